@@ -17,15 +17,52 @@ from upmplgmodels import (
 )
 from upmplgutils import *
 import hraapi
+import httpcaching
+import os
 import urllib
 import datetime
 import traceback
 import base64
 
+# Disk-backed cache for the vault catalog calls (album details, categories, editor playlists,
+# search). Lists get a shorter ttl, they change more often. Track details carry the stream url
+# and user calls are user data, they are not cached. userData holds the session id, which is
+# renewed every 20 mn and does not change the catalog responses, so it is not part of the key.
+_http_cache = None
+_http_cache_item_regex = r"/vault/(album|categories/ListAllCategories|categories/ListAllGenre)/?\?"
+_http_cache_list_regex = (r"/vault/(categories/ListCategorieContent|search/quickSearch|SearchInCategory|"
+                          r"editorPlaylists|getSingleEditorPlaylists|getEditorPlaylists(Moods|Genres|Themes))/?\?")
+_http_cache_list_max_ttl_sec = 3600
+
+
+def _get_http_cache():
+    global _http_cache
+    if _http_cache is None and getOptionValue("hraenablehttpresponsecache", True):
+        ttl = getOptionValue("hrahttpresponsecachettlsec", 86400)
+        try:
+            _http_cache = httpcaching.HttpResponseCache(
+                name="hra",
+                db_file=os.path.join(getcachedir("hra"), "http-response-cache.db"),
+                rules=[
+                    httpcaching.HttpCacheRule(pattern=_http_cache_item_regex, ttl_sec=ttl),
+                    httpcaching.HttpCacheRule(
+                        pattern=_http_cache_list_regex, ttl_sec=min(ttl, _http_cache_list_max_ttl_sec))],
+                logger=uplog,
+                max_size_bytes=getOptionValue("hrahttpresponsecachemaxsizemb", 64) * 1024 * 1024,
+                ignored_params=["userData"])
+            _http_cache.open()
+        except Exception as ex:
+            uplog(f"HRA: cannot open http response cache: {ex}")
+            _http_cache = False
+    return _http_cache
+
 
 class Session(object):
     def __init__(self):
         self.api = hraapi.HRAAPI()
+        http_cache = _get_http_cache()
+        if http_cache:
+            httpcaching.install(self.api.session, http_cache)
 
     def login(self, username, password, lang):
         self.api.setlang(lang)
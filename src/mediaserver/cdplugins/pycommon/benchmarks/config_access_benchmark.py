@@ -0,0 +1,83 @@
+# Copyright (C) 2026 Giovanni Fulco
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Micro-benchmark of configuration parameter access, read from the
+# configuration file on every call versus served by a ConfigSnapshotHolder.
+# Run from the cdplugins directory:
+#   python3 pycommon/benchmarks/config_access_benchmark.py [iterations]
+
+import os
+import sys
+import tempfile
+import time
+from typing import Any
+from typing import Callable
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import upmplgutils  # noqa: E402
+from configsnapshot import ConfigSnapshotHolder  # noqa: E402
+
+
+class _Param:
+
+    def __init__(self, key: str, default_value: Any):
+        self.key: str = key
+        self.default_value: Any = default_value
+
+
+# roughly the size of a plugin configuration
+__param_count: int = 100
+
+
+def measure_per_call_ns(accessor: Callable[[], Any], iterations: int) -> float:
+    """Returns the average cost of one call in nanoseconds"""
+    start: int = time.perf_counter_ns()
+    for _ in range(iterations):
+        accessor()
+    return (time.perf_counter_ns() - start) / iterations
+
+
+def measure_config_param_access(iterations: int) -> tuple[float, float]:
+    """Returns the cost of one config param access in nanoseconds, without and with the snapshot"""
+    param_list: list[_Param] = [_Param(f"benchparam{i}", 0) for i in range(__param_count)]
+
+    def load_bool(param: _Param) -> bool:
+        return int(upmplgutils.getOptionValue(param.key, param.default_value)) == 1
+
+    holder: ConfigSnapshotHolder = ConfigSnapshotHolder(
+        param_list=lambda: param_list,
+        str_loader=lambda p: upmplgutils.getOptionValue(p.key, p.default_value),
+        int_loader=lambda p: int(upmplgutils.getOptionValue(p.key, p.default_value)),
+        bool_loader=load_bool)
+    # the last parameter is not in the file, as most parameters in a real configuration
+    measured: _Param = param_list[-1]
+    live: float = measure_per_call_ns(lambda: load_bool(measured), iterations)
+    snapshot: float = measure_per_call_ns(lambda: holder.get_bool(measured), iterations)
+    return live, snapshot
+
+
+if __name__ == "__main__":
+    iteration_count: int = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        config_file_name: str = os.path.join(tmp_dir, "upmpdcli.conf")
+        with open(config_file_name, "w") as f:
+            for i in range(__param_count - 1):
+                f.write(f"benchparam{i} = {i % 2}\n")
+        os.environ["UPMPD_CONFIG"] = config_file_name
+        upmplgutils.resetConfigObject()
+        live_ns, snapshot_ns = measure_config_param_access(iteration_count)
+    print(f"config param access over [{iteration_count}] calls: "
+          f"live [{live_ns:.0f}] ns snapshot [{snapshot_ns:.0f}] ns")
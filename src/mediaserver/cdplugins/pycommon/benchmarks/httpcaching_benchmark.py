@@ -0,0 +1,117 @@
+# Copyright (C) 2026 Giovanni Fulco
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+# Http response cache against a local mock server with a fixed latency per request.
+# Three "starts" of a plugin fetching the same album pages:
+# - first start, empty cache
+# - restart, entries still fresh
+# - restart, entries expired, revalidated by ETag (the server answers 304)
+# Run from the cdplugins directory:
+#   python3 pycommon/benchmarks/httpcaching_benchmark.py [page_count] [latency_ms]
+
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from httpcaching import HttpCacheRule  # noqa: E402
+from httpcaching import HttpResponseCache  # noqa: E402
+from httpcaching import install  # noqa: E402
+
+
+class _AlbumHandler(BaseHTTPRequestHandler):
+
+    latency_sec: float = 0.05
+    status_list: list[int] = []
+
+    def do_GET(self):
+        time.sleep(self.latency_sec)
+        if self.headers.get("If-None-Match") == "\"v1\"":
+            self.status_list.append(304)
+            self.send_response(304)
+            self.end_headers()
+            return
+        body: bytes = (f"{{\"id\": \"{self.path}\", \"tracks\": [" +
+                       ", ".join(f"{{\"id\": {i}, \"title\": \"track {i}\"}}" for i in range(20)) +
+                       "]}").encode("utf-8")
+        self.status_list.append(200)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", "\"v1\"")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def fetch_all(db_file: str, base_url: str, page_count: int) -> float:
+    """One plugin start: opens the cache and gets every page, returns the elapsed seconds"""
+    start: float = time.perf_counter()
+    cache: HttpResponseCache = HttpResponseCache(
+        name="benchmark",
+        db_file=db_file,
+        rules=[HttpCacheRule(pattern=r"/albums/", ttl_sec=3600)],
+        logger=lambda message: None)
+    cache.open()
+    session: requests.Session = install(requests.Session(), cache)
+    for i in range(page_count):
+        session.get(f"{base_url}/albums/{i}").raise_for_status()
+    session.close()
+    return time.perf_counter() - start
+
+
+def run(page_count: int, latency_ms: int) -> dict[str, str]:
+    _AlbumHandler.latency_sec = latency_ms / 1000.0
+    server: ThreadingHTTPServer = ThreadingHTTPServer(("127.0.0.1", 0), _AlbumHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url: str = f"http://127.0.0.1:{server.server_address[1]}"
+    result: dict[str, str] = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_file: str = os.path.join(tmp_dir, "http-cache.db")
+        phase: str
+        for phase in ["first start", "restart, fresh", "restart, expired"]:
+            if phase == "restart, expired":
+                # as if the ttl had elapsed between the runs
+                connection: sqlite3.Connection = sqlite3.connect(db_file)
+                connection.execute("UPDATE http_response_v1 SET expires_at = 0")
+                connection.commit()
+                connection.close()
+            _AlbumHandler.status_list = []
+            elapsed: float = fetch_all(db_file, base_url, page_count)
+            statuses: str = ", ".join(f"{s} x{_AlbumHandler.status_list.count(s)}"
+                                      for s in sorted(set(_AlbumHandler.status_list)))
+            result[phase] = f"[{elapsed:.2f}] sec server responses [{statuses}]"
+    server.shutdown()
+    server.server_close()
+    return result
+
+
+if __name__ == "__main__":
+    pages: int = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    latency: int = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    print(f"http response cache, [{pages}] pages, [{latency}] ms latency")
+    for name, line in run(pages, latency).items():
+        print(f"  {name:<17} {line}")
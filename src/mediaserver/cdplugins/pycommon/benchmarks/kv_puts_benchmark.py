@@ -0,0 +1,80 @@
+# Copyright (C) 2026 Giovanni Fulco
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Micro-benchmark of key-value cache puts on a temporary db.
+# Run from the cdplugins directory:
+#   python3 pycommon/benchmarks/kv_puts_benchmark.py [count]
+
+import datetime
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from keyvaluecaching import KeyValueItem  # noqa: E402
+from keyvaluecaching import build_create_v1_sql  # noqa: E402
+from keyvaluecaching import insert_kv_item_v1  # noqa: E402
+from keyvaluecaching import load_kv_item_v1  # noqa: E402
+from keyvaluecaching import put_key_value_item  # noqa: E402
+from keyvaluecaching import update_kv_item_v1  # noqa: E402
+from keyvaluecaching import upsert_kv_item_list_v1  # noqa: E402
+from keyvaluecaching import upsert_kv_item_v1  # noqa: E402
+import sqlhelper  # noqa: E402
+import sqlite3util  # noqa: E402
+
+
+def measure_puts_per_sec(count: int) -> dict[str, float]:
+    """Puts/s for select+insert/update (as put_key_value_item), upsert with one commit per put,
+    and upsert_kv_item_list_v1 with one commit for all puts"""
+    result: dict[str, float] = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        connection: sqlite3.Connection = sqlite3.connect(os.path.join(tmp_dir, "kv.db"))
+        connection.execute(build_create_v1_sql())
+        executor: sqlhelper.SqlExecutor = sqlite3util.get_sqlite3_executor(connection)
+        selector: sqlhelper.SqlSelector = sqlite3util.get_sqlite3_selector(connection)
+        # half of the keys are new, half are updates
+        key_list: list[str] = [str(i // 2) for i in range(count)]
+        start: float = time.perf_counter()
+        for key in key_list:
+            put_key_value_item(
+                key_value_item=KeyValueItem("select_then_write", key, key),
+                creator=lambda key_value_item, creation_timestamp, do_commit: insert_kv_item_v1(
+                    executor, key_value_item, creation_timestamp, do_commit),
+                updater=lambda partition, key, value, update_timestamp, do_commit: update_kv_item_v1(
+                    executor, partition, key, value, update_timestamp),
+                loader=lambda partition, key: load_kv_item_v1(selector, partition, key))
+        result["select_then_write"] = count / (time.perf_counter() - start)
+        start = time.perf_counter()
+        for key in key_list:
+            upsert_kv_item_v1(executor, KeyValueItem("upsert", key, key), datetime.datetime.now())
+        result["upsert"] = count / (time.perf_counter() - start)
+        start = time.perf_counter()
+        upsert_kv_item_list_v1(
+            sqlite3util.get_sqlite3_many_executor(connection),
+            [KeyValueItem("upsert_list", key, key) for key in key_list],
+            datetime.datetime.now())
+        result["upsert_list"] = count / (time.perf_counter() - start)
+        connection.close()
+    return result
+
+
+if __name__ == "__main__":
+    puts_count: int = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    print(f"key-value puts/s for [{puts_count}] puts (half updates)")
+    for name, puts_per_sec in measure_puts_per_sec(puts_count).items():
+        print(f"  {name} [{puts_per_sec:.0f}]")
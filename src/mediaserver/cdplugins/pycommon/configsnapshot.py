@@ -0,0 +1,169 @@
+# Copyright (C) 2026 Giovanni Fulco
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# typed, read-only snapshot of the plugin configuration parameters
+# all parameters are read and converted once, accessors then become dictionary lookups
+# values which cannot be computed upfront are delegated to the loader on every call,
+# so that behavior (including errors) is the same as reading the configuration directly
+
+import signal
+import threading
+import time
+from types import MappingProxyType
+from typing import Any
+from typing import Callable
+from typing import Iterable
+from typing import Mapping
+from typing import Protocol
+
+import upmplgutils
+
+
+class ConfigSnapshotLogger(Protocol):
+    def __call__(self, message: str) -> None:
+        ...
+
+
+_MISSING: object = object()
+
+
+class ConfigSnapshot:
+
+    def __init__(
+            self,
+            str_values: dict[Any, str],
+            int_values: dict[Any, int],
+            bool_values: dict[Any, bool]):
+        self.__str_values: Mapping[Any, str] = MappingProxyType(str_values)
+        self.__int_values: Mapping[Any, int] = MappingProxyType(int_values)
+        self.__bool_values: Mapping[Any, bool] = MappingProxyType(bool_values)
+        self.__created: float = time.time()
+
+    @property
+    def created(self) -> float:
+        return self.__created
+
+    @property
+    def size(self) -> int:
+        return len(self.__str_values) + len(self.__int_values) + len(self.__bool_values)
+
+    def get_str(self, param: Any, loader: Callable[[Any], str]) -> str:
+        v: Any = self.__str_values.get(param, _MISSING)
+        return loader(param) if v is _MISSING else v
+
+    def get_int(self, param: Any, loader: Callable[[Any], int]) -> int:
+        v: Any = self.__int_values.get(param, _MISSING)
+        return loader(param) if v is _MISSING else v
+
+    def get_bool(self, param: Any, loader: Callable[[Any], bool]) -> bool:
+        v: Any = self.__bool_values.get(param, _MISSING)
+        return loader(param) if v is _MISSING else v
+
+
+def _load_all(
+        param_list: Iterable[Any],
+        loader: Callable[[Any], Any],
+        accept_default: Callable[[Any], bool]) -> dict[Any, Any]:
+    result: dict[Any, Any] = {}
+    for param in param_list:
+        # only read the types which are compatible with the default value
+        # other conversions might be meaningless and would log errors
+        if not accept_default(param.default_value):
+            continue
+        try:
+            result[param] = loader(param)
+        except Exception:
+            # not valid for this type, will be delegated to the loader
+            pass
+    return result
+
+
+class ConfigSnapshotHolder:
+
+    def __init__(
+            self,
+            param_list: Callable[[], Iterable[Any]],
+            str_loader: Callable[[Any], str],
+            int_loader: Callable[[Any], int],
+            bool_loader: Callable[[Any], bool]):
+        self.__param_list: Callable[[], Iterable[Any]] = param_list
+        self.__str_loader: Callable[[Any], str] = str_loader
+        self.__int_loader: Callable[[Any], int] = int_loader
+        self.__bool_loader: Callable[[Any], bool] = bool_loader
+        self.__lock: threading.Lock = threading.Lock()
+        self.__snapshot: ConfigSnapshot = None
+
+    def get(self) -> ConfigSnapshot:
+        snapshot: ConfigSnapshot = self.__snapshot
+        if snapshot is None:
+            with self.__lock:
+                if self.__snapshot is None:
+                    self.__snapshot = self.__build()
+                snapshot = self.__snapshot
+        return snapshot
+
+    def get_str(self, param: Any) -> str:
+        return self.get().get_str(param, self.__str_loader)
+
+    def get_int(self, param: Any) -> int:
+        return self.get().get_int(param, self.__int_loader)
+
+    def get_bool(self, param: Any) -> bool:
+        return self.get().get_bool(param, self.__bool_loader)
+
+    def reload(self) -> ConfigSnapshot:
+        """Reads the configuration file again and replaces the current snapshot"""
+        with self.__lock:
+            upmplgutils.resetConfigObject()
+            self.__snapshot = self.__build()
+            return self.__snapshot
+
+    def install_reload_on_sighup(self, logger: ConfigSnapshotLogger) -> bool:
+        """Must be called from the main thread"""
+        if not hasattr(signal, "SIGHUP"):
+            return False
+
+        def handler(signum, frame):
+            # do not hold the lock in the handler, the main thread might own it
+            threading.Thread(target=self.__reload_and_log, args=(logger,), daemon=True).start()
+
+        signal.signal(signal.SIGHUP, handler)
+        return True
+
+    def __reload_and_log(self, logger: ConfigSnapshotLogger):
+        try:
+            start: float = time.time()
+            snapshot: ConfigSnapshot = self.reload()
+            logger(f"Configuration reloaded [{snapshot.size}] values "
+                   f"in [{(time.time() - start):.3f}] sec")
+        except Exception as ex:
+            logger(f"Configuration reload failed due to [{type(ex)}] [{ex}]")
+
+    def __build(self) -> ConfigSnapshot:
+        param_list: list[Any] = list(self.__param_list())
+        return ConfigSnapshot(
+            str_values=_load_all(
+                param_list,
+                self.__str_loader,
+                lambda dv: dv is None or isinstance(dv, str)),
+            int_values=_load_all(
+                param_list,
+                self.__int_loader,
+                lambda dv: dv is None or isinstance(dv, int)),
+            bool_values=_load_all(
+                param_list,
+                self.__bool_loader,
+                lambda dv: isinstance(dv, int)))
+
@@ -0,0 +1,375 @@
+# Copyright (C) 2026 Giovanni Fulco
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# disk-backed cache for http GET responses, shared by plugins using requests
+# the cache is a transport adapter mounted on a requests.Session, so api clients are unchanged
+# only urls matching a rule are cached, each rule has its own ttl
+# when an entry is expired and the server sent ETag/Last-Modified, the request is made conditional
+# and a 304 renews the stored response, otherwise the entry is simply fetched again
+# entries survive restarts, the total size is bounded, least recently used entries go first
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Protocol
+from urllib.parse import parse_qsl
+from urllib.parse import urlencode
+from urllib.parse import urlsplit
+from urllib.parse import urlunsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+
+class HttpCacheLogger(Protocol):
+    def __call__(self, message: str) -> None:
+        ...
+
+
+# last access is written to the db at most once in this interval
+_TOUCH_RESOLUTION_SEC: int = 300
+# when over budget, evict until the total size is under this fraction of the budget
+_LOW_WATERMARK: float = 0.9
+# response headers worth storing, the body is stored decoded so Content-Encoding is not
+_STORED_HEADERS: list[str] = ["Content-Type", "ETag", "Last-Modified"]
+
+
+class HttpCacheRule:
+
+    def __init__(self, pattern: str, ttl_sec: int):
+        self.__pattern: re.Pattern = re.compile(pattern)
+        self.__ttl_sec: int = ttl_sec
+
+    @property
+    def pattern(self) -> str:
+        return self.__pattern.pattern
+
+    @property
+    def ttl_sec(self) -> int:
+        return self.__ttl_sec
+
+    def matches(self, url: str) -> bool:
+        return self.__pattern.search(url) is not None
+
+
+class HttpCacheStatistics:
+
+    def __init__(self):
+        self.hits: int = 0
+        self.revalidated: int = 0
+        self.misses: int = 0
+        self.stored: int = 0
+        self.evicted: int = 0
+        self.entries: int = 0
+        self.bytes: int = 0
+
+    @property
+    def lookups(self) -> int:
+        return self.hits + self.revalidated + self.misses
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups: int = self.lookups
+        return (self.hits + self.revalidated) / lookups if lookups > 0 else 0.0
+
+    def __str__(self) -> str:
+        return (f"entries [{self.entries}] bytes [{self.bytes}] "
+                f"lookups [{self.lookups}] hit ratio [{self.hit_ratio:.3f}] "
+                f"hits [{self.hits}] revalidated [{self.revalidated}] misses [{self.misses}] "
+                f"stored [{self.stored}] evicted [{self.evicted}]")
+
+
+class _StoredResponse:
+
+    def __init__(
+            self,
+            status: int,
+            headers: dict[str, str],
+            body: bytes,
+            etag: str,
+            last_modified: str,
+            expires_at: float,
+            last_access: float):
+        self.status: int = status
+        self.headers: dict[str, str] = headers
+        self.body: bytes = body
+        self.etag: str = etag
+        self.last_modified: str = last_modified
+        self.expires_at: float = expires_at
+        self.last_access: float = last_access
+
+    @property
+    def revalidable(self) -> bool:
+        return self.etag is not None or self.last_modified is not None
+
+
+class HttpResponseCache:
+
+    def __init__(
+            self,
+            name: str,
+            db_file: str,
+            rules: list[HttpCacheRule],
+            logger: HttpCacheLogger,
+            max_size_bytes: int = 0,
+            ignored_params: list[str] = None,
+            report_every: int = 0):
+        self.__name: str = name
+        self.__db_file: str = db_file
+        self.__rules: list[HttpCacheRule] = rules
+        self.__logger: HttpCacheLogger = logger
+        # 0 means no limit
+        self.__max_size_bytes: int = max_size_bytes
+        # query parameters which do not change the response (e.g. session ids)
+        self.__ignored_params: set[str] = set(ignored_params) if ignored_params else set()
+        self.__report_every: int = report_every
+        self.__lock: threading.Lock = threading.Lock()
+        self.__statistics: HttpCacheStatistics = HttpCacheStatistics()
+        self.__connection: sqlite3.Connection = None
+
+    @property
+    def name(self) -> str:
+        return self.__name
+
+    @property
+    def statistics(self) -> HttpCacheStatistics:
+        return self.__statistics
+
+    def open(self):
+        """Opens (and creates if needed) the db, unusable entries are purged"""
+        start: float = time.time()
+        os.makedirs(os.path.dirname(self.__db_file), exist_ok=True)
+        connection: sqlite3.Connection = sqlite3.connect(self.__db_file, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS http_response_v1("
+            "cache_key VARCHAR(64) PRIMARY KEY, "
+            "url TEXT, "
+            "status INTEGER, "
+            "headers TEXT, "
+            "body BLOB, "
+            "etag TEXT, "
+            "last_modified TEXT, "
+            "expires_at REAL, "
+            "size INTEGER, "
+            "last_access REAL)")
+        connection.execute(
+            "CREATE INDEX IF NOT EXISTS idx_http_response_v1_last_access "
+            "ON http_response_v1(last_access)")
+        # expired entries without validators cannot be reused
+        purged: int = connection.execute(
+            "DELETE FROM http_response_v1 "
+            "WHERE expires_at < ? AND etag IS NULL AND last_modified IS NULL",
+            (time.time(),)).rowcount
+        connection.commit()
+        entries, total = connection.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM http_response_v1").fetchone()
+        with self.__lock:
+            self.__connection = connection
+            self.__statistics.entries = entries
+            self.__statistics.bytes = total
+            self.__evict()
+            connection.commit()
+        self.__logger(f"HttpResponseCache [{self.__name}] opened [{self.__db_file}] "
+                      f"entries [{entries}] bytes [{total}] purged [{purged}] "
+                      f"in [{(time.time() - start):.3f}] sec")
+
+    def clear(self):
+        with self.__lock:
+            self.__connection.execute("DELETE FROM http_response_v1")
+            self.__connection.commit()
+            self.__statistics.entries = 0
+            self.__statistics.bytes = 0
+
+    def get_rule(self, method: str, url: str) -> HttpCacheRule | None:
+        if method != "GET" or self.__connection is None:
+            return None
+        rule: HttpCacheRule
+        for rule in self.__rules:
+            if rule.matches(url):
+                return rule
+        return None
+
+    def get_key(self, url: str) -> str:
+        """Key for url, query parameters are sorted and ignored parameters are removed"""
+        parts = urlsplit(url)
+        query: list[tuple[str, str]] = sorted(
+            (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+            if k not in self.__ignored_params)
+        normalized: str = urlunsplit((parts.scheme, parts.netloc.lower(), parts.path, urlencode(query), ""))
+        return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+    def report(self):
+        self.__logger(f"HttpResponseCache [{self.__name}] {self.__statistics}")
+
+    def _load(self, cache_key: str) -> _StoredResponse | None:
+        with self.__lock:
+            row = self.__connection.execute(
+                "SELECT status, headers, body, etag, last_modified, expires_at, last_access "
+                "FROM http_response_v1 WHERE cache_key = ?",
+                (cache_key,)).fetchone()
+        if row is None:
+            return None
+        return _StoredResponse(
+            status=row[0],
+            headers=json.loads(row[1]),
+            body=row[2],
+            etag=row[3],
+            last_modified=row[4],
+            expires_at=row[5],
+            last_access=row[6])
+
+    def _hit(self, cache_key: str, stored: _StoredResponse, revalidated: bool, ttl_sec: int):
+        now: float = time.time()
+        with self.__lock:
+            if revalidated:
+                self.__statistics.revalidated += 1
+                self.__connection.execute(
+                    "UPDATE http_response_v1 SET expires_at = ?, last_access = ? WHERE cache_key = ?",
+                    (now + ttl_sec, now, cache_key))
+                self.__connection.commit()
+            else:
+                self.__statistics.hits += 1
+                if (now - stored.last_access) > _TOUCH_RESOLUTION_SEC:
+                    self.__connection.execute(
+                        "UPDATE http_response_v1 SET last_access = ? WHERE cache_key = ?",
+                        (now, cache_key))
+                    self.__connection.commit()
+            self.__maybe_report()
+
+    def _miss(self):
+        with self.__lock:
+            self.__statistics.misses += 1
+            self.__maybe_report()
+
+    def _store(self, cache_key: str, url: str, response: requests.Response, ttl_sec: int):
+        now: float = time.time()
+        headers: dict[str, str] = {k: response.headers[k] for k in _STORED_HEADERS if k in response.headers}
+        body: bytes = response.content
+        size: int = len(body) + len(url)
+        with self.__lock:
+            previous = self.__connection.execute(
+                "SELECT size FROM http_response_v1 WHERE cache_key = ?",
+                (cache_key,)).fetchone()
+            self.__connection.execute(
+                "INSERT INTO http_response_v1"
+                "(cache_key, url, status, headers, body, etag, last_modified, expires_at, size, last_access) "
+                "VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(cache_key) DO UPDATE SET "
+                "url = excluded.url, status = excluded.status, headers = excluded.headers, "
+                "body = excluded.body, etag = excluded.etag, last_modified = excluded.last_modified, "
+                "expires_at = excluded.expires_at, size = excluded.size, last_access = excluded.last_access",
+                (cache_key, url, response.status_code, json.dumps(headers), body,
+                 response.headers.get("ETag"), response.headers.get("Last-Modified"),
+                 now + ttl_sec, size, now))
+            if previous:
+                self.__statistics.bytes -= previous[0]
+            else:
+                self.__statistics.entries += 1
+            self.__statistics.bytes += size
+            self.__statistics.stored += 1
+            self.__evict()
+            self.__connection.commit()
+
+    def __evict(self):
+        # lock must be held by the caller
+        if self.__max_size_bytes <= 0 or self.__statistics.bytes <= self.__max_size_bytes:
+            return
+        target: int = int(self.__max_size_bytes * _LOW_WATERMARK)
+        victim_list: list[tuple[str, int]] = []
+        freed: int = 0
+        for cache_key, size in self.__connection.execute(
+                "SELECT cache_key, size FROM http_response_v1 ORDER BY last_access"):
+            if self.__statistics.bytes - freed <= target:
+                break
+            victim_list.append((cache_key,))
+            freed += size
+        self.__connection.executemany("DELETE FROM http_response_v1 WHERE cache_key = ?", victim_list)
+        self.__statistics.entries -= len(victim_list)
+        self.__statistics.bytes -= freed
+        self.__statistics.evicted += len(victim_list)
+
+    def __maybe_report(self):
+        # lock must be held by the caller
+        if self.__report_every > 0 and self.__statistics.lookups % self.__report_every == 0:
+            self.__logger(f"HttpResponseCache [{self.__name}] {self.__statistics}")
+
+
+class CachingAdapter(HTTPAdapter):
+
+    def __init__(self, cache: HttpResponseCache, **kwargs):
+        super().__init__(**kwargs)
+        self.__cache: HttpResponseCache = cache
+
+    def send(self, request: requests.PreparedRequest, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        rule: HttpCacheRule = (self.__cache.get_rule(request.method, request.url)
+                               if not stream and not self.__is_conditional(request)
+                               else None)
+        if rule is None:
+            return super().send(request, stream=stream, timeout=timeout, verify=verify, cert=cert, proxies=proxies)
+        cache_key: str = self.__cache.get_key(request.url)
+        stored: _StoredResponse = self.__cache._load(cache_key)
+        if stored and stored.expires_at > time.time():
+            self.__cache._hit(cache_key, stored, revalidated=False, ttl_sec=rule.ttl_sec)
+            return self.__build_response(request, stored)
+        if stored and stored.revalidable:
+            request = request.copy()
+            if stored.etag:
+                request.headers["If-None-Match"] = stored.etag
+            if stored.last_modified:
+                request.headers["If-Modified-Since"] = stored.last_modified
+        response: requests.Response = super().send(
+            request, stream=stream, timeout=timeout, verify=verify, cert=cert, proxies=proxies)
+        if response.status_code == 304 and stored:
+            response.close()
+            self.__cache._hit(cache_key, stored, revalidated=True, ttl_sec=rule.ttl_sec)
+            return self.__build_response(request, stored)
+        self.__cache._miss()
+        if response.status_code == 200 and "no-store" not in response.headers.get("Cache-Control", ""):
+            self.__cache._store(cache_key, request.url, response, rule.ttl_sec)
+        return response
+
+    def __is_conditional(self, request: requests.PreparedRequest) -> bool:
+        # the caller is doing its own revalidation
+        return "If-None-Match" in request.headers or "If-Modified-Since" in request.headers
+
+    def __build_response(self, request: requests.PreparedRequest, stored: _StoredResponse) -> requests.Response:
+        response: requests.Response = requests.Response()
+        response.status_code = stored.status
+        response.reason = "OK"
+        response.headers = CaseInsensitiveDict(stored.headers)
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        # body is already there, like a consumed stream
+        response._content = stored.body
+        response._content_consumed = True
+        return response
+
+
+def install(session: requests.Session, cache: HttpResponseCache) -> requests.Session:
+    """Mounts a caching adapter on session for http and https"""
+    adapter: CachingAdapter = CachingAdapter(cache)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
@@ -0,0 +1,562 @@
+# Copyright (C) 2026 Giovanni Fulco
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# in-memory index of an image cache directory, with size/age bounded eviction
+# the directory is scanned once, then the index is kept up to date on add/remove
+# eviction runs in a background thread, a limited number of files per run
+# missing images are downloaded in background on a shared keep-alive session, once per url
+
+import mimetypes
+import os
+import queue
+import shutil
+import time
+import threading
+from collections import OrderedDict
+from typing import Callable
+from typing import Protocol
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class ImageCacheLogger(Protocol):
+    def __call__(self, message: str) -> None:
+        ...
+
+
+# last access time is written to disk (as mtime) at most once in this interval
+# so that the lru order survives a restart without a syscall on every hit
+_TOUCH_RESOLUTION_SEC: int = 3600
+# when over budget, evict until the total size is under this fraction of the budget
+_LOW_WATERMARK: float = 0.9
+
+
+class CachedImageFile:
+
+    def __init__(self, sub_dir: str, file_name: str, size: int, last_access: float, inode: tuple[int, int] = None):
+        self.__sub_dir: str = sub_dir
+        self.__file_name: str = file_name
+        self.__size: int = size
+        # (st_dev, st_ino), None when unknown
+        self.__inode: tuple[int, int] = inode
+        self.__last_access: float = last_access
+        self.__last_touch: float = last_access
+
+    @property
+    def sub_dir(self) -> str:
+        return self.__sub_dir
+
+    @property
+    def file_name(self) -> str:
+        return self.__file_name
+
+    @property
+    def relative_path(self) -> str:
+        return os.path.join(self.__sub_dir, self.__file_name)
+
+    @property
+    def size(self) -> int:
+        return self.__size
+
+    @property
+    def inode(self) -> tuple[int, int]:
+        return self.__inode
+
+    @property
+    def last_access(self) -> float:
+        return self.__last_access
+
+    @property
+    def last_touch(self) -> float:
+        return self.__last_touch
+
+    def access(self, now: float):
+        self.__last_access = now
+
+    def touched(self, now: float):
+        self.__last_touch = now
+
+
+def _get_inode(st: os.stat_result) -> tuple[int, int]:
+    # st_ino is 0 where the platform does not provide it
+    return (st.st_dev, st.st_ino) if st.st_ino else None
+
+
+def _add_link(link_count: dict[tuple[int, int], int], cached: CachedImageFile) -> int:
+    """Returns the size added to the total, hard links to the same file count once"""
+    if cached.inode is None:
+        return cached.size
+    count: int = link_count.get(cached.inode, 0)
+    link_count[cached.inode] = count + 1
+    return cached.size if count == 0 else 0
+
+
+def _remove_link(link_count: dict[tuple[int, int], int], cached: CachedImageFile) -> int:
+    """Returns the size freed, which is 0 while other links to the same file are left"""
+    if cached.inode is None:
+        return cached.size
+    count: int = link_count.get(cached.inode, 0)
+    if count > 1:
+        link_count[cached.inode] = count - 1
+        return 0
+    link_count.pop(cached.inode, None)
+    return cached.size
+
+
+class ImageCacheStatistics:
+
+    def __init__(
+            self,
+            file_count: int,
+            total_size: int,
+            evicted_count: int,
+            evicted_size: int,
+            eviction_runs: int):
+        self.__file_count: int = file_count
+        self.__total_size: int = total_size
+        self.__evicted_count: int = evicted_count
+        self.__evicted_size: int = evicted_size
+        self.__eviction_runs: int = eviction_runs
+
+    @property
+    def file_count(self) -> int:
+        return self.__file_count
+
+    @property
+    def total_size(self) -> int:
+        return self.__total_size
+
+    @property
+    def evicted_count(self) -> int:
+        return self.__evicted_count
+
+    @property
+    def evicted_size(self) -> int:
+        return self.__evicted_size
+
+    @property
+    def eviction_runs(self) -> int:
+        return self.__eviction_runs
+
+    def __str__(self) -> str:
+        return (f"files [{self.__file_count}] "
+                f"size [{self.__total_size}] "
+                f"evicted [{self.__evicted_count}] "
+                f"evicted size [{self.__evicted_size}] "
+                f"runs [{self.__eviction_runs}]")
+
+
+class ImageCache:
+
+    def __init__(
+            self,
+            name: str,
+            directory: str,
+            accept: Callable[[str], bool],
+            logger: ImageCacheLogger,
+            max_size_bytes: int = 0,
+            max_age_sec: int = 0):
+        self.__name: str = name
+        self.__directory: str = directory
+        self.__accept: Callable[[str], bool] = accept
+        self.__logger: ImageCacheLogger = logger
+        self.__max_size_bytes: int = max_size_bytes
+        self.__max_age_sec: int = max_age_sec
+        self.__lock: threading.Lock = threading.Lock()
+        # relative path -> file
+        self.__by_path: dict[str, CachedImageFile] = {}
+        # (sub_dir, file name without extension) -> file
+        self.__by_stem: dict[tuple[str, str], CachedImageFile] = {}
+        # (st_dev, st_ino) -> number of indexed files sharing it
+        self.__link_count: dict[tuple[int, int], int] = {}
+        # bytes on disk, hard linked files are counted once
+        self.__total_size: int = 0
+        self.__evicted_count: int = 0
+        self.__evicted_size: int = 0
+        self.__eviction_runs: int = 0
+        self.__eviction_thread: threading.Thread = None
+
+    @property
+    def name(self) -> str:
+        return self.__name
+
+    @property
+    def directory(self) -> str:
+        return self.__directory
+
+    @property
+    def bounded(self) -> bool:
+        return self.__max_size_bytes > 0 or self.__max_age_sec > 0
+
+    def load(self) -> int:
+        start: float = time.time()
+        spurious_count: int = 0
+        by_path: dict[str, CachedImageFile] = {}
+        by_stem: dict[tuple[str, str], CachedImageFile] = {}
+        link_count: dict[tuple[int, int], int] = {}
+        total_size: int = 0
+        to_visit: list[str] = [""]
+        while len(to_visit) > 0:
+            sub_dir: str = to_visit.pop()
+            entry: os.DirEntry
+            with os.scandir(os.path.join(self.__directory, sub_dir)) as it:
+                for entry in it:
+                    if entry.is_dir():
+                        to_visit.append(os.path.join(sub_dir, entry.name))
+                        continue
+                    if not entry.is_file() or not self.__accept(entry.name):
+                        continue
+                    st: os.stat_result = entry.stat()
+                    current: CachedImageFile = CachedImageFile(
+                        sub_dir=sub_dir,
+                        file_name=entry.name,
+                        size=st.st_size,
+                        last_access=st.st_mtime,
+                        inode=_get_inode(st))
+                    stem_key: tuple[str, str] = (sub_dir, os.path.splitext(entry.name)[0])
+                    existing: CachedImageFile = by_stem.get(stem_key)
+                    if existing:
+                        # more than one image for the same id, keep the newest
+                        to_remove: CachedImageFile = existing if existing.last_access < current.last_access else current
+                        if to_remove == existing:
+                            del by_path[existing.relative_path]
+                            total_size -= _remove_link(link_count, existing)
+                        self.__delete_file(to_remove)
+                        spurious_count += 1
+                        if to_remove == current:
+                            continue
+                    by_path[current.relative_path] = current
+                    by_stem[stem_key] = current
+                    total_size += _add_link(link_count, current)
+        with self.__lock:
+            self.__by_path = by_path
+            self.__by_stem = by_stem
+            self.__link_count = link_count
+            self.__total_size = total_size
+        self.__logger(f"ImageCache [{self.__name}] indexed [{len(by_path)}] files "
+                      f"size [{total_size}] "
+                      f"(removed [{spurious_count}] spurious) "
+                      f"in [{(time.time() - start):.3f}] sec")
+        return len(by_path)
+
+    def get_file_name(self, item_id: str, sub_dir: str = "") -> str | None:
+        """Returns the cached file name for item_id, which might or might not have an extension"""
+        with self.__lock:
+            cached: CachedImageFile = self.__by_path.get(os.path.join(sub_dir, item_id))
+            if not cached:
+                cached = self.__by_stem.get((sub_dir, item_id))
+            return cached.file_name if cached else None
+
+    def get_file_path(self, item_id: str, sub_dir: str = "") -> str | None:
+        file_name: str = self.get_file_name(item_id=item_id, sub_dir=sub_dir)
+        return os.path.join(self.__directory, sub_dir, file_name) if file_name else None
+
+    def touch(self, file_name: str, sub_dir: str = ""):
+        now: float = time.time()
+        with self.__lock:
+            cached: CachedImageFile = self.__by_path.get(os.path.join(sub_dir, file_name))
+            if not cached:
+                return
+            cached.access(now)
+            if now - cached.last_touch < _TOUCH_RESOLUTION_SEC:
+                return
+            cached.touched(now)
+        try:
+            os.utime(os.path.join(self.__directory, sub_dir, file_name))
+        except Exception as ex:
+            self.__logger(f"ImageCache [{self.__name}] cannot touch [{file_name}] due to [{type(ex)}] [{ex}]")
+
+    def add(self, file_name: str, size: int, sub_dir: str = ""):
+        now: float = time.time()
+        inode: tuple[int, int] = None
+        try:
+            inode = _get_inode(os.stat(os.path.join(self.__directory, sub_dir, file_name)))
+        except OSError:
+            # counted on its own
+            pass
+        current: CachedImageFile = CachedImageFile(
+            sub_dir=sub_dir,
+            file_name=file_name,
+            size=size,
+            last_access=now,
+            inode=inode)
+        with self.__lock:
+            self.__remove_entry(self.__by_path.get(current.relative_path))
+            self.__by_path[current.relative_path] = current
+            self.__by_stem[(sub_dir, os.path.splitext(file_name)[0])] = current
+            self.__total_size += _add_link(self.__link_count, current)
+
+    def remove(self, file_name: str, sub_dir: str = "") -> bool:
+        with self.__lock:
+            return self.__remove_entry(self.__by_path.get(os.path.join(sub_dir, file_name)))
+
+    def __remove_entry(self, cached: CachedImageFile) -> bool:
+        # lock must be held by the caller
+        if not cached:
+            return False
+        self.__unindex(cached)
+        return True
+
+    def __unindex(self, cached: CachedImageFile) -> int:
+        # lock must be held by the caller, returns the size freed
+        del self.__by_path[cached.relative_path]
+        stem_key: tuple[str, str] = (cached.sub_dir, os.path.splitext(cached.file_name)[0])
+        if self.__by_stem.get(stem_key) == cached:
+            del self.__by_stem[stem_key]
+        freed_size: int = _remove_link(self.__link_count, cached)
+        self.__total_size -= freed_size
+        return freed_size
+
+    def __delete_file(self, cached: CachedImageFile) -> bool:
+        try:
+            os.remove(os.path.join(self.__directory, cached.relative_path))
+            return True
+        except FileNotFoundError:
+            # already gone
+            return True
+        except Exception as ex:
+            self.__logger(f"ImageCache [{self.__name}] cannot delete [{cached.relative_path}] due to [{type(ex)}] [{ex}]")
+            return False
+
+    def __select_for_eviction(self, now: float, max_count: int) -> list[CachedImageFile]:
+        with self.__lock:
+            snapshot: list[CachedImageFile] = list(self.__by_path.values())
+            link_count: dict[tuple[int, int], int] = dict(self.__link_count)
+            total_size: int = self.__total_size
+        selected: list[CachedImageFile] = []
+        if self.__max_age_sec > 0:
+            selected.extend(x for x in snapshot if now - x.last_access >= self.__max_age_sec)
+            total_size -= sum(_remove_link(link_count, x) for x in selected)
+        if self.__max_size_bytes > 0 and total_size > self.__max_size_bytes:
+            target_size: int = int(self.__max_size_bytes * _LOW_WATERMARK)
+            expired: set[str] = set(x.relative_path for x in selected)
+            candidate: CachedImageFile
+            for candidate in sorted(snapshot, key=lambda x: x.last_access):
+                if total_size <= target_size:
+                    break
+                if candidate.relative_path in expired:
+                    continue
+                selected.append(candidate)
+                # a hard linked file only frees space with its last link
+                total_size -= _remove_link(link_count, candidate)
+        selected.sort(key=lambda x: x.last_access)
+        return selected[0:max_count]
+
+    def evict(self, max_count: int) -> int:
+        """Runs one eviction pass, deleting at most max_count files"""
+        start: float = time.time()
+        evicted_count: int = 0
+        evicted_size: int = 0
+        cached: CachedImageFile
+        for cached in self.__select_for_eviction(now=start, max_count=max_count):
+            with self.__lock:
+                # skip files which have been accessed or replaced in the meantime
+                if (self.__by_path.get(cached.relative_path) != cached or
+                        cached.last_access > start):
+                    continue
+                freed_size: int = self.__unindex(cached)
+            if self.__delete_file(cached):
+                evicted_count += 1
+                evicted_size += freed_size
+        with self.__lock:
+            self.__evicted_count += evicted_count
+            self.__evicted_size += evicted_size
+            self.__eviction_runs += 1
+        if evicted_count > 0:
+            self.__logger(f"ImageCache [{self.__name}] evicted [{evicted_count}] files "
+                          f"size [{evicted_size}] "
+                          f"in [{(time.time() - start):.3f}] sec, "
+                          f"{self.get_statistics()}")
+        return evicted_count
+
+    def start_eviction(self, interval_sec: int, max_count_per_run: int):
+        if not self.bounded:
+            self.__logger(f"ImageCache [{self.__name}] has no size or age limit, eviction not started")
+            return
+        if self.__eviction_thread:
+            return
+        self.__eviction_thread = threading.Thread(
+            target=self.__eviction_worker,
+            args=(interval_sec, max_count_per_run),
+            daemon=True)
+        self.__eviction_thread.start()
+        self.__logger(f"ImageCache [{self.__name}] eviction started "
+                      f"max size [{self.__max_size_bytes}] "
+                      f"max age sec [{self.__max_age_sec}] "
+                      f"interval [{interval_sec}] "
+                      f"max files per run [{max_count_per_run}]")
+
+    def __eviction_worker(self, interval_sec: int, max_count_per_run: int):
+        while True:
+            try:
+                evicted: int = self.evict(max_count=max_count_per_run)
+            except Exception as ex:
+                self.__logger(f"ImageCache [{self.__name}] eviction failed due to [{type(ex)}] [{ex}]")
+                evicted = 0
+            # when a run is full, there is likely more to evict, don't wait the whole interval
+            time.sleep(1 if evicted >= max_count_per_run else interval_sec)
+
+    def get_statistics(self) -> ImageCacheStatistics:
+        with self.__lock:
+            return ImageCacheStatistics(
+                file_count=len(self.__by_path),
+                total_size=self.__total_size,
+                evicted_count=self.__evicted_count,
+                evicted_size=self.__evicted_size,
+                eviction_runs=self.__eviction_runs)
+
+
+class ImageDownloadStatistics:
+
+    def __init__(self):
+        self.downloaded: int = 0
+        self.linked: int = 0
+        self.deduplicated: int = 0
+        self.dropped: int = 0
+        self.failed: int = 0
+
+    def __str__(self) -> str:
+        return (f"downloaded [{self.downloaded}] linked [{self.linked}] "
+                f"deduplicated [{self.deduplicated}] dropped [{self.dropped}] failed [{self.failed}]")
+
+
+class ImageDownloader:
+
+    def __init__(
+            self,
+            image_cache: ImageCache,
+            logger: ImageCacheLogger,
+            worker_count: int = 2,
+            max_pending: int = 1000,
+            max_known_urls: int = 10000,
+            timeout_sec: float = 10.0):
+        self.__image_cache: ImageCache = image_cache
+        self.__logger: ImageCacheLogger = logger
+        self.__worker_count: int = max(1, worker_count)
+        self.__max_pending: int = max_pending
+        self.__max_known_urls: int = max_known_urls
+        self.__timeout_sec: float = timeout_sec
+        self.__session: requests.Session = requests.Session()
+        adapter: HTTPAdapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.__worker_count)
+        self.__session.mount("https://", adapter)
+        self.__session.mount("http://", adapter)
+        self.__lock: threading.Lock = threading.Lock()
+        self.__queue: queue.Queue[str] = queue.Queue()
+        # url -> (sub_dir, item_id) waiting for it
+        self.__pending: dict[str, set[tuple[str, str]]] = {}
+        # url -> relative path of the last file downloaded from it, new targets get a hard link
+        self.__path_by_url: OrderedDict[str, str] = OrderedDict()
+        self.__statistics: ImageDownloadStatistics = ImageDownloadStatistics()
+        self.__workers: list[threading.Thread] = []
+
+    @property
+    def statistics(self) -> ImageDownloadStatistics:
+        return self.__statistics
+
+    def submit(self, url: str, item_id: str, sub_dir: str = "") -> bool:
+        """Queues the download of url as item_id, each url is downloaded once for all its items"""
+        with self.__lock:
+            targets: set[tuple[str, str]] = self.__pending.get(url)
+            if targets is not None:
+                targets.add((sub_dir, item_id))
+                self.__statistics.deduplicated += 1
+                return True
+            if len(self.__pending) >= self.__max_pending:
+                self.__statistics.dropped += 1
+                return False
+            self.__pending[url] = {(sub_dir, item_id)}
+            if not self.__workers:
+                for _ in range(self.__worker_count):
+                    worker: threading.Thread = threading.Thread(target=self.__run, daemon=True)
+                    worker.start()
+                    self.__workers.append(worker)
+        self.__queue.put(url)
+        return True
+
+    def __run(self):
+        while True:
+            url: str = self.__queue.get()
+            try:
+                self.__process(url)
+            except Exception as ex:
+                with self.__lock:
+                    self.__pending.pop(url, None)
+                self.__statistics.failed += 1
+                self.__logger(f"ImageDownloader [{self.__image_cache.name}] cannot get [{url}] "
+                              f"due to [{type(ex)}] [{ex}]")
+
+    def __process(self, url: str):
+        with self.__lock:
+            source_path: str = self.__path_by_url.get(url)
+        if source_path and os.path.exists(os.path.join(self.__image_cache.directory, source_path)):
+            source_file: str = os.path.join(self.__image_cache.directory, source_path)
+            self.__store(url=url, ext=os.path.splitext(source_path)[1], source_file=source_file, data=None)
+            return
+        response: requests.Response = self.__session.get(url, timeout=self.__timeout_sec)
+        response.raise_for_status()
+        ext_list: list[str] = mimetypes.guess_all_extensions(response.headers.get("content-type", ""))
+        if not ext_list:
+            raise Exception(f"Unknown content type [{response.headers.get('content-type')}]")
+        self.__store(url=url, ext=ext_list[0].lower(), source_file=None, data=response.content)
+
+    def __store(self, url: str, ext: str, source_file: str, data: bytes):
+        with self.__lock:
+            # no more targets can be added from now on
+            target_list: list[tuple[str, str]] = list(self.__pending.pop(url, set()))
+        target: tuple[str, str]
+        for target in target_list:
+            sub_dir, item_id = target
+            file_name: str = f"{item_id}{ext}"
+            file_path: str = os.path.join(self.__image_cache.directory, sub_dir, file_name)
+            if file_path == source_file:
+                continue
+            # the sub directory might not exist yet, e.g. fresh cache or new image type
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            tmp_file_path: str = f"{file_path}.tmp"
+            size: int
+            if source_file:
+                # same image bytes for another item, share them
+                if os.path.exists(tmp_file_path):
+                    os.remove(tmp_file_path)
+                try:
+                    os.link(source_file, tmp_file_path)
+                except OSError:
+                    # no hard links on this file system
+                    shutil.copyfile(source_file, tmp_file_path)
+                size = os.path.getsize(tmp_file_path)
+                self.__statistics.linked += 1
+            else:
+                with open(tmp_file_path, "wb") as f:
+                    f.write(data)
+                size = len(data)
+                self.__statistics.downloaded += 1
+            os.replace(tmp_file_path, file_path)
+            # an image with another extension for the same item is stale now
+            previous_file_name: str = self.__image_cache.get_file_name(item_id=item_id, sub_dir=sub_dir)
+            if previous_file_name and previous_file_name != file_name:
+                self.__image_cache.remove(file_name=previous_file_name, sub_dir=sub_dir)
+                try:
+                    os.remove(os.path.join(self.__image_cache.directory, sub_dir, previous_file_name))
+                except FileNotFoundError:
+                    pass
+            self.__image_cache.add(file_name=file_name, size=size, sub_dir=sub_dir)
+            if not source_file:
+                source_file = file_path
+                with self.__lock:
+                    self.__path_by_url[url] = os.path.join(sub_dir, file_name)
+                    self.__path_by_url.move_to_end(url)
+                    while len(self.__path_by_url) > self.__max_known_urls:
+                        self.__path_by_url.popitem(last=False)
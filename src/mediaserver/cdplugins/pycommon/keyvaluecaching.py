@@ -14,6 +14,10 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 import datetime
+import sys
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
 from enum import Enum
 from typing import Protocol
 import sqlhelper
@@ -163,6 +167,53 @@ def update_kv_item_v1(
         do_commit=True)
 
 
+def build_upsert_v1_sql() -> str:
+    # created timestamp is kept on update
+    return f"""
+        INSERT INTO {KeyValueTableName.TABLE_NAME_V1.table_name}(
+            {KeyValueCacheColumnName.ITEM_PARTITION.value},
+            {KeyValueCacheColumnName.ITEM_KEY.value},
+            {KeyValueCacheColumnName.ITEM_VALUE.value},
+            {KeyValueCacheColumnName.CREATED_TIMESTAMP.value},
+            {KeyValueCacheColumnName.UPDATED_TIMESTAMP.value})
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT(
+            {KeyValueCacheColumnName.ITEM_PARTITION.value},
+            {KeyValueCacheColumnName.ITEM_KEY.value})
+        DO UPDATE SET
+            {KeyValueCacheColumnName.ITEM_VALUE.value} = excluded.{KeyValueCacheColumnName.ITEM_VALUE.value},
+            {KeyValueCacheColumnName.UPDATED_TIMESTAMP.value} = excluded.{KeyValueCacheColumnName.UPDATED_TIMESTAMP.value}
+    """
+
+
+def upsert_kv_item_v1(
+        sql_executor: sqlhelper.SqlExecutor,
+        key_value_item: KeyValueItem,
+        timestamp: datetime.datetime,
+        do_commit: bool = True) -> None:
+    sql_executor(
+        sql=build_upsert_v1_sql(),
+        data=(
+            key_value_item.partition,
+            key_value_item.key,
+            key_value_item.value,
+            timestamp,
+            timestamp),
+        do_commit=do_commit)
+
+
+def upsert_kv_item_list_v1(
+        sql_many_executor: sqlhelper.SqlManyExecutor,
+        key_value_item_list: list[KeyValueItem],
+        timestamp: datetime.datetime,
+        do_commit: bool = True) -> int:
+    """All items with one statement, in the same transaction"""
+    return sql_many_executor(
+        sql=build_upsert_v1_sql(),
+        data_list=[(x.partition, x.key, x.value, timestamp, timestamp) for x in key_value_item_list],
+        do_commit=do_commit)
+
+
 def load_kv_item_v1(
         sql_selector: sqlhelper.SqlSelector,
         partition: str,
@@ -270,3 +321,216 @@ def put_key_value_item(
             key_value_item=key_value_item,
             creation_timestamp=datetime.datetime.now(),
             do_commit=do_commit)
+
+
+class KvItemListWriter(Protocol):
+    def __call__(self, key_value_item_list: list[KeyValueItem]) -> None:
+        ...
+
+
+class KeyValueWriteBufferLogger(Protocol):
+    def __call__(self, message: str) -> None:
+        ...
+
+
+class KeyValueWriteBuffer:
+    """Write-behind buffer: puts are kept in memory and written in batches by a background thread.
+    Only the last value for a (partition, key) is written. Readers must look here first."""
+
+    def __init__(
+            self,
+            name: str,
+            writer: KvItemListWriter,
+            logger: KeyValueWriteBufferLogger,
+            flush_interval_sec: float,
+            max_pending: int):
+        self.__name: str = name
+        self.__writer: KvItemListWriter = writer
+        self.__logger: KeyValueWriteBufferLogger = logger
+        self.__flush_interval_sec: float = flush_interval_sec
+        self.__max_pending: int = max_pending
+        self.__lock: threading.Lock = threading.Lock()
+        # held while a batch is written, direct writes and deletes wait for it
+        self.__flush_lock: threading.RLock = threading.RLock()
+        self.__wake: threading.Event = threading.Event()
+        self.__pending: dict[tuple[str, str], KeyValueItem] = {}
+        # being written by a flush, still visible to readers
+        self.__in_flight: dict[tuple[str, str], KeyValueItem] = {}
+        self.__worker: threading.Thread = None
+        self.__written: int = 0
+        self.__flushes: int = 0
+
+    @property
+    def pending_count(self) -> int:
+        return len(self.__pending)
+
+    def put(self, key_value_item: KeyValueItem):
+        with self.__lock:
+            self.__pending[(key_value_item.partition, key_value_item.key)] = key_value_item
+            full: bool = self.__max_pending > 0 and len(self.__pending) >= self.__max_pending
+            if self.__worker is None:
+                self.__worker = threading.Thread(target=self.__run, daemon=True)
+                self.__worker.start()
+        if full:
+            self.__wake.set()
+
+    def get(self, partition: str, key: str) -> KeyValueItem | None:
+        with self.__lock:
+            item: KeyValueItem = self.__pending.get((partition, key))
+            return item if item else self.__in_flight.get((partition, key))
+
+    @contextmanager
+    def exclusive(self):
+        """No batch is being written while this is held.
+        Callers writing or deleting buffered keys directly must hold it,
+        otherwise an older in flight batch could commit after them"""
+        with self.__flush_lock:
+            yield
+
+    def discard(self, partition: str, key: str = None):
+        """Drops pending writes for key, or for the whole partition if key is None.
+        Waits for a flush in progress, so its items cannot be written after the caller's delete"""
+        with self.__flush_lock:
+            with self.__lock:
+                if key is not None:
+                    self.__pending.pop((partition, key), None)
+                    return
+                for k in [k for k in self.__pending.keys() if k[0] == partition]:
+                    del self.__pending[k]
+
+    def flush(self) -> int:
+        """Writes pending items now, returns the number of written items"""
+        with self.__flush_lock:
+            with self.__lock:
+                if not self.__pending:
+                    return 0
+                self.__in_flight = self.__pending
+                self.__pending = {}
+            item_list: list[KeyValueItem] = list(self.__in_flight.values())
+            try:
+                self.__writer(item_list)
+                self.__written += len(item_list)
+                self.__flushes += 1
+                return len(item_list)
+            except Exception as ex:
+                self.__logger(f"KeyValueWriteBuffer [{self.__name}] flush of [{len(item_list)}] items "
+                              f"failed [{type(ex)}] [{ex}]")
+                with self.__lock:
+                    # newer puts win
+                    for k, v in self.__in_flight.items():
+                        self.__pending.setdefault(k, v)
+                return 0
+            finally:
+                with self.__lock:
+                    self.__in_flight = {}
+
+    def __str__(self) -> str:
+        return (f"[{self.__name}] pending [{len(self.__pending)}] "
+                f"written [{self.__written}] flushes [{self.__flushes}]")
+
+    def __run(self):
+        while True:
+            self.__wake.wait(self.__flush_interval_sec)
+            self.__wake.clear()
+            self.flush()
+
+
+class KeyValueMemoryTierLogger(Protocol):
+    def __call__(self, message: str) -> None:
+        ...
+
+
+class KeyValueMemoryTier:
+    """Bounded lru of items in front of the table, absent keys are remembered too.
+    Callers must write through: every put/delete of the table must be mirrored here."""
+
+    def __init__(
+            self,
+            name: str,
+            max_size: int,
+            logger: KeyValueMemoryTierLogger = None,
+            report_every: int = 0):
+        self.__name: str = name
+        self.__max_size: int = max_size
+        self.__logger: KeyValueMemoryTierLogger = logger
+        self.__report_every: int = report_every
+        self.__lock: threading.Lock = threading.Lock()
+        # None values are known to be absent
+        self.__items: OrderedDict[tuple[str, str], KeyValueItem | None] = OrderedDict()
+        self.__sizes: dict[tuple[str, str], int] = {}
+        self.__bytes: int = 0
+        self.__hits: int = 0
+        self.__misses: int = 0
+        self.__evictions: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups: int = self.__hits + self.__misses
+        return float(self.__hits) / lookups if lookups > 0 else 0.0
+
+    @property
+    def size(self) -> int:
+        return len(self.__items)
+
+    @property
+    def bytes(self) -> int:
+        """Estimated memory footprint of keys and values"""
+        return self.__bytes
+
+    def lookup(self, partition: str, key: str) -> tuple[bool, KeyValueItem | None]:
+        """(True, item) if known, item is None when known to be absent, (False, None) otherwise"""
+        with self.__lock:
+            cache_key: tuple[str, str] = (partition, key)
+            if cache_key not in self.__items:
+                self.__misses += 1
+                self.__maybe_report()
+                return False, None
+            self.__items.move_to_end(cache_key)
+            self.__hits += 1
+            self.__maybe_report()
+            return True, self.__items[cache_key]
+
+    def put(self, partition: str, key: str, item: KeyValueItem | None):
+        """Stores item, None records the key as absent"""
+        with self.__lock:
+            cache_key: tuple[str, str] = (partition, key)
+            self.__remove(cache_key)
+            size: int = sys.getsizeof(partition) + sys.getsizeof(key)
+            if item is not None:
+                size += sys.getsizeof(item) + sys.getsizeof(item.value)
+            self.__items[cache_key] = item
+            self.__sizes[cache_key] = size
+            self.__bytes += size
+            while len(self.__items) > self.__max_size:
+                self.__remove(next(iter(self.__items)))
+                self.__evictions += 1
+
+    def invalidate(self, partition: str = None, key: str = None):
+        """Drops key, the whole partition if key is None, everything if partition is None too"""
+        with self.__lock:
+            if partition is None:
+                self.__items.clear()
+                self.__sizes.clear()
+                self.__bytes = 0
+            elif key is not None:
+                self.__remove((partition, key))
+            else:
+                for cache_key in [k for k in self.__items.keys() if k[0] == partition]:
+                    self.__remove(cache_key)
+
+    def __remove(self, cache_key: tuple[str, str]):
+        # lock must be held by the caller
+        if cache_key in self.__items:
+            del self.__items[cache_key]
+            self.__bytes -= self.__sizes.pop(cache_key)
+
+    def __str__(self) -> str:
+        return (f"[{self.__name}] entries [{len(self.__items)}] of [{self.__max_size}] "
+                f"bytes [{self.__bytes}] hits [{self.__hits}] misses [{self.__misses}] "
+                f"hit ratio [{self.hit_ratio:.3f}] evictions [{self.__evictions}]")
+
+    def __maybe_report(self):
+        # lock must be held by the caller
+        if self.__logger and self.__report_every > 0 and (self.__hits + self.__misses) % self.__report_every == 0:
+            self.__logger(f"KeyValueMemoryTier {self}")
+
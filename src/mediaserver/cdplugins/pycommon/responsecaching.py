@@ -0,0 +1,289 @@
+# Copyright (C) 2026 Giovanni Fulco
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# bounded lru cache for responses of remote calls
+# entries are fresh for ttl seconds, then served stale for up to stale seconds
+# while a background refresh is running
+# concurrent requests for the same key wait for a single load
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+from typing import Callable
+from typing import Hashable
+from typing import Protocol
+
+
+class ResponseCacheLogger(Protocol):
+    def __call__(self, message: str) -> None:
+        ...
+
+
+class ResponseCacheStatistics:
+
+    def __init__(self, group: str):
+        self.__group: str = group
+        self.__hits: int = 0
+        self.__stale_hits: int = 0
+        self.__coalesced: int = 0
+        self.__misses: int = 0
+        self.__load_time: float = 0.0
+        self.__saved_time: float = 0.0
+
+    @property
+    def group(self) -> str:
+        return self.__group
+
+    @property
+    def lookups(self) -> int:
+        return self.__hits + self.__stale_hits + self.__coalesced + self.__misses
+
+    @property
+    def hits(self) -> int:
+        return self.__hits
+
+    @property
+    def stale_hits(self) -> int:
+        return self.__stale_hits
+
+    @property
+    def coalesced(self) -> int:
+        return self.__coalesced
+
+    @property
+    def misses(self) -> int:
+        return self.__misses
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups: int = self.lookups
+        return (lookups - self.__misses) / lookups if lookups > 0 else 0.0
+
+    @property
+    def load_time(self) -> float:
+        return self.__load_time
+
+    @property
+    def saved_time(self) -> float:
+        return self.__saved_time
+
+    def hit(self, saved: float, stale: bool = False):
+        if stale:
+            self.__stale_hits += 1
+        else:
+            self.__hits += 1
+        self.__saved_time += saved
+
+    def coalesce(self, saved: float):
+        self.__coalesced += 1
+        self.__saved_time += saved
+
+    def miss(self, load_time: float):
+        self.__misses += 1
+        self.__load_time += load_time
+
+    def __str__(self) -> str:
+        return (f"[{self.__group}] lookups [{self.lookups}] "
+                f"hit ratio [{self.hit_ratio:.3f}] "
+                f"hits [{self.__hits}] stale [{self.__stale_hits}] "
+                f"coalesced [{self.__coalesced}] misses [{self.__misses}] "
+                f"load time [{self.__load_time:.3f}] saved [{self.__saved_time:.3f}] sec")
+
+
+class _Entry:
+
+    def __init__(self, value: Any, load_time: float, fresh_until: float, stale_until: float):
+        self.value: Any = value
+        self.load_time: float = load_time
+        self.fresh_until: float = fresh_until
+        self.stale_until: float = stale_until
+
+
+class _InFlight:
+
+    def __init__(self):
+        self.event: threading.Event = threading.Event()
+        self.value: Any = None
+        self.error: Exception = None
+        self.load_time: float = 0.0
+
+
+class ResponseCache:
+
+    def __init__(
+            self,
+            name: str,
+            max_size: int,
+            logger: ResponseCacheLogger,
+            report_every: int = 0):
+        self.__name: str = name
+        self.__max_size: int = max_size
+        self.__logger: ResponseCacheLogger = logger
+        self.__report_every: int = report_every
+        self.__lock: threading.Lock = threading.Lock()
+        self.__entries: OrderedDict[Hashable, _Entry] = OrderedDict()
+        self.__in_flight: dict[Hashable, _InFlight] = {}
+        self.__statistics: dict[str, ResponseCacheStatistics] = {}
+        self.__lookups: int = 0
+
+    @property
+    def name(self) -> str:
+        return self.__name
+
+    def get(
+            self,
+            group: str,
+            key: Hashable,
+            loader: Callable[[], Any],
+            ttl_sec: float,
+            stale_sec: float = 0,
+            accept: Callable[[Any], bool] = None,
+            ttl_of: Callable[[Any], float] = None) -> Any:
+        """Returns the cached value for key, or the value returned by loader.
+        Values are stored only if accept returns True (default: always).
+        ttl_of gives the ttl of a loaded value which is already aged (default: ttl_sec)"""
+        now: float = time.time()
+        cache_key: tuple[str, Hashable] = (group, key)
+        owner: bool = False
+        refresh: _InFlight = None
+        with self.__lock:
+            stats: ResponseCacheStatistics = self.__get_group_statistics(group)
+            self.__lookups += 1
+            self.__maybe_report()
+            entry: _Entry = self.__entries.get(cache_key)
+            if entry and now < entry.fresh_until:
+                self.__entries.move_to_end(cache_key)
+                stats.hit(saved=entry.load_time)
+                return entry.value
+            if entry and now < entry.stale_until:
+                self.__entries.move_to_end(cache_key)
+                stats.hit(saved=entry.load_time, stale=True)
+                if cache_key not in self.__in_flight:
+                    refresh = _InFlight()
+                    self.__in_flight[cache_key] = refresh
+            else:
+                in_flight: _InFlight = self.__in_flight.get(cache_key)
+                if in_flight is None:
+                    in_flight = _InFlight()
+                    self.__in_flight[cache_key] = in_flight
+                    owner = True
+        if refresh:
+            threading.Thread(
+                target=self.__refresh,
+                args=(cache_key, loader, ttl_sec, stale_sec, accept, ttl_of, refresh),
+                daemon=True).start()
+            return entry.value
+        if owner:
+            return self.__load(cache_key, loader, ttl_sec, stale_sec, accept, ttl_of, in_flight)
+        # somebody else is loading the same key
+        in_flight.event.wait()
+        if in_flight.error:
+            raise in_flight.error
+        with self.__lock:
+            stats.coalesce(saved=in_flight.load_time)
+        return in_flight.value
+
+    def peek(self, group: str, key: Hashable) -> Any:
+        """Returns the cached value for key, fresh or stale, or None. Nothing is loaded"""
+        with self.__lock:
+            entry: _Entry = self.__entries.get((group, key))
+            return entry.value if entry and time.time() < entry.stale_until else None
+
+    def invalidate(self, group: str = None, key: Hashable = None):
+        """Drops the entry for group and key, all entries of group, or all entries"""
+        with self.__lock:
+            if group is not None and key is not None:
+                self.__entries.pop((group, key), None)
+                return
+            if group is None:
+                self.__entries.clear()
+                return
+            for cache_key in [k for k in self.__entries.keys() if k[0] == group]:
+                del self.__entries[cache_key]
+
+    def get_statistics(self) -> list[ResponseCacheStatistics]:
+        with self.__lock:
+            return list(self.__statistics.values())
+
+    def __load(
+            self,
+            cache_key: tuple[str, Hashable],
+            loader: Callable[[], Any],
+            ttl_sec: float,
+            stale_sec: float,
+            accept: Callable[[Any], bool],
+            ttl_of: Callable[[Any], float],
+            in_flight: _InFlight) -> Any:
+        start: float = time.time()
+        try:
+            value: Any = loader()
+        except Exception as ex:
+            with self.__lock:
+                self.__in_flight.pop(cache_key, None)
+            in_flight.error = ex
+            in_flight.event.set()
+            raise ex
+        now: float = time.time()
+        load_time: float = now - start
+        with self.__lock:
+            if accept is None or accept(value):
+                value_ttl_sec: float = ttl_of(value) if ttl_of else ttl_sec
+                self.__entries[cache_key] = _Entry(
+                    value=value,
+                    load_time=load_time,
+                    fresh_until=now + value_ttl_sec,
+                    stale_until=now + value_ttl_sec + stale_sec)
+                self.__entries.move_to_end(cache_key)
+                while len(self.__entries) > self.__max_size:
+                    self.__entries.popitem(last=False)
+            self.__in_flight.pop(cache_key, None)
+            self.__get_group_statistics(cache_key[0]).miss(load_time=load_time)
+        in_flight.value = value
+        in_flight.load_time = load_time
+        in_flight.event.set()
+        return value
+
+    def __refresh(
+            self,
+            cache_key: tuple[str, Hashable],
+            loader: Callable[[], Any],
+            ttl_sec: float,
+            stale_sec: float,
+            accept: Callable[[Any], bool],
+            ttl_of: Callable[[Any], float],
+            in_flight: _InFlight):
+        try:
+            self.__load(cache_key, loader, ttl_sec, stale_sec, accept, ttl_of, in_flight)
+        except Exception as ex:
+            # the stale entry stays until it expires
+            self.__logger(f"ResponseCache [{self.__name}] refresh of [{cache_key}] failed due to [{type(ex)}] [{ex}]")
+
+    def __get_group_statistics(self, group: str) -> ResponseCacheStatistics:
+        # lock must be held by the caller
+        stats: ResponseCacheStatistics = self.__statistics.get(group)
+        if stats is None:
+            stats = ResponseCacheStatistics(group)
+            self.__statistics[group] = stats
+        return stats
+
+    def __maybe_report(self):
+        # lock must be held by the caller
+        if self.__report_every <= 0 or self.__lookups % self.__report_every != 0:
+            return
+        self.__logger(f"ResponseCache [{self.__name}] size [{len(self.__entries)}] "
+                      f"lookups [{self.__lookups}]")
+        for stats in self.__statistics.values():
+            self.__logger(f"ResponseCache [{self.__name}] {stats}")
@@ -26,6 +26,15 @@ class SqlExecutor(Protocol):
         ...
 
 
+class SqlManyExecutor(Protocol):
+    def __call__(
+            self,
+            sql: str,
+            data_list: list[tuple],
+            do_commit: bool) -> int:
+        ...
+
+
 class SqlSelector(Protocol):
     def __call__(
             self,
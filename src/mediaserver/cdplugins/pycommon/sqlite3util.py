@@ -53,8 +53,32 @@ def get_sqlite3_executor(connection: sqlite3.Connection) -> sqlhelper.SqlExecuto
         do_commit=do_commit)
 
 
+def get_sqlite3_many_executor(connection: sqlite3.Connection) -> sqlhelper.SqlManyExecutor:
+    return lambda sql, data_list, do_commit: sqlite3_execute_many(
+        connection=connection,
+        sql=sql,
+        data_list=data_list,
+        do_commit=do_commit)
+
+
 def get_sqlite3_selector(connection: sqlite3.Connection) -> sqlhelper.SqlSelector:
     return lambda sql, parameters: __sqlite3_select(
         connection=connection,
         sql=sql,
         parameters=parameters)
+
+
+def sqlite3_execute_many(
+        connection: sqlite3.Connection,
+        sql: str,
+        data_list: list[tuple],
+        do_commit: bool = True) -> int:
+    if not data_list:
+        return 0
+    cursor = connection.cursor()
+    cursor.executemany(sql, data_list)
+    row_count: int = cursor.rowcount
+    cursor.close()
+    if do_commit:
+        connection.commit()
+    return row_count
@@ -0,0 +1,197 @@
+# Copyright (C) 2026 Giovanni Fulco
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+# Run from the cdplugins directory:
+#   python3 -m pytest pycommon/tests
+
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from httpcaching import HttpCacheRule  # noqa: E402
+from httpcaching import HttpResponseCache  # noqa: E402
+from httpcaching import install  # noqa: E402
+
+
+class CatalogHandler(BaseHTTPRequestHandler):
+    """Serves /album/<n> and /other/<n>, with an ETag unless the path ends with /plain"""
+
+    # set by the test
+    server_state: dict = None
+
+    def do_GET(self):
+        state: dict = self.server_state
+        state["requests"].append((self.path, self.headers.get("If-None-Match")))
+        etag: str = f"\"{state['version']}\""
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        body: bytes = f"{self.path} version {state['version']}".encode("utf-8") + b"." * state["padding"]
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        if not self.path.endswith("/plain"):
+            self.send_header("ETag", etag)
+        if self.path.endswith("/nostore"):
+            self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestHttpResponseCache(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server: ThreadingHTTPServer = ThreadingHTTPServer(("127.0.0.1", 0), CatalogHandler)
+        cls.server_thread: threading.Thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.server_thread.start()
+        cls.base_url: str = f"http://127.0.0.1:{cls.server.server_address[1]}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.state: dict = {"requests": [], "version": 1, "padding": 0}
+        CatalogHandler.server_state = self.state
+        self.tmp_dir: str = tempfile.mkdtemp(prefix="httpcaching-tests-")
+        self.cache: HttpResponseCache = self.__open_cache()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def __open_cache(self, ttl_sec: int = 3600, max_size_bytes: int = 0) -> HttpResponseCache:
+        cache: HttpResponseCache = HttpResponseCache(
+            name="test",
+            db_file=os.path.join(self.tmp_dir, "http-cache.db"),
+            rules=[HttpCacheRule(pattern=r"/album/", ttl_sec=ttl_sec)],
+            logger=lambda message: None,
+            max_size_bytes=max_size_bytes,
+            ignored_params=["sessionId"])
+        cache.open()
+        return cache
+
+    def __get(self, path: str, cache: HttpResponseCache = None) -> requests.Response:
+        session: requests.Session = install(requests.Session(), cache if cache else self.cache)
+        response: requests.Response = session.get(f"{self.base_url}{path}")
+        session.close()
+        return response
+
+    def test_fresh_entry_is_served_from_cache(self):
+        first: requests.Response = self.__get("/album/1")
+        second: requests.Response = self.__get("/album/1")
+        self.assertEqual(len(self.state["requests"]), 1)
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.text, first.text)
+        self.assertEqual(second.headers["ETag"], "\"1\"")
+        self.assertEqual(self.cache.statistics.hits, 1)
+        self.assertEqual(self.cache.statistics.misses, 1)
+
+    def test_urls_without_rule_are_not_cached(self):
+        self.__get("/other/1")
+        self.__get("/other/1")
+        self.assertEqual(len(self.state["requests"]), 2)
+        self.assertEqual(self.cache.statistics.lookups, 0)
+
+    def test_no_store_is_not_cached(self):
+        self.__get("/album/1/nostore")
+        self.__get("/album/1/nostore")
+        self.assertEqual(len(self.state["requests"]), 2)
+        self.assertEqual(self.cache.statistics.stored, 0)
+
+    def test_key_ignores_parameter_order_and_ignored_parameters(self):
+        self.__get("/album/1?b=2&a=1&sessionId=x")
+        self.__get("/album/1?a=1&b=2&sessionId=y")
+        self.__get("/album/1?a=1&b=3")
+        self.assertEqual(len(self.state["requests"]), 2)
+
+    def test_expired_entry_is_revalidated_by_etag(self):
+        cache: HttpResponseCache = self.__open_cache(ttl_sec=0)
+        first: requests.Response = self.__get("/album/1", cache)
+        second: requests.Response = self.__get("/album/1", cache)
+        # second request was conditional, the 304 renewed the stored response
+        self.assertEqual(self.state["requests"], [("/album/1", None), ("/album/1", "\"1\"")])
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.text, first.text)
+        self.assertEqual(cache.statistics.revalidated, 1)
+
+    def test_expired_entry_is_replaced_when_changed(self):
+        cache: HttpResponseCache = self.__open_cache(ttl_sec=0)
+        self.__get("/album/1", cache)
+        self.state["version"] = 2
+        changed: requests.Response = self.__get("/album/1", cache)
+        self.assertEqual(changed.text, "/album/1 version 2")
+        self.assertEqual(cache.statistics.revalidated, 0)
+        self.assertEqual(cache.statistics.stored, 2)
+        self.assertEqual(cache.statistics.entries, 1)
+
+    def test_expired_entry_without_validators_is_fetched_again(self):
+        cache: HttpResponseCache = self.__open_cache(ttl_sec=0)
+        self.__get("/album/1/plain", cache)
+        self.__get("/album/1/plain", cache)
+        self.assertEqual(self.state["requests"], [("/album/1/plain", None), ("/album/1/plain", None)])
+        self.assertEqual(cache.statistics.misses, 2)
+
+    def test_entries_survive_reopen(self):
+        self.__get("/album/1")
+        reopened: HttpResponseCache = self.__open_cache()
+        self.assertEqual(reopened.statistics.entries, 1)
+        self.__get("/album/1", reopened)
+        self.assertEqual(len(self.state["requests"]), 1)
+        self.assertEqual(reopened.statistics.hits, 1)
+
+    def test_open_purges_expired_entries_without_validators(self):
+        cache: HttpResponseCache = self.__open_cache(ttl_sec=0)
+        self.__get("/album/1/plain", cache)
+        self.__get("/album/2", cache)
+        reopened: HttpResponseCache = self.__open_cache(ttl_sec=0)
+        # the one with an ETag can still be revalidated
+        self.assertEqual(reopened.statistics.entries, 1)
+
+    def test_least_recently_used_entries_are_evicted(self):
+        self.state["padding"] = 1000
+        cache: HttpResponseCache = self.__open_cache(max_size_bytes=2500)
+        self.__get("/album/1", cache)
+        self.__get("/album/2", cache)
+        self.__get("/album/3", cache)
+        self.assertGreaterEqual(cache.statistics.evicted, 1)
+        self.assertLessEqual(cache.statistics.bytes, 2500)
+        # the newest is still there, the oldest is gone
+        self.__get("/album/3", cache)
+        self.assertEqual(len(self.state["requests"]), 3)
+        self.__get("/album/1", cache)
+        self.assertEqual(len(self.state["requests"]), 4)
+
+    def test_clear(self):
+        self.__get("/album/1")
+        self.cache.clear()
+        self.assertEqual(self.cache.statistics.entries, 0)
+        self.__get("/album/1")
+        self.assertEqual(len(self.state["requests"]), 2)
@@ -0,0 +1,99 @@
+# Copyright (C) 2026 Giovanni Fulco
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+# Run from the cdplugins directory:
+#   python3 -m pytest pycommon/tests
+
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from imagecaching import ImageCache  # noqa: E402
+
+
+def write_file(path: str, size: int):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(b"x" * size)
+
+
+class TestImageCacheHardLinks(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.directory: str = self.tmp.name
+        self.messages: list[str] = []
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def new_cache(self, max_size_bytes: int = 0) -> ImageCache:
+        return ImageCache(
+            name="test",
+            directory=self.directory,
+            accept=lambda x: not x.endswith(".tmp"),
+            logger=self.messages.append,
+            max_size_bytes=max_size_bytes)
+
+    def link(self, source: str, target: str):
+        try:
+            os.link(os.path.join(self.directory, source), os.path.join(self.directory, target))
+        except OSError:
+            self.skipTest("no hard links on this file system")
+
+    def test_load_counts_linked_files_once(self):
+        write_file(os.path.join(self.directory, "album", "a.jpg"), 1000)
+        self.link(os.path.join("album", "a.jpg"), os.path.join("album", "b.jpg"))
+        write_file(os.path.join(self.directory, "album", "c.jpg"), 10)
+        cache: ImageCache = self.new_cache()
+        self.assertEqual(3, cache.load())
+        self.assertEqual(3, cache.get_statistics().file_count)
+        self.assertEqual(1010, cache.get_statistics().total_size)
+
+    def test_add_and_remove_count_linked_files_once(self):
+        os.makedirs(os.path.join(self.directory, "album"))
+        cache: ImageCache = self.new_cache()
+        cache.load()
+        write_file(os.path.join(self.directory, "album", "a.jpg"), 1000)
+        cache.add(file_name="a.jpg", size=1000, sub_dir="album")
+        self.link(os.path.join("album", "a.jpg"), os.path.join("album", "b.jpg"))
+        cache.add(file_name="b.jpg", size=1000, sub_dir="album")
+        self.assertEqual(1000, cache.get_statistics().total_size)
+        cache.remove(file_name="a.jpg", sub_dir="album")
+        self.assertEqual(1000, cache.get_statistics().total_size)
+        cache.remove(file_name="b.jpg", sub_dir="album")
+        self.assertEqual(0, cache.get_statistics().total_size)
+
+    def test_eviction_frees_space_with_the_last_link(self):
+        write_file(os.path.join(self.directory, "a.jpg"), 1000)
+        self.link("a.jpg", "b.jpg")
+        write_file(os.path.join(self.directory, "c.jpg"), 1000)
+        os.utime(os.path.join(self.directory, "a.jpg"), (1, 1))
+        cache: ImageCache = self.new_cache(max_size_bytes=1500)
+        cache.load()
+        self.assertEqual(2000, cache.get_statistics().total_size)
+        # both links are the oldest entries, evicting them alone brings the cache under budget
+        self.assertEqual(2, cache.evict(max_count=10))
+        self.assertTrue(os.path.exists(os.path.join(self.directory, "c.jpg")))
+        self.assertEqual(1000, cache.get_statistics().total_size)
+        self.assertEqual(1000, cache.get_statistics().evicted_size)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,271 @@
+# Copyright (C) 2026 Giovanni Fulco
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Run from the cdplugins directory:
+#   python3 -m pytest pycommon/tests
+
+import datetime
+import os
+import sqlite3
+import sys
+import threading
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import sqlite3util  # noqa: E402
+from keyvaluecaching import KeyValueItem  # noqa: E402
+from keyvaluecaching import KeyValueMemoryTier  # noqa: E402
+from keyvaluecaching import KeyValueWriteBuffer  # noqa: E402
+from keyvaluecaching import build_create_v1_sql  # noqa: E402
+from keyvaluecaching import delete_kv_item_v1  # noqa: E402
+from keyvaluecaching import load_kv_item_v1  # noqa: E402
+from keyvaluecaching import upsert_kv_item_list_v1  # noqa: E402
+from keyvaluecaching import upsert_kv_item_v1  # noqa: E402
+
+
+class BlockingWriter:
+    """Writer which waits for release, so that the test can act during a flush"""
+
+    def __init__(self, fail: bool = False, sink=None):
+        self.fail: bool = fail
+        self.sink = sink
+        self.entered: threading.Event = threading.Event()
+        self.release: threading.Event = threading.Event()
+        self.written: list[KeyValueItem] = []
+
+    def __call__(self, key_value_item_list: list[KeyValueItem]):
+        self.entered.set()
+        self.release.wait(5)
+        if self.fail:
+            raise Exception("write failed")
+        if self.sink:
+            self.sink(key_value_item_list)
+        self.written.extend(key_value_item_list)
+
+
+class TestKeyValueWriteBuffer(unittest.TestCase):
+
+    def __build_buffer(self, writer) -> KeyValueWriteBuffer:
+        # the background flush never fires during a test
+        return KeyValueWriteBuffer(
+            name="test",
+            writer=writer,
+            logger=lambda message: None,
+            flush_interval_sec=3600,
+            max_pending=0)
+
+    def __flush_in_background(self, buffer: KeyValueWriteBuffer, writer: BlockingWriter) -> threading.Thread:
+        flusher: threading.Thread = threading.Thread(target=buffer.flush)
+        flusher.start()
+        self.assertTrue(writer.entered.wait(5))
+        return flusher
+
+    def test_last_put_wins(self):
+        written: list[KeyValueItem] = []
+        buffer: KeyValueWriteBuffer = self.__build_buffer(lambda item_list: written.extend(item_list))
+        buffer.put(KeyValueItem("p", "k", "v1"))
+        buffer.put(KeyValueItem("p", "k", "v2"))
+        self.assertEqual(buffer.get("p", "k").value, "v2")
+        self.assertEqual(buffer.flush(), 1)
+        self.assertEqual([x.value for x in written], ["v2"])
+        self.assertIsNone(buffer.get("p", "k"))
+        self.assertEqual(buffer.flush(), 0)
+
+    def test_in_flight_items_are_visible(self):
+        writer: BlockingWriter = BlockingWriter()
+        buffer: KeyValueWriteBuffer = self.__build_buffer(writer)
+        buffer.put(KeyValueItem("p", "k", "v"))
+        flusher: threading.Thread = self.__flush_in_background(buffer, writer)
+        self.assertEqual(buffer.get("p", "k").value, "v")
+        writer.release.set()
+        flusher.join()
+        self.assertIsNone(buffer.get("p", "k"))
+
+    def __run_in_background(self, target) -> threading.Thread:
+        runner: threading.Thread = threading.Thread(target=target)
+        runner.start()
+        return runner
+
+    def test_discard_key_waits_for_flush(self):
+        writer: BlockingWriter = BlockingWriter(fail=True)
+        buffer: KeyValueWriteBuffer = self.__build_buffer(writer)
+        buffer.put(KeyValueItem("p", "discarded", "v"))
+        buffer.put(KeyValueItem("p", "kept", "v"))
+        flusher: threading.Thread = self.__flush_in_background(buffer, writer)
+        discarder: threading.Thread = self.__run_in_background(lambda: buffer.discard("p", "discarded"))
+        discarder.join(0.2)
+        self.assertTrue(discarder.is_alive())
+        writer.release.set()
+        flusher.join()
+        discarder.join(5)
+        self.assertFalse(discarder.is_alive())
+        # the failed flush re-queued both, then the discard dropped one
+        self.assertEqual(buffer.pending_count, 1)
+        self.assertIsNone(buffer.get("p", "discarded"))
+        self.assertEqual(buffer.get("p", "kept").value, "v")
+
+    def test_discard_partition_waits_for_flush(self):
+        writer: BlockingWriter = BlockingWriter(fail=True)
+        buffer: KeyValueWriteBuffer = self.__build_buffer(writer)
+        buffer.put(KeyValueItem("discarded", "k", "v"))
+        buffer.put(KeyValueItem("kept", "k", "v"))
+        flusher: threading.Thread = self.__flush_in_background(buffer, writer)
+        discarder: threading.Thread = self.__run_in_background(lambda: buffer.discard("discarded"))
+        discarder.join(0.2)
+        self.assertTrue(discarder.is_alive())
+        writer.release.set()
+        flusher.join()
+        discarder.join(5)
+        self.assertEqual(buffer.pending_count, 1)
+        self.assertIsNone(buffer.get("discarded", "k"))
+        self.assertEqual(buffer.get("kept", "k").value, "v")
+
+    def test_delete_during_flush_is_not_overwritten(self):
+        connection: sqlite3.Connection = sqlite3.connect(":memory:", check_same_thread=False)
+        connection.execute(build_create_v1_sql())
+        db_lock: threading.Lock = threading.Lock()
+
+        def write(key_value_item_list: list[KeyValueItem]):
+            with db_lock:
+                upsert_kv_item_list_v1(
+                    sqlite3util.get_sqlite3_many_executor(connection),
+                    key_value_item_list,
+                    datetime.datetime.now())
+
+        def delete():
+            with buffer.exclusive():
+                buffer.discard("p", "k")
+                with db_lock:
+                    delete_kv_item_v1(sqlite3util.get_sqlite3_executor(connection), "p", "k")
+
+        writer: BlockingWriter = BlockingWriter(sink=write)
+        buffer: KeyValueWriteBuffer = self.__build_buffer(writer)
+        buffer.put(KeyValueItem("p", "k", "old"))
+        flusher: threading.Thread = self.__flush_in_background(buffer, writer)
+        deleter: threading.Thread = self.__run_in_background(delete)
+        deleter.join(0.2)
+        # the delete waits for the in flight upsert
+        self.assertTrue(deleter.is_alive())
+        writer.release.set()
+        flusher.join()
+        deleter.join(5)
+        self.assertFalse(deleter.is_alive())
+        self.assertIsNone(load_kv_item_v1(sqlite3util.get_sqlite3_selector(connection), "p", "k"))
+        self.assertIsNone(buffer.get("p", "k"))
+        connection.close()
+
+    def test_put_after_discard_during_flush(self):
+        writer: BlockingWriter = BlockingWriter()
+        buffer: KeyValueWriteBuffer = self.__build_buffer(writer)
+        buffer.put(KeyValueItem("p", "k", "old"))
+        flusher: threading.Thread = self.__flush_in_background(buffer, writer)
+
+        def discard_and_put():
+            buffer.discard("p", "k")
+            buffer.put(KeyValueItem("p", "k", "new"))
+
+        replacer: threading.Thread = self.__run_in_background(discard_and_put)
+        writer.release.set()
+        flusher.join()
+        replacer.join(5)
+        self.assertEqual([x.value for x in writer.written], ["old"])
+        self.assertEqual(buffer.get("p", "k").value, "new")
+
+    def test_failed_flush_does_not_overwrite_newer_puts(self):
+        writer: BlockingWriter = BlockingWriter(fail=True)
+        buffer: KeyValueWriteBuffer = self.__build_buffer(writer)
+        buffer.put(KeyValueItem("p", "k", "old"))
+        flusher: threading.Thread = self.__flush_in_background(buffer, writer)
+        buffer.put(KeyValueItem("p", "k", "new"))
+        writer.release.set()
+        flusher.join()
+        self.assertEqual(buffer.pending_count, 1)
+        self.assertEqual(buffer.get("p", "k").value, "new")
+
+    def test_discard_before_flush(self):
+        written: list[KeyValueItem] = []
+        buffer: KeyValueWriteBuffer = self.__build_buffer(lambda item_list: written.extend(item_list))
+        buffer.put(KeyValueItem("p", "k1", "v"))
+        buffer.put(KeyValueItem("p", "k2", "v"))
+        buffer.put(KeyValueItem("q", "k1", "v"))
+        buffer.discard("p", "k1")
+        buffer.discard("q")
+        self.assertEqual(buffer.flush(), 1)
+        self.assertEqual([(x.partition, x.key) for x in written], [("p", "k2")])
+
+
+class TestKeyValueMemoryTier(unittest.TestCase):
+
+    def test_lookup_absent_and_eviction(self):
+        tier: KeyValueMemoryTier = KeyValueMemoryTier(name="test", max_size=2)
+        self.assertEqual(tier.lookup("p", "k1"), (False, None))
+        tier.put("p", "k1", None)
+        self.assertEqual(tier.lookup("p", "k1"), (True, None))
+        tier.put("p", "k2", KeyValueItem("p", "k2", "v2"))
+        # k1 was used last, k2 is evicted
+        tier.lookup("p", "k1")
+        tier.put("p", "k3", KeyValueItem("p", "k3", "v3"))
+        self.assertEqual(tier.size, 2)
+        self.assertEqual(tier.lookup("p", "k2"), (False, None))
+        self.assertTrue(tier.lookup("p", "k1")[0])
+
+    def test_invalidate(self):
+        tier: KeyValueMemoryTier = KeyValueMemoryTier(name="test", max_size=10)
+        tier.put("p", "k1", KeyValueItem("p", "k1", "v"))
+        tier.put("p", "k2", KeyValueItem("p", "k2", "v"))
+        tier.put("q", "k1", KeyValueItem("q", "k1", "v"))
+        tier.invalidate("p", "k1")
+        self.assertFalse(tier.lookup("p", "k1")[0])
+        tier.invalidate("p")
+        self.assertFalse(tier.lookup("p", "k2")[0])
+        self.assertTrue(tier.lookup("q", "k1")[0])
+        tier.invalidate()
+        self.assertEqual(tier.size, 0)
+        self.assertEqual(tier.bytes, 0)
+
+
+class TestUpsert(unittest.TestCase):
+
+    def setUp(self):
+        self.connection: sqlite3.Connection = sqlite3.connect(":memory:")
+        self.connection.execute(build_create_v1_sql())
+
+    def tearDown(self):
+        self.connection.close()
+
+    def test_upsert_keeps_creation_timestamp(self):
+        executor = sqlite3util.get_sqlite3_executor(self.connection)
+        selector = sqlite3util.get_sqlite3_selector(self.connection)
+        created: datetime.datetime = datetime.datetime(2026, 1, 1)
+        updated: datetime.datetime = datetime.datetime(2026, 2, 1)
+        upsert_kv_item_v1(executor, KeyValueItem("p", "k", "v1"), created)
+        upsert_kv_item_v1(executor, KeyValueItem("p", "k", "v2"), updated)
+        item: KeyValueItem = load_kv_item_v1(selector, "p", "k")
+        self.assertEqual(item.value, "v2")
+        self.assertEqual(str(item.created_timestamp), str(created))
+        self.assertEqual(str(item.updated_timestamp), str(updated))
+
+    def test_upsert_list(self):
+        upsert_kv_item_list_v1(
+            sqlite3util.get_sqlite3_many_executor(self.connection),
+            [KeyValueItem("p", str(i), str(i)) for i in range(10)],
+            datetime.datetime.now())
+        selector = sqlite3util.get_sqlite3_selector(self.connection)
+        self.assertEqual(load_kv_item_v1(selector, "p", "7").value, "7")
+
+
+if __name__ == "__main__":
+    unittest.main()
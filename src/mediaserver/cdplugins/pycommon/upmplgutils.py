@@ -166,6 +166,12 @@ def getOptionValue(nm, dflt=None):
     return value
 
 
+def resetConfigObject():
+    """Forget the parsed configuration, it will be read again on next access"""
+    global _g_upconfig
+    _g_upconfig = None
+
+
 def getConfigObject():
     if _g_upconfig is None:
         getOptionValue("somebogusvalue")
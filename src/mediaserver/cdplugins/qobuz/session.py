@@ -12,6 +12,7 @@ from upmplgutils import *
 from conftree import ConfSimple
 
 from qobuz.api import raw
+import httpcaching
 
 # General limit for fetching stuff, in places where we do it in one chunk.
 # The high limit set by Qobuz depends a bit on the nature of the request, but
@@ -21,6 +22,43 @@ general_slice = 100
 # Show rate/bits with album titles? Simpler as a global
 show_album_rate_and_bits = False
 
+# Disk-backed cache for the catalog calls which the api sends as GET (albums, artists,
+# featured lists, playlists, search). Lists get a shorter ttl, they change more often.
+# Nothing else is cached: user data and stream urls are POSTs.
+_http_cache = None
+_http_cache_item_regex = r"/api\.json/[^/]+/(album/get|artist/get|artist/getSimilarArtists)\?"
+_http_cache_list_regex = r"/api\.json/[^/]+/(album/getFeatured|playlist/get|playlist/getFeatured|catalog/search)\?"
+_http_cache_list_max_ttl_sec = 3600
+
+
+def _get_http_cache():
+    global _http_cache
+    if _http_cache is None and getOptionValue("qobuzenablehttpresponsecache", True):
+        ttl = getOptionValue("qobuzhttpresponsecachettlsec", 86400)
+        try:
+            _http_cache = httpcaching.HttpResponseCache(
+                name="qobuz",
+                db_file=os.path.join(getcachedir("qobuz"), "http-response-cache.db"),
+                rules=[
+                    httpcaching.HttpCacheRule(pattern=_http_cache_item_regex, ttl_sec=ttl),
+                    httpcaching.HttpCacheRule(
+                        pattern=_http_cache_list_regex, ttl_sec=min(ttl, _http_cache_list_max_ttl_sec))],
+                logger=uplog,
+                max_size_bytes=getOptionValue("qobuzhttpresponsecachemaxsizemb", 64) * 1024 * 1024)
+            _http_cache.open()
+        except Exception as ex:
+            uplog(f"Qobuz: cannot open http response cache: {ex}")
+            _http_cache = False
+    return _http_cache
+
+
+def _new_api():
+    api = raw.RawApi()
+    http_cache = _get_http_cache()
+    if http_cache:
+        httpcaching.install(api.session, http_cache)
+    return api
+
 
 class Session(object):
     def __init__(self, format_id, fetch_resource_info=False, show_album_maxaudio=False):
@@ -35,7 +73,7 @@ class Session(object):
     def init_oauth(self, auth_code):
         uplog(f"session: init_oauth: auth_code {auth_code}")
         if not self.api:
-            self.api = raw.RawApi()
+            self.api = _new_api()
         usr_info = self.api.login_with_oauth_code(auth_code)
         if usr_info:
             oauth_user_id = usr_info.get("user", {}).get("id")
@@ -50,7 +88,7 @@ class Session(object):
         # working for OH Credentials. Else we create the API with our input params which come from
         # the configuration (and still may be empty in which case the spoofer will be used).
         if not self.api:
-            self.api = raw.RawApi()
+            self.api = _new_api()
         auth_token = self.config.get("user_auth_token")
         user_id = self.config.get("user_id")
         if not auth_token or not user_id:
@@ -66,7 +104,7 @@ class Session(object):
 
     def get_appid(self):
         if not self.api:
-            self.api = raw.RawApi()
+            self.api = _new_api()
         return self.api.appid
 
     def get_appid_and_token(self):
@@ -0,0 +1,275 @@
+# Copyright (C) 2026 Giovanni Fulco
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# in-memory index of album_property_v1 for the album property browser
+# every album gets a bit position, every (key, value) and every key get a bitmap (a python int)
+# conditions are evaluated with bitwise and/not, counts with bit_count
+# semantics are the same as the sql queries in persistence:
+# - the universe is the set of albums with at least one property
+# - a positive condition (key, value) requires that value
+# - a negative condition (key, no value) requires that the album has no value for key
+
+import random
+import threading
+import time
+from typing import Any
+from typing import Callable
+from typing import Iterable
+
+from album_property_key import AlbumPropertyKeyValue
+from album_property_key import AlbumPropertyKeyOccurrence
+from album_property_key import AlbumPropertyValueOccurrence
+from msgproc_provider import msgproc
+
+
+def _iter_positions(mask: int) -> Iterable[int]:
+    # scanning the binary representation is much faster than shifting a large int
+    bits: str = bin(mask)[:1:-1]
+    pos: int = bits.find("1")
+    while pos != -1:
+        yield pos
+        pos = bits.find("1", pos + 1)
+
+
+def _to_mask(position_list: list[int], byte_count: int) -> int:
+    buffer: bytearray = bytearray(byte_count)
+    for pos in position_list:
+        buffer[pos >> 3] |= 1 << (pos & 7)
+    return int.from_bytes(buffer, "little")
+
+
+class AlbumFacetIndex:
+
+    def __init__(self):
+        self.__lock: threading.RLock = threading.RLock()
+        self.__loaded: bool = False
+        self.__clear()
+
+    @property
+    def loaded(self) -> bool:
+        return self.__loaded
+
+    @property
+    def album_count(self) -> int:
+        return len(self.__position_by_album_id)
+
+    def invalidate(self):
+        """The index will be loaded again on next use"""
+        with self.__lock:
+            self.__loaded = False
+            self.__clear()
+
+    def ensure_loaded(self, loader: Callable[[], Iterable[tuple[str, str, Any]]]):
+        """Builds the index from (album_id, key, value) rows, if not loaded yet"""
+        if self.__loaded:
+            return
+        with self.__lock:
+            if self.__loaded:
+                return
+            start: float = time.time()
+            self.__clear()
+            # collect positions first, then build each bitmap once
+            positions_by_key: dict[str, list[int]] = {}
+            positions_by_key_value: dict[str, dict[str, list[int]]] = {}
+            position_by_album_id: dict[str, int] = self.__position_by_album_id
+            properties_by_album_id: dict[str, dict[str, set[str]]] = self.__properties_by_album_id
+            row_count: int = 0
+            for album_id, key, value in loader():
+                row_count += 1
+                pos: int = position_by_album_id.get(album_id, -1)
+                if pos < 0:
+                    pos = self.__allocate_position(album_id)
+                    properties_by_album_id[album_id] = {}
+                album_properties: dict[str, set[str]] = properties_by_album_id[album_id]
+                album_values: set[str] = album_properties.get(key)
+                if album_values is None:
+                    album_values = set()
+                    album_properties[key] = album_values
+                    positions_by_key.setdefault(key, []).append(pos)
+                if value is not None:
+                    value = str(value)
+                    positions_by_key_value.setdefault(key, {}).setdefault(value, []).append(pos)
+                album_values.add(value)
+            byte_count: int = (len(self.__album_id_by_position) + 7) // 8
+            self.__key_bits = {k: _to_mask(v, byte_count) for k, v in positions_by_key.items()}
+            self.__value_bits = {
+                k: {v: _to_mask(p, byte_count) for v, p in by_value.items()}
+                for k, by_value in positions_by_key_value.items()}
+            self.__universe = (1 << len(self.__album_id_by_position)) - 1
+            self.__loaded = True
+            msgproc.log(f"AlbumFacetIndex loaded [{row_count}] rows "
+                        f"albums [{len(self.__position_by_album_id)}] "
+                        f"keys [{len(self.__key_bits)}] "
+                        f"values [{sum(len(v) for v in self.__value_bits.values())}] "
+                        f"in [{(time.time() - start):.3f}] sec")
+
+    def set_album_properties(
+            self,
+            album_id: str,
+            properties: dict[str, list[Any]],
+            replace_all: bool = False):
+        """Mirrors save_album_properties, only the given keys are replaced unless replace_all"""
+        with self.__lock:
+            if self.__loaded:
+                self.__set(album_id, properties, replace_all)
+
+    def remove_album(self, album_id: str):
+        with self.__lock:
+            if self.__loaded:
+                self.__set(album_id, {}, replace_all=True)
+
+    def get_matching_count(self, condition_list: list[AlbumPropertyKeyValue]) -> int:
+        with self.__lock:
+            return self.__matching(condition_list).bit_count()
+
+    def get_matching(self, condition_list: list[AlbumPropertyKeyValue]) -> list[str]:
+        with self.__lock:
+            return [self.__album_id_by_position[p] for p in _iter_positions(self.__matching(condition_list))]
+
+    def get_one_random_matching(self, condition_list: list[AlbumPropertyKeyValue]) -> str | None:
+        with self.__lock:
+            return self.__random_album_id(self.__matching(condition_list))
+
+    def get_key_occurrence_list(
+            self,
+            condition_list: list[AlbumPropertyKeyValue]) -> list[AlbumPropertyKeyOccurrence]:
+        with self.__lock:
+            universe: int = self.__matching(condition_list)
+            total: int = universe.bit_count()
+            active_keys: set[str] = set(c.key for c in condition_list) if condition_list else set()
+            result: list[AlbumPropertyKeyOccurrence] = []
+            key: str
+            for key in sorted(self.__key_bits.keys()):
+                key_mask: int = self.__key_bits[key] & universe
+                if not key_mask:
+                    continue
+                frequencies: list[int] = [c for c in (
+                    (v & universe).bit_count() for v in self.__value_bits.get(key, {}).values()) if c > 0]
+                unique_value_count: int = len(frequencies)
+                is_missing_for_some: bool = key_mask.bit_count() < total
+                # not a single-value constant, not a unique id, not redundant unless already filtered
+                if ((unique_value_count > 1 or is_missing_for_some) and
+                        unique_value_count < total and
+                        (max(frequencies, default=0) < total or key in active_keys)):
+                    result.append(AlbumPropertyKeyOccurrence(
+                        property_key=key,
+                        property_value_count=unique_value_count,
+                        is_missing_for_some=1 if is_missing_for_some else 0,
+                        representative_album_id=self.__random_album_id(key_mask)))
+            return result
+
+    def get_value_occurrence_list(
+            self,
+            condition_list: list[AlbumPropertyKeyValue],
+            property_key: str) -> list[AlbumPropertyValueOccurrence]:
+        with self.__lock:
+            universe: int = self.__matching(condition_list)
+            key_mask: int = self.__key_bits.get(property_key, 0) & universe
+            has_missing: int = 1 if universe.bit_count() > key_mask.bit_count() else 0
+            result: list[AlbumPropertyValueOccurrence] = []
+            value_bits: dict[str, int] = self.__value_bits.get(property_key, {})
+            value: str
+            for value in sorted(value_bits.keys()):
+                value_mask: int = value_bits[value] & universe
+                if not value_mask:
+                    continue
+                result.append(AlbumPropertyValueOccurrence(
+                    property_value=value,
+                    album_count=value_mask.bit_count(),
+                    representative_album_id=self.__album_id_by_position[(value_mask & -value_mask).bit_length() - 1],
+                    is_missing_for_some=has_missing))
+            return result
+
+    def __clear(self):
+        self.__position_by_album_id: dict[str, int] = {}
+        self.__album_id_by_position: list[str] = []
+        self.__free_positions: list[int] = []
+        self.__properties_by_album_id: dict[str, dict[str, set[str]]] = {}
+        self.__key_bits: dict[str, int] = {}
+        self.__value_bits: dict[str, dict[str, int]] = {}
+        self.__universe: int = 0
+
+    def __matching(self, condition_list: list[AlbumPropertyKeyValue]) -> int:
+        mask: int = self.__universe
+        curr_condition: AlbumPropertyKeyValue
+        for curr_condition in condition_list if condition_list else []:
+            if curr_condition.value:
+                mask &= self.__value_bits.get(curr_condition.key, {}).get(curr_condition.value, 0)
+            else:
+                mask &= ~self.__key_bits.get(curr_condition.key, 0)
+            if not mask:
+                break
+        return mask
+
+    def __random_album_id(self, mask: int) -> str | None:
+        count: int = mask.bit_count()
+        if count == 0:
+            return None
+        selected: int = random.randrange(count)
+        for index, pos in enumerate(_iter_positions(mask)):
+            if index == selected:
+                return self.__album_id_by_position[pos]
+        return None
+
+    def __allocate_position(self, album_id: str) -> int:
+        pos: int = self.__position_by_album_id.get(album_id, -1)
+        if pos >= 0:
+            return pos
+        if self.__free_positions:
+            pos = self.__free_positions.pop()
+            self.__album_id_by_position[pos] = album_id
+        else:
+            pos = len(self.__album_id_by_position)
+            self.__album_id_by_position.append(album_id)
+        self.__position_by_album_id[album_id] = pos
+        return pos
+
+    def __set(self, album_id: str, properties: dict[str, list[Any]], replace_all: bool):
+        current: dict[str, set[str]] = self.__properties_by_album_id.get(album_id)
+        if current is None and not properties:
+            return
+        pos: int = self.__allocate_position(album_id)
+        bit: int = 1 << pos
+        if current is None:
+            current = {}
+            self.__properties_by_album_id[album_id] = current
+        key: str
+        for key in list(current.keys()) if replace_all else [k for k in properties.keys() if k in current]:
+            self.__key_bits[key] &= ~bit
+            value: str
+            for value in current.pop(key):
+                if value is not None:
+                    self.__value_bits[key][value] &= ~bit
+        values: list[Any]
+        for key, values in properties.items():
+            # values are stored as text
+            value_set: set[str] = set(str(v) if v is not None else None for v in values)
+            if not value_set:
+                continue
+            current[key] = value_set
+            self.__key_bits[key] = self.__key_bits.get(key, 0) | bit
+            by_value: dict[str, int] = self.__value_bits.setdefault(key, {})
+            for value in value_set:
+                if value is not None:
+                    by_value[value] = by_value.get(value, 0) | bit
+        if current:
+            self.__universe |= bit
+        else:
+            # no properties left, release the position
+            self.__universe &= ~bit
+            del self.__properties_by_album_id[album_id]
+            del self.__position_by_album_id[album_id]
+            self.__album_id_by_position[pos] = None
+            self.__free_positions.append(pos)
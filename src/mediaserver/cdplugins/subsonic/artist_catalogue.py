@@ -0,0 +1,357 @@
+# Copyright (C) 2026 Giovanni Fulco
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# resident artist catalogue for artist browsing
+# built from getArtists and from the metadata tables, it holds:
+# - the initial -> artists index from the server
+# - artists by role and initial, sorted as the corresponding queries in persistence
+# - artist metadata, cover art candidates and genres by artist id
+# - artist ids by display name
+# a catalogue is never modified, a new one is built in background when the current one is stale
+# and then replaces it, so pages are served from memory without any I/O
+
+import random
+import threading
+import time
+
+from subsonic_connector.artist_list_item import ArtistListItem
+from subsonic_connector.artists import Artists
+from subsonic_connector.artists_initial import ArtistsInitial
+from subsonic_connector.response import Response
+
+from artist_metadata import ArtistMetadata
+from msgproc_provider import msgproc
+import config
+import connector_provider
+import constants
+import persistence
+
+
+def _sql_upper(value: str) -> str:
+    # sqlite UPPER only changes ascii characters
+    return "".join(c.upper() if "a" <= c <= "z" else c for c in value)
+
+
+class _RoleArtists:
+
+    def __init__(self):
+        self.__artists: list[persistence.ArtistEntry] = []
+        self.__with_cover_art: list[persistence.ArtistEntry] = []
+
+    @property
+    def artists(self) -> list[persistence.ArtistEntry]:
+        return self.__artists
+
+    def add(self, entry: persistence.ArtistEntry):
+        self.__artists.append(entry)
+        if entry.artist_cover_art:
+            self.__with_cover_art.append(entry)
+
+    def sort(self):
+        self.__artists.sort(key=lambda x: _sql_upper(x.artist_sort_name))
+
+    def random_artist(self) -> persistence.ArtistEntry:
+        # artists with cover art first
+        return random.choice(self.__with_cover_art if self.__with_cover_art else self.__artists)
+
+
+class ArtistCatalogue:
+
+    def __init__(
+            self,
+            artists_initial_list: list[tuple[str, list[ArtistListItem]]] | None,
+            artist_metadata_list: list[ArtistMetadata],
+            artist_role_list: list[persistence.ArtistRole],
+            album_artist_rows: list[tuple[str, str]],
+            album_rows: list[tuple[str, str, str, str, str]],
+            album_genre_rows: list[tuple[str, str]]):
+        self.__artists_initial_list: list[tuple[str, list[ArtistListItem]]] | None = artists_initial_list
+        self.__artists_by_initial: dict[str, list[ArtistListItem]] = {}
+        name: str
+        item_list: list[ArtistListItem]
+        for name, item_list in artists_initial_list if artists_initial_list else []:
+            self.__artists_by_initial.setdefault(name, []).extend(item_list)
+        self.__metadata_by_artist_id: dict[str, ArtistMetadata] = {m.artist_id: m for m in artist_metadata_list}
+        # artist ids by album, from album_artist_v1
+        artist_id_list_by_album_id: dict[str, list[str]] = {}
+        album_id: str
+        artist_id: str
+        for album_id, artist_id in album_artist_rows:
+            artist_id_list_by_album_id.setdefault(album_id, []).append(artist_id)
+        # display names
+        self.__artist_id_list_by_display_name: dict[str, list[str]] = {}
+        # albums by artist, also using album_artist_id
+        album_id_set_by_artist_id: dict[str, set[str]] = {}
+        cover_art_by_album_id: dict[str, str] = {}
+        genre_set_by_album_id: dict[str, set[str]] = {}
+        album_artist_id: str
+        display_artist: str
+        album_cover_art: str
+        album_genre: str
+        for album_id, album_artist_id, display_artist, album_cover_art, album_genre in album_rows:
+            cover_art_by_album_id[album_id] = album_cover_art
+            if album_genre:
+                genre_set_by_album_id.setdefault(album_id, set()).add(album_genre)
+            if album_artist_id:
+                album_id_set_by_artist_id.setdefault(album_artist_id, set()).add(album_id)
+            for artist_id in artist_id_list_by_album_id.get(album_id, []):
+                album_id_set_by_artist_id.setdefault(artist_id, set()).add(album_id)
+                if display_artist:
+                    self.__add_display_name(display_artist, artist_id)
+        for album_id, album_genre in album_genre_rows:
+            if album_genre:
+                genre_set_by_album_id.setdefault(album_id, set()).add(album_genre)
+        metadata: ArtistMetadata
+        for metadata in artist_metadata_list:
+            self.__add_display_name(metadata.artist_sort_name, metadata.artist_id)
+            self.__add_display_name(metadata.artist_name, metadata.artist_id)
+        # album cover art and genres by artist
+        self.__album_cover_art_list_by_artist_id: dict[str, list[str]] = {}
+        self.__genre_list_by_artist_id: dict[str, list[str]] = {}
+        album_id_set: set[str]
+        for artist_id, album_id_set in album_id_set_by_artist_id.items():
+            cover_art_list: list[str] = [cover_art_by_album_id[a] for a in album_id_set if cover_art_by_album_id.get(a)]
+            if cover_art_list:
+                self.__album_cover_art_list_by_artist_id[artist_id] = cover_art_list
+            genre_set: set[str] = set()
+            for album_id in album_id_set:
+                genre_set.update(genre_set_by_album_id.get(album_id, set()))
+            self.__genre_list_by_artist_id[artist_id] = sorted(genre_set)
+        # roles
+        self.__artists_by_role: dict[str, _RoleArtists] = {}
+        self.__artists_by_role_initial: dict[str, dict[str, _RoleArtists]] = {}
+        role: persistence.ArtistRole
+        for role in artist_role_list:
+            metadata = self.__metadata_by_artist_id.get(role.artist_id)
+            if metadata is None:
+                continue
+            entry: persistence.ArtistEntry = persistence.ArtistEntry(
+                artist_id=metadata.artist_id,
+                artist_name=metadata.artist_name,
+                artist_sort_name=metadata.artist_sort_name,
+                artist_cover_art=metadata.artist_cover_art)
+            self.__artists_by_role.setdefault(role.artist_role, _RoleArtists()).add(entry)
+            if metadata.artist_sort_name is None:
+                # cannot be listed by initial
+                continue
+            initial: str = _sql_upper(metadata.artist_sort_name[0:1])
+            (self.__artists_by_role_initial
+                .setdefault(role.artist_role, {})
+                .setdefault(initial, _RoleArtists())
+                .add(entry))
+        by_initial: dict[str, _RoleArtists]
+        for by_initial in self.__artists_by_role_initial.values():
+            role_artists: _RoleArtists
+            for role_artists in by_initial.values():
+                role_artists.sort()
+
+    @property
+    def artist_count(self) -> int:
+        return len(self.__metadata_by_artist_id)
+
+    @property
+    def artists_initial_list(self) -> list[tuple[str, list[ArtistListItem]]] | None:
+        return self.__artists_initial_list
+
+    def get_artist_initials(self) -> list[str] | None:
+        if self.__artists_initial_list is None:
+            return None
+        return [name for name, _ in self.__artists_initial_list]
+
+    def get_artists_by_initial(self, initial: str) -> list[ArtistListItem] | None:
+        if self.__artists_initial_list is None:
+            return None
+        return self.__artists_by_initial.get(initial, [])
+
+    def get_artist_metadata(self, artist_id: str) -> ArtistMetadata | None:
+        return self.__metadata_by_artist_id.get(artist_id)
+
+    def get_cover_art(self, artist_id: str) -> str | None:
+        metadata: ArtistMetadata = self.__metadata_by_artist_id.get(artist_id)
+        if metadata and metadata.artist_cover_art:
+            return metadata.artist_cover_art
+        cover_art_list: list[str] = self.__album_cover_art_list_by_artist_id.get(artist_id)
+        return random.choice(cover_art_list) if cover_art_list else None
+
+    def get_genre_list(self, artist_id: str) -> list[str]:
+        return list(self.__genre_list_by_artist_id.get(artist_id, []))
+
+    def get_artist_id_list_by_display_name(self, artist_display_name: str) -> list[str]:
+        return list(self.__artist_id_list_by_display_name.get(artist_display_name, []))
+
+    def get_artist_roles(self) -> list[persistence.ArtistRoleEntry]:
+        result: list[persistence.ArtistRoleEntry] = []
+        role: str
+        for role in sorted(self.__artists_by_role.keys()):
+            selected: persistence.ArtistEntry = self.__artists_by_role[role].random_artist()
+            result.append(persistence.ArtistRoleEntry(
+                artist_role=role,
+                random_artist_id=selected.artist_id,
+                random_artist_name=selected.artist_name,
+                random_artist_cover_art=selected.artist_cover_art))
+        return result
+
+    def get_artist_role_initials(self, artist_role: str) -> list[persistence.ArtistRoleInitialEntry]:
+        result: list[persistence.ArtistRoleInitialEntry] = []
+        by_initial: dict[str, _RoleArtists] = self.__artists_by_role_initial.get(artist_role, {})
+        initial: str
+        for initial in sorted(by_initial.keys()):
+            selected: persistence.ArtistEntry = by_initial[initial].random_artist()
+            result.append(persistence.ArtistRoleInitialEntry(
+                artist_role=artist_role,
+                artist_initial=initial,
+                random_artist_id=selected.artist_id,
+                random_artist_name=selected.artist_sort_name,
+                random_artist_cover_art=selected.artist_cover_art))
+        return result
+
+    def get_artist_by_role_and_initial(
+            self,
+            artist_role: str,
+            initial: str,
+            offset: int,
+            limit: int) -> list[persistence.ArtistEntry]:
+        role_artists: _RoleArtists = self.__artists_by_role_initial.get(artist_role, {}).get(_sql_upper(initial))
+        return role_artists.artists[offset:offset + limit] if role_artists else []
+
+    def __add_display_name(self, display_name: str, artist_id: str):
+        if not display_name or not artist_id:
+            return
+        id_list: list[str] = self.__artist_id_list_by_display_name.setdefault(display_name, [])
+        if artist_id not in id_list:
+            id_list.append(artist_id)
+
+
+__lock: threading.Lock = threading.Lock()
+__catalogue: ArtistCatalogue = None
+__built_at: float = 0.0
+__refreshing: bool = False
+
+
+def __load_artists_initial_list() -> list[tuple[str, list[ArtistListItem]]] | None:
+    try:
+        res: Response[Artists] = connector_provider.get().getArtists()
+    except Exception as ex:
+        msgproc.log(f"artist_catalogue getArtists failed [{type(ex)}] [{ex}]")
+        return None
+    if not res or not res.isOk() or not res.getObj():
+        msgproc.log("artist_catalogue getArtists failed")
+        return None
+    initials: list[ArtistsInitial] = res.getObj().getArtistListInitials()
+    return [(current.getName(), current.getArtistListItems()) for current in initials]
+
+
+def __build(previous: ArtistCatalogue | None) -> ArtistCatalogue:
+    start: float = time.time()
+    artists_initial_list: list[tuple[str, list[ArtistListItem]]] | None = __load_artists_initial_list()
+    if artists_initial_list is None and previous is not None:
+        # keep what we had
+        artists_initial_list = previous.artists_initial_list
+    server_elapsed: float = time.time() - start
+    catalogue: ArtistCatalogue = ArtistCatalogue(
+        artists_initial_list=artists_initial_list,
+        artist_metadata_list=persistence.get_artist_metadata_list(),
+        artist_role_list=persistence.get_artist_role_list(),
+        album_artist_rows=persistence.get_album_artist_rows(),
+        album_rows=persistence.get_album_artist_summary_rows(),
+        album_genre_rows=persistence.get_album_genre_rows())
+    msgproc.log(f"artist_catalogue built with [{catalogue.artist_count}] artists "
+                f"initials [{len(artists_initial_list) if artists_initial_list is not None else None}] "
+                f"getArtists [{server_elapsed:.3f}] "
+                f"total [{(time.time() - start):.3f}] sec")
+    return catalogue
+
+
+def refresh():
+    """Builds a new catalogue in the calling thread and replaces the current one"""
+    global __catalogue
+    global __built_at
+    catalogue: ArtistCatalogue = __build(__catalogue)
+    __catalogue = catalogue
+    __built_at = time.time()
+
+
+def __background_refresh():
+    global __built_at
+    global __refreshing
+    try:
+        refresh()
+    except Exception as ex:
+        msgproc.log(f"artist_catalogue refresh failed [{type(ex)}] [{ex}]")
+        # retry at next interval
+        __built_at = time.time()
+    finally:
+        with __lock:
+            __refreshing = False
+
+
+def get() -> ArtistCatalogue | None:
+    """The current catalogue, None if disabled"""
+    global __refreshing
+    if not config.get_config_param_as_bool(constants.ConfigParam.ENABLE_ARTIST_CATALOGUE):
+        return None
+    catalogue: ArtistCatalogue = __catalogue
+    if catalogue is None:
+        with __lock:
+            if __catalogue is None:
+                refresh()
+            return __catalogue
+    refresh_interval_sec: int = config.get_config_param_as_int(
+        constants.ConfigParam.ARTIST_CATALOGUE_REFRESH_INTERVAL_SEC)
+    if (time.time() - __built_at) > refresh_interval_sec:
+        with __lock:
+            if not __refreshing:
+                __refreshing = True
+                threading.Thread(target=__background_refresh, daemon=True).start()
+    # meanwhile, the current catalogue is used
+    return catalogue
+
+
+def get_artist_roles() -> list[persistence.ArtistRoleEntry]:
+    catalogue: ArtistCatalogue = get()
+    return catalogue.get_artist_roles() if catalogue else persistence.get_artist_roles()
+
+
+def get_artist_role_initials(artist_role: str) -> list[persistence.ArtistRoleInitialEntry]:
+    catalogue: ArtistCatalogue = get()
+    return (catalogue.get_artist_role_initials(artist_role=artist_role)
+            if catalogue
+            else persistence.get_artist_role_initials(artist_role=artist_role))
+
+
+def get_artist_by_role_and_initial(
+        artist_role: str,
+        initial: str,
+        offset: int,
+        limit: int) -> list[persistence.ArtistEntry]:
+    catalogue: ArtistCatalogue = get()
+    if catalogue:
+        return catalogue.get_artist_by_role_and_initial(
+            artist_role=artist_role,
+            initial=initial,
+            offset=offset,
+            limit=limit)
+    return persistence.get_artist_by_role_and_initial(
+        artist_role=artist_role,
+        initial=initial,
+        offset=offset,
+        limit=limit)
+
+
+def get_artist_id_list_by_display_name(artist_display_name: str) -> list[str]:
+    catalogue: ArtistCatalogue = get()
+    return (catalogue.get_artist_id_list_by_display_name(artist_display_name=artist_display_name)
+            if catalogue
+            else persistence.get_artist_id_list_by_display_name(artist_display_name=artist_display_name))
@@ -0,0 +1,121 @@
+# Copyright (C) 2026 Giovanni Fulco
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+# Album property browser: in-memory facet index against the sql queries,
+# on a temporary db filled with synthetic albums (about 6 property rows per album).
+# Run from the cdplugins directory:
+#   python3 subsonic/benchmarks/album_facet_index_benchmark.py [album_count]
+
+import random
+import sqlite3
+import sys
+import time
+from typing import Callable
+
+import benchmark_env
+
+from album_metadata import AlbumMetadata  # noqa: E402
+from album_property_key import AlbumPropertyKeyValue  # noqa: E402
+from album_property_key import AlbumPropertyKeyOccurrence  # noqa: E402
+from metadata_model import AlbumMetadataModel  # noqa: E402
+import persistence  # noqa: E402
+
+
+def create_albums(album_count: int, rng: random.Random) -> int:
+    """Stores album_count albums with their properties in one transaction, returns the property rows"""
+    row_count: int = 0
+    connection: sqlite3.Connection = persistence.get_working_connection()
+    for i in range(album_count):
+        album_id: str = f"album-{i:06d}"
+        album_metadata: AlbumMetadata = AlbumMetadata()
+        album_metadata.set_value(AlbumMetadataModel.ALBUM_ID, album_id)
+        persistence.save_album_metadata(
+            album_metadata=album_metadata,
+            force_insert=True,
+            connection=connection,
+            do_commit=False)
+        properties: dict[str, list[str]] = {
+            "genre": [f"genre-{rng.randrange(40)}"],
+            "year": [str(1950 + rng.randrange(70))],
+            "label": [f"label-{rng.randrange(500)}"],
+            "format": [rng.choice(["cd", "vinyl", "digital"])]}
+        if rng.random() < 0.7:
+            properties["country"] = [f"country-{rng.randrange(30)}"]
+        if rng.random() < 0.5:
+            properties["mood"] = rng.sample([f"mood-{m}" for m in range(12)], k=2)
+        row_count += sum(len(v) for v in properties.values())
+        persistence.save_album_properties(
+            album_id=album_id,
+            properties=properties,
+            delete_all=True,
+            connection=connection,
+            do_commit=False)
+    persistence.commit(connection)
+    connection.close()
+    return row_count
+
+
+def drill_down_step(condition_list: list[AlbumPropertyKeyValue], connection: sqlite3.Connection = None):
+    """What the browser runs for one page: the count, the keys, the values of one key"""
+    persistence.get_album_property_matching_count(condition_list=condition_list, connection=connection)
+    key_list: list[AlbumPropertyKeyOccurrence] = persistence.get_album_property_key_occurence_list(
+        condition_list=condition_list,
+        connection=connection)
+    if key_list:
+        persistence.get_album_property_value_occurence_list(
+            condition_list=condition_list,
+            property_key=key_list[0].property_key,
+            connection=connection)
+
+
+def measure_sec(f: Callable[[], None], repeat: int) -> float:
+    start: float = time.perf_counter()
+    for _ in range(repeat):
+        f()
+    return (time.perf_counter() - start) / repeat
+
+
+def run(album_count: int) -> dict[str, float]:
+    rng: random.Random = random.Random(42)
+    result: dict[str, float] = {}
+    start: float = time.perf_counter()
+    result["property rows"] = create_albums(album_count, rng)
+    result["fill db (sec)"] = time.perf_counter() - start
+    # first use builds the index
+    start = time.perf_counter()
+    persistence.load_album_facet_index()
+    result["index build (sec)"] = time.perf_counter() - start
+    condition_list: list[AlbumPropertyKeyValue] = [
+        AlbumPropertyKeyValue(key="genre", value="genre-1"),
+        AlbumPropertyKeyValue(key="mood", value=None)]
+    connection: sqlite3.Connection = persistence.get_working_connection()
+    result["count, index (us)"] = 1e6 * measure_sec(
+        lambda: persistence.get_album_property_matching_count(condition_list=condition_list), 1000)
+    result["count, sql (us)"] = 1e6 * measure_sec(
+        lambda: persistence.get_album_property_matching_count(
+            condition_list=condition_list,
+            connection=connection), 10)
+    result["drill-down step, index (ms)"] = 1e3 * measure_sec(lambda: drill_down_step(condition_list), 100)
+    result["drill-down step, sql (ms)"] = 1e3 * measure_sec(lambda: drill_down_step(condition_list, connection), 5)
+    connection.close()
+    return result
+
+
+if __name__ == "__main__":
+    albums: int = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    print(f"album facet index, [{albums}] albums, cache dir [{benchmark_env.tmp_dir}]")
+    for name, value in run(albums).items():
+        print(f"  {name} [{value:.3f}]" if isinstance(value, float) else f"  {name} [{value}]")
@@ -0,0 +1,129 @@
+# Copyright (C) 2026 Giovanni Fulco
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+# Artist browsing by role and initial: resident artist catalogue against the sql queries,
+# on a temporary db filled with synthetic artists. Pages are also compared.
+# The catalogue is built from the db only, getArtists is not called.
+# Run from the cdplugins directory:
+#   python3 subsonic/benchmarks/artist_catalogue_benchmark.py [artist_count]
+
+import random
+import sqlite3
+import string
+import sys
+import time
+from typing import Callable
+
+import benchmark_env
+
+from artist_catalogue import ArtistCatalogue  # noqa: E402
+from artist_metadata import ArtistMetadata  # noqa: E402
+from metadata_model import ArtistMetadataModel  # noqa: E402
+import persistence  # noqa: E402
+
+ROLE_LIST: list[str] = ["albumartist", "artist", "composer", "conductor", "performer"]
+PAGE_SIZE: int = 50
+
+
+def create_artists(artist_count: int, rng: random.Random):
+    connection: sqlite3.Connection = persistence.get_working_connection()
+    for i in range(artist_count):
+        artist_id: str = f"artist-{i:06d}"
+        name: str = "".join(rng.choice(string.ascii_letters + "  ") for _ in range(rng.randint(4, 20))).strip()
+        artist_metadata: ArtistMetadata = ArtistMetadata()
+        artist_metadata.set_value(ArtistMetadataModel.ARTIST_ID, artist_id)
+        artist_metadata.set_value(ArtistMetadataModel.ARTIST_NAME, f"The {name}" if rng.random() < 0.1 else name)
+        artist_metadata.set_value(ArtistMetadataModel.ARTIST_SORT_NAME, name)
+        if rng.random() < 0.8:
+            artist_metadata.set_value(ArtistMetadataModel.ARTIST_COVER_ART, f"cover-{artist_id}")
+        persistence.save_artist_metadata(artist_metadata=artist_metadata, connection=connection, do_commit=False)
+        persistence.update_artist_roles(
+            artist_id=artist_id,
+            artist_roles=rng.sample(ROLE_LIST, k=rng.randint(1, 3)),
+            connection=connection,
+            do_commit=False)
+    persistence.commit(connection)
+    connection.close()
+
+
+def build_catalogue() -> ArtistCatalogue:
+    return ArtistCatalogue(
+        artists_initial_list=None,
+        artist_metadata_list=persistence.get_artist_metadata_list(),
+        artist_role_list=persistence.get_artist_role_list(),
+        album_artist_rows=persistence.get_album_artist_rows(),
+        album_rows=persistence.get_album_artist_summary_rows(),
+        album_genre_rows=persistence.get_album_genre_rows())
+
+
+def measure_us(f: Callable[[], None], repeat: int) -> float:
+    start: float = time.perf_counter()
+    for _ in range(repeat):
+        f()
+    return 1e6 * (time.perf_counter() - start) / repeat
+
+
+def compare_pages(catalogue: ArtistCatalogue, connection: sqlite3.Connection) -> tuple[int, int]:
+    """Pages compared and pages which differ, for every role and initial"""
+    page_count: int = 0
+    mismatch_count: int = 0
+    role: str
+    for role in ROLE_LIST:
+        initial_list: list[str] = [e.artist_initial for e in catalogue.get_artist_role_initials(artist_role=role)]
+        if initial_list != [e.artist_initial for e in persistence.get_artist_role_initials(
+                artist_role=role,
+                connection=connection)]:
+            mismatch_count += 1
+        for initial in initial_list:
+            page_count += 1
+            from_catalogue: list[str] = [e.artist_id for e in catalogue.get_artist_by_role_and_initial(
+                artist_role=role, initial=initial, offset=0, limit=PAGE_SIZE)]
+            from_sql: list[str] = [e.artist_id for e in persistence.get_artist_by_role_and_initial(
+                artist_role=role, initial=initial, offset=0, limit=PAGE_SIZE, connection=connection)]
+            # artists with the same sort name might come in any order
+            if sorted(from_catalogue) != sorted(from_sql):
+                mismatch_count += 1
+    return page_count, mismatch_count
+
+
+def run(artist_count: int) -> dict[str, float]:
+    result: dict[str, float] = {}
+    create_artists(artist_count, random.Random(42))
+    start: float = time.perf_counter()
+    catalogue: ArtistCatalogue = build_catalogue()
+    result["catalogue build (ms)"] = 1e3 * (time.perf_counter() - start)
+    connection: sqlite3.Connection = persistence.get_working_connection()
+    result["pages compared"], result["pages differing"] = compare_pages(catalogue, connection)
+    result["role/initial page, catalogue (us)"] = measure_us(
+        lambda: catalogue.get_artist_by_role_and_initial(artist_role="artist", initial="M", offset=0, limit=PAGE_SIZE),
+        10000)
+    result["role/initial page, sql (us)"] = measure_us(
+        lambda: persistence.get_artist_by_role_and_initial(
+            artist_role="artist", initial="M", offset=0, limit=PAGE_SIZE, connection=connection),
+        100)
+    result["role initials, catalogue (us)"] = measure_us(
+        lambda: catalogue.get_artist_role_initials(artist_role="artist"), 1000)
+    result["role initials, sql (us)"] = measure_us(
+        lambda: persistence.get_artist_role_initials(artist_role="artist", connection=connection), 100)
+    connection.close()
+    return result
+
+
+if __name__ == "__main__":
+    artists: int = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    print(f"artist catalogue, [{artists}] artists, cache dir [{benchmark_env.tmp_dir}]")
+    for name, value in run(artists).items():
+        print(f"  {name} [{value:.3f}]" if isinstance(value, float) else f"  {name} [{value}]")
@@ -0,0 +1,35 @@
+# Copyright (C) 2026 Giovanni Fulco
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+# benchmark environment: plugin modules are imported flat, as upmpdcli does,
+# with an empty configuration and a temporary cache directory (as in tests/conftest.py)
+# Import it before any plugin module.
+
+import atexit
+import os
+import shutil
+import sys
+import tempfile
+
+__plugin_dir: str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(__plugin_dir), "pycommon"))
+sys.path.insert(0, __plugin_dir)
+
+tmp_dir: str = tempfile.mkdtemp(prefix="subsonic-benchmarks-")
+atexit.register(shutil.rmtree, tmp_dir, True)
+with open(os.path.join(tmp_dir, "upmpdcli.conf"), "w") as f:
+    f.write(f"cachedir = {tmp_dir}\n")
+os.environ["UPMPD_CONFIG"] = os.path.join(tmp_dir, "upmpdcli.conf")
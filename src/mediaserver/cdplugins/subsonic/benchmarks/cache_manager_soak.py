@@ -0,0 +1,86 @@
+# Copyright (C) 2026 Giovanni Fulco
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+# Soak test of the bounded CacheManager: many single-value and multi-value inserts
+# over a growing key space, then lookups, with the given limits.
+# Traced memory and RSS are reported along the way, they must stay flat once the limits are hit.
+# Run from the cdplugins directory (scale 1 is 3M + 1M inserts and 300k lookups):
+#   python3 subsonic/benchmarks/cache_manager_soak.py [scale]
+
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from caching import CacheLimits  # noqa: E402
+from caching import CacheManager  # noqa: E402
+
+MAX_ENTRIES: int = 5000
+MAX_BYTES: int = 4 * 1024 * 1024
+REPORT_EVERY: int = 500000
+
+
+def rss_mb() -> float:
+    # current, not peak, resident set size
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except OSError:
+        return 0.0
+
+
+def report(label: str, operations: int):
+    current, _ = tracemalloc.get_traced_memory()
+    print(f"  {label:<14} [{operations:>8}] traced [{current / (1024 * 1024):.2f}] MB rss [{rss_mb():.1f}] MB")
+
+
+def run(scale: float) -> CacheManager:
+    rng: random.Random = random.Random(42)
+    cache_manager: CacheManager = CacheManager(
+        default_limits=CacheLimits(max_entries=MAX_ENTRIES, max_bytes=MAX_BYTES))
+    single_count: int = int(3000000 * scale)
+    multi_count: int = int(1000000 * scale)
+    lookup_count: int = int(300000 * scale)
+    tracemalloc.start()
+    start: float = time.perf_counter()
+    i: int
+    for i in range(single_count):
+        # keys are never repeated, as album ids over the life of the process
+        cache_manager.cache_element_value("album", f"album-{i}", f"artist-{i % 1000}")
+        if (i + 1) % REPORT_EVERY == 0:
+            report("single inserts", i + 1)
+    for i in range(multi_count):
+        cache_manager.cache_element_multi_value("genre", f"genre-{i // 20}", f"album-{i}")
+        if (i + 1) % REPORT_EVERY == 0:
+            report("multi inserts", i + 1)
+    hits: int = 0
+    for i in range(lookup_count):
+        if cache_manager.get_cached_element("album", f"album-{single_count - 1 - rng.randrange(2 * MAX_ENTRIES)}"):
+            hits += 1
+    report("lookups", lookup_count)
+    print(f"  elapsed [{time.perf_counter() - start:.1f}] sec, lookup hits [{hits}]")
+    tracemalloc.stop()
+    return cache_manager
+
+
+if __name__ == "__main__":
+    soak_scale: float = float(sys.argv[1]) if len(sys.argv) > 1 else 1.0
+    print(f"CacheManager soak, scale [{soak_scale}] limits entries [{MAX_ENTRIES}] bytes [{MAX_BYTES}]")
+    for line in run(soak_scale).dump():
+        print(f"  {line}")
@@ -0,0 +1,71 @@
+# Copyright (C) 2026 Giovanni Fulco
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+# Key-value cache lookups: get_kv_item from the memory tier against the same call going to sqlite.
+# Items are written straight to the db, so the first lookup of each key misses the memory tier
+# and opens a connection as get_kv_item does without it; the following lookups are served from memory.
+# Run from the cdplugins directory (key_count should not exceed kvmemorycachesize, 1000 by default):
+#   python3 subsonic/benchmarks/kv_memory_tier_benchmark.py [key_count]
+
+import datetime
+import sqlite3
+import sys
+import time
+
+import benchmark_env
+
+from keyvaluecaching import KeyValueItem  # noqa: E402
+from keyvaluecaching import upsert_kv_item_list_v1  # noqa: E402
+import persistence  # noqa: E402
+import sqlite3util  # noqa: E402
+
+PARTITION: str = "benchmark"
+MEMORY_PASSES: int = 20
+
+
+def create_items(key_count: int) -> list[str]:
+    key_list: list[str] = [f"key-{i:06d}" for i in range(key_count)]
+    connection: sqlite3.Connection = persistence.get_working_connection()
+    upsert_kv_item_list_v1(
+        sqlite3util.get_sqlite3_many_executor(connection),
+        [KeyValueItem(PARTITION, key, f"value-{key}") for key in key_list],
+        datetime.datetime.now())
+    connection.close()
+    return key_list
+
+
+def lookup_all_us(key_list: list[str]) -> float:
+    start: float = time.perf_counter()
+    key: str
+    for key in key_list:
+        if persistence.get_kv_item(partition=PARTITION, key=key) is None:
+            raise Exception(f"Missing [{key}]")
+    return 1e6 * (time.perf_counter() - start) / len(key_list)
+
+
+def run(key_count: int) -> dict[str, float]:
+    key_list: list[str] = create_items(key_count)
+    result: dict[str, float] = {}
+    result["first lookup, sqlite (us)"] = lookup_all_us(key_list)
+    result["repeated lookup, memory (us)"] = sum(lookup_all_us(key_list) for _ in range(MEMORY_PASSES)) / MEMORY_PASSES
+    return result
+
+
+if __name__ == "__main__":
+    keys: int = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    print(f"get_kv_item, [{keys}] keys, cache dir [{benchmark_env.tmp_dir}]")
+    for name, value in run(keys).items():
+        print(f"  {name} [{value:.2f}]")
@@ -0,0 +1,257 @@
+# Copyright (C) 2026 Giovanni Fulco
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+# Album preload against a local mock Subsonic server with a fixed latency per request.
+# The server answers search3 (used by the full preload) and getIndexes, getAlbumList2,
+# getAlbum (used by the incremental sync), with synthetic albums.
+# - full: the loop before the preload pipeline (each search3 page is fetched, then its
+#   albums are saved one by one) against the pipeline with bulk saves, as in preload_albums
+# - delta: getIndexes, the newest albums, then one getAlbum per album for the songs,
+#   sequentially as before against the concurrent fetchers of preload_sync
+# Run from the cdplugins directory:
+#   python3 subsonic/benchmarks/preload_benchmark.py [album_count] [latency_ms] [fetcher_count]
+
+import datetime
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+
+import benchmark_env
+
+
+class _SubsonicHandler(BaseHTTPRequestHandler):
+
+    latency_sec: float = 0.05
+    album_count: int = 0
+    songs_per_album: int = 10
+    request_count: dict[str, int] = {}
+    __lock: threading.Lock = threading.Lock()
+
+    def do_GET(self):
+        self.__answer(urllib.parse.urlparse(self.path).query)
+
+    def do_POST(self):
+        # libsonic sends the parameters in the body, unless configured to use GET
+        length: int = int(self.headers.get("Content-Length", 0))
+        self.__answer(self.rfile.read(length).decode("utf-8"))
+
+    def __answer(self, query: str):
+        time.sleep(self.latency_sec)
+        verb: str = urllib.parse.urlparse(self.path).path.rsplit("/", 1)[-1].removesuffix(".view")
+        params: dict[str, str] = {k: v[0] for k, v in urllib.parse.parse_qs(query).items()}
+        with _SubsonicHandler.__lock:
+            _SubsonicHandler.request_count[verb] = _SubsonicHandler.request_count.get(verb, 0) + 1
+        response: dict[str, any] = {"status": "ok", "version": "1.16.1"}
+        if verb == "search3":
+            offset: int = int(params.get("albumOffset", 0))
+            count: int = int(params.get("albumCount", 20))
+            response["searchResult3"] = {"album": [
+                self.__album(i) for i in range(offset, min(offset + count, self.album_count))]}
+        elif verb == "getAlbumList2":
+            # newest first
+            offset: int = int(params.get("offset", 0))
+            size: int = int(params.get("size", 10))
+            response["albumList2"] = {"album": [
+                self.__album(self.album_count - 1 - i)
+                for i in range(offset, min(offset + size, self.album_count))]}
+        elif verb == "getAlbum":
+            index: int = int(params["id"].rsplit("-", 1)[-1])
+            album: dict[str, any] = self.__album(index)
+            album["song"] = [self.__song(index, n) for n in range(self.songs_per_album)]
+            response["album"] = album
+        elif verb == "getIndexes":
+            response["indexes"] = {"lastModified": 1000 + self.album_count, "index": []}
+        else:
+            response = {"status": "failed", "version": "1.16.1",
+                        "error": {"code": 0, "message": f"unsupported [{verb}]"}}
+        body: bytes = json.dumps({"subsonic-response": response}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def __album(self, index: int) -> dict[str, any]:
+        created: datetime.datetime = datetime.datetime(2020, 1, 1) + datetime.timedelta(minutes=index)
+        return {
+            "id": f"album-{index:06d}",
+            "name": f"Album {index}",
+            "artist": f"Artist {index % 300}",
+            "artistId": f"artist-{index % 300}",
+            "coverArt": f"al-album-{index:06d}",
+            "songCount": self.songs_per_album,
+            "duration": 2400,
+            "year": 1960 + index % 60,
+            "genre": f"Genre {index % 25}",
+            "created": created.strftime("%Y-%m-%dT%H:%M:%S.000Z")}
+
+    def __song(self, album_index: int, number: int) -> dict[str, any]:
+        return {
+            "id": f"song-{album_index:06d}-{number:02d}",
+            "parent": f"album-{album_index:06d}",
+            "title": f"Song {number}",
+            "album": f"Album {album_index}",
+            "albumId": f"album-{album_index:06d}",
+            "artist": f"Artist {album_index % 300}",
+            "artistId": f"artist-{album_index % 300}",
+            "track": number + 1,
+            "duration": 240,
+            "suffix": "flac",
+            "isDir": False}
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(album_count: int, latency_ms: int) -> ThreadingHTTPServer:
+    _SubsonicHandler.album_count = album_count
+    _SubsonicHandler.latency_sec = latency_ms / 1000.0
+    server: ThreadingHTTPServer = ThreadingHTTPServer(("127.0.0.1", 0), _SubsonicHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    # the plugin reads the server address from the configuration, before its modules are loaded
+    with open(os.environ["UPMPD_CONFIG"], "a") as f:
+        f.write("subsonicbaseurl = http://127.0.0.1\n"
+                f"subsonicport = {server.server_address[1]}\n"
+                "subsonicuser = benchmark\n"
+                "subsonicpassword = benchmark\n")
+    return server
+
+
+def run(album_count: int, latency_ms: int, fetcher_count: int) -> dict[str, str]:
+    server: ThreadingHTTPServer = start_server(album_count, latency_ms)
+    # plugin modules are loaded only now, see start_server
+    import connector_provider
+    import constants
+    import metadata_converter
+    import persistence
+    import preload_sync
+    import subsonic_util
+    from preload_pipeline import PagePipeline
+
+    page_size: int = constants.Defaults.SUBSONIC_API_MAX_RETURN_SIZE.value
+    # the newest tenth of the library was added since the previous sync
+    delta_count: int = max(1, album_count // 10)
+
+    def fetch_page(album_offset: int, album_count: int) -> list:
+        return connector_provider.get().search(
+            query="",
+            albumCount=album_count,
+            albumOffset=album_offset,
+            artistCount=0,
+            songCount=0).getAlbums()
+
+    def full_sequential() -> int:
+        connection: sqlite3.Connection = persistence.get_working_connection()
+        album_offset: int = 0
+        stored: int = 0
+        while True:
+            album_list: list = fetch_page(album_offset, page_size)
+            for album in album_list:
+                persistence.save_album_metadata(
+                    album_metadata=metadata_converter.build_album_metadata(album=album),
+                    context="preload",
+                    connection=connection,
+                    do_commit=False)
+            persistence.commit(connection=connection)
+            stored += len(album_list)
+            if len(album_list) < page_size:
+                break
+            album_offset += len(album_list)
+        connection.close()
+        return stored
+
+    def full_pipeline() -> int:
+        connection: sqlite3.Connection = persistence.get_working_connection()
+        stored: int = 0
+
+        def store_page(album_offset: int, album_list: list):
+            nonlocal stored
+            persistence.save_album_metadata_list(
+                album_metadata_list=[metadata_converter.build_album_metadata(album=album) for album in album_list],
+                context="preload",
+                connection=connection,
+                do_commit=False)
+            persistence.commit(connection=connection)
+            stored += len(album_list)
+
+        PagePipeline(
+            name="preload_benchmark",
+            fetch_page=fetch_page,
+            page_size=page_size,
+            fetcher_count=fetcher_count).run(store_page)
+        connection.close()
+        return stored
+
+    def fetch_delta_albums() -> list:
+        preload_sync.get_server_last_modified()
+        mark_album = connector_provider.get().getNewestAlbumList(size=1, offset=delta_count).getObj().getAlbums()[0]
+        return preload_sync.fetch_albums_created_after(high_water_mark=subsonic_util.get_album_created(mark_album))
+
+    def delta_sequential() -> int:
+        album_list: list = fetch_delta_albums()
+        for album in album_list:
+            connector_provider.get_uncached().getAlbum(album.getId()).getObj().getSongs()
+        return len(album_list)
+
+    def delta_concurrent() -> int:
+        album_list: list = fetch_delta_albums()
+        # read at every call, the configuration file has no value for it
+        os.environ["UPMPD_SUBSONICPRELOADFETCHERCOUNT"] = str(fetcher_count)
+        preload_sync.fetch_songs_by_album_list(album_list=album_list)
+        return len(album_list)
+
+    def clear_albums():
+        # every full run inserts all the albums
+        connection: sqlite3.Connection = persistence.get_working_connection()
+        persistence.prune_album_metadata(
+            update_timestamp=datetime.datetime.now() + datetime.timedelta(days=1),
+            connection=connection)
+        connection.close()
+
+    result: dict[str, str] = {}
+    for name, measured in [
+            ("full, sequential", full_sequential),
+            (f"full, {fetcher_count} fetchers", full_pipeline),
+            ("delta, sequential", delta_sequential),
+            (f"delta, {fetcher_count} fetchers", delta_concurrent)]:
+        clear_albums()
+        # getAlbum responses must not come from the response cache of a previous run
+        connector_provider.caching_connector.invalidate()
+        _SubsonicHandler.request_count = {}
+        start: float = time.perf_counter()
+        stored: int = measured()
+        elapsed: float = time.perf_counter() - start
+        requests_made: str = ", ".join(f"{k} x{v}" for k, v in sorted(_SubsonicHandler.request_count.items()))
+        result[name] = (f"[{stored}] albums in [{elapsed:.2f}] sec "
+                        f"[{stored / elapsed:.1f}] albums/sec requests [{requests_made}]")
+    server.shutdown()
+    server.server_close()
+    return result
+
+
+if __name__ == "__main__":
+    albums: int = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    latency: int = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    fetchers: int = int(sys.argv[3]) if len(sys.argv) > 3 else 4
+    print(f"album preload, [{albums}] albums, [{latency}] ms latency, cache dir [{benchmark_env.tmp_dir}]")
+    for name, line in run(albums, latency, fetchers).items():
+        print(f"  {name:<21} {line}")
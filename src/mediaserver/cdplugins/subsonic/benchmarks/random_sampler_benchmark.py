@@ -0,0 +1,93 @@
+# Copyright (C) 2026 Giovanni Fulco
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+# Random album by genre: id reservoir against ORDER BY RANDOM(),
+# on a temporary db growing through the given album counts (20 genres).
+# Both paths open their own connection, as get_random_album_by_genre does.
+# Run from the cdplugins directory:
+#   python3 subsonic/benchmarks/random_sampler_benchmark.py [album_count ...]
+
+import random
+import sqlite3
+import sys
+import time
+
+import benchmark_env
+
+from album_metadata import AlbumMetadata  # noqa: E402
+from metadata_model import AlbumMetadataModel  # noqa: E402
+import persistence  # noqa: E402
+
+GENRE_COUNT: int = 20
+PICK_COUNT: int = 50
+
+
+def add_albums(first: int, last: int):
+    connection: sqlite3.Connection = persistence.get_working_connection()
+    for i in range(first, last):
+        album_metadata: AlbumMetadata = AlbumMetadata()
+        album_metadata.set_value(AlbumMetadataModel.ALBUM_ID, f"album-{i:06d}")
+        album_metadata.set_value(AlbumMetadataModel.ALBUM_GENRE, f"genre-{i % GENRE_COUNT}")
+        persistence.save_album_metadata(
+            album_metadata=album_metadata,
+            force_insert=True,
+            connection=connection,
+            do_commit=False)
+    persistence.commit(connection)
+    connection.close()
+
+
+def pick_with_sql(genre_name: str) -> AlbumMetadata:
+    # a provided connection bypasses the reservoir
+    connection: sqlite3.Connection = persistence.get_working_connection()
+    try:
+        return persistence.get_random_album_by_genre(genre_name=genre_name, connection=connection)
+    finally:
+        connection.close()
+
+
+def measure_ms(pick, genre_list: list[str]) -> float:
+    start: float = time.perf_counter()
+    for genre_name in genre_list:
+        if pick(genre_name) is None:
+            raise Exception(f"No album for [{genre_name}]")
+    return 1e3 * (time.perf_counter() - start) / len(genre_list)
+
+
+def run(album_count_list: list[int]) -> list[tuple[int, float, float]]:
+    rng: random.Random = random.Random(42)
+    result: list[tuple[int, float, float]] = []
+    current: int = 0
+    album_count: int
+    for album_count in sorted(album_count_list):
+        add_albums(current, album_count)
+        current = album_count
+        persistence.load_random_samplers()
+        genre_list: list[str] = [f"genre-{rng.randrange(GENRE_COUNT)}" for _ in range(PICK_COUNT)]
+        result.append((
+            album_count,
+            measure_ms(lambda g: persistence.get_random_album_by_genre(genre_name=g), genre_list),
+            measure_ms(pick_with_sql, genre_list)))
+    return result
+
+
+if __name__ == "__main__":
+    sizes: list[int] = [int(x) for x in sys.argv[1:]] if len(sys.argv) > 1 else [2000, 10000, 25000, 50000]
+    print(f"random album by genre, [{GENRE_COUNT}] genres, [{PICK_COUNT}] picks per size, "
+          f"cache dir [{benchmark_env.tmp_dir}]")
+    print("  albums   reservoir   ORDER BY RANDOM()")
+    for albums, reservoir_ms, sql_ms in run(sizes):
+        print(f"  {albums:6d}   {reservoir_ms:6.2f} ms   {sql_ms:6.2f} ms")
@@ -0,0 +1,186 @@
+# Copyright (C) 2026 Giovanni Fulco
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+# Trackuri against a local mock Subsonic server with a fixed latency per request.
+# - before: getSong for every track, then the scrobble, both waited for
+# - after: the song info comes from the songs presented while browsing (memory),
+#   from song_metadata_v1 (database), or from getSong for unknown songs (server),
+#   the scrobble is queued and sent in background
+# The stream url is built the same way in both cases.
+# Run from the cdplugins directory:
+#   python3 subsonic/benchmarks/trackuri_benchmark.py [track_count] [latency_ms]
+
+import json
+import os
+import sys
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+
+import benchmark_env
+
+
+class _SubsonicHandler(BaseHTTPRequestHandler):
+
+    latency_sec: float = 0.05
+    request_count: dict[str, int] = {}
+    __lock: threading.Lock = threading.Lock()
+
+    def do_GET(self):
+        self.__answer(urllib.parse.urlparse(self.path).query)
+
+    def do_POST(self):
+        # libsonic sends the parameters in the body, unless configured to use GET
+        length: int = int(self.headers.get("Content-Length", 0))
+        self.__answer(self.rfile.read(length).decode("utf-8"))
+
+    def __answer(self, query: str):
+        time.sleep(self.latency_sec)
+        verb: str = urllib.parse.urlparse(self.path).path.rsplit("/", 1)[-1].removesuffix(".view")
+        params: dict[str, str] = {k: v[0] for k, v in urllib.parse.parse_qs(query).items()}
+        with _SubsonicHandler.__lock:
+            _SubsonicHandler.request_count[verb] = _SubsonicHandler.request_count.get(verb, 0) + 1
+        response: dict[str, any] = {"status": "ok", "version": "1.16.1"}
+        if verb == "getSong":
+            response["song"] = build_song_data(params["id"])
+        elif verb != "scrobble":
+            response = {"status": "failed", "version": "1.16.1",
+                        "error": {"code": 0, "message": f"unsupported [{verb}]"}}
+        body: bytes = json.dumps({"subsonic-response": response}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def build_song_data(song_id: str) -> dict[str, any]:
+    return {
+        "id": song_id,
+        "title": f"Song {song_id}",
+        "album": "Album",
+        "albumId": "album-1",
+        "artist": "Artist",
+        "artistId": "artist-1",
+        "suffix": "flac",
+        "contentType": "audio/flac",
+        "bitRate": 1000,
+        "bitDepth": 16,
+        "samplingRate": 44100,
+        "duration": 240,
+        "isDir": False}
+
+
+def start_server(latency_ms: int) -> ThreadingHTTPServer:
+    _SubsonicHandler.latency_sec = latency_ms / 1000.0
+    server: ThreadingHTTPServer = ThreadingHTTPServer(("127.0.0.1", 0), _SubsonicHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    # the plugin reads the server address from the configuration, before its modules are loaded
+    with open(os.environ["UPMPD_CONFIG"], "a") as f:
+        f.write("subsonicbaseurl = http://127.0.0.1\n"
+                f"subsonicport = {server.server_address[1]}\n"
+                "subsonicuser = benchmark\n"
+                "subsonicpassword = benchmark\n")
+    return server
+
+
+def run(track_count: int, latency_ms: int) -> dict[str, str]:
+    server: ThreadingHTTPServer = start_server(latency_ms)
+    # plugin modules are loaded only now, see start_server
+    from subsonic_connector.album import Album
+    from subsonic_connector.song import Song
+    import connector_provider
+    import metadata_converter
+    import persistence
+    import scrobble_queue
+    import stream_info
+
+    def before(track_id: str) -> str:
+        song: Song = connector_provider.get().getSong(song_id=track_id).getObj()
+        connector_provider.get().scrobble(song_id=song.getId())
+        return connector_provider.get().buildSongUrlBySong(song=song)
+
+    def after(track_id: str) -> str:
+        # as song_trackuri, with trackuriuselocalmetadata enabled
+        info: stream_info.StreamInfo = stream_info.cache.get(track_id)
+        if not info:
+            song_metadata = persistence.get_song_metadata(song_id=track_id)
+            info = stream_info.from_song_metadata(song_metadata) if song_metadata else None
+        if not info:
+            info = stream_info.from_song(connector_provider.get().getSong(song_id=track_id).getObj())
+        stream_info.cache.put(info)
+        scrobble_queue.scrobble_queue.submit(song_id=info.song_id)
+        return connector_provider.get().buildSongUrlBySong(song=Song({"id": info.song_id}))
+
+    def prepare_memory(track_id_list: list[str]):
+        # song_to_entry records every song it presents
+        for track_id in track_id_list:
+            stream_info.cache.put(stream_info.from_song(Song(build_song_data(track_id))))
+
+    def prepare_database(track_id_list: list[str]):
+        # stored by the preload, songs refer to their album
+        persistence.save_album_metadata(
+            album_metadata=metadata_converter.build_album_metadata(album=Album({"id": "album-1", "name": "Album"})))
+        for track_id in track_id_list:
+            persistence.save_song_metadata(
+                song_metadata=metadata_converter.build_song_metadata(song=Song(build_song_data(track_id))))
+
+    def wait_for_scrobbles(expected: int):
+        # the queued scrobbles are sent before the next phase, so they are counted here
+        deadline: float = time.time() + 60
+        while _SubsonicHandler.request_count.get("scrobble", 0) < expected and time.time() < deadline:
+            time.sleep(0.05)
+
+    result: dict[str, str] = {}
+    for phase, (name, trackuri, prepare) in enumerate([
+            ("before", before, None),
+            ("after, memory", after, prepare_memory),
+            ("after, database", after, prepare_database),
+            ("after, server", after, None)]):
+        # songs of each phase are new, so they are not found in the places filled by another one
+        track_id_list: list[str] = [f"song-{phase}-{i:06d}" for i in range(track_count)]
+        if prepare:
+            prepare(track_id_list)
+        # the response cache must not serve getSong
+        connector_provider.caching_connector.invalidate()
+        _SubsonicHandler.request_count = {}
+        elapsed_list: list[float] = []
+        for track_id in track_id_list:
+            start: float = time.perf_counter()
+            trackuri(track_id)
+            elapsed_list.append(time.perf_counter() - start)
+        wait_for_scrobbles(track_count)
+        requests_made: str = ", ".join(f"{k} x{v}" for k, v in sorted(_SubsonicHandler.request_count.items()))
+        elapsed_list.sort()
+        result[name] = (f"mean [{1000.0 * sum(elapsed_list) / len(elapsed_list):.2f}] ms "
+                        f"p95 [{1000.0 * elapsed_list[int(0.95 * (len(elapsed_list) - 1))]:.2f}] ms "
+                        f"requests [{requests_made}]")
+    server.shutdown()
+    server.server_close()
+    return result
+
+
+if __name__ == "__main__":
+    tracks: int = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    latency: int = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    print(f"trackuri, [{tracks}] tracks, [{latency}] ms latency, cache dir [{benchmark_env.tmp_dir}]")
+    for name, line in run(tracks, latency).items():
+        print(f"  {name:<16} {line}")
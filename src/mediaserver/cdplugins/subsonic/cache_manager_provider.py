@@ -14,8 +14,18 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from caching import CacheManager
+from caching import CacheLimits
+from msgproc_provider import msgproc
+import config
+import constants
 
-__cache_manager: CacheManager = CacheManager()
+__cache_manager: CacheManager = CacheManager(
+    default_limits=CacheLimits(
+        max_entries=config.get_config_param_as_int(constants.ConfigParam.CACHE_MANAGER_MAX_ENTRIES),
+        max_bytes=config.get_config_param_as_int(constants.ConfigParam.CACHE_MANAGER_MAX_BYTES),
+        ttl_sec=config.get_config_param_as_int(constants.ConfigParam.CACHE_MANAGER_TTL_SEC)),
+    logger=msgproc.log,
+    report_every=config.get_config_param_as_int(constants.ConfigParam.CACHE_MANAGER_REPORT_EVERY))
 
 
 def get() -> CacheManager:
@@ -30,6 +30,7 @@ class CacheType(Enum):
 
     GENERIC_KEY_VALUE = _CacheTypeData("generic_kv")
     ITEM_IDENTIFIER_CODEC = _CacheTypeData("iid_codec")
+    PRELOAD_SYNC = _CacheTypeData("preload_sync")
 
     @property
     def cache_name(self) -> str:
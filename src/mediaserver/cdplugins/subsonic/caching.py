@@ -13,47 +13,235 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+# named in-memory caches, each one bounded by entry count and by (estimated) size
+# least recently used entries are evicted first, entries optionally expire after ttl
+# counters are kept per cache and can be dumped to the log
+
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+from typing import Callable
+from typing import Hashable
+
+
+class CacheLimits:
+
+    def __init__(self, max_entries: int = 0, max_bytes: int = 0, ttl_sec: float = 0):
+        # 0 means no limit
+        self.__max_entries: int = max_entries
+        self.__max_bytes: int = max_bytes
+        self.__ttl_sec: float = ttl_sec
+
+    @property
+    def max_entries(self) -> int:
+        return self.__max_entries
+
+    @property
+    def max_bytes(self) -> int:
+        return self.__max_bytes
+
+    @property
+    def ttl_sec(self) -> float:
+        return self.__ttl_sec
+
+
+class CacheStatistics:
+
+    def __init__(self, cache_name: str):
+        self.__cache_name: str = cache_name
+        self.hits: int = 0
+        self.misses: int = 0
+        self.inserts: int = 0
+        self.updates: int = 0
+        self.deletes: int = 0
+        self.evictions: int = 0
+        self.expirations: int = 0
+        self.entries: int = 0
+        self.bytes: int = 0
+
+    @property
+    def cache_name(self) -> str:
+        return self.__cache_name
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups: int = self.hits + self.misses
+        return float(self.hits) / lookups if lookups > 0 else 0.0
+
+    def __str__(self) -> str:
+        return (f"[{self.__cache_name}] entries [{self.entries}] bytes [{self.bytes}] "
+                f"hits [{self.hits}] misses [{self.misses}] hit ratio [{self.hit_ratio:.3f}] "
+                f"inserts [{self.inserts}] updates [{self.updates}] deletes [{self.deletes}] "
+                f"evictions [{self.evictions}] expirations [{self.expirations}]")
+
+
+def _estimate_size(value: Any) -> int:
+    # shallow, plus elements for the collections we store
+    size: int = sys.getsizeof(value)
+    if isinstance(value, (set, frozenset, list, tuple)):
+        size += sum(sys.getsizeof(v) for v in value)
+    return size
+
+
+class _Entry:
+
+    __slots__ = ("value", "size", "expires_at")
+
+    def __init__(self, value: Any, size: int, expires_at: float):
+        self.value: Any = value
+        self.size: int = size
+        self.expires_at: float = expires_at
+
+
+class _ElementCache:
+
+    def __init__(self, name: str, limits: CacheLimits):
+        self.name: str = name
+        self.limits: CacheLimits = limits
+        self.entries: OrderedDict[Hashable, _Entry] = OrderedDict()
+        self.statistics: CacheStatistics = CacheStatistics(name)
+
 
 class CacheManager:
 
-    def __init__(self):
-        self.__caches: dict[str, any] = {}
+    def __init__(
+            self,
+            default_limits: CacheLimits = None,
+            limits_by_cache_name: dict[str, CacheLimits] = None,
+            logger: Callable[[str], None] = None,
+            report_every: int = 0):
+        self.__default_limits: CacheLimits = default_limits if default_limits else CacheLimits()
+        self.__limits_by_cache_name: dict[str, CacheLimits] = limits_by_cache_name if limits_by_cache_name else {}
+        self.__logger: Callable[[str], None] = logger
+        self.__report_every: int = report_every
+        self.__operations: int = 0
+        self.__lock: threading.RLock = threading.RLock()
+        self.__caches: dict[Hashable, _ElementCache] = {}
 
-    def __get_element_cache(self, cache_name: str) -> dict[str, any]:
-        if cache_name in self.__caches:
-            return self.__caches[cache_name]
-        cache: dict[str, any] = {}
-        self.__caches[cache_name] = cache
+    def __get_element_cache(self, cache_name: Hashable) -> _ElementCache:
+        cache: _ElementCache = self.__caches.get(cache_name)
+        if cache is None:
+            # element types are also used as cache names
+            name: str = getattr(cache_name, "element_name", None) or str(cache_name)
+            cache = _ElementCache(
+                name=name,
+                limits=self.__limits_by_cache_name.get(name, self.__default_limits))
+            self.__caches[cache_name] = cache
         return cache
 
     def cache_element_value(self, cache_name: str, key: str, value: any):
-        cache: dict[str, any] = self.__get_element_cache(cache_name)
-        cache[key] = value
+        with self.__lock:
+            cache: _ElementCache = self.__get_element_cache(cache_name)
+            self.__put(cache, key, value)
+            self.__operation()
 
     def cache_element_multi_value(self, cache_name: str, key: str, value: any):
-        cache: dict[str, any] = self.__get_element_cache(cache_name)
-        existing: set[any] = cache[key] if key in cache else None
-        if not existing:
-            existing = set()
-            cache[key] = existing
-        if value not in existing:
-            existing.add(value)
+        with self.__lock:
+            cache: _ElementCache = self.__get_element_cache(cache_name)
+            entry: _Entry = self.__get_entry(cache, key)
+            if entry is None:
+                self.__put(cache, key, {value})
+            elif value not in entry.value:
+                entry.value.add(value)
+                added: int = sys.getsizeof(value)
+                entry.size += added
+                cache.statistics.bytes += added
+                cache.statistics.updates += 1
+                self.__evict(cache)
+            self.__operation()
 
     def is_element_cached(self, cache_name: str, key: str) -> bool:
-        cache: dict[str, any] = self.__get_element_cache(cache_name)
-        return key in cache if cache else False
+        with self.__lock:
+            return self.__lookup(self.__get_element_cache(cache_name), key) is not None
 
     def get_cached_element(self, cache_name: str, key: str) -> any:
-        cache: dict[str, any] = self.__get_element_cache(cache_name)
-        return cache[key] if key in cache else None
+        with self.__lock:
+            entry: _Entry = self.__lookup(self.__get_element_cache(cache_name), key)
+            return entry.value if entry else None
 
     def delete_cached_element(self, cache_name: str, key: str) -> bool:
-        cache: dict[str, any] = self.__get_element_cache(cache_name)
-        can_delete: bool = key in cache
-        if can_delete:
-            del cache[key]
-        return can_delete
+        with self.__lock:
+            cache: _ElementCache = self.__get_element_cache(cache_name)
+            entry: _Entry = cache.entries.pop(key, None)
+            if entry is None:
+                return False
+            cache.statistics.deletes += 1
+            self.__removed(cache, entry)
+            return True
 
     def get_cache_size(self, cache_name: str) -> int:
-        element_cache: dict[str, any] = self.__get_element_cache(cache_name)
-        return len(element_cache) if element_cache else 0
+        with self.__lock:
+            return len(self.__get_element_cache(cache_name).entries)
+
+    def get_statistics(self) -> list[CacheStatistics]:
+        with self.__lock:
+            return [cache.statistics for cache in self.__caches.values()]
+
+    def dump(self) -> list[str]:
+        """One line per cache, with limits and counters"""
+        with self.__lock:
+            return [f"CacheManager {cache.statistics} "
+                    f"limits entries [{cache.limits.max_entries}] bytes [{cache.limits.max_bytes}] "
+                    f"ttl [{cache.limits.ttl_sec}]"
+                    for cache in self.__caches.values()]
+
+    def __get_entry(self, cache: _ElementCache, key: Hashable) -> _Entry | None:
+        # no counters, expired entries are dropped
+        entry: _Entry = cache.entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at and entry.expires_at <= time.time():
+            del cache.entries[key]
+            cache.statistics.expirations += 1
+            self.__removed(cache, entry)
+            return None
+        return entry
+
+    def __lookup(self, cache: _ElementCache, key: Hashable) -> _Entry | None:
+        entry: _Entry = self.__get_entry(cache, key)
+        if entry is None:
+            cache.statistics.misses += 1
+            return None
+        cache.entries.move_to_end(key)
+        cache.statistics.hits += 1
+        return entry
+
+    def __put(self, cache: _ElementCache, key: Hashable, value: Any):
+        ttl_sec: float = cache.limits.ttl_sec
+        entry: _Entry = _Entry(
+            value=value,
+            size=sys.getsizeof(key) + _estimate_size(value),
+            expires_at=time.time() + ttl_sec if ttl_sec > 0 else 0.0)
+        previous: _Entry = cache.entries.pop(key, None)
+        if previous is not None:
+            cache.statistics.updates += 1
+            self.__removed(cache, previous)
+        else:
+            cache.statistics.inserts += 1
+        cache.entries[key] = entry
+        cache.statistics.entries += 1
+        cache.statistics.bytes += entry.size
+        self.__evict(cache)
+
+    def __evict(self, cache: _ElementCache):
+        max_entries: int = cache.limits.max_entries
+        max_bytes: int = cache.limits.max_bytes
+        # the most recent entry is kept anyway
+        while len(cache.entries) > 1 and (
+                (max_entries > 0 and len(cache.entries) > max_entries) or
+                (max_bytes > 0 and cache.statistics.bytes > max_bytes)):
+            _, entry = cache.entries.popitem(last=False)
+            cache.statistics.evictions += 1
+            self.__removed(cache, entry)
+
+    def __removed(self, cache: _ElementCache, entry: _Entry):
+        cache.statistics.entries -= 1
+        cache.statistics.bytes -= entry.size
+
+    def __operation(self):
+        self.__operations += 1
+        if self.__logger and self.__report_every > 0 and self.__operations % self.__report_every == 0:
+            for line in self.dump():
+                self.__logger(line)
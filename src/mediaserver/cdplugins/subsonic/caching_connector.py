@@ -0,0 +1,126 @@
+# Copyright (C) 2026 Giovanni Fulco
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# wraps the subsonic connector, caching the responses of selected read-only methods
+# all the other methods are delegated as they are
+
+import inspect
+from typing import Any
+from typing import Callable
+
+from subsonic_connector.connector import Connector
+from subsonic_connector.response import Response
+from subsonic_connector.song import Song
+
+from responsecaching import ResponseCache
+from responsecaching import ResponseCacheStatistics
+
+
+class CachedMethod:
+
+    def __init__(self, ttl_sec: int, stale_sec: int):
+        self.__ttl_sec: int = ttl_sec
+        self.__stale_sec: int = stale_sec
+
+    @property
+    def ttl_sec(self) -> int:
+        return self.__ttl_sec
+
+    @property
+    def stale_sec(self) -> int:
+        return self.__stale_sec
+
+
+def _is_ok(res: Response) -> bool:
+    return res is not None and res.isOk()
+
+
+class CachingConnector:
+
+    def __init__(
+            self,
+            connector: Connector,
+            cache: ResponseCache,
+            cached_methods: dict[str, CachedMethod]):
+        self.__connector: Connector = connector
+        self.__cache: ResponseCache = cache
+        # methods with ttl 0 are not cached
+        self.__cached_methods: dict[str, CachedMethod] = {
+            k: v for k, v in cached_methods.items() if v.ttl_sec > 0}
+        self.__wrappers: dict[str, Callable[..., Any]] = {}
+        self.__signatures: dict[str, inspect.Signature] = {}
+
+    @property
+    def connector(self) -> Connector:
+        return self.__connector
+
+    def get_statistics(self) -> list[ResponseCacheStatistics]:
+        return self.__cache.get_statistics()
+
+    def invalidate(self, method_name: str = None, **arguments):
+        """Drops the responses of method_name (all methods if None),
+        only the one for arguments when they are given"""
+        if method_name is not None and arguments:
+            self.__cache.invalidate(group=method_name, key=self.__build_key(method_name, (), arguments))
+        else:
+            self.__cache.invalidate(group=method_name)
+
+    def scrobble(self, song_id: str, *args, **kwargs) -> Any:
+        res: Any = self.__connector.scrobble(song_id, *args, **kwargs)
+        # play count and last played of the song and of its album have changed
+        song_key: tuple = self.__build_key("getSong", (), {"song_id": song_id})
+        cached_song: Response[Song] = self.__cache.peek(group="getSong", key=song_key)
+        self.__cache.invalidate(group="getSong", key=song_key)
+        if cached_song and cached_song.getObj() and cached_song.getObj().getAlbumId():
+            self.invalidate("getAlbum", albumId=cached_song.getObj().getAlbumId())
+        else:
+            # album not known, drop them all
+            self.invalidate("getAlbum")
+        return res
+
+    def __getattr__(self, name: str) -> Any:
+        # only invoked for attributes not defined here
+        wrapper: Callable[..., Any] = self.__wrappers.get(name)
+        if wrapper:
+            return wrapper
+        target: Any = getattr(self.__connector, name)
+        cached_method: CachedMethod = self.__cached_methods.get(name)
+        if cached_method is None:
+            return target
+        wrapper = self.__wrap(name, target, cached_method)
+        self.__wrappers[name] = wrapper
+        return wrapper
+
+    def __build_key(self, name: str, args: tuple, kwargs: dict[str, Any]) -> tuple:
+        # same key for positional and keyword arguments
+        signature: inspect.Signature = self.__signatures.get(name)
+        if signature is None:
+            signature = inspect.signature(getattr(self.__connector, name))
+            self.__signatures[name] = signature
+        bound: inspect.BoundArguments = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        return tuple(bound.arguments.items())
+
+    def __wrap(self, name: str, target: Callable[..., Any], cached_method: CachedMethod) -> Callable[..., Any]:
+
+        def cached_call(*args, **kwargs) -> Any:
+            return self.__cache.get(
+                group=name,
+                key=self.__build_key(name, args, kwargs),
+                loader=lambda: target(*args, **kwargs),
+                ttl_sec=cached_method.ttl_sec,
+                stale_sec=cached_method.stale_sec,
+                accept=_is_ok)
+        return cached_call
@@ -14,61 +14,83 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 import base64
+import threading
+import time
 import constants
 import config
 from msgproc_provider import msgproc
-import persistence
 from cache_type import CacheType
-import sqlite3
+from identifier_map import IdentifierMap
 
 
 __encoding: str = "utf-8"
 
+__identifier_map: IdentifierMap = None
+__identifier_map_lock: threading.Lock = threading.Lock()
+
+
+def __get_identifier_map() -> IdentifierMap:
+    global __identifier_map
+    if __identifier_map is None:
+        with __identifier_map_lock:
+            if __identifier_map is None:
+                __identifier_map = IdentifierMap(
+                    partition=CacheType.ITEM_IDENTIFIER_CODEC.cache_name,
+                    max_size=config.get_config_param_as_int(constants.ConfigParam.IDENTIFIER_CACHE_SIZE),
+                    flush_threshold=config.get_config_param_as_int(constants.ConfigParam.IDENTIFIER_FLUSH_THRESHOLD))
+    return __identifier_map
+
 
 def encode(data: str) -> str:
     if config.get_config_param_as_bool(constants.ConfigParam.MINIMIZE_IDENTIFIER_LENGTH):
-        encoded_name: str = base64_encode(data)
-        connection: sqlite3.Connection = persistence.get_working_connection(provided=None)
-        kv_list: list[persistence.KeyValueItem] = persistence.get_kv_items_by_value(
-            partition=CacheType.ITEM_IDENTIFIER_CODEC.cache_name,
-            value=encoded_name,
-            connection=connection)
-        if len(kv_list) > 1:
-            raise Exception(f"Duplicate entries for [{encoded_name}]")
-        kv_item: persistence.KeyValueItem = kv_list[0] if len(kv_list) == 1 else None
-        if kv_item:
-            return kv_item.key
-        else:
-            persistence.lock_immediate(connection=connection)
-            id_count: int = persistence.get_kv_partition_count(
-                partition=CacheType.ITEM_IDENTIFIER_CODEC.cache_name,
-                connection=connection)
-            new_id: str = str(id_count + 1)
-            persistence.save_kv_item(key_value_item=persistence.KeyValueItem(
-                partition=CacheType.ITEM_IDENTIFIER_CODEC.cache_name,
-                key=new_id,
-                value=encoded_name),
-                connection=connection,
-                do_commit=True)
-            return str(new_id)
+        return __get_identifier_map().get_id(base64_encode(data))
     else:
         return base64_encode(data)
 
 
 def decode(id: str) -> str:
     if config.get_config_param_as_bool(constants.ConfigParam.MINIMIZE_IDENTIFIER_LENGTH):
-        # must be in dict, otherwise we get an exception
-        encoded_kv: persistence.KeyValueItem = persistence.get_kv_item(
-            partition=CacheType.ITEM_IDENTIFIER_CODEC.cache_name,
-            key=id)
-        if encoded_kv is None:
+        # must be known, otherwise we get an exception
+        encoded_value: str = __get_identifier_map().get_value(id)
+        if encoded_value is None:
             raise Exception(f"codec.decode id [{id}] not found, please browse from the root of the plugin")
         # decode encoded value
-        return base64_decode(encoded_kv.value)
+        return base64_decode(encoded_value)
     else:
         return base64_decode(id)
 
 
+def flush():
+    """Persists identifiers created since the last flush, to be called once per request"""
+    if __identifier_map is None:
+        return
+    written: int = __identifier_map.flush()
+    if written > 0 and config.get_verbose_logging():
+        msgproc.log(f"codec.flush wrote [{written}] identifiers, {__identifier_map}")
+
+
+def start_flusher(interval_sec: int):
+    """Persists new identifiers every interval_sec, also when no request ends"""
+    if interval_sec <= 0 or not config.get_config_param_as_bool(constants.ConfigParam.MINIMIZE_IDENTIFIER_LENGTH):
+        return
+    threading.Thread(target=__flush_periodically, args=(interval_sec,), daemon=True).start()
+
+
+def __flush_periodically(interval_sec: int):
+    while True:
+        time.sleep(interval_sec)
+        try:
+            flush()
+        except Exception as ex:
+            msgproc.log(f"codec.flush failed due to [{type(ex)}] [{ex}]")
+
+
+def reset():
+    """Drops the in-memory identifiers, to be called after the identifier cache is purged"""
+    if __identifier_map is not None:
+        __identifier_map.clear()
+
+
 def base64_encode(v: str) -> str:
     message_bytes: bytes = v.encode(__encoding)
     base64_bytes: bytes = base64.b64encode(message_bytes)
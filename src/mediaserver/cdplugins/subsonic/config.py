@@ -16,6 +16,8 @@
 import constants
 
 import upmplgutils
+from configsnapshot import ConfigSnapshotHolder
+from configsnapshot import ConfigSnapshotLogger
 # uncomment when py-sonic with useragent support is released
 from subsonic_connector.connector import Constants as SubsonicConnectorConstants
 from subsonic_connector.configuration import ConfigurationInterface
@@ -83,7 +85,35 @@ def is_tag_supported(tag: TagType) -> bool:
     return True
 
 
+__snapshot_holder: ConfigSnapshotHolder = ConfigSnapshotHolder(
+    param_list=lambda: constants.ConfigParam,
+    str_loader=lambda p: __load_config_param_as_str(p),
+    int_loader=lambda p: __load_config_param_as_int(p),
+    bool_loader=lambda p: __load_config_param_as_bool(p))
+
+
 def get_config_param_as_str(configuration_parameter: constants.ConfigParam) -> str:
+    return __snapshot_holder.get_str(configuration_parameter)
+
+
+def get_config_param_as_int(configuration_parameter: constants.ConfigParam) -> int:
+    return __snapshot_holder.get_int(configuration_parameter)
+
+
+def get_config_param_as_bool(configuration_parameter: constants.ConfigParam) -> bool:
+    return __snapshot_holder.get_bool(configuration_parameter)
+
+
+def reload_config() -> None:
+    """Reads the configuration again, config param accessors will return the new values"""
+    __snapshot_holder.reload()
+
+
+def install_reload_config_on_sighup(logger: ConfigSnapshotLogger) -> bool:
+    return __snapshot_holder.install_reload_on_sighup(logger=logger)
+
+
+def __load_config_param_as_str(configuration_parameter: constants.ConfigParam) -> str:
     dv: str | None = configuration_parameter.default_value
     if dv is not None and not isinstance(dv, str):
         raise Exception(f"Invalid default value for [{configuration_parameter.key}]")
@@ -97,7 +127,7 @@ def get_config_param_as_str(configuration_parameter: constants.ConfigParam) -> s
     return str(v)
 
 
-def get_config_param_as_int(configuration_parameter: constants.ConfigParam) -> str:
+def __load_config_param_as_int(configuration_parameter: constants.ConfigParam) -> str:
     dv: int | None = configuration_parameter.default_value
     if dv is not None and not isinstance(dv, int):
         raise Exception(f"Invalid default value for [{configuration_parameter.key}]")
@@ -111,7 +141,7 @@ def get_config_param_as_int(configuration_parameter: constants.ConfigParam) -> s
     return int(v)
 
 
-def get_config_param_as_bool(configuration_parameter: constants.ConfigParam) -> bool:
+def __load_config_param_as_bool(configuration_parameter: constants.ConfigParam) -> bool:
     default_value_as_int: int = 0
     dv: any = configuration_parameter.default_value
     if isinstance(dv, int):
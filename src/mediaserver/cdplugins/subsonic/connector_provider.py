@@ -16,6 +16,11 @@
 from subsonic_connector.connector import Connector
 from config import UpmpdcliSubsonicConfig
 from msgproc_provider import msgproc
+from caching_connector import CachingConnector
+from caching_connector import CachedMethod
+from responsecaching import ResponseCache
+import config
+import constants
 
 msgproc.log(f"base_url/port: [{UpmpdcliSubsonicConfig().getBaseUrl()}]:[{UpmpdcliSubsonicConfig().getPort()}]")
 msgproc.log(f"server_path: [{UpmpdcliSubsonicConfig().getServerPath()}]")
@@ -24,5 +29,39 @@ msgproc.log(f"User Agent: [{UpmpdcliSubsonicConfig().getUserAgent()}]")
 connector: Connector = Connector(UpmpdcliSubsonicConfig())
 
 
+def __create_caching_connector() -> CachingConnector:
+    stale_sec: int = config.get_config_param_as_int(constants.ConfigParam.RESPONSE_CACHE_STALE_SEC)
+    cached_methods: dict[str, CachedMethod] = {
+        "getAlbum": CachedMethod(
+            ttl_sec=config.get_config_param_as_int(constants.ConfigParam.RESPONSE_CACHE_ALBUM_TTL_SEC),
+            stale_sec=stale_sec),
+        "getArtist": CachedMethod(
+            ttl_sec=config.get_config_param_as_int(constants.ConfigParam.RESPONSE_CACHE_ARTIST_TTL_SEC),
+            stale_sec=stale_sec),
+        "getSong": CachedMethod(
+            ttl_sec=config.get_config_param_as_int(constants.ConfigParam.RESPONSE_CACHE_SONG_TTL_SEC),
+            stale_sec=stale_sec)}
+    msgproc.log(f"Response cache ttl: [{', '.join(f'{k}={v.ttl_sec}' for k, v in cached_methods.items())}] "
+                f"stale [{stale_sec}]")
+    return CachingConnector(
+        connector=connector,
+        cache=ResponseCache(
+            name="subsonic",
+            max_size=config.get_config_param_as_int(constants.ConfigParam.RESPONSE_CACHE_MAX_SIZE),
+            logger=msgproc.log,
+            report_every=config.get_config_param_as_int(constants.ConfigParam.RESPONSE_CACHE_REPORT_EVERY)),
+        cached_methods=cached_methods)
+
+
+caching_connector: CachingConnector = __create_caching_connector()
+
+
 def get() -> Connector:
+    # responses of read-only calls might be cached, see caching_connector
+    return caching_connector
+
+
+def get_uncached() -> Connector:
+    # for bulk reads like the preload sync, which would only evict useful entries
+    # and must see the current state of the server
     return connector
@@ -18,7 +18,7 @@ from enum import Enum
 
 class PluginConstant(Enum):
 
-    PLUGIN_RELEASE = "0.9.15.1"
+    PLUGIN_RELEASE = "0.9.16"
     PLUGIN_NAME = "subsonic"
 
 
@@ -257,6 +257,33 @@ class ConfigParam(Enum):
         default_value=False,
         description="Scrobble to the subsonic server when trackuri is invoked")
 
+    SCROBBLE_MAX_ATTEMPTS = _ConfigParamData(
+        key="scrobblemaxattempts",
+        default_value=3,
+        description=("Server side scrobbling is done in background, failed scrobbles are attempted up to this number of times"))
+
+    SCROBBLE_RETRY_DELAY_SEC = _ConfigParamData(
+        key="scrobbleretrydelaysec",
+        default_value=10,
+        description=("Delay before retrying failed scrobbles"))
+
+    SCROBBLE_DEDUPE_SEC = _ConfigParamData(
+        key="scrobblededupesec",
+        default_value=30,
+        description=("Repeated scrobbles for the same song within this interval are sent once, "
+                     "as trackuri can be invoked more than once for the same playback"))
+
+    TRACKURI_USE_LOCAL_METADATA = _ConfigParamData(
+        key="trackuriuselocalmetadata",
+        default_value=True,
+        description=("Build the stream url from recently presented songs or from the metadata database, "
+                     "asking the server only for unknown songs"))
+
+    STREAM_INFO_CACHE_SIZE = _ConfigParamData(
+        key="streaminfocachesize",
+        default_value=5000,
+        description=("Maximum number of recently presented songs kept in memory for trackuri"))
+
     DUMP_ACTION_ON_MB_ALBUM_CACHE = _ConfigParamData(
         "dumpactiononmbalbumcache",
         default_value=False,
@@ -356,7 +383,20 @@ class ConfigParam(Enum):
     CACHED_IMAGE_MAX_AGE_DAYS = _ConfigParamData(
         "cachedimagemaxagedays",
         default_value=60,
-        description="If cache files are older than the specified max age, they are deleted on startup")
+        description="If cache files have not been accessed for the specified max age, they are deleted in background")
+    CACHED_IMAGE_MAX_SIZE_MB = _ConfigParamData(
+        "cachedimagemaxsizemb",
+        default_value=0,
+        description=("Maximum size of the image cache in MB, least recently used images are deleted "
+                     "in background when exceeded, 0 means no limit"))
+    CACHED_IMAGE_EVICTION_INTERVAL_SEC = _ConfigParamData(
+        "cachedimageevictionintervalsec",
+        default_value=300,
+        description="Interval between runs of the image cache eviction")
+    CACHED_IMAGE_MAX_EVICTIONS_PER_RUN = _ConfigParamData(
+        "cachedimagemaxevictionsperrun",
+        default_value=500,
+        description="Maximum number of cached images deleted by a single eviction run")
 
     SKIP_USER_AGENT = _ConfigParamData(
         "skipuseragent",
@@ -378,6 +418,12 @@ class ConfigParam(Enum):
         default_value=False,
         description="General verbose logging")
 
+    ENABLE_CONFIG_RELOAD_ON_SIGHUP = _ConfigParamData(
+        "enableconfigreloadonsighup",
+        default_value=False,
+        description=("Configuration is read once at startup, "
+                     "enable this to read it again when the plugin receives SIGHUP"))
+
     CACHED_ARTIST_LIST_CACHE_TIMEOUT_SEC = _ConfigParamData(
         "cachedartistlistcachetimeoutsec",
         default_value=300,
@@ -467,6 +513,54 @@ class ConfigParam(Enum):
         default_value=3600,
         description=("Preload data only if oldest update is before current time minus this delta"))
 
+    PRELOAD_FETCHER_COUNT = _ConfigParamData(
+        key="preloadfetchercount",
+        default_value=4,
+        description=("Number of concurrent requests to the server while preloading albums and songs"))
+
+    ENABLE_ALBUM_FACET_INDEX = _ConfigParamData(
+        key="enablealbumfacetindex",
+        default_value=True,
+        description=("Keep album properties indexed in memory for the album property browser, "
+                     "instead of querying the database at every step"))
+
+    ENABLE_RANDOM_SAMPLER = _ConfigParamData(
+        key="enablerandomsampler",
+        default_value=True,
+        description=("Pick random albums (e.g. the genre cover art) from ids kept in memory, "
+                     "instead of sorting the table randomly at every request"))
+
+    RANDOM_SAMPLER_REFRESH_INTERVAL_SEC = _ConfigParamData(
+        key="randomsamplerrefreshintervalsec",
+        default_value=600,
+        description=("Interval between background reloads of the ids used for random picks"))
+
+    ENABLE_ARTIST_CATALOGUE = _ConfigParamData(
+        key="enableartistcatalogue",
+        default_value=True,
+        description=("Keep artists, their initials, roles and cover art in memory for artist browsing"))
+
+    ARTIST_CATALOGUE_REFRESH_INTERVAL_SEC = _ConfigParamData(
+        key="artistcataloguerefreshintervalsec",
+        default_value=300,
+        description=("Interval between background rebuilds of the artist catalogue"))
+
+    PRELOAD_DELTA_SYNC = _ConfigParamData(
+        key="preloaddeltasync",
+        default_value=True,
+        description=("After a full preload, only fetch albums and songs added since the previous sync, "
+                     "skipping the preload entirely when the server reports no changes"))
+
+    PRELOAD_RECONCILE_INTERVAL_SEC = _ConfigParamData(
+        key="preloadreconcileintervalsec",
+        default_value=86400,
+        description=("With delta sync, interval between checks for albums deleted on the server"))
+
+    PRELOAD_FULL_SYNC_INTERVAL_SEC = _ConfigParamData(
+        key="preloadfullsyncintervalsec",
+        default_value=604800,
+        description=("With delta sync, interval between full preloads"))
+
     PRELOAD_VERBOSE_LOGGING = _ConfigParamData(
         key="preloadverboselogging",
         default_value=False,
@@ -516,6 +610,23 @@ class ConfigParam(Enum):
         default_value=True,
         description=("Purge the identifier cache records created by id caching"))
 
+    IDENTIFIER_CACHE_SIZE = _ConfigParamData(
+        key="identifiercachesize",
+        default_value=20000,
+        description=("Max number of identifiers kept in memory when minimizeidentifierlength is enabled"))
+
+    IDENTIFIER_FLUSH_THRESHOLD = _ConfigParamData(
+        key="identifierflushthreshold",
+        default_value=500,
+        description=("New identifiers are written to the database at the end of each request, "
+                     "or earlier when this many are waiting to be written"))
+
+    IDENTIFIER_FLUSH_INTERVAL_SEC = _ConfigParamData(
+        key="identifierflushintervalsec",
+        default_value=10,
+        description=("New identifiers not yet written to the database are written every this many seconds "
+                     "and when the plugin exits, 0 disables the periodic write"))
+
     EXECUTE_VACUUM = _ConfigParamData(
         key="executevacuum",
         default_value=False,
@@ -526,6 +637,85 @@ class ConfigParam(Enum):
         default_value=Defaults.CACHED_REQUEST_TIMEOUT_SEC.value,
         description=("Timeout for cached requests in seconds"))
 
+    RESPONSE_CACHE_MAX_SIZE = _ConfigParamData(
+        key="responsecachemaxsize",
+        default_value=2000,
+        description=("Max number of server responses (album, artist, song) kept in memory"))
+
+    RESPONSE_CACHE_ALBUM_TTL_SEC = _ConfigParamData(
+        key="responsecachealbumttlsec",
+        default_value=120,
+        description=("Time in seconds an album response is considered fresh, 0 disables caching"))
+
+    RESPONSE_CACHE_ARTIST_TTL_SEC = _ConfigParamData(
+        key="responsecacheartistttlsec",
+        default_value=300,
+        description=("Time in seconds an artist response is considered fresh, 0 disables caching"))
+
+    RESPONSE_CACHE_SONG_TTL_SEC = _ConfigParamData(
+        key="responsecachesongttlsec",
+        default_value=120,
+        description=("Time in seconds a song response is considered fresh, 0 disables caching"))
+
+    RESPONSE_CACHE_STALE_SEC = _ConfigParamData(
+        key="responsecachestalesec",
+        default_value=600,
+        description=("After the ttl, a response is still served for this many seconds "
+                     "while it is refreshed in background"))
+
+    RESPONSE_CACHE_REPORT_EVERY = _ConfigParamData(
+        key="responsecachereportevery",
+        default_value=1000,
+        description=("Log response cache statistics (hit ratio, time saved) every this many lookups, "
+                     "0 disables the report"))
+
+    CACHE_MANAGER_MAX_ENTRIES = _ConfigParamData(
+        key="cachemanagermaxentries",
+        default_value=5000,
+        description=("Maximum number of entries in each of the in-memory element caches, 0 for no limit"))
+
+    CACHE_MANAGER_MAX_BYTES = _ConfigParamData(
+        key="cachemanagermaxbytes",
+        default_value=4 * 1024 * 1024,
+        description=("Maximum estimated size in bytes of each of the in-memory element caches, 0 for no limit"))
+
+    CACHE_MANAGER_TTL_SEC = _ConfigParamData(
+        key="cachemanagerttlsec",
+        default_value=0,
+        description=("Entries of the in-memory element caches expire after this many seconds, 0 for no expiration"))
+
+    CACHE_MANAGER_REPORT_EVERY = _ConfigParamData(
+        key="cachemanagerreportevery",
+        default_value=0,
+        description=("Log element cache statistics every this many writes, 0 disables the report"))
+
+    ENABLE_KV_WRITE_BEHIND = _ConfigParamData(
+        key="enablekvwritebehind",
+        default_value=False,
+        description=("Keep key-value cache writes in memory and write them in batches "
+                     "from a background thread"))
+
+    KV_WRITE_BEHIND_FLUSH_INTERVAL_SEC = _ConfigParamData(
+        key="kvwritebehindflushintervalsec",
+        default_value=5,
+        description=("Interval between key-value cache write-behind flushes"))
+
+    KV_WRITE_BEHIND_MAX_PENDING = _ConfigParamData(
+        key="kvwritebehindmaxpending",
+        default_value=500,
+        description=("Pending key-value cache writes which trigger an early flush, 0 means no limit"))
+
+    KV_MEMORY_CACHE_SIZE = _ConfigParamData(
+        key="kvmemorycachesize",
+        default_value=1000,
+        description=("Key-value cache items kept in memory, 0 disables the memory tier"))
+
+    KV_MEMORY_CACHE_REPORT_EVERY = _ConfigParamData(
+        key="kvmemorycachereportevery",
+        default_value=0,
+        description=("Log key-value memory tier hit ratio and footprint every this many lookups, "
+                     "0 disables the report"))
+
     MAX_FAVORITE_SONGS_PER_PAGE = _ConfigParamData(
         key="maxfavoritesongsperpage",
         default_value=250,
@@ -46,6 +46,8 @@ import subsonic_util
 import codec
 import constants
 import metadata_converter
+import stream_info
+import artist_catalogue
 from album_metadata import AlbumMetadata
 from metadata_model import AlbumMetadataModel
 
@@ -357,9 +359,14 @@ def artist_to_entry_raw(
             album_art_uri=album_art_uri,
             target=entry)
     upnp_util.set_class_artist(entry)
+    # the artist catalogue avoids the lookups
+    catalogue: artist_catalogue.ArtistCatalogue = artist_catalogue.get()
+    catalogue_metadata: persistence.ArtistMetadata = catalogue.get_artist_metadata(artist_id) if catalogue else None
     subsonic_util.set_artist_metadata_by_artist_id(
         artist_id=artist_id,
-        target=entry)
+        target=entry,
+        artist_metadata=catalogue_metadata,
+        genre_list=catalogue.get_genre_list(artist_id) if catalogue_metadata else None)
     return entry
 
 
@@ -477,6 +484,8 @@ def song_to_entry(
     entry['id'] = id
     entry['pid'] = song.getId()
     upnp_util.set_class_music_track(entry)
+    # trackuri will not need to ask the server for this song
+    stream_info.cache.put(stream_info.from_song(song))
     song_uri: str = build_intermediate_url(track_id=song.getId(), suffix=song.getSuffix())
     entry['uri'] = song_uri
     title: str = song.getTitle()
@@ -0,0 +1,152 @@
+# Copyright (C) 2026 Giovanni Fulco
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# bidirectional value <-> id map used by the codec when identifiers are minimized
+# recently used mappings are kept in memory, new mappings are written to the db in batches
+# ids are allocated from an in-memory sequence, seeded once from the db
+
+import threading
+from collections import OrderedDict
+
+import persistence
+from keyvaluecaching import KeyValueItem
+from msgproc_provider import msgproc
+
+
+class IdentifierMap:
+
+    def __init__(self, partition: str, max_size: int, flush_threshold: int):
+        self.__partition: str = partition
+        self.__max_size: int = max_size
+        self.__flush_threshold: int = flush_threshold
+        self.__lock: threading.RLock = threading.RLock()
+        # value -> id, in lru order
+        self.__by_value: OrderedDict[str, str] = OrderedDict()
+        # id -> value
+        self.__by_id: dict[str, str] = {}
+        # new mappings not yet written to the db, by value and by id
+        self.__pending_by_value: dict[str, KeyValueItem] = {}
+        self.__pending_by_id: dict[str, KeyValueItem] = {}
+        self.__next_id: int = None
+        self.__hits: int = 0
+        self.__misses: int = 0
+        self.__allocated: int = 0
+
+    def get_id(self, value: str) -> str:
+        with self.__lock:
+            id: str = self.__by_value.get(value)
+            if id is not None:
+                self.__by_value.move_to_end(value)
+                self.__hits += 1
+                return id
+            pending: KeyValueItem = self.__pending_by_value.get(value)
+            if pending:
+                self.__hits += 1
+                return pending.key
+            self.__misses += 1
+            kv_list: list[KeyValueItem] = persistence.get_kv_items_by_value(
+                partition=self.__partition,
+                value=value)
+            if len(kv_list) > 1:
+                raise Exception(f"Duplicate entries for [{value}]")
+            if len(kv_list) == 1:
+                id = kv_list[0].key
+                self.__remember(id=id, value=value)
+                return id
+            id = self.__allocate_id()
+            new_item: KeyValueItem = KeyValueItem(
+                partition=self.__partition,
+                key=id,
+                value=value)
+            self.__pending_by_value[value] = new_item
+            self.__pending_by_id[id] = new_item
+            if len(self.__pending_by_id) >= self.__flush_threshold:
+                self.flush()
+            return id
+
+    def get_value(self, id: str) -> str | None:
+        with self.__lock:
+            value: str = self.__by_id.get(id)
+            if value is not None:
+                self.__by_value.move_to_end(value)
+                self.__hits += 1
+                return value
+            pending: KeyValueItem = self.__pending_by_id.get(id)
+            if pending:
+                self.__hits += 1
+                return pending.value
+            self.__misses += 1
+            kv_item: KeyValueItem = persistence.get_kv_item(
+                partition=self.__partition,
+                key=id)
+            if kv_item is None:
+                return None
+            self.__remember(id=id, value=kv_item.value)
+            return kv_item.value
+
+    def flush(self) -> int:
+        """Writes pending mappings to the db in one transaction, returns how many were written"""
+        with self.__lock:
+            if len(self.__pending_by_id) == 0:
+                return 0
+            to_write: list[KeyValueItem] = list(self.__pending_by_id.values())
+            try:
+                persistence.insert_kv_item_list(key_value_item_list=to_write)
+            except Exception as ex:
+                # keep them pending, we will retry on next flush
+                msgproc.log(f"IdentifierMap flush of [{len(to_write)}] items failed due to [{type(ex)}] [{ex}]")
+                return 0
+            self.__pending_by_value.clear()
+            self.__pending_by_id.clear()
+            current: KeyValueItem
+            for current in to_write:
+                self.__remember(id=current.key, value=current.value)
+            return len(to_write)
+
+    def clear(self):
+        """Drops in-memory state, to be called when the partition is purged"""
+        with self.__lock:
+            self.__by_value.clear()
+            self.__by_id.clear()
+            self.__pending_by_value.clear()
+            self.__pending_by_id.clear()
+            self.__next_id = None
+
+    def __allocate_id(self) -> str:
+        # lock must be held by the caller
+        if self.__next_id is None:
+            self.__next_id = persistence.get_kv_partition_max_numeric_key(partition=self.__partition) + 1
+            msgproc.log(f"IdentifierMap [{self.__partition}] next id is [{self.__next_id}]")
+        id: str = str(self.__next_id)
+        self.__next_id += 1
+        self.__allocated += 1
+        return id
+
+    def __remember(self, id: str, value: str):
+        # lock must be held by the caller
+        self.__by_value[value] = id
+        self.__by_value.move_to_end(value)
+        self.__by_id[id] = value
+        while len(self.__by_value) > self.__max_size:
+            _, evicted_id = self.__by_value.popitem(last=False)
+            self.__by_id.pop(evicted_id, None)
+
+    def __str__(self) -> str:
+        with self.__lock:
+            return (f"size [{len(self.__by_value)}] "
+                    f"pending [{len(self.__pending_by_id)}] "
+                    f"hits [{self.__hits}] "
+                    f"misses [{self.__misses}] "
+                    f"allocated [{self.__allocated}]")
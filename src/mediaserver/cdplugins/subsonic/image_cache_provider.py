@@ -0,0 +1,54 @@
+# Copyright (C) 2026 Giovanni Fulco
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from typing import Callable
+from imagecaching import ImageCache
+from msgproc_provider import msgproc
+import config
+import constants
+import threading
+
+__image_cache: ImageCache = None
+__lock: threading.Lock = threading.Lock()
+
+
+def __create(directory: str, accept: Callable[[str], bool]) -> ImageCache:
+    max_age_sec: int = (config.get_config_param_as_int(constants.ConfigParam.CACHED_IMAGE_MAX_AGE_DAYS) * (24 * 60 * 60)
+                        if config.get_config_param_as_bool(constants.ConfigParam.ENABLE_CACHED_IMAGE_AGE_LIMIT)
+                        else 0)
+    max_size_bytes: int = config.get_config_param_as_int(constants.ConfigParam.CACHED_IMAGE_MAX_SIZE_MB) * 1024 * 1024
+    image_cache: ImageCache = ImageCache(
+        name=constants.PluginConstant.PLUGIN_NAME.value,
+        directory=directory,
+        accept=accept,
+        logger=msgproc.log,
+        max_size_bytes=max_size_bytes,
+        max_age_sec=max_age_sec)
+    image_cache.load()
+    return image_cache
+
+
+def get_or_create(directory: str, accept: Callable[[str], bool]) -> ImageCache:
+    global __image_cache
+    if __image_cache:
+        return __image_cache
+    with __lock:
+        if not __image_cache:
+            __image_cache = __create(directory=directory, accept=accept)
+        return __image_cache
+
+
+def get() -> ImageCache | None:
+    return __image_cache
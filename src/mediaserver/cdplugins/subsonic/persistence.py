@@ -20,6 +20,8 @@ from search_util import simplify
 import datetime
 import time
 import secrets
+import threading
+import contextlib
 
 from typing import Callable
 from typing import Any
@@ -34,10 +36,12 @@ from keyvaluecaching import KeyValueItem
 from keyvaluecaching import KeyValueTableName
 from keyvaluecaching import build_create_v1_sql as build_create_cache_v1_sql
 from keyvaluecaching import get_key_value_item
-from keyvaluecaching import put_key_value_item
+from keyvaluecaching import upsert_kv_item_v1
+from keyvaluecaching import upsert_kv_item_list_v1
+from keyvaluecaching import KeyValueWriteBuffer
+from keyvaluecaching import KeyValueMemoryTier
 from keyvaluecaching import load_kv_item_v1
 from keyvaluecaching import insert_kv_item_v1
-from keyvaluecaching import update_kv_item_v1
 from keyvaluecaching import delete_kv_item_v1
 from keyvaluecaching import KeyValueCacheColumnName
 from cache_type import CacheType
@@ -71,9 +75,37 @@ from song_data_structures import SongContributor
 from album_property_key import AlbumPropertyKeyValue
 from album_property_key import AlbumPropertyKeyOccurrence
 from album_property_key import AlbumPropertyValueOccurrence
+from album_facet_index import AlbumFacetIndex
+from random_sampler import IdReservoir
 
 from msgproc_provider import msgproc
 
+# kept up to date by the functions which change album_property_v1
+__album_facet_index: AlbumFacetIndex = AlbumFacetIndex()
+
+# index changes wait for the commit of the transaction which made them, so a concurrent
+# reload cannot see them before the database does, keyed by id of the connection
+__pending_facet_index_changes: dict[int, tuple[sqlite3.Connection, list[Callable[[], None]]]] = {}
+__pending_facet_index_lock: threading.Lock = threading.Lock()
+
+
+def __defer_facet_index_change(connection: sqlite3.Connection, change: Callable[[], None]):
+    with __pending_facet_index_lock:
+        pending: tuple[sqlite3.Connection, list[Callable[[], None]]] = __pending_facet_index_changes.get(id(connection))
+        if pending is None or pending[0] is not connection:
+            pending = (connection, [])
+            __pending_facet_index_changes[id(connection)] = pending
+        pending[1].append(change)
+
+
+def __pop_facet_index_changes(connection: sqlite3.Connection) -> list[Callable[[], None]]:
+    with __pending_facet_index_lock:
+        pending: tuple[sqlite3.Connection, list[Callable[[], None]]] = __pending_facet_index_changes.get(id(connection))
+        if pending is None or pending[0] is not connection:
+            return []
+        del __pending_facet_index_changes[id(connection)]
+        return pending[1]
+
 
 def __create_qmark_list(num_qmark: int) -> str:
     return ", ".join(["?"] * num_qmark)
@@ -783,10 +815,138 @@ def get_artist_id_list_by_display_name(artist_display_name: str, connection: sql
     return res
 
 
+def get_artist_metadata_list(connection: sqlite3.Connection = None) -> list[ArtistMetadata]:
+    the_connection: sqlite3.Connection = get_working_connection(connection)
+    q: str = f"""
+        SELECT {", ".join(m.column_name.value for m in __artist_metadata_model_list)}
+        FROM {TableName.ARTIST_METADATA_V1.value}
+    """
+    rows: list[any] = __get_sqlite3_selector(connection=the_connection)(sql=q, parameters=())
+    if connection is None:
+        the_connection.close()
+    return [__artist_metadata_by_row(row=row) for row in rows] if rows else []
+
+
+def get_artist_role_list(connection: sqlite3.Connection = None) -> list[ArtistRole]:
+    the_connection: sqlite3.Connection = get_working_connection(connection)
+    q: str = f"""
+        SELECT {ColumnName.ARTIST_ID.value}, {ColumnName.ARTIST_ROLE.value}
+        FROM {TableName.ARTIST_ROLE_V1.value}
+    """
+    rows: list[any] = __get_sqlite3_selector(connection=the_connection)(sql=q, parameters=())
+    if connection is None:
+        the_connection.close()
+    return [ArtistRole(artist_id=row[0], artist_role=row[1]) for row in rows] if rows else []
+
+
+def get_album_artist_rows(connection: sqlite3.Connection = None) -> list[tuple[str, str]]:
+    """All (album_id, artist_id) from album_artist_v1"""
+    the_connection: sqlite3.Connection = get_working_connection(connection)
+    q: str = f"""
+        SELECT {ColumnName.ALBUM_ID.value}, {ColumnName.ARTIST_ID.value}
+        FROM {TableName.ALBUM_ARTIST_V1.value}
+    """
+    rows: list[any] = __get_sqlite3_selector(connection=the_connection)(sql=q, parameters=())
+    if connection is None:
+        the_connection.close()
+    return rows if rows else []
+
+
+def get_album_artist_summary_rows(connection: sqlite3.Connection = None) -> list[tuple[str, str, str, str, str]]:
+    """All (album_id, album_artist_id, album_display_artist, album_cover_art, album_genre) from album_metadata_v1"""
+    the_connection: sqlite3.Connection = get_working_connection(connection)
+    q: str = f"""
+        SELECT
+            {ColumnName.ALBUM_ID.value},
+            {ColumnName.ALBUM_ARTIST_ID.value},
+            {ColumnName.ALBUM_DISPLAY_ARTIST.value},
+            {ColumnName.ALBUM_COVER_ART.value},
+            {ColumnName.ALBUM_GENRE.value}
+        FROM {TableName.ALBUM_METADATA_V1.value}
+    """
+    rows: list[any] = __get_sqlite3_selector(connection=the_connection)(sql=q, parameters=())
+    if connection is None:
+        the_connection.close()
+    return rows if rows else []
+
+
+def get_album_genre_rows(connection: sqlite3.Connection = None) -> list[tuple[str, str]]:
+    """All (album_id, album_genre) from album_genre_v1"""
+    the_connection: sqlite3.Connection = get_working_connection(connection)
+    q: str = f"""
+        SELECT {ColumnName.ALBUM_ID.value}, {ColumnName.ALBUM_GENRE.value}
+        FROM {TableName.ALBUM_GENRE_V1.value}
+    """
+    rows: list[any] = __get_sqlite3_selector(connection=the_connection)(sql=q, parameters=())
+    if connection is None:
+        the_connection.close()
+    return rows if rows else []
+
+
+def __load_album_genre_rows() -> list[tuple[str, str]]:
+    # same preference as the queries in get_random_album_by_genre:
+    # secondary genres are used only for genres which are never the main genre
+    sql: str = f"""
+        SELECT {ColumnName.ALBUM_GENRE.value}, {ColumnName.ALBUM_ID.value}
+            FROM {TableName.ALBUM_METADATA_V1.value}
+            WHERE {ColumnName.ALBUM_GENRE.value} IS NOT NULL
+        UNION ALL
+        SELECT {ColumnName.ALBUM_GENRE.value}, {ColumnName.ALBUM_ID.value}
+            FROM {TableName.ALBUM_GENRE_V1.value}
+            WHERE {ColumnName.ALBUM_GENRE.value} NOT IN (
+                SELECT DISTINCT {ColumnName.ALBUM_GENRE.value}
+                    FROM {TableName.ALBUM_METADATA_V1.value}
+                    WHERE {ColumnName.ALBUM_GENRE.value} IS NOT NULL)
+    """
+    the_connection: sqlite3.Connection = get_working_connection()
+    rows: list[any] = __get_sqlite3_selector(connection=the_connection)(sql=sql, parameters=())
+    the_connection.close()
+    return rows if rows else []
+
+
+__album_genre_reservoir: IdReservoir = IdReservoir(
+    name="album_by_genre",
+    loader=__load_album_genre_rows,
+    refresh_interval_sec=config.get_config_param_as_int(constants.ConfigParam.RANDOM_SAMPLER_REFRESH_INTERVAL_SEC))
+
+
+def __get_random_album_by_genre_from_reservoir(
+        genre_name: str,
+        connection: sqlite3.Connection) -> AlbumMetadata | None:
+    # a few attempts, ids of deleted albums stay in the reservoir until the next refresh
+    for _ in range(3):
+        album_id: str = __album_genre_reservoir.sample_one(genre_name)
+        if album_id is None:
+            return None
+        album_metadata: AlbumMetadata = __load_album_metadata(album_id=album_id, connection=connection)
+        if album_metadata is not None:
+            return album_metadata
+    return None
+
+
+def load_random_samplers() -> bool:
+    """Loads the random samplers now instead of on first use"""
+    if not config.get_config_param_as_bool(constants.ConfigParam.ENABLE_RANDOM_SAMPLER):
+        return False
+    __album_genre_reservoir.load()
+    return True
+
+
 def get_random_album_by_genre(genre_name: str, connection: sqlite3.Connection = None) -> AlbumMetadata:
     verbose: bool = config.get_verbose_logging()
     the_connection: sqlite3.Connection = get_working_connection(connection)
     album_metadata: AlbumMetadata = None
+    if connection is None and config.get_config_param_as_bool(constants.ConfigParam.ENABLE_RANDOM_SAMPLER):
+        album_metadata = __get_random_album_by_genre_from_reservoir(
+            genre_name=genre_name,
+            connection=the_connection)
+        # no albums for the genre as of the last refresh, no need to query again
+        if album_metadata is not None or __album_genre_reservoir.get_count(genre_name) == 0:
+            the_connection.close()
+            if verbose:
+                msgproc.log(f"get_random_album_by_genre for [{genre_name}] from reservoir -> "
+                            f"album_id [{album_metadata.album_id if album_metadata else None}]")
+            return album_metadata
     column_list_names: list[str] = __album_metadata_model_all_column_names
     column_list_names_joined = ", ".join(column_list_names)
     sql_direct: str = f"""
@@ -842,8 +1002,8 @@ def get_random_album_by_genre(genre_name: str, connection: sqlite3.Connection =
         the_connection.close()
     if verbose:
         msgproc.log(f"get_random_album_by_genre for [{genre_name}] -> "
-                    f"album_id [{album_metadata.album_id}] "
-                    f"cover_art [{album_metadata.album_cover_art}]")
+                    f"album_id [{album_metadata.album_id if album_metadata else None}] "
+                    f"cover_art [{album_metadata.album_cover_art if album_metadata else None}]")
     return album_metadata
 
 
@@ -1142,6 +1302,13 @@ def get_kv_item(
         partition: str,
         key: str,
         connection: sqlite3.Connection = None) -> KeyValueItem:
+    buffered: KeyValueItem = __kv_write_buffer.get(partition, key) if __kv_write_buffer else None
+    if buffered:
+        return buffered
+    if __kv_memory_tier:
+        known, item = __kv_memory_tier.lookup(partition, key)
+        if known:
+            return item
     the_connection: sqlite3.Connection = get_working_connection(provided=connection)
     res: KeyValueItem = get_key_value_item(
         partition=partition,
@@ -1152,6 +1319,8 @@ def get_kv_item(
             connection=the_connection))
     if connection is None:
         the_connection.close()
+    if __kv_memory_tier:
+        __kv_memory_tier.put(partition, key, res)
     return res
 
 
@@ -1159,6 +1328,7 @@ def get_kv_items_by_value(
         partition: str,
         value: str,
         connection: sqlite3.Connection = None) -> list[KeyValueItem]:
+    flush_kv_write_buffer()
     the_connection: sqlite3.Connection = get_working_connection(provided=connection)
     sql: str = f"""
         SELECT
@@ -1184,12 +1354,15 @@ def get_kv_items_by_value(
             created_timestamp=row[1],
             updated_timestamp=row[2])
         kv_list.append(curr)
+    if connection is None:
+        the_connection.close()
     return kv_list
 
 
 def get_kv_partition_count(
         partition: str,
         connection: sqlite3.Connection = None) -> int:
+    flush_kv_write_buffer()
     the_connection: sqlite3.Connection = get_working_connection(provided=connection)
     sql: str = f"""
         SELECT COUNT(*)
@@ -1205,9 +1378,32 @@ def get_kv_partition_count(
     if len(rows) == 0 or len(rows) > 1:
         raise Exception(f"get_kv_partition_count count should return 1 row for [{partition}] (we got [{len(rows)}])")
     cnt: int = rows[0][0]
+    if connection is None:
+        the_connection.close()
     return cnt
 
 
+def get_kv_partition_max_numeric_key(
+        partition: str,
+        connection: sqlite3.Connection = None) -> int:
+    flush_kv_write_buffer()
+    the_connection: sqlite3.Connection = get_working_connection(provided=connection)
+    sql: str = f"""
+        SELECT COALESCE(MAX(CAST({KeyValueCacheColumnName.ITEM_KEY.value} AS INTEGER)), 0)
+        FROM {TableName.KV_CACHE_V1.value}
+        WHERE {KeyValueCacheColumnName.ITEM_PARTITION.value} = ?
+    """
+    t = (partition,)
+    rows: list[Any] = __get_sqlite3_selector(the_connection)(
+        sql=sql,
+        parameters=t)
+    if connection is None:
+        the_connection.close()
+    if not rows or len(rows) != 1:
+        raise Exception(f"get_kv_partition_max_numeric_key should return 1 row for [{partition}]")
+    return rows[0][0]
+
+
 def get_table_count(
         table_name: TableName,
         connection: sqlite3.Connection = None) -> int:
@@ -1284,6 +1480,33 @@ def __load_album_metadata_list(album_id_list: list[str], connection: sqlite3.Con
     return res
 
 
+def __load_song_metadata_list(song_id_list: list[str], connection: sqlite3.Connection = None) -> dict[str, SongMetadata]:
+    if len(song_id_list if song_id_list else []) == 0:
+        # just return an empty dict
+        return {}
+    the_connection: sqlite3.Connection = get_working_connection(connection)
+    t = tuple(song_id_list)
+    qmarks: str = __create_qmark_list(len(song_id_list))
+    q: str = f"""
+    SELECT
+        {', '.join(__song_metadata_model_all_column_names)}
+    FROM
+        {TableName.SONG_METADATA_V1.value}
+    WHERE
+        {SongMetadataModel.SONG_ID.column_name.value} IN ({qmarks})
+    """
+    rows: list[Any] = __get_sqlite3_selector(the_connection)(
+        sql=q,
+        parameters=t)
+    if connection is None:
+        the_connection.close()
+    res: dict[str, SongMetadata] = {}
+    for row in rows if rows else []:
+        curr: SongMetadata = __song_metadata_by_row(row=row)
+        res[curr.song_id] = curr
+    return res
+
+
 def __load_artist_metadata(artist_id: str, connection: sqlite3.Connection) -> ArtistMetadata:
     the_connection: sqlite3.Connection = get_working_connection(connection)
     t = tuple([artist_id])
@@ -1331,26 +1554,6 @@ def __load_artist_roles(artist_id: str, connection: sqlite3.Connection = None) -
     return result
 
 
-def __update_kv_item(
-        partition: str,
-        key: str,
-        value: str,
-        update_timestamp: datetime.datetime,
-        connection: sqlite3.Connection = None,
-        do_commit: bool = True) -> None:
-    the_connection: sqlite3.Connection = get_working_connection(connection)
-    update_kv_item_v1(
-        sql_executor=__get_sqlite3_executor(the_connection),
-        partition=partition,
-        key=key,
-        value=value,
-        update_timestamp=update_timestamp)
-    if do_commit or connection is None:
-        commit(connection=the_connection)
-    if connection is None:
-        the_connection.close()
-
-
 def __load_key_value_item(partition: str, key: str, connection: sqlite3.Connection = None) -> KeyValueItem:
     the_connection: sqlite3.Connection = get_working_connection(connection)
     res: KeyValueItem = load_kv_item_v1(
@@ -1450,6 +1653,8 @@ def __delete_album_metadata_from_db(
         sql=q,
         data=t,
         do_commit=False)
+    # properties are deleted by the foreign key
+    __defer_facet_index_change(the_connection, lambda: __album_facet_index.remove_album(album_id=album_id))
     if do_commit or connection is None:
         commit(connection=the_connection)
     if connection is None:
@@ -1611,13 +1816,18 @@ def __delete_artist_metadata_from_db(
 
 
 def _delete_kv_item_from_db(partition: str, key: str, connection: sqlite3.Connection = None):
-    the_connection: sqlite3.Connection = get_working_connection(connection)
-    delete_kv_item_v1(
-        sql_executor=__get_sqlite3_executor(the_connection),
-        partition=partition,
-        key=key)
-    if connection is None:
-        the_connection.close()
+    with __kv_write_buffer_exclusive():
+        if __kv_write_buffer:
+            __kv_write_buffer.discard(partition, key)
+        if __kv_memory_tier:
+            __kv_memory_tier.put(partition, key, None)
+        the_connection: sqlite3.Connection = get_working_connection(connection)
+        delete_kv_item_v1(
+            sql_executor=__get_sqlite3_executor(the_connection),
+            partition=partition,
+            key=key)
+        if connection is None:
+            the_connection.close()
 
 
 def save_album_properties(
@@ -1663,6 +1873,10 @@ def save_album_properties(
                 data=tuple([album_id, k, p]),
                 connection=the_connection,
                 do_commit=False)
+    __defer_facet_index_change(the_connection, lambda: __album_facet_index.set_album_properties(
+        album_id=album_id,
+        properties=properties,
+        replace_all=delete_all))
     # final checks
     if connection is None or do_commit:
         commit(the_connection)
@@ -2116,6 +2330,140 @@ def __save_album_metadata(
         return (album_metadata, SaveMode.INSERTED)
 
 
+def __execute_many_in_savepoint(
+        connection: sqlite3.Connection,
+        statement_list: list[tuple[str, list[tuple]]]):
+    # on failure, the statements are rolled back and the enclosing transaction is left as it was,
+    # so that the caller can still save row by row on the same connection
+    if not connection.in_transaction:
+        connection.execute("BEGIN")
+    connection.execute("SAVEPOINT bulk_save")
+    try:
+        sql: str
+        data_list: list[tuple]
+        for sql, data_list in statement_list:
+            sqlite3util.sqlite3_execute_many(
+                connection=connection,
+                sql=sql,
+                data_list=data_list,
+                do_commit=False)
+    except Exception:
+        connection.execute("ROLLBACK TO bulk_save")
+        connection.execute("RELEASE bulk_save")
+        raise
+    connection.execute("RELEASE bulk_save")
+
+
+def save_album_metadata_list(
+        album_metadata_list: list[AlbumMetadata],
+        context: str = None,
+        connection: sqlite3.Connection = None,
+        do_commit: bool = True) -> dict[str, SaveMode]:
+    """Bulk version of save_album_metadata: one query for existing rows,
+    then one executemany for the updates and one for the inserts"""
+    start: float = time.time()
+    the_connection: sqlite3.Connection = get_working_connection(provided=connection)
+    existing_dict: dict[str, AlbumMetadata] = __load_album_metadata_list(
+        album_id_list=[x.album_id for x in album_metadata_list],
+        connection=the_connection)
+    update_list: list[tuple] = []
+    insert_list: list[tuple] = []
+    result: dict[str, SaveMode] = {}
+    now: datetime.datetime = datetime.datetime.now()
+    album_metadata: AlbumMetadata
+    for album_metadata in album_metadata_list:
+        existing_metadata: AlbumMetadata = existing_dict.get(album_metadata.album_id)
+        if existing_metadata:
+            updated_metadata: AlbumMetadata = metadata_converter.update_album_metadata(
+                existing_metadata=existing_metadata,
+                album_metadata=album_metadata)
+            update_list.append(tuple(
+                list(map(lambda x: updated_metadata.get_value(x), __album_metadata_model_non_pk_list)) +
+                list(map(lambda x: updated_metadata.get_value(x), __album_metadata_model_pk_list))))
+            result[album_metadata.album_id] = SaveMode.UPDATED
+        elif album_metadata.album_id not in result:
+            album_metadata.set_value(AlbumMetadataModel.CREATED_TIMESTAMP, now)
+            album_metadata.set_value(AlbumMetadataModel.UPDATED_TIMESTAMP, now)
+            insert_list.append(tuple(list(map(lambda x: album_metadata.get_value(x), __album_metadata_model_list))))
+            result[album_metadata.album_id] = SaveMode.INSERTED
+    __execute_many_in_savepoint(
+        connection=the_connection,
+        statement_list=[
+            (sqlhelper.create_simple_update_sql(
+                table_name=TableName.ALBUM_METADATA_V1.value,
+                set_column_list=__album_metadata_model_non_pk_column_names,
+                where_column_list=__album_metadata_model_pk_column_names),
+             update_list),
+            (sqlhelper.create_simple_insert_sql(
+                table_name=TableName.ALBUM_METADATA_V1.value,
+                column_list=__album_metadata_model_all_column_names),
+             insert_list)])
+    if do_commit or connection is None:
+        the_connection.commit()
+    if connection is None:
+        the_connection.close()
+    if config.get_config_param_as_bool(constants.ConfigParam.TRACE_PERSISTENCE_OPERATIONS):
+        msgproc.log(f"save_album_metadata_list context [{context}] "
+                    f"updated [{len(update_list)}] inserted [{len(insert_list)}] "
+                    f"executed in [{(time.time() - start):.3f}]")
+    return result
+
+
+def save_song_metadata_list(
+        song_metadata_list: list[SongMetadata],
+        context: str = None,
+        connection: sqlite3.Connection = None,
+        do_commit: bool = True) -> dict[str, SaveMode]:
+    """Bulk version of save_song_metadata: one query for existing rows,
+    then one executemany for the updates and one for the inserts"""
+    start: float = time.time()
+    the_connection: sqlite3.Connection = get_working_connection(provided=connection)
+    existing_dict: dict[str, SongMetadata] = __load_song_metadata_list(
+        song_id_list=[x.song_id for x in song_metadata_list],
+        connection=the_connection)
+    update_list: list[tuple] = []
+    insert_list: list[tuple] = []
+    result: dict[str, SaveMode] = {}
+    now: datetime.datetime = datetime.datetime.now()
+    song_metadata: SongMetadata
+    for song_metadata in song_metadata_list:
+        existing_metadata: SongMetadata = existing_dict.get(song_metadata.song_id)
+        if existing_metadata:
+            updated_metadata: SongMetadata = metadata_converter.update_song_metadata(
+                existing_metadata=existing_metadata,
+                song_metadata=song_metadata)
+            update_list.append(tuple(
+                list(map(lambda x: updated_metadata.get_value(x), __song_metadata_model_non_pk_list)) +
+                list(map(lambda x: updated_metadata.get_value(x), __song_metadata_model_pk_list))))
+            result[song_metadata.song_id] = SaveMode.UPDATED
+        elif song_metadata.song_id not in result:
+            song_metadata.set_value(AlbumMetadataModel.CREATED_TIMESTAMP, now)
+            song_metadata.set_value(AlbumMetadataModel.UPDATED_TIMESTAMP, now)
+            insert_list.append(tuple(list(map(lambda x: song_metadata.get_value(x), __song_metadata_model_list))))
+            result[song_metadata.song_id] = SaveMode.INSERTED
+    __execute_many_in_savepoint(
+        connection=the_connection,
+        statement_list=[
+            (sqlhelper.create_simple_update_sql(
+                table_name=TableName.SONG_METADATA_V1.value,
+                set_column_list=__song_metadata_model_non_pk_column_names,
+                where_column_list=__song_metadata_model_pk_column_names),
+             update_list),
+            (sqlhelper.create_simple_insert_sql(
+                table_name=TableName.SONG_METADATA_V1.value,
+                column_list=__song_metadata_model_all_column_names),
+             insert_list)])
+    if do_commit or connection is None:
+        the_connection.commit()
+    if connection is None:
+        the_connection.close()
+    if config.get_config_param_as_bool(constants.ConfigParam.TRACE_PERSISTENCE_OPERATIONS):
+        msgproc.log(f"save_song_metadata_list context [{context}] "
+                    f"updated [{len(update_list)}] inserted [{len(insert_list)}] "
+                    f"executed in [{(time.time() - start):.3f}]")
+    return result
+
+
 def save_artist_metadata(
         artist_metadata: ArtistMetadata,
         connection: sqlite3.Connection = None,
@@ -2143,11 +2491,19 @@ def prune_metadata(
         DELETE FROM {table_name.value}
         WHERE {ColumnName.UPDATED_TIMESTAMP.value} < ?
     """
-    return __execute_update(
+    the_connection: sqlite3.Connection = get_working_connection(connection)
+    update_count: int = __execute_update(
         sql=sql,
         data=(update_timestamp,),
-        connection=connection,
-        do_commit=do_commit)
+        connection=the_connection,
+        do_commit=False)
+    if table_name == TableName.ALBUM_METADATA_V1:
+        __defer_facet_index_change(the_connection, __album_facet_index.invalidate)
+    if do_commit or connection is None:
+        commit(connection=the_connection)
+    if connection is None:
+        the_connection.close()
+    return update_count
 
 
 def prune_artist_metadata(
@@ -2183,6 +2539,67 @@ def prune_song_metadata(
         do_commit=do_commit)
 
 
+def get_newest_album_created(connection: sqlite3.Connection = None) -> datetime.datetime | None:
+    the_connection: sqlite3.Connection = get_working_connection(connection)
+    sql: str = f"""
+        SELECT {ColumnName.ALBUM_CREATED.value}
+        FROM {TableName.ALBUM_METADATA_V1.value}
+        WHERE {ColumnName.ALBUM_CREATED.value} IS NOT NULL
+        ORDER BY {ColumnName.ALBUM_CREATED.value} DESC
+        LIMIT 1
+    """
+    rows: list[Any] = __get_sqlite3_selector(the_connection)(
+        sql=sql,
+        parameters=())
+    if connection is None:
+        the_connection.close()
+    return rows[0][0] if rows else None
+
+
+def delete_album_metadata_not_in(
+        album_id_list: list[str],
+        connection: sqlite3.Connection,
+        do_commit: bool = True) -> int:
+    # the id list can be large, so it goes through a temporary table
+    # dependent tables are cleaned up by the foreign keys
+    connection.execute("CREATE TEMP TABLE IF NOT EXISTS album_id_keep (album_id TEXT PRIMARY KEY)")
+    connection.execute("DELETE FROM album_id_keep")
+    connection.executemany(
+        "INSERT OR IGNORE INTO album_id_keep (album_id) VALUES (?)",
+        [(album_id,) for album_id in album_id_list])
+    sql: str = f"""
+        DELETE FROM {TableName.ALBUM_METADATA_V1.value}
+        WHERE {ColumnName.ALBUM_ID.value} NOT IN (SELECT album_id FROM album_id_keep)
+    """
+    delete_count: int = __execute_update(
+        sql=sql,
+        data=(),
+        connection=connection,
+        do_commit=False)
+    connection.execute("DROP TABLE album_id_keep")
+    __defer_facet_index_change(connection, __album_facet_index.invalidate)
+    if do_commit:
+        commit(connection=connection)
+    return delete_count
+
+
+def delete_orphan_song_metadata(
+        connection: sqlite3.Connection = None,
+        do_commit: bool = True) -> int:
+    sql: str = f"""
+        DELETE FROM {TableName.SONG_METADATA_V1.value}
+        WHERE {SongMetadataModel.SONG_ALBUM_ID.column_name.value} IS NOT NULL
+        AND {SongMetadataModel.SONG_ALBUM_ID.column_name.value} NOT IN (
+            SELECT {ColumnName.ALBUM_ID.value}
+            FROM {TableName.ALBUM_METADATA_V1.value})
+    """
+    return __execute_update(
+        sql=sql,
+        data=(),
+        connection=connection,
+        do_commit=do_commit)
+
+
 def __save_artist_metadata(
         artist_metadata: ArtistMetadata,
         connection: sqlite3.Connection = None,
@@ -2230,26 +2647,123 @@ def save_kv_item(
         key_value_item: KeyValueItem,
         connection: sqlite3.Connection = None,
         do_commit: bool = True):
+    if __kv_memory_tier:
+        __kv_memory_tier.put(key_value_item.partition, key_value_item.key, key_value_item)
+    if connection is None and __kv_write_buffer:
+        __kv_write_buffer.put(key_value_item)
+        return
+    with __kv_write_buffer_exclusive():
+        if __kv_write_buffer:
+            # a pending or in flight older value must not overwrite this one
+            __kv_write_buffer.discard(key_value_item.partition, key_value_item.key)
+        the_connection: sqlite3.Connection = get_working_connection(provided=connection)
+        upsert_kv_item_v1(
+            sql_executor=__get_sqlite3_executor(the_connection),
+            key_value_item=key_value_item,
+            timestamp=datetime.datetime.now(),
+            do_commit=do_commit or connection is None)
+        if connection is None:
+            the_connection.close()
+
+
+def save_kv_item_list(
+        key_value_item_list: list[KeyValueItem],
+        connection: sqlite3.Connection = None):
+    """Inserts or updates all the items in a single transaction"""
+    if not key_value_item_list:
+        return
+    __invalidate_kv_memory_tier(key_value_item_list)
     the_connection: sqlite3.Connection = get_working_connection(provided=connection)
-    put_key_value_item(
-        key_value_item=key_value_item,
-        updater=(lambda partition, key, value, update_timestamp, do_commit: __update_kv_item(
-                    partition=partition,
-                    key=key,
-                    value=value,
-                    update_timestamp=update_timestamp,
-                    connection=the_connection,
-                    do_commit=do_commit)),
-        creator=(lambda key_value_item, creation_timestamp, do_commit: _insert_key_value_item(
-                    key_value_item=key_value_item,
-                    creation_timestamp=creation_timestamp,
-                    connection=the_connection,
-                    do_commit=do_commit)),
-        loader=(lambda partition, key: __load_key_value_item(
-                    partition=partition,
-                    key=key,
-                    connection=the_connection)),
-        do_commit=do_commit)
+    try:
+        upsert_kv_item_list_v1(
+            sql_many_executor=sqlite3util.get_sqlite3_many_executor(the_connection),
+            key_value_item_list=key_value_item_list,
+            timestamp=datetime.datetime.now(),
+            do_commit=False)
+        the_connection.commit()
+    except Exception as ex:
+        the_connection.rollback()
+        raise ex
+    finally:
+        if connection is None:
+            the_connection.close()
+
+
+def __invalidate_kv_memory_tier(key_value_item_list: list[KeyValueItem]):
+    # absent keys might have been remembered
+    if __kv_memory_tier:
+        current: KeyValueItem
+        for current in key_value_item_list:
+            __kv_memory_tier.invalidate(current.partition, current.key)
+
+
+def __write_kv_item_list(key_value_item_list: list[KeyValueItem]):
+    save_kv_item_list(key_value_item_list=key_value_item_list)
+
+
+# optional write-behind for save_kv_item, pending items are seen by get_kv_item
+# and written before queries over whole partitions
+__kv_write_buffer: KeyValueWriteBuffer = (
+    KeyValueWriteBuffer(
+        name=TableName.KV_CACHE_V1.value,
+        writer=__write_kv_item_list,
+        logger=msgproc.log,
+        flush_interval_sec=config.get_config_param_as_int(constants.ConfigParam.KV_WRITE_BEHIND_FLUSH_INTERVAL_SEC),
+        max_pending=config.get_config_param_as_int(constants.ConfigParam.KV_WRITE_BEHIND_MAX_PENDING))
+    if config.get_config_param_as_bool(constants.ConfigParam.ENABLE_KV_WRITE_BEHIND)
+    else None)
+
+
+# optional lru in front of kv_cache_v1 for get_kv_item, writes go through it
+__kv_memory_tier: KeyValueMemoryTier = (
+    KeyValueMemoryTier(
+        name=TableName.KV_CACHE_V1.value,
+        max_size=config.get_config_param_as_int(constants.ConfigParam.KV_MEMORY_CACHE_SIZE),
+        logger=msgproc.log,
+        report_every=config.get_config_param_as_int(constants.ConfigParam.KV_MEMORY_CACHE_REPORT_EVERY))
+    if config.get_config_param_as_int(constants.ConfigParam.KV_MEMORY_CACHE_SIZE) > 0
+    else None)
+
+
+def get_kv_memory_tier_statistics() -> str | None:
+    """Hit ratio and memory footprint of the kv memory tier, None if disabled"""
+    return str(__kv_memory_tier) if __kv_memory_tier else None
+
+
+def __kv_write_buffer_exclusive():
+    # direct writes and deletes wait for an in flight batch to be committed
+    return __kv_write_buffer.exclusive() if __kv_write_buffer else contextlib.nullcontext()
+
+
+def flush_kv_write_buffer() -> int:
+    """Writes pending kv items now, returns the number of written items"""
+    return __kv_write_buffer.flush() if __kv_write_buffer else 0
+
+
+def insert_kv_item_list(
+        key_value_item_list: list[KeyValueItem],
+        connection: sqlite3.Connection = None):
+    """Inserts all the items in a single transaction"""
+    if not key_value_item_list:
+        return
+    __invalidate_kv_memory_tier(key_value_item_list)
+    the_connection: sqlite3.Connection = get_working_connection(provided=connection)
+    try:
+        sql_executor: sqlhelper.SqlExecutor = __get_sqlite3_executor(the_connection)
+        current: KeyValueItem
+        for current in key_value_item_list:
+            insert_kv_item_v1(
+                sql_executor=sql_executor,
+                key_value_item=current,
+                creation_timestamp=current.created_timestamp,
+                do_commit=False)
+        the_connection.commit()
+    except Exception as ex:
+        the_connection.rollback()
+        raise ex
+    finally:
+        if connection is None:
+            the_connection.close()
 
 
 def __insert_song_metadata(
@@ -2637,6 +3151,7 @@ def purge_unknown_album_properties(
         sql=sql,
         data=tuple(valid_property_key_list),
         do_commit=False)
+    __defer_facet_index_change(the_connection, __album_facet_index.invalidate)
     if do_commit or connection is None:
         commit(connection=the_connection)
     if connection is None:
@@ -2644,6 +3159,34 @@ def purge_unknown_album_properties(
     return del_count
 
 
+def __load_album_facet_rows() -> list[tuple[str, str, Any]]:
+    sql: str = f"""
+        SELECT
+            {AlbumPropertyMetaModel.ALBUM_ID.column_name.value},
+            {AlbumPropertyMetaModel.ALBUM_PROPERTY_KEY.column_name.value},
+            {AlbumPropertyMetaModel.ALBUM_PROPERTY_VALUE.column_name.value}
+        FROM
+            {TableName.ALBUM_PROPERTY_V1.value}
+    """
+    the_connection: sqlite3.Connection = get_working_connection()
+    rows: list[Any] = __get_sqlite3_selector(connection=the_connection)(sql=sql, parameters=())
+    the_connection.close()
+    return rows if rows else []
+
+
+def __get_album_facet_index(connection: sqlite3.Connection = None) -> AlbumFacetIndex | None:
+    # callers providing their own connection keep reading from the database
+    if connection is not None or not config.get_config_param_as_bool(constants.ConfigParam.ENABLE_ALBUM_FACET_INDEX):
+        return None
+    __album_facet_index.ensure_loaded(loader=__load_album_facet_rows)
+    return __album_facet_index
+
+
+def load_album_facet_index() -> bool:
+    """Builds the album property index now instead of on first use"""
+    return __get_album_facet_index() is not None
+
+
 def __on_meta(x: AlbumPropertyMetadata, res: list[AlbumPropertyMetadata]):
     res.append(x)
 
@@ -2675,6 +3218,9 @@ def __create_album_property_except() -> str:
 def get_album_property_matching_count(
         condition_list: list[AlbumPropertyKeyValue],
         connection: sqlite3.Connection = None) -> int:
+    index: AlbumFacetIndex = __get_album_facet_index(connection)
+    if index is not None:
+        return index.get_matching_count(condition_list=condition_list)
     values: list[str] = []
     intersections: str = ""
     curr_condition: AlbumPropertyKeyValue
@@ -2713,6 +3259,9 @@ def get_album_property_matching_count(
 def get_one_random_album_property_matching(
         condition_list: list[AlbumPropertyKeyValue],
         connection: sqlite3.Connection = None) -> str:
+    index: AlbumFacetIndex = __get_album_facet_index(connection)
+    if index is not None:
+        return index.get_one_random_matching(condition_list=condition_list)
     values: list[str] = []
     intersections: str = ""
     curr_condition: AlbumPropertyKeyValue
@@ -2753,6 +3302,9 @@ def get_one_random_album_property_matching(
 def get_album_property_matching(
         condition_list: list[AlbumPropertyKeyValue],
         connection: sqlite3.Connection = None) -> list[str]:
+    index: AlbumFacetIndex = __get_album_facet_index(connection)
+    if index is not None:
+        return index.get_matching(condition_list=condition_list)
     values: list[str] = []
     intersections: str = ""
     curr_condition: AlbumPropertyKeyValue
@@ -2788,6 +3340,9 @@ def get_album_property_matching(
 def get_album_property_key_occurence_list(
         condition_list: list[AlbumPropertyKeyValue],
         connection: sqlite3.Connection = None) -> list[AlbumPropertyKeyOccurrence]:
+    index: AlbumFacetIndex = __get_album_facet_index(connection)
+    if index is not None:
+        return index.get_key_occurrence_list(condition_list=condition_list)
     values: list[str] = []
     # Track which keys are currently active in the filter
     active_keys = [c.key for c in condition_list] if condition_list else []
@@ -2873,6 +3428,9 @@ def get_album_property_value_occurence_list(
         condition_list: list[AlbumPropertyKeyValue],
         property_key: str,
         connection: sqlite3.Connection = None) -> list[AlbumPropertyValueOccurrence]:
+    index: AlbumFacetIndex = __get_album_facet_index(connection)
+    if index is not None:
+        return index.get_value_occurrence_list(condition_list=condition_list, property_key=property_key)
     values: list[str] = []
     intersections: str = ""
     curr_condition: AlbumPropertyKeyValue
@@ -3053,6 +3611,9 @@ def get_album_property_values(
 
 def purge_spurious_caches():
     msgproc.log("purge_spurious_caches starting ...")
+    flush_kv_write_buffer()
+    if __kv_memory_tier:
+        __kv_memory_tier.invalidate()
     cache_not_in: list[str] = [c.cache_name for c in CacheType]
     qmark_list: str = __create_qmark_list(len(cache_not_in))
     sql: str = f"""
@@ -3068,32 +3629,22 @@ def purge_spurious_caches():
 
 def purge_id_cache():
     msgproc.log("purge_id_cache starting ...")
-    sql: str = f"""
-        DELETE FROM {TableName.KV_CACHE_V1.name}
-        WHERE {KeyValueCacheColumnName.ITEM_PARTITION.value} = ?
-    """
-    t = (CacheType.ITEM_IDENTIFIER_CODEC.cache_name,)
-    upd_count: int = __execute_update(
-        sql=sql,
-        data=t)
+    with __kv_write_buffer_exclusive():
+        if __kv_write_buffer:
+            __kv_write_buffer.discard(CacheType.ITEM_IDENTIFIER_CODEC.cache_name)
+        if __kv_memory_tier:
+            __kv_memory_tier.invalidate(CacheType.ITEM_IDENTIFIER_CODEC.cache_name)
+        sql: str = f"""
+            DELETE FROM {TableName.KV_CACHE_V1.name}
+            WHERE {KeyValueCacheColumnName.ITEM_PARTITION.value} = ?
+        """
+        t = (CacheType.ITEM_IDENTIFIER_CODEC.cache_name,)
+        upd_count: int = __execute_update(
+            sql=sql,
+            data=t)
     msgproc.log(f"purge_id_cache deleted [{upd_count}] entries")
 
 
-def _insert_key_value_item(
-        key_value_item: KeyValueItem,
-        creation_timestamp: datetime.datetime,
-        connection: sqlite3.Connection = None,
-        do_commit: bool = True) -> None:
-    the_connection: sqlite3.Connection = get_working_connection(connection)
-    insert_kv_item_v1(
-        sql_executor=__get_sqlite3_executor(the_connection),
-        key_value_item=key_value_item,
-        creation_timestamp=creation_timestamp,
-        do_commit=do_commit if connection else True)
-    if connection is None:
-        the_connection.close()
-
-
 def __execute_update(
         sql: str,
         data: tuple,
@@ -3116,10 +3667,16 @@ def lock_immediate(connection: sqlite3.Connection):
 
 def rollback(connection: sqlite3.Connection):
     connection.rollback()
+    if __pop_facet_index_changes(connection):
+        # the index was not touched, but let it be reloaded from what is committed
+        __album_facet_index.invalidate()
 
 
 def commit(connection: sqlite3.Connection):
     connection.commit()
+    change: Callable[[], None]
+    for change in __pop_facet_index_changes(connection):
+        change()
 
 
 def do_vacuum():
@@ -3237,6 +3794,19 @@ def __store_db_version(version: str):
     msgproc.log(f"Db version correctly set to [{version}]")
 
 
+def do_migration_73():
+    __do_create_table(
+        table_name=TableName.KV_CACHE_V1.value,
+        sql=create_index_on_columns(
+            table_name=TableName.KV_CACHE_V1.value,
+            index_name=(f"{TableName.KV_CACHE_V1.value}_"
+                        f"{KeyValueCacheColumnName.ITEM_PARTITION.value}_"
+                        f"{KeyValueCacheColumnName.ITEM_VALUE.value}"),
+            column_name_list=[
+                KeyValueCacheColumnName.ITEM_PARTITION,
+                KeyValueCacheColumnName.ITEM_VALUE]))
+
+
 def do_migration_72():
     __do_create_table(
         table_name=TableName.ALBUM_METADATA_V1.value,
@@ -4355,7 +4925,13 @@ def __init():
             applies_on=72,
             migration_name=(f"Altering table {TableName.ALBUM_METADATA_V1.value} "
                             f"adding {AlbumMetadataModel.ALBUM_REPLAY_GAIN.column_name.value}"),
-            migration_function=do_migration_72)]
+            migration_function=do_migration_72),
+        __create_migration(
+            applies_on=73,
+            migration_name=(f"Creating index on {TableName.KV_CACHE_V1.value} "
+                            f"for {KeyValueCacheColumnName.ITEM_PARTITION.value}, "
+                            f"{KeyValueCacheColumnName.ITEM_VALUE.value}"),
+            migration_function=do_migration_73)]
     current_migration: Migration
     migration_counter: int = 0
     for current_migration in migrations:
@@ -0,0 +1,155 @@
+# Copyright (C) 2026 Giovanni Fulco
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# paged fetch from the server with concurrent fetchers feeding a single consumer
+# fetchers claim increasing offsets until one of them gets a short page
+# the consumer runs in the calling thread, so it can safely use its own db connection
+# pages might be consumed out of order
+
+import queue
+import threading
+import time
+from typing import Any
+from typing import Callable
+
+from msgproc_provider import msgproc
+
+
+class PipelineStatistics:
+
+    def __init__(self, name: str):
+        self.__name: str = name
+        self.__start: float = time.time()
+        self.__elapsed: float = 0.0
+        self.__pages: int = 0
+        self.__items: int = 0
+        self.__fetch_time: float = 0.0
+        self.__consume_time: float = 0.0
+
+    @property
+    def pages(self) -> int:
+        return self.__pages
+
+    @property
+    def items(self) -> int:
+        return self.__items
+
+    @property
+    def elapsed(self) -> float:
+        return self.__elapsed
+
+    @property
+    def items_per_sec(self) -> float:
+        return float(self.__items) / self.__elapsed if self.__elapsed > 0 else 0.0
+
+    def fetched(self, elapsed: float):
+        self.__fetch_time += elapsed
+
+    def consumed(self, item_count: int, elapsed: float):
+        self.__pages += 1
+        self.__items += item_count
+        self.__consume_time += elapsed
+
+    def complete(self):
+        self.__elapsed = time.time() - self.__start
+
+    def __str__(self) -> str:
+        return (f"[{self.__name}] pages [{self.__pages}] items [{self.__items}] "
+                f"in [{self.__elapsed:.3f}] [{self.items_per_sec:.3f}] items/sec "
+                f"fetch time [{self.__fetch_time:.3f}] consume time [{self.__consume_time:.3f}]")
+
+
+class PagePipeline:
+
+    def __init__(
+            self,
+            name: str,
+            fetch_page: Callable[[int, int], list[Any]],
+            page_size: int,
+            fetcher_count: int):
+        self.__name: str = name
+        self.__fetch_page: Callable[[int, int], list[Any]] = fetch_page
+        self.__page_size: int = page_size
+        self.__fetcher_count: int = max(1, fetcher_count)
+        self.__lock: threading.Lock = threading.Lock()
+        self.__next_offset: int = 0
+        self.__done: bool = False
+        self.__error: Exception = None
+        # bounded, so fetchers do not get too far ahead of the consumer
+        self.__queue: queue.Queue = queue.Queue(maxsize=2 * self.__fetcher_count)
+        self.__statistics: PipelineStatistics = PipelineStatistics(name)
+
+    def run(self, consume: Callable[[int, list[Any]], None]) -> PipelineStatistics:
+        """Fetches all pages and passes them to consume(offset, item_list) in the calling thread"""
+        fetchers: list[threading.Thread] = [
+            threading.Thread(target=self.__fetcher, daemon=True)
+            for _ in range(self.__fetcher_count)]
+        for fetcher in fetchers:
+            fetcher.start()
+        # when all fetchers are done, signal the consumer
+        threading.Thread(target=self.__close_when_done, args=(fetchers,), daemon=True).start()
+        closed: bool = False
+        try:
+            while True:
+                item: tuple[int, list[Any]] = self.__queue.get()
+                if item is None:
+                    closed = True
+                    break
+                offset, page = item
+                start: float = time.time()
+                consume(offset, page)
+                self.__statistics.consumed(item_count=len(page), elapsed=time.time() - start)
+        finally:
+            with self.__lock:
+                self.__done = True
+            # consumer failed, unblock fetchers waiting on a full queue
+            while not closed:
+                closed = self.__queue.get() is None
+        if self.__error:
+            raise self.__error
+        self.__statistics.complete()
+        msgproc.log(f"PagePipeline {self.__statistics}")
+        return self.__statistics
+
+    def __fetcher(self):
+        while True:
+            with self.__lock:
+                if self.__done:
+                    return
+                offset: int = self.__next_offset
+                self.__next_offset += self.__page_size
+            start: float = time.time()
+            try:
+                page: list[Any] = self.__fetch_page(offset, self.__page_size)
+            except Exception as ex:
+                msgproc.log(f"PagePipeline [{self.__name}] fetch at offset [{offset}] "
+                            f"failed due to [{type(ex)}] [{ex}]")
+                with self.__lock:
+                    if self.__error is None:
+                        self.__error = ex
+                    self.__done = True
+                return
+            with self.__lock:
+                self.__statistics.fetched(time.time() - start)
+                if len(page) < self.__page_size:
+                    # last page
+                    self.__done = True
+            if len(page) > 0:
+                self.__queue.put((offset, page))
+
+    def __close_when_done(self, fetchers: list[threading.Thread]):
+        for fetcher in fetchers:
+            fetcher.join()
+        self.__queue.put(None)
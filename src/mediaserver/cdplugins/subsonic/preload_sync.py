@@ -0,0 +1,309 @@
+# Copyright (C) 2026 Giovanni Fulco
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# incremental synchronization of the album and song metadata
+# a full preload is done only periodically, in between:
+# - nothing is fetched if getIndexes reports no change since the previous sync
+# - otherwise only albums created after the newest stored album are fetched (high-water mark)
+# - periodically, album ids are listed and albums missing on the server are deleted
+# - albums whose songs could not be loaded are kept for the next sync, which is not skipped
+# the server is called without the response cache, see connector_provider.get_uncached
+
+import datetime
+import json
+from enum import Enum
+
+from subsonic_connector.album import Album
+from subsonic_connector.album_list import AlbumList
+from subsonic_connector.response import Response
+from subsonic_connector.search_result import SearchResult
+from subsonic_connector.song import Song
+
+from keyvaluecaching import KeyValueItem
+from msgproc_provider import msgproc
+from cache_type import CacheType
+from preload_pipeline import PagePipeline
+import config
+import connector_provider
+import constants
+import persistence
+import subsonic_util
+
+
+class SyncMode(Enum):
+
+    FULL = 1
+    RECONCILE = 2
+    DELTA = 3
+    NONE = 4
+
+
+class SyncKey(Enum):
+
+    SERVER_LAST_MODIFIED = "server_last_modified"
+    LAST_FULL_SYNC = "last_full_sync"
+    LAST_RECONCILE = "last_reconcile"
+    RETRY_ALBUM_IDS = "retry_album_ids"
+
+
+class FetchedSongs:
+
+    def __init__(self, song_list: list[Song], failed_album_id_list: list[str]):
+        self.__song_list: list[Song] = song_list
+        self.__failed_album_id_list: list[str] = failed_album_id_list
+
+    @property
+    def song_list(self) -> list[Song]:
+        return self.__song_list
+
+    @property
+    def failed_album_id_list(self) -> list[str]:
+        return self.__failed_album_id_list
+
+
+class SyncState:
+
+    def __init__(
+            self,
+            server_last_modified: int | None,
+            last_full_sync: float | None,
+            last_reconcile: float | None):
+        self.__server_last_modified: int | None = server_last_modified
+        self.__last_full_sync: float | None = last_full_sync
+        self.__last_reconcile: float | None = last_reconcile
+
+    @property
+    def server_last_modified(self) -> int | None:
+        return self.__server_last_modified
+
+    @property
+    def last_full_sync(self) -> float | None:
+        return self.__last_full_sync
+
+    @property
+    def last_reconcile(self) -> float | None:
+        return self.__last_reconcile
+
+    def __str__(self) -> str:
+        return (f"server_last_modified [{self.__server_last_modified}] "
+                f"last_full_sync [{self.__last_full_sync}] "
+                f"last_reconcile [{self.__last_reconcile}]")
+
+
+def __load_value(key: SyncKey) -> float | None:
+    item: KeyValueItem = persistence.get_kv_item(
+        partition=CacheType.PRELOAD_SYNC.cache_name,
+        key=key.value)
+    if not item or not item.value:
+        return None
+    try:
+        return float(item.value)
+    except ValueError:
+        msgproc.log(f"preload_sync invalid value [{item.value}] for [{key.value}]")
+        return None
+
+
+def __save_value(key: SyncKey, value: float | None):
+    if value is None:
+        return
+    persistence.save_kv_item(KeyValueItem(
+        partition=CacheType.PRELOAD_SYNC.cache_name,
+        key=key.value,
+        value=str(value)))
+
+
+def load_state() -> SyncState:
+    server_last_modified: float | None = __load_value(SyncKey.SERVER_LAST_MODIFIED)
+    return SyncState(
+        server_last_modified=int(server_last_modified) if server_last_modified is not None else None,
+        last_full_sync=__load_value(SyncKey.LAST_FULL_SYNC),
+        last_reconcile=__load_value(SyncKey.LAST_RECONCILE))
+
+
+def load_retry_album_id_list() -> list[str]:
+    item: KeyValueItem = persistence.get_kv_item(
+        partition=CacheType.PRELOAD_SYNC.cache_name,
+        key=SyncKey.RETRY_ALBUM_IDS.value)
+    if not item or not item.value:
+        return []
+    try:
+        return json.loads(item.value)
+    except ValueError:
+        msgproc.log(f"preload_sync invalid value [{item.value}] for [{SyncKey.RETRY_ALBUM_IDS.value}]")
+        return []
+
+
+def save_retry_album_id_list(album_id_list: list[str]):
+    persistence.save_kv_item(KeyValueItem(
+        partition=CacheType.PRELOAD_SYNC.cache_name,
+        key=SyncKey.RETRY_ALBUM_IDS.value,
+        value=json.dumps(album_id_list)))
+
+
+def save_full_sync(sync_start: float, server_last_modified: int | None):
+    # a full sync also reconciles, and loads the albums to be retried
+    __save_value(SyncKey.LAST_FULL_SYNC, sync_start)
+    __save_value(SyncKey.LAST_RECONCILE, sync_start)
+    __save_value(SyncKey.SERVER_LAST_MODIFIED, server_last_modified)
+    save_retry_album_id_list([])
+
+
+def save_reconcile(sync_start: float):
+    __save_value(SyncKey.LAST_RECONCILE, sync_start)
+
+
+def save_server_last_modified(server_last_modified: int | None):
+    __save_value(SyncKey.SERVER_LAST_MODIFIED, server_last_modified)
+
+
+def get_server_last_modified(if_modified_since: int | None = None) -> int | None:
+    """Returns the lastModified reported by getIndexes, None if not available"""
+    music_folder_id: str = config.get_config_param_as_str(constants.ConfigParam.MUSIC_FOLDER_ID)
+    try:
+        # with ifModifiedSince, an unchanged library does not return the index entries
+        res: dict = connector_provider.get_uncached().getIndexes(
+            musicFolderId=music_folder_id if music_folder_id else None,
+            ifModifiedSince=if_modified_since if if_modified_since else 0)
+    except Exception as ex:
+        msgproc.log(f"preload_sync getIndexes failed [{type(ex)}] [{ex}]")
+        return None
+    indexes: dict = res.get("indexes") if res else None
+    last_modified: any = indexes.get("lastModified") if indexes else None
+    return int(last_modified) if last_modified is not None else None
+
+
+def get_sync_mode(state: SyncState, server_last_modified: int | None, now: float) -> SyncMode:
+    full_sync_interval_sec: int = config.get_config_param_as_int(
+        constants.ConfigParam.PRELOAD_FULL_SYNC_INTERVAL_SEC)
+    reconcile_interval_sec: int = config.get_config_param_as_int(
+        constants.ConfigParam.PRELOAD_RECONCILE_INTERVAL_SEC)
+    if state.last_full_sync is None or (now - state.last_full_sync) > full_sync_interval_sec:
+        return SyncMode.FULL
+    if state.last_reconcile is None or (now - state.last_reconcile) > reconcile_interval_sec:
+        return SyncMode.RECONCILE
+    if (server_last_modified is None or
+            state.server_last_modified is None or
+            server_last_modified != state.server_last_modified):
+        return SyncMode.DELTA
+    return SyncMode.NONE
+
+
+def __to_epoch(dt: datetime.datetime) -> float:
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=datetime.timezone.utc)
+    return dt.timestamp()
+
+
+def fetch_albums_created_after(high_water_mark: datetime.datetime | None) -> list[Album]:
+    """Albums from the newest list, until one created up to the high-water mark is found"""
+    if high_water_mark is None:
+        return []
+    mark: float = __to_epoch(high_water_mark)
+    req_count: int = constants.Defaults.SUBSONIC_API_MAX_RETURN_SIZE.value
+    music_folder_id: str = config.get_config_param_as_str(constants.ConfigParam.MUSIC_FOLDER_ID)
+    result: list[Album] = []
+    offset: int = 0
+    while True:
+        res: Response[AlbumList] = connector_provider.get_uncached().getNewestAlbumList(
+            size=req_count,
+            offset=offset,
+            musicFolderId=music_folder_id if music_folder_id else None)
+        if not res or not res.isOk() or not res.getObj():
+            # an empty list would be taken as no new albums
+            raise Exception(f"getNewestAlbumList failed at offset [{offset}]")
+        album_list: list[Album] = res.getObj().getAlbums()
+        album: Album
+        for album in album_list:
+            created: datetime.datetime | None = subsonic_util.get_album_created(album)
+            if created is not None and __to_epoch(created) <= mark:
+                return result
+            result.append(album)
+        if len(album_list) < req_count:
+            return result
+        offset += req_count
+
+
+def fetch_albums_by_id_list(album_id_list: list[str]) -> list[Album]:
+    """Albums to be retried, the ones the server does not return anymore are left out"""
+    result: list[Album] = []
+    album_id: str
+    for album_id in album_id_list:
+        res: Response[Album] = connector_provider.get_uncached().getAlbum(album_id)
+        if not res or not res.isOk() or not res.getObj():
+            msgproc.log(f"preload_sync could not load album_id [{album_id}] again, dropped")
+            continue
+        result.append(res.getObj())
+    return result
+
+
+def fetch_songs_by_album_list(album_list: list[Album]) -> FetchedSongs:
+    """Songs of the albums, one getAlbum per album with concurrent fetchers"""
+    song_list: list[Song] = []
+    failed_album_id_list: list[str] = []
+
+    def fetch_album_songs(album: Album) -> tuple[str, list[Song] | None]:
+        try:
+            res: Response[Album] = connector_provider.get_uncached().getAlbum(album.getId())
+        except Exception as ex:
+            msgproc.log(f"preload_sync could not load songs for album_id [{album.getId()}] [{type(ex)}] [{ex}]")
+            return album.getId(), None
+        if not res or not res.isOk() or not res.getObj():
+            msgproc.log(f"preload_sync could not load songs for album_id [{album.getId()}]")
+            return album.getId(), None
+        return album.getId(), res.getObj().getSongs()
+
+    # an item is the outcome for one album, so a page is short only past the last album
+    def fetch_page(album_offset: int, album_count: int) -> list[tuple[str, list[Song] | None]]:
+        return [fetch_album_songs(album) for album in album_list[album_offset:album_offset + album_count]]
+
+    def consume(album_offset: int, page: list[tuple[str, list[Song] | None]]):
+        album_id: str
+        album_song_list: list[Song] | None
+        for album_id, album_song_list in page:
+            if album_song_list is None:
+                failed_album_id_list.append(album_id)
+            else:
+                song_list.extend(album_song_list)
+
+    PagePipeline(
+        name="preload_sync_album_songs",
+        fetch_page=fetch_page,
+        page_size=1,
+        fetcher_count=config.get_config_param_as_int(constants.ConfigParam.PRELOAD_FETCHER_COUNT)).run(consume)
+    return FetchedSongs(song_list=song_list, failed_album_id_list=failed_album_id_list)
+
+
+def fetch_album_id_list() -> list[str]:
+    """All the album ids on the server, nothing is written"""
+    music_folder_id: str = config.get_config_param_as_str(constants.ConfigParam.MUSIC_FOLDER_ID)
+    result: list[str] = []
+
+    def fetch_page(album_offset: int, album_count: int) -> list[Album]:
+        res: SearchResult = connector_provider.get_uncached().search(
+            query="",
+            albumCount=album_count,
+            albumOffset=album_offset,
+            artistCount=0,
+            songCount=0,
+            musicFolderId=music_folder_id)
+        return res.getAlbums()
+
+    PagePipeline(
+        name="preload_sync_album_ids",
+        fetch_page=fetch_page,
+        page_size=constants.Defaults.SUBSONIC_API_MAX_RETURN_SIZE.value,
+        fetcher_count=config.get_config_param_as_int(constants.ConfigParam.PRELOAD_FETCHER_COUNT)).run(
+            lambda offset, album_list: result.extend(album.getId() for album in album_list))
+    return result
@@ -0,0 +1,111 @@
+# Copyright (C) 2026 Giovanni Fulco
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# random selection without ORDER BY RANDOM(), which scans and sorts the table on every call
+# ids are kept in memory grouped by a filter value (e.g. the genre), a random pick is a list index
+# the first use loads the groups, afterwards stale groups are reloaded by a background thread
+# and swapped in as a whole, so readers never see a partial reload
+# ids might refer to rows deleted after the last load, callers must handle missing rows
+
+import random
+import threading
+import time
+from typing import Callable
+from typing import Iterable
+
+from msgproc_provider import msgproc
+
+
+class IdReservoir:
+
+    def __init__(
+            self,
+            name: str,
+            loader: Callable[[], Iterable[tuple[str, str]]],
+            refresh_interval_sec: int):
+        self.__name: str = name
+        self.__loader: Callable[[], Iterable[tuple[str, str]]] = loader
+        self.__refresh_interval_sec: int = refresh_interval_sec
+        self.__lock: threading.Lock = threading.Lock()
+        self.__groups: dict[str, list[str]] = None
+        self.__loaded_at: float = 0.0
+        self.__refreshing: bool = False
+
+    @property
+    def loaded(self) -> bool:
+        return self.__groups is not None
+
+    def invalidate(self):
+        """Groups will be reloaded in background on next use"""
+        self.__loaded_at = 0.0
+
+    def get_count(self, group: str) -> int:
+        return len(self.__get_groups().get(group, []))
+
+    def sample_one(self, group: str) -> str | None:
+        id_list: list[str] = self.__get_groups().get(group)
+        return id_list[random.randrange(len(id_list))] if id_list else None
+
+    def sample(self, group: str, count: int) -> list[str]:
+        """Up to count distinct ids from group"""
+        id_list: list[str] = self.__get_groups().get(group)
+        return random.sample(id_list, min(count, len(id_list))) if id_list else []
+
+    def load(self):
+        """Loads the groups now, in the calling thread"""
+        start: float = time.time()
+        groups: dict[str, list[str]] = {}
+        row_count: int = 0
+        group: str
+        item_id: str
+        for group, item_id in self.__loader():
+            row_count += 1
+            groups.setdefault(group, []).append(item_id)
+        # replaced as a whole
+        self.__groups = groups
+        self.__loaded_at = time.time()
+        msgproc.log(f"IdReservoir [{self.__name}] loaded [{row_count}] ids "
+                    f"in [{len(groups)}] groups "
+                    f"in [{(time.time() - start):.3f}] sec")
+
+    def __get_groups(self) -> dict[str, list[str]]:
+        groups: dict[str, list[str]] = self.__groups
+        if groups is None:
+            with self.__lock:
+                if self.__groups is None:
+                    self.load()
+                return self.__groups
+        if (time.time() - self.__loaded_at) > self.__refresh_interval_sec:
+            self.__start_refresh()
+        # meanwhile, current groups are used
+        return groups
+
+    def __start_refresh(self):
+        with self.__lock:
+            if self.__refreshing:
+                return
+            self.__refreshing = True
+        threading.Thread(target=self.__refresh, daemon=True).start()
+
+    def __refresh(self):
+        try:
+            self.load()
+        except Exception as ex:
+            msgproc.log(f"IdReservoir [{self.__name}] refresh failed [{type(ex)}] [{ex}]")
+            # retry at next interval
+            self.__loaded_at = time.time()
+        finally:
+            with self.__lock:
+                self.__refreshing = False
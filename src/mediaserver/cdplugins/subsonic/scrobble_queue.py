@@ -0,0 +1,154 @@
+# Copyright (C) 2026 Giovanni Fulco
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# scrobbles are sent by a background thread, so trackuri does not wait for the server
+# pending requests are sent in batches, repeated requests for the same song are sent once
+# failed requests are retried with the original listen time
+
+import queue
+import threading
+import time
+from typing import Any
+from typing import Callable
+
+from msgproc_provider import msgproc
+import config
+import connector_provider
+import constants
+
+
+class ScrobbleRequest:
+
+    def __init__(self, song_id: str, listen_time: float):
+        self.__song_id: str = song_id
+        self.__listen_time: float = listen_time
+        self.__attempts: int = 0
+
+    @property
+    def song_id(self) -> str:
+        return self.__song_id
+
+    @property
+    def listen_time(self) -> float:
+        return self.__listen_time
+
+    @property
+    def attempts(self) -> int:
+        return self.__attempts
+
+    def attempted(self):
+        self.__attempts += 1
+
+
+class ScrobbleQueue:
+
+    def __init__(
+            self,
+            scrobbler: Callable[[str, float], Any],
+            max_attempts: int,
+            retry_delay_sec: float,
+            dedupe_sec: float):
+        self.__scrobbler: Callable[[str, float], Any] = scrobbler
+        self.__max_attempts: int = max(1, max_attempts)
+        self.__retry_delay_sec: float = retry_delay_sec
+        self.__dedupe_sec: float = dedupe_sec
+        self.__queue: queue.Queue[ScrobbleRequest] = queue.Queue()
+        self.__lock: threading.Lock = threading.Lock()
+        self.__worker: threading.Thread = None
+        # last listen time by song id, for deduplication
+        self.__last_by_song_id: dict[str, float] = {}
+        self.__sent: int = 0
+        self.__failed: int = 0
+        self.__deduplicated: int = 0
+
+    def submit(self, song_id: str):
+        now: float = time.time()
+        with self.__lock:
+            last: float = self.__last_by_song_id.get(song_id)
+            if last is not None and (now - last) < self.__dedupe_sec:
+                self.__deduplicated += 1
+                return
+            self.__last_by_song_id[song_id] = now
+            if self.__worker is None:
+                self.__worker = threading.Thread(target=self.__run, daemon=True)
+                self.__worker.start()
+        self.__queue.put(ScrobbleRequest(song_id=song_id, listen_time=now))
+
+    def __str__(self) -> str:
+        return (f"sent [{self.__sent}] failed [{self.__failed}] "
+                f"deduplicated [{self.__deduplicated}] pending [{self.__queue.qsize()}]")
+
+    def __run(self):
+        while True:
+            batch: list[ScrobbleRequest] = [self.__queue.get()]
+            # everything queued in the meantime goes in the same batch
+            while True:
+                try:
+                    batch.append(self.__queue.get_nowait())
+                except queue.Empty:
+                    break
+            retry_list: list[ScrobbleRequest] = []
+            request: ScrobbleRequest
+            for request in batch:
+                if not self.__send(request):
+                    retry_list.append(request)
+            if len(retry_list) > 0:
+                time.sleep(self.__retry_delay_sec)
+                for request in retry_list:
+                    self.__queue.put(request)
+            self.__purge_dedupe_entries()
+
+    def __send(self, request: ScrobbleRequest) -> bool:
+        # False when the request must be retried
+        request.attempted()
+        start: float = time.time()
+        try:
+            self.__scrobbler(request.song_id, request.listen_time)
+            self.__sent += 1
+            if config.get_verbose_logging():
+                msgproc.log(f"ScrobbleQueue song_id [{request.song_id}] "
+                            f"attempt [{request.attempts}] "
+                            f"elapsed [{(time.time() - start):.3f}] {self}")
+            return True
+        except Exception as ex:
+            msgproc.log(f"ScrobbleQueue song_id [{request.song_id}] "
+                        f"attempt [{request.attempts}] of [{self.__max_attempts}] "
+                        f"failed [{type(ex)}] [{ex}]")
+            if request.attempts < self.__max_attempts:
+                return False
+            self.__failed += 1
+            # dropped
+            return True
+
+    def __purge_dedupe_entries(self):
+        now: float = time.time()
+        with self.__lock:
+            expired: list[str] = [k for k, v in self.__last_by_song_id.items() if (now - v) >= self.__dedupe_sec]
+            for k in expired:
+                del self.__last_by_song_id[k]
+
+
+def __scrobble(song_id: str, listen_time: float):
+    connector_provider.get().scrobble(
+        song_id=song_id,
+        submission=True,
+        listenTime=int(listen_time))
+
+
+scrobble_queue: ScrobbleQueue = ScrobbleQueue(
+    scrobbler=__scrobble,
+    max_attempts=config.get_config_param_as_int(constants.ConfigParam.SCROBBLE_MAX_ATTEMPTS),
+    retry_delay_sec=config.get_config_param_as_int(constants.ConfigParam.SCROBBLE_RETRY_DELAY_SEC),
+    dedupe_sec=config.get_config_param_as_int(constants.ConfigParam.SCROBBLE_DEDUPE_SEC))
@@ -0,0 +1,134 @@
+# Copyright (C) 2026 Giovanni Fulco
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# what trackuri needs to know about a song to build the stream url
+# recorded when songs are presented, so playback does not need to ask the server again
+
+import threading
+from collections import OrderedDict
+
+from subsonic_connector.song import Song
+
+from metadata_model import SongMetadataModel
+from song_metadata import SongMetadata
+import config
+import constants
+import subsonic_util
+
+
+class StreamInfo:
+
+    def __init__(
+            self,
+            song_id: str,
+            suffix: str,
+            content_type: str,
+            bit_rate: int = None,
+            bit_depth: int = None,
+            sampling_rate: int = None,
+            duration: int = None):
+        self.__song_id: str = song_id
+        self.__suffix: str = suffix
+        self.__content_type: str = content_type
+        self.__bit_rate: int = bit_rate
+        self.__bit_depth: int = bit_depth
+        self.__sampling_rate: int = sampling_rate
+        self.__duration: int = duration
+
+    @property
+    def song_id(self) -> str:
+        return self.__song_id
+
+    @property
+    def suffix(self) -> str:
+        return self.__suffix
+
+    @property
+    def content_type(self) -> str:
+        return self.__content_type
+
+    @property
+    def bit_rate(self) -> int:
+        return self.__bit_rate
+
+    @property
+    def bit_depth(self) -> int:
+        return self.__bit_depth
+
+    @property
+    def sampling_rate(self) -> int:
+        return self.__sampling_rate
+
+    @property
+    def duration(self) -> int:
+        return self.__duration
+
+
+def from_song(song: Song) -> StreamInfo:
+    return StreamInfo(
+        song_id=song.getId(),
+        suffix=song.getSuffix(),
+        content_type=song.getContentType(),
+        bit_rate=song.getBitRate(),
+        bit_depth=subsonic_util.get_song_bit_depth(song=song),
+        sampling_rate=subsonic_util.get_song_sampling_rate(song=song),
+        duration=song.getDuration())
+
+
+def from_song_metadata(song_metadata: SongMetadata) -> StreamInfo | None:
+    suffix: str = song_metadata.get_value(SongMetadataModel.SONG_SUFFIX)
+    if not suffix:
+        # not enough to decide about transcoding
+        return None
+    return StreamInfo(
+        song_id=song_metadata.song_id,
+        suffix=suffix,
+        content_type=song_metadata.get_value(SongMetadataModel.SONG_CONTENT_TYPE),
+        bit_rate=song_metadata.get_value(SongMetadataModel.SONG_BITRATE),
+        bit_depth=song_metadata.get_value(SongMetadataModel.SONG_BITDEPTH),
+        sampling_rate=song_metadata.get_value(SongMetadataModel.SONG_SAMPLING_RATE),
+        duration=song_metadata.get_value(SongMetadataModel.SONG_DURATION))
+
+
+class StreamInfoCache:
+
+    def __init__(self, max_size: int):
+        self.__max_size: int = max_size
+        self.__lock: threading.Lock = threading.Lock()
+        self.__entries: OrderedDict[str, StreamInfo] = OrderedDict()
+
+    @property
+    def size(self) -> int:
+        return len(self.__entries)
+
+    def get(self, song_id: str) -> StreamInfo | None:
+        with self.__lock:
+            stream_info: StreamInfo = self.__entries.get(song_id)
+            if stream_info:
+                self.__entries.move_to_end(song_id)
+            return stream_info
+
+    def put(self, stream_info: StreamInfo):
+        if self.__max_size <= 0 or not stream_info.song_id:
+            return
+        with self.__lock:
+            self.__entries[stream_info.song_id] = stream_info
+            self.__entries.move_to_end(stream_info.song_id)
+            while len(self.__entries) > self.__max_size:
+                self.__entries.popitem(last=False)
+
+
+cache: StreamInfoCache = StreamInfoCache(
+    max_size=config.get_config_param_as_int(constants.ConfigParam.STREAM_INFO_CACHE_SIZE))
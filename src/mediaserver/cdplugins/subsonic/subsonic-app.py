@@ -70,6 +70,12 @@ import entry_creator
 import constants
 import persistence
 import metadata_converter
+import artist_catalogue
+from artist_catalogue import ArtistCatalogue
+import scrobble_queue
+import stream_info
+from stream_info import StreamInfo
+from song_metadata import SongMetadata
 from artist_metadata import ArtistMetadata
 from album_metadata import AlbumMetadata
 from album_property_key import AlbumPropertyKey
@@ -282,8 +288,21 @@ def cover_art_trackuri(item_id: str):
     return result
 
 
-def song_trackuri(track_id: str):
-    verbose: bool = config.get_verbose_logging()
+def __get_stream_info(track_id: str) -> tuple[StreamInfo | None, str]:
+    # returns the stream info along with where it was found
+    if config.get_config_param_as_bool(constants.ConfigParam.TRACKURI_USE_LOCAL_METADATA):
+        cached: StreamInfo = stream_info.cache.get(track_id)
+        if cached:
+            return cached, "memory"
+        from_db: StreamInfo = None
+        try:
+            song_metadata: SongMetadata = persistence.get_song_metadata(song_id=track_id)
+            from_db = stream_info.from_song_metadata(song_metadata) if song_metadata else None
+        except Exception as ex:
+            msgproc.log(f"Cannot get song metadata for id [{track_id}] [{type(ex)}] [{ex}]")
+        if from_db:
+            stream_info.cache.put(from_db)
+            return from_db, "database"
     song: Song = None
     try:
         res: Response[Song] = connector_provider.get().getSong(song_id=track_id)
@@ -291,39 +310,43 @@ def song_trackuri(track_id: str):
     except Exception as ex:
         msgproc.log(f"Cannot get a song from id [{track_id}] [{type(ex)}] [{ex}]")
     if not song:
+        return None, "server"
+    from_server: StreamInfo = stream_info.from_song(song)
+    stream_info.cache.put(from_server)
+    return from_server, "server"
+
+
+def song_trackuri(track_id: str):
+    verbose: bool = config.get_verbose_logging()
+    start: float = time.time()
+    song_info, song_info_source = __get_stream_info(track_id)
+    if not song_info:
         return {'media_url': ""}
-    song_suffix: str = song.getSuffix()
-    # scrobble if allowed
+    song_suffix: str = song_info.suffix
+    # scrobble if allowed, in background
     scrobble_msg: str = "no"
     if config.get_config_param_as_bool(constants.ConfigParam.SERVER_SIDE_SCROBBLING):
-        scrobble_time: float = 0.0
-        scrobble_start: float = time.time()
-        scrobble_success: bool = False
-        try:
-            connector_provider.get().scrobble(song_id=song.getId())
-            scrobble_success = True
-        except Exception as ex:
-            msgproc.log(f"trackuri scrobble failed [{type(ex)}] [{ex}]")
-        scrobble_time = time.time() - scrobble_start
-        scrobble_msg = f"Success: ({'yes' if scrobble_success else 'no'}) Elapsed ({scrobble_time:.3f})]"
+        scrobble_queue.scrobble_queue.submit(song_id=song_info.song_id)
+        scrobble_msg = f"queued, {scrobble_queue.scrobble_queue}"
     tr_format: str = config.get_transcode_codec()
     tr_bitrate: int = config.get_transcode_max_bitrate()
-    if tr_format and song.getSuffix() and tr_format.lower() == song.getSuffix().lower():
+    if tr_format and song_suffix and tr_format.lower() == song_suffix.lower():
         # skip transcoding when not needed
         if verbose:
-            msgproc.log(f"trackuri transcoding skipped because suffix is [{song.getSuffix()}] "
+            msgproc.log(f"trackuri transcoding skipped because suffix is [{song_suffix}] "
                         f"and transcoding format is [{tr_format}]")
         tr_format = None
         tr_bitrate = None
+    # the stream url only depends on the song id
     media_url: str = connector_provider.get().buildSongUrlBySong(
-        song=song,
+        song=Song({"id": song_info.song_id}),
         format=tr_format,
         max_bitrate=tr_bitrate)
     # media_url is now set, we can now start collecting information
     # just to show metadata from the subsonic server
-    mimetype: str = song.getContentType()
-    bitrate: str = str(song.getBitRate()) if song.getBitRate() else None
-    duration: str = str(song.getDuration()) if song.getDuration() else None
+    mimetype: str = song_info.content_type
+    bitrate: str = str(song_info.bit_rate) if song_info.bit_rate else None
+    duration: str = str(song_info.duration) if song_info.duration else None
     msgproc.log(f"trackuri for track_id [{track_id}] "
                 f"tr_format [{tr_format}] "
                 f"tr_bitrate [{tr_bitrate}] "
@@ -331,10 +354,12 @@ def song_trackuri(track_id: str):
                 f"source mimetype [{mimetype}] "
                 f"source suffix [{song_suffix}] "
                 f"source bitRate [{bitrate}] "
-                f"source bitDepth [{subsonic_util.get_song_bit_depth(song=song)}] "
-                f"source samplingRate [{subsonic_util.get_song_sampling_rate(song=song)}] "
+                f"source bitDepth [{song_info.bit_depth}] "
+                f"source samplingRate [{song_info.sampling_rate}] "
                 f"duration [{duration}] "
-                f"scrobble [{scrobble_msg}]")
+                f"scrobble [{scrobble_msg}] "
+                f"info from [{song_info_source}] "
+                f"elapsed [{(time.time() - start):.3f}]")
     result: dict[str, str] = dict()
     # only media_url is necessary
     # anything else would be ignored
@@ -344,6 +369,8 @@ def song_trackuri(track_id: str):
 
 def _returnentries(entries, no_cache: bool = False):
     """Helper function: build plugin browse or search return value from items list"""
+    # identifiers created while building the entries are persisted in one go
+    codec.flush()
     return {"entries": json.dumps(entries), "nocache": "1" if no_cache else "0"}
 
 
@@ -659,6 +686,49 @@ def _albums_by_artist_to_entries(
     return entries
 
 
+def __create_artists_by_initial_next_entry(
+        objid,
+        artist_initial: str,
+        element_type: ElementType,
+        offset: int) -> dict[str, any]:
+    next_identifier: ItemIdentifier = ItemIdentifier(
+        element_type.element_name,
+        codec.base64_encode(artist_initial))
+    next_identifier.set(ItemIdentifierKey.OFFSET, offset)
+    next_id: str = identifier_util.create_objid(
+        objid=objid,
+        id=identifier_util.create_id_from_identifier(next_identifier))
+    return upmplgutils.direntry(
+        next_id,
+        objid,
+        title="Next")
+
+
+def __load_artists_by_initial_from_catalogue(
+        objid,
+        artist_initial: str,
+        catalogue: ArtistCatalogue,
+        artist_list: list[ArtistListItem],
+        entries: list,
+        element_type: ElementType,
+        offset: int) -> list:
+    page_size: int = config.get_items_per_page()
+    current_artist: ArtistListItem
+    for current_artist in artist_list[offset:offset + page_size]:
+        entries.append(entry_creator.artist_to_entry(
+            objid=objid,
+            artist=current_artist,
+            cover_art=(subsonic_util.get_artist_cover_art(current_artist) or
+                       catalogue.get_cover_art(current_artist.getId()))))
+    if len(artist_list) > offset + page_size:
+        entries.append(__create_artists_by_initial_next_entry(
+            objid=objid,
+            artist_initial=artist_initial,
+            element_type=element_type,
+            offset=offset + page_size))
+    return entries
+
+
 def __load_artists_by_initial(
         objid,
         artist_initial: str,
@@ -666,6 +736,19 @@ def __load_artists_by_initial(
         element_type: ElementType,
         options: dict[str, any] = {}) -> list:
     offset: int = option_util.get_option(options=options, option_key=OptionKey.OFFSET)
+    catalogue: ArtistCatalogue = artist_catalogue.get()
+    catalogue_artists: list[ArtistListItem] = (catalogue.get_artists_by_initial(artist_initial)
+                                               if catalogue
+                                               else None)
+    if catalogue_artists is not None:
+        return __load_artists_by_initial_from_catalogue(
+            objid=objid,
+            artist_initial=artist_initial,
+            catalogue=catalogue,
+            artist_list=catalogue_artists,
+            entries=entries,
+            element_type=element_type,
+            offset=offset)
     counter: int = 0
     artists_response: Response[Artists] = request_cache.get_artists()
     if not artists_response.isOk():
@@ -698,18 +781,11 @@ def __load_artists_by_initial(
                 # we are at the next initial
                 break
     if broke_out:
-        next_identifier: ItemIdentifier = ItemIdentifier(
-            element_type.element_name,
-            codec.base64_encode(artist_initial))
-        next_identifier.set(ItemIdentifierKey.OFFSET, offset + config.get_items_per_page())
-        next_id: str = identifier_util.create_objid(
+        entries.append(__create_artists_by_initial_next_entry(
             objid=objid,
-            id=identifier_util.create_id_from_identifier(next_identifier))
-        next_entry: dict[str, any] = upmplgutils.direntry(
-            next_id,
-            objid,
-            title="Next")
-        entries.append(next_entry)
+            artist_initial=artist_initial,
+            element_type=element_type,
+            offset=offset + config.get_items_per_page()))
     return entries
 
 
@@ -859,22 +935,29 @@ def _create_list_of_playlist_entries(objid, playlist_id: str, entries: list) ->
     return entries
 
 
+def __get_artist_initials() -> list[str] | None:
+    catalogue: ArtistCatalogue = artist_catalogue.get()
+    initials: list[str] = catalogue.get_artist_initials() if catalogue else None
+    if initials is not None:
+        return initials
+    artists_response: Response[Artists] = request_cache.get_artists()
+    if not artists_response.isOk():
+        return None
+    return [current.getName() for current in artists_response.getObj().getArtistListInitials()]
+
+
 def _create_list_of_artist_initials(
         objid,
         entries: list,
         options: dict[str, any] = dict()) -> list:
-    artists_response: Response[Artists] = request_cache.get_artists()
-    if not artists_response.isOk():
-        return entries
-    artists_initial: list[ArtistsInitial] = artists_response.getObj().getArtistListInitials()
-    current_artists_initial: ArtistsInitial
-    for current_artists_initial in artists_initial:
+    initials: list[str] = __get_artist_initials()
+    artist_initial: str
+    for artist_initial in initials if initials else []:
         entry: dict[str, any] = entry_creator.artist_initial_to_entry(
             objid=objid,
-            artist_initial=current_artists_initial.getName(),
+            artist_initial=artist_initial,
             options=options)
         entries.append(entry)
-        # populate cache of artist by initial
     return entries
 
 
@@ -2316,9 +2399,19 @@ def handler_tag_all_artists_unsorted(objid, item_identifier: ItemIdentifier, ent
         entries=entries)
 
 
+def __get_album_cover_art_by_artist_id(artist_id: str) -> str:
+    catalogue: ArtistCatalogue = artist_catalogue.get()
+    cover_art: str = catalogue.get_cover_art(artist_id) if catalogue else None
+    if cover_art:
+        return cover_art
+    return art_retriever.get_album_cover_art_by_artist_id(
+        artist_id=artist_id,
+        skip_artist_metadata_cache=True)
+
+
 def handler_tag_artist_roles(objid, item_identifier: ItemIdentifier, entries: list) -> list:
     verbose: bool = config.get_verbose_logging()
-    roles: list[persistence.ArtistRoleEntry] = persistence.get_artist_roles()
+    roles: list[persistence.ArtistRoleEntry] = artist_catalogue.get_artist_roles()
     role_entry: persistence.ArtistRoleEntry
     for role_entry in roles if roles else []:
         if verbose:
@@ -2338,9 +2431,7 @@ def handler_tag_artist_roles(objid, item_identifier: ItemIdentifier, entries: li
                 msgproc.log(f"handler_tag_artist_roles querying db for a cover art "
                             f"for role [{role_entry.artist_role}] using random "
                             f"artist [{role_entry.random_artist_id}] [{role_entry.random_artist_name}]")
-            artist_cover_art = art_retriever.get_album_cover_art_by_artist_id(
-                artist_id=role_entry.random_artist_id,
-                skip_artist_metadata_cache=True)
+            artist_cover_art = __get_album_cover_art_by_artist_id(artist_id=role_entry.random_artist_id)
         if artist_cover_art:
             upnp_util.set_album_art_from_uri(
                 album_art_uri=subsonic_util.build_cover_art_url(item_id=artist_cover_art),
@@ -2553,7 +2644,7 @@ def handler_artist_appearances(objid, item_identifier: ItemIdentifier, entries:
 def handler_element_artist_role(objid, item_identifier: ItemIdentifier, entries: list) -> list:
     verbose: bool = config.get_verbose_logging()
     artist_role: str = item_identifier.get(ItemIdentifierKey.THING_VALUE)
-    roles_initials: list[persistence.ArtistRoleInitialEntry] = persistence.get_artist_role_initials(artist_role=artist_role)
+    roles_initials: list[persistence.ArtistRoleInitialEntry] = artist_catalogue.get_artist_role_initials(artist_role=artist_role)
     role_initial_entry: persistence.ArtistRoleInitialEntry
     for role_initial_entry in roles_initials if roles_initials else []:
         if verbose:
@@ -2575,9 +2666,7 @@ def handler_element_artist_role(objid, item_identifier: ItemIdentifier, entries:
                 msgproc.log(f"handler_element_artist_role querying db for a cover art "
                             f"for role [{artist_role}] using random "
                             f"artist [{role_initial_entry.random_artist_id}] [{role_initial_entry.random_artist_name}]")
-            artist_cover_art = art_retriever.get_album_cover_art_by_artist_id(
-                artist_id=role_initial_entry.random_artist_id,
-                skip_artist_metadata_cache=True)
+            artist_cover_art = __get_album_cover_art_by_artist_id(artist_id=role_initial_entry.random_artist_id)
         if artist_cover_art:
             upnp_util.set_album_art_from_uri(
                 album_art_uri=subsonic_util.build_cover_art_url(item_id=artist_cover_art),
@@ -2596,7 +2685,7 @@ def handler_element_artist_role_initial(objid, item_identifier: ItemIdentifier,
                     f"initial [{artist_initial}] "
                     f"offset [{offset}]")
     page_size: int = config.get_config_param_as_int(constants.ConfigParam.MAX_ARTISTS_PER_PAGE)
-    artists: list[persistence.ArtistEntry] = persistence.get_artist_by_role_and_initial(
+    artists: list[persistence.ArtistEntry] = artist_catalogue.get_artist_by_role_and_initial(
         artist_role=artist_role,
         initial=artist_initial,
         offset=offset,
@@ -2622,10 +2711,18 @@ def handler_element_artist_role_initial(objid, item_identifier: ItemIdentifier,
                     f"cover arts out of [{len(artists)}] "
                     f"missing [{artist_id_list_missing_cover}]")
     # see if we can get cover arts where missing
-    cover_list_dict: dict[str, list[ArtistAlbumCoverArt]] = persistence.get_cover_art_list_by_artist_id_list(
-        artist_id_list=artist_id_list_missing_cover)
+    catalogue: ArtistCatalogue = artist_catalogue.get()
+    cover_list_dict: dict[str, list[ArtistAlbumCoverArt]] = (
+        persistence.get_cover_art_list_by_artist_id_list(artist_id_list=artist_id_list_missing_cover)
+        if catalogue is None
+        else {})
     curr_artist_id_missing_cover: str
     for curr_artist_id_missing_cover in artist_id_list_missing_cover:
+        if catalogue is not None:
+            catalogue_cover_art: str = catalogue.get_cover_art(curr_artist_id_missing_cover)
+            if catalogue_cover_art:
+                cover_arts_by_artist_id[curr_artist_id_missing_cover] = catalogue_cover_art
+            continue
         # cover art list if available
         lst: list[ArtistAlbumCoverArt] = (cover_list_dict[curr_artist_id_missing_cover]
                                           if curr_artist_id_missing_cover in cover_list_dict
@@ -4337,7 +4434,7 @@ def search_artist_by_artist_name(artist_name: str) -> list[Artist]:
                             f"adding [{current.getId()}] [{current.getName()}]")
             artist_list.append(current)
     # we also want to see if we have matching artist id by the provided artist_name
-    artist_id_list: list[str] = persistence.get_artist_id_list_by_display_name(artist_display_name=artist_name)
+    artist_id_list: list[str] = artist_catalogue.get_artist_id_list_by_display_name(artist_display_name=artist_name)
     if verbose:
         msgproc.log(f"search_artist_by_artist_name handle display names: [{artist_name}] -> [{artist_id_list}]")
     artist_id: str
@@ -40,56 +40,23 @@ import connector_provider
 from msgproc_provider import msgproc
 import constants
 import upmplgutils
+import imagecaching
 import persistence
+import artist_catalogue
+import codec
+from preload_pipeline import PagePipeline
+import preload_sync
 import sqlite3
 import shutil
 import time
 import datetime
-import os
-import glob
-import pathlib
 import threading
 
 
-def get_image_cache_path_for_pruning(www_image_path: list[str]) -> str:
-    # check cache dir
-    cache_dir: str = upmplgutils.getUpnpWebDocRoot(constants.PluginConstant.PLUGIN_NAME.value)
-    if not cache_dir:
-        msgproc.log("Cache directory is not set, cannot allow pruning.")
-        return None
-    candidate: pathlib.Path = pathlib.Path(cache_dir)
-    # does the path actually exist?
-    if not candidate.exists() or not candidate.is_dir():
-        msgproc.log(f"Invalid cache path [{candidate}], cannot allow pruning.")
-        return None
-    # is the provided argument a valid non-empty list?
-    if not www_image_path or not isinstance(www_image_path, list) or len(www_image_path) == 0:
-        msgproc.log("www_image_path is not a valid list, cannot allow pruning.")
-        return None
-    return subsonic_util.ensure_directory(
-        upmplgutils.getUpnpWebDocRoot(constants.PluginConstant.PLUGIN_NAME.value),
-        www_image_path)
-
-
-def prune_cache(images_static_dir: str):
-    now: float = time.time()
-    # list directories
-    file_count: int = 0
-    deleted_count: int = 0
-    max_age_seconds: int = config.get_config_param_as_int(constants.ConfigParam.CACHED_IMAGE_MAX_AGE_DAYS) * (24 * 60 * 60)
-    for filename in glob.glob(f"{images_static_dir}/**/*", recursive=True):
-        filename_path = os.path.normpath(filename)
-        file_count += 1
-        time_diff_sec: float = now - os.path.getmtime(filename_path)
-        if time_diff_sec >= float(max_age_seconds):
-            os.remove(filename_path)
-            deleted_count += 1
-    msgproc.log(f"Deleted [{deleted_count}] cached images out of [{file_count}]")
-
-
 def subsonic_init():
     msgproc.log(f"Subsonic [{constants.PluginConstant.PLUGIN_RELEASE.value}] Initializing ...")
     init_success: bool = False
+    __init_config()
     try:
         cache_dir: str = upmplgutils.getcachedir(constants.PluginConstant.PLUGIN_NAME.value)
         msgproc.log(f"Cache dir for [{constants.PluginConstant.PLUGIN_NAME.value}] is "
@@ -144,18 +111,31 @@ def subsonic_init():
     except Exception as e:
         msgproc.log(f"Subsonic [{constants.PluginConstant.PLUGIN_RELEASE.value}] "
                     f"Initialization failed [{e}]")
-    if config.get_config_param_as_bool(constants.ConfigParam.ENABLE_CACHED_IMAGE_AGE_LIMIT):
-        prune_path: str = get_image_cache_path_for_pruning(config.get_webserver_path_images_cache())
-        if prune_path:
-            msgproc.log(f"Pruning image cache at path [{prune_path}] ...")
-            prune_cache(images_static_dir=prune_path)
-            msgproc.log(f"Pruned image cache at path [{prune_path}].")
-    else:
-        msgproc.log("Image pruning disabled.")
+    if config.getWebServerDocumentRoot() and (
+            config.get_config_param_as_bool(constants.ConfigParam.ENABLE_IMAGE_CACHING) or
+            config.get_config_param_as_bool(constants.ConfigParam.ENABLE_CACHED_IMAGE_AGE_LIMIT)):
+        # index the image cache once, lookups are served from memory afterwards
+        try:
+            image_cache: imagecaching.ImageCache = subsonic_util.get_image_cache()
+            # evict by age/size in background
+            image_cache.start_eviction(
+                interval_sec=config.get_config_param_as_int(constants.ConfigParam.CACHED_IMAGE_EVICTION_INTERVAL_SEC),
+                max_count_per_run=config.get_config_param_as_int(constants.ConfigParam.CACHED_IMAGE_MAX_EVICTIONS_PER_RUN))
+        except Exception as ex:
+            msgproc.log(f"Cannot index image cache due to [{type(ex)}] [{ex}]")
+    # new identifiers are also written outside of requests, and when upmpdcli closes our input
+    codec.start_flusher(interval_sec=config.get_config_param_as_int(constants.ConfigParam.IDENTIFIER_FLUSH_INTERVAL_SEC))
+    msgproc.em.exitfunc = __on_plugin_exit
     msgproc.log(f"Subsonic [{constants.PluginConstant.PLUGIN_RELEASE.value}] "
                 f"Initialization success: [{init_success}]")
 
 
+def __on_plugin_exit(exit_value: int):
+    codec.flush()
+    written: int = persistence.flush_kv_write_buffer()
+    msgproc.log(f"Subsonic exiting with [{exit_value}], pending key-value items written [{written}]")
+
+
 def detect_anomalies():
     # detect_multiple_artists()
     pass
@@ -207,7 +187,7 @@ def wrap_action_with_connection(action: Callable[[sqlite3.Connection], Any], con
     except Exception as ex:
         msgproc.log(f"{context} failed [{type(ex)}] [{ex}]")
         # don't commit
-        connection.rollback()
+        persistence.rollback(connection)
         connection.close()
     persistence.commit(connection)
     connection.close()
@@ -256,15 +236,68 @@ def get_loaded_song_list(loaded_by_album_id: dict[str, list[Song]], album_id: st
     return existing
 
 
-def preload_songs(connection: sqlite3.Connection, preload_albums_result: PreloadAlbumsResult):
-    msgproc.log("preload_songs starting ...")
+def __save_album_metadata_page(
+        album_list: list[Album],
+        connection: sqlite3.Connection) -> dict[str, persistence.SaveMode]:
+    try:
+        return persistence.save_album_metadata_list(
+            album_metadata_list=[metadata_converter.build_album_metadata(album=album) for album in album_list],
+            context="preload",
+            connection=connection,
+            do_commit=False)
+    except Exception as ex:
+        msgproc.log(f"preload_albums bulk save failed [{type(ex)}] [{ex}], saving one by one ...")
+    result: dict[str, persistence.SaveMode] = {}
+    album: Album
+    for album in album_list:
+        try:
+            _, result[album.getId()] = persistence.save_album_metadata(
+                album_metadata=metadata_converter.build_album_metadata(album=album),
+                context="preload",
+                connection=connection,
+                do_commit=False)
+        except Exception as ex:
+            msgproc.log(f"preload_albums error while saving album_id [{album.getId()}] [{type(ex)}] [{ex}]")
+    return result
+
+
+def __save_song_metadata_page(
+        song_list: list[Song],
+        connection: sqlite3.Connection) -> dict[str, persistence.SaveMode]:
+    try:
+        return persistence.save_song_metadata_list(
+            song_metadata_list=[metadata_converter.build_song_metadata(song=song) for song in song_list],
+            context="preload",
+            connection=connection,
+            do_commit=False)
+    except Exception as ex:
+        msgproc.log(f"preload_songs bulk save failed [{type(ex)}] [{ex}], saving one by one ...")
+    result: dict[str, persistence.SaveMode] = {}
+    song: Song
+    for song in song_list:
+        try:
+            _, result[song.getId()] = persistence.save_song_metadata(
+                song_metadata=metadata_converter.build_song_metadata(song=song),
+                context="preload",
+                connection=connection,
+                do_commit=False)
+        except Exception as ex:
+            msgproc.log(f"preload_songs error while saving song_id [{song.getId()}] [{type(ex)}] [{ex}]")
+    return result
+
+
+def preload_songs(
+        connection: sqlite3.Connection,
+        preload_albums_result: PreloadAlbumsResult,
+        song_list: list[Song] = None):
+    # with song_list, only those songs are stored and nothing is pruned
+    msgproc.log(f"preload_songs starting (delta [{song_list is not None}]) ...")
     verbose_logging: bool = config.get_verbose_logging()
     preload_verbose_logging: bool = (verbose_logging and
                                      config.get_config_param_as_bool(constants.ConfigParam.PRELOAD_VERBOSE_LOGGING))
     start: float = time.time()
     enabled_album_property_key_list: list[AlbumPropertyKey] = config.get_enabled_album_property_key_list()
     preload_start: datetime.datetime = datetime.datetime.now()
-    song_offset: int = 0
     total_stored: int = 0
     req_count: int = constants.Defaults.SUBSONIC_API_MAX_RETURN_SIZE.value
     insert_count: int = 0
@@ -272,24 +305,32 @@ def preload_songs(connection: sqlite3.Connection, preload_albums_result: Preload
     skip_count: int = 0
     album_id_set: set[str] = set()
     missing_album_id_set: set[str] = set()
-    save_mode: persistence.SaveMode
     loaded_by_album_id: dict[str, list[Song]] = {}
     song_count_by_album_id: dict[str, int] = {}
-    while True:
+    fetcher_count: int = config.get_config_param_as_int(constants.ConfigParam.PRELOAD_FETCHER_COUNT)
+    music_folder_id: str = config.get_config_param_as_str(constants.ConfigParam.MUSIC_FOLDER_ID)
+
+    def fetch_page(song_offset: int, song_count: int) -> list[Song]:
+        if song_list is not None:
+            return song_list[song_offset:song_offset + song_count]
         res: SearchResult = connector_provider.get().search(
             query="",
-            songCount=req_count,
+            songCount=song_count,
             songOffset=song_offset,
             artistCount=0,
             albumCount=0,
-            musicFolderId=config.get_config_param_as_str(constants.ConfigParam.MUSIC_FOLDER_ID))
-        retrieved: int = len(res.getSongs())
+            musicFolderId=music_folder_id)
+        return res.getSongs()
+
+    def store_page(song_offset: int, page: list[Song]):
+        nonlocal total_stored, insert_count, update_count, skip_count
+        retrieved: int = len(page)
         song: Song
         partial_insert_count: int = 0
         partial_update_count: int = 0
         partial_skip_count: int = 0
-        cnt: int = 0
-        for song in res.getSongs():
+        to_save: list[Song] = []
+        for song in page:
             album_exists: bool = song.getAlbumId() in album_id_set
             if not album_exists:
                 if song.getAlbumId() not in missing_album_id_set:
@@ -302,30 +343,28 @@ def preload_songs(connection: sqlite3.Connection, preload_albums_result: Preload
                         album_exists = True
                     else:
                         missing_album_id_set.add(song.getAlbumId())
-            cnt += 1
             if not album_exists:
                 msgproc.log(f"Skipping song [{song.getId()}] (missing album [{song.getAlbumId()}])")
                 partial_skip_count += 1
                 continue
+            to_save.append(song)
+        save_mode_by_song_id: dict[str, persistence.SaveMode] = __save_song_metadata_page(
+            song_list=to_save,
+            connection=connection)
+        cnt: int = 0
+        for song in to_save:
+            cnt += 1
+            save_mode: persistence.SaveMode = save_mode_by_song_id.get(song.getId())
             if preload_verbose_logging:
-                msgproc.log(f"preload_songs for [{song.getId()}] "
-                            f"[{cnt}] of [{retrieved}] ([{cnt + song_offset}])...")
-            try:
-                _, save_mode = persistence.save_song_metadata(
-                    song_metadata=metadata_converter.build_song_metadata(song=song),
-                    context="preload",
-                    connection=connection,
-                    do_commit=False)
-            except Exception as ex:
-                msgproc.log(f"preload_songs error while saving song_id [{song.getId()}] [{type(ex)}] [{ex}]")
-            if preload_verbose_logging:
-                msgproc.log(f"preload_songs saved song_id [{song.getId()}] as [{save_mode}]")
+                msgproc.log(f"preload_songs saved song_id [{song.getId()}] as [{save_mode}] "
+                            f"[{cnt}] of [{len(to_save)}] ([{cnt + song_offset}])")
             if save_mode == persistence.SaveMode.INSERTED:
                 partial_insert_count += 1
             elif save_mode == persistence.SaveMode.UPDATED:
                 partial_update_count += 1
             else:
-                raise Exception(f"Invalid mode [{save_mode}]")
+                # could not be saved, already logged
+                continue
             persistence.save_song_album_artist_list(
                 song_id=song.getId(),
                 album_id=song.getAlbumId(),
@@ -385,10 +424,6 @@ def preload_songs(connection: sqlite3.Connection, preload_albums_result: Preload
                         do_commit=False)
                 # purge from loaded_by_album_id
                 del loaded_by_album_id[song.getAlbumId()]
-                # commit for every slice of entries
-                persistence.commit(connection=connection)
-                # allow main thread
-                time.sleep(0.001)
         total_stored += retrieved
         insert_count += partial_insert_count
         update_count += partial_update_count
@@ -401,18 +436,23 @@ def preload_songs(connection: sqlite3.Connection, preload_albums_result: Preload
                     f"i:[{insert_count}] "
                     f"u:[{update_count}] "
                     f"s:[{skip_count}])")
-        if (retrieved < req_count):
-            # finished.
-            break
-        song_offset += retrieved
+        # commit for every slice of entries
+        persistence.commit(connection=connection)
+
+    PagePipeline(
+        name="preload_songs",
+        fetch_page=fetch_page,
+        page_size=req_count,
+        fetcher_count=fetcher_count if song_list is None else 1).run(store_page)
     # get count after loading entries
     count_before_prune: int = persistence.get_table_count(
         table_name=TableName.ALBUM_METADATA_V1,
         connection=connection)
-    prune_count: int = persistence.prune_song_metadata(
+    prune_count: int = (persistence.prune_song_metadata(
         update_timestamp=preload_start,
         connection=connection,
         do_commit=False)
+        if song_list is None else 0)
     elapsed: float = time.time() - start
     per_sec: float = float(total_stored) / elapsed
     msgproc.log(f"preload_songs loaded [{total_stored}] "
@@ -422,8 +462,9 @@ def preload_songs(connection: sqlite3.Connection, preload_albums_result: Preload
                 f"[{per_sec:.3f}] songs/sec")
 
 
-def preload_albums(connection: sqlite3.Connection) -> PreloadAlbumsResult:
-    msgproc.log("preload_albums starting ...")
+def preload_albums(connection: sqlite3.Connection, album_list: list[Album] = None) -> PreloadAlbumsResult:
+    # with album_list, only those albums are stored and nothing is pruned
+    msgproc.log(f"preload_albums starting (delta [{album_list is not None}]) ...")
     result: PreloadAlbumsResult = PreloadAlbumsResult()
     verbose_logging: bool = config.get_verbose_logging()
     preload_verbose_logging: bool = (verbose_logging and
@@ -431,26 +472,36 @@ def preload_albums(connection: sqlite3.Connection) -> PreloadAlbumsResult:
     start: float = time.time()
     preload_start: datetime.datetime = datetime.datetime.now()
     enabled_album_property_key_list: list[AlbumPropertyKey] = config.get_enabled_album_property_key_list()
-    album_offset: int = 0
     total_stored: int = 0
     req_count: int = constants.Defaults.SUBSONIC_API_MAX_RETURN_SIZE.value
     insert_count: int = 0
     update_count: int = 0
-    save_mode: persistence.SaveMode
-    while True:
+    fetcher_count: int = config.get_config_param_as_int(constants.ConfigParam.PRELOAD_FETCHER_COUNT)
+    music_folder_id: str = config.get_config_param_as_str(constants.ConfigParam.MUSIC_FOLDER_ID)
+
+    def fetch_page(album_offset: int, album_count: int) -> list[Album]:
+        if album_list is not None:
+            return album_list[album_offset:album_offset + album_count]
         res: SearchResult = connector_provider.get().search(
             query="",
-            albumCount=req_count,
+            albumCount=album_count,
             albumOffset=album_offset,
             artistCount=0,
             songCount=0,
-            musicFolderId=config.get_config_param_as_str(constants.ConfigParam.MUSIC_FOLDER_ID))
-        retrieved: int = len(res.getAlbums())
+            musicFolderId=music_folder_id)
+        return res.getAlbums()
+
+    def store_page(album_offset: int, page: list[Album]):
+        nonlocal total_stored, insert_count, update_count
+        retrieved: int = len(page)
+        save_mode_by_album_id: dict[str, persistence.SaveMode] = __save_album_metadata_page(
+            album_list=page,
+            connection=connection)
         album: Album
         partial_insert_count: int = 0
         partial_update_count: int = 0
         cnt: int = 0
-        for album in res.getAlbums():
+        for album in page:
             cnt += 1
             if preload_verbose_logging:
                 msgproc.log(f"preload_albums for [{album.getId()}] "
@@ -459,20 +510,14 @@ def preload_albums(connection: sqlite3.Connection) -> PreloadAlbumsResult:
             if has_album_artist:
                 msgproc.log(f"preload_albums WARNING album [{album.getId()}] "
                             f"has [{constants.ItemKey.ALBUM_ARTISTS.value}] unexpectedly")
-            try:
-                _, save_mode = persistence.save_album_metadata(
-                    album_metadata=metadata_converter.build_album_metadata(album=album),
-                    context="preload",
-                    connection=connection,
-                    do_commit=False)
-            except Exception as ex:
-                msgproc.log(f"preload_albums error while saving album_id [{album.getId()}] [{type(ex)}] [{ex}]")
+            save_mode: persistence.SaveMode = save_mode_by_album_id.get(album.getId())
             if save_mode == persistence.SaveMode.INSERTED:
                 partial_insert_count += 1
             elif save_mode == persistence.SaveMode.UPDATED:
                 partial_update_count += 1
             else:
-                raise Exception(f"Invalid mode [{save_mode}]")
+                # could not be saved, already logged
+                continue
             album_properties = subsonic_util.build_album_properties(album=album)
             # filter properties based on enabled keys
             album_properties = {k: v for k, v in album_properties.items() if k in [x.property_key for x in enabled_album_property_key_list]}
@@ -542,23 +587,24 @@ def preload_albums(connection: sqlite3.Connection) -> PreloadAlbumsResult:
                     f"(total [{total_stored}] "
                     f"ins [{insert_count}] "
                     f"upd [{update_count}])")
-        if (retrieved < req_count):
-            # finished.
-            break
-        album_offset += retrieved
         # commit for every slice of entries
         persistence.commit(connection=connection)
-        # allow main thread
-        time.sleep(0.001)
+
+    PagePipeline(
+        name="preload_albums",
+        fetch_page=fetch_page,
+        page_size=req_count,
+        fetcher_count=fetcher_count if album_list is None else 1).run(store_page)
     # get count after loading entries
     count_before_prune: int = persistence.get_table_count(
         table_name=TableName.ALBUM_METADATA_V1,
         connection=connection)
     # prune
-    prune_count: int = persistence.prune_album_metadata(
+    prune_count: int = (persistence.prune_album_metadata(
         update_timestamp=preload_start,
         connection=connection,
         do_commit=False)
+        if album_list is None else 0)
     elapsed: float = time.time() - start
     per_sec: float = float(total_stored) / elapsed
     msgproc.log(f"preload_albums loaded [{total_stored}] "
@@ -622,6 +668,62 @@ def preload_artists(connection: sqlite3.Connection):
                 f"[{per_sec:.3f}] artists/sec")
 
 
+def delta_sync(
+        sync_mode: preload_sync.SyncMode,
+        preload_songs_enabled: bool,
+        server_last_modified: int | None,
+        sync_start: float):
+    start: float = time.time()
+    if sync_mode == preload_sync.SyncMode.RECONCILE:
+        album_id_list: list[str] = preload_sync.fetch_album_id_list()
+        if len(album_id_list) > 0:
+            deleted_album_count: int = wrap_action_with_connection(
+                action=lambda x: persistence.delete_album_metadata_not_in(
+                    album_id_list=album_id_list,
+                    connection=x,
+                    do_commit=False),
+                context="delta_sync reconcile albums")
+            deleted_song_count: int = persistence.delete_orphan_song_metadata()
+            msgproc.log(f"delta_sync reconcile server albums [{len(album_id_list)}] "
+                        f"deleted albums [{deleted_album_count}] "
+                        f"deleted songs [{deleted_song_count}]")
+            preload_sync.save_reconcile(sync_start=sync_start)
+        else:
+            msgproc.log("delta_sync reconcile skipped, no albums returned by the server")
+    elif sync_mode == preload_sync.SyncMode.NONE:
+        msgproc.log("delta_sync no changes on the server")
+        return
+    high_water_mark: datetime.datetime | None = persistence.get_newest_album_created()
+    album_list: list[Album] = preload_sync.fetch_albums_created_after(high_water_mark=high_water_mark)
+    msgproc.log(f"delta_sync [{len(album_list)}] albums created after [{high_water_mark}]")
+    # albums whose songs could not be loaded by the previous sync are below the high-water mark
+    new_album_id_set: set[str] = set(album.getId() for album in album_list)
+    retry_album_id_list: list[str] = [x for x in preload_sync.load_retry_album_id_list() if x not in new_album_id_set]
+    if len(retry_album_id_list) > 0:
+        retry_album_list: list[Album] = preload_sync.fetch_albums_by_id_list(album_id_list=retry_album_id_list)
+        msgproc.log(f"delta_sync retrying [{len(retry_album_list)}] of [{len(retry_album_id_list)}] albums")
+        album_list.extend(retry_album_list)
+    failed_album_id_list: list[str] = []
+    if len(album_list) > 0:
+        preload_albums_result: PreloadAlbumsResult = wrap_action_with_connection(
+            action=lambda x: preload_albums(x, album_list=album_list),
+            context="delta_sync preload_albums")
+        if preload_songs_enabled:
+            fetched_songs: preload_sync.FetchedSongs = preload_sync.fetch_songs_by_album_list(album_list=album_list)
+            wrap_action_with_connection(
+                action=lambda x: preload_songs(x, preload_albums_result, song_list=fetched_songs.song_list),
+                context="delta_sync preload_songs")
+            failed_album_id_list = fetched_songs.failed_album_id_list
+    preload_sync.save_retry_album_id_list(failed_album_id_list)
+    if len(failed_album_id_list) > 0:
+        # the next sync must not be skipped as unchanged
+        msgproc.log(f"delta_sync songs of [{len(failed_album_id_list)}] albums not loaded, "
+                    "server last modified not saved")
+    else:
+        preload_sync.save_server_last_modified(server_last_modified=server_last_modified)
+    msgproc.log(f"delta_sync [{sync_mode.name}] completed in [{(time.time() - start):.3f}] sec")
+
+
 def initial_caching():
     thread = threading.Thread(target=initial_caching_executor, args=tuple([]))
     # Start it
@@ -657,8 +759,34 @@ def initial_caching_executor():
             msgproc.log("initial_caching skipping preload_artists because "
                         f"start - oldest [{(initial_caching_start - oldest).total_seconds()}] <= "
                         f"max_delta [{preload_max_delta_sec}]")
+    delta_sync_enabled: bool = preload_albums_enabled and config.get_config_param_as_bool(
+        constants.ConfigParam.PRELOAD_DELTA_SYNC)
+    sync_mode: preload_sync.SyncMode = preload_sync.SyncMode.FULL
+    server_last_modified: int | None = None
+    if delta_sync_enabled:
+        sync_state: preload_sync.SyncState = preload_sync.load_state()
+        server_last_modified = preload_sync.get_server_last_modified(
+            if_modified_since=sync_state.server_last_modified)
+        sync_mode = preload_sync.get_sync_mode(
+            state=sync_state,
+            server_last_modified=server_last_modified,
+            now=preload_start)
+        msgproc.log(f"initial_caching sync mode [{sync_mode.name}] "
+                    f"state {sync_state} "
+                    f"server last modified [{server_last_modified}]")
+    if sync_mode != preload_sync.SyncMode.FULL:
+        try:
+            delta_sync(
+                sync_mode=sync_mode,
+                preload_songs_enabled=preload_songs_enabled,
+                server_last_modified=server_last_modified,
+                sync_start=preload_start)
+        except Exception as ex:
+            msgproc.log(f"delta_sync failed [{type(ex)}] [{ex}]")
+            preload_success = False
     preload_albums_result: PreloadAlbumsResult = None
-    if preload_albums_enabled:
+    preload_songs_success: bool = True
+    if preload_albums_enabled and sync_mode == preload_sync.SyncMode.FULL:
         oldest = persistence.get_oldest_metadata(table_name=TableName.ALBUM_METADATA_V1)
         album_initial_count: int = persistence.get_table_count(table_name=TableName.ALBUM_METADATA_V1)
         msgproc.log(f"initial_caching {TableName.ALBUM_METADATA_V1.value} "
@@ -676,7 +804,7 @@ def initial_caching_executor():
             msgproc.log("initial_caching skipping preload_albums because "
                         f"start - oldest [{(initial_caching_start - oldest).total_seconds()}] <= "
                         f"max_delta [{preload_max_delta_sec}]")
-    if preload_songs_enabled:
+    if preload_songs_enabled and sync_mode == preload_sync.SyncMode.FULL:
         msgproc.log(f"Preloaded [{preload_albums_result.album_count if preload_albums_result else 0}] albums, "
                     "starting song preload")
         oldest = persistence.get_oldest_metadata(table_name=TableName.SONG_METADATA_V1)
@@ -691,16 +819,47 @@ def initial_caching_executor():
                     context="preload_songs")
             except Exception as ex:
                 msgproc.log(f"preload_songs failed [{type(ex)}] [{ex}]")
+                preload_songs_success = False
         else:
             msgproc.log("initial_caching skipping preload_songs because "
                         f"start - oldest [{(initial_caching_start - oldest).total_seconds()}] <= "
                         f"max_delta [{preload_max_delta_sec}]")
+    if (delta_sync_enabled and
+            sync_mode == preload_sync.SyncMode.FULL and
+            preload_albums_result is not None and
+            preload_songs_success):
+        # next restarts can be incremental
+        preload_sync.save_full_sync(
+            sync_start=preload_start,
+            server_last_modified=server_last_modified)
+    try:
+        # album property browser does not wait for the index
+        persistence.load_album_facet_index()
+    except Exception as ex:
+        msgproc.log(f"load_album_facet_index failed [{type(ex)}] [{ex}]")
+    try:
+        # reload, preload might have added albums
+        persistence.load_random_samplers()
+    except Exception as ex:
+        msgproc.log(f"load_random_samplers failed [{type(ex)}] [{ex}]")
+    try:
+        if config.get_config_param_as_bool(constants.ConfigParam.ENABLE_ARTIST_CATALOGUE):
+            artist_catalogue.refresh()
+    except Exception as ex:
+        msgproc.log(f"artist_catalogue refresh failed [{type(ex)}] [{ex}]")
     preload_elapsed: float = time.time() - preload_start
     if preload_artists_enabled or preload_albums_enabled or preload_songs_enabled:
         msgproc.log(f"initial_caching completed with success [{preload_success}] "
                     f"in [{preload_elapsed:.3f}]")
 
 
+def __init_config():
+    if config.get_config_param_as_bool(constants.ConfigParam.ENABLE_CONFIG_RELOAD_ON_SIGHUP):
+        installed: bool = config.install_reload_config_on_sighup(logger=msgproc.log)
+        msgproc.log(f"subsonic_init config reload on SIGHUP installed [{installed}]")
+
+
 def purge_id_cache():
     if config.get_config_param_as_bool(constants.ConfigParam.PURGE_IDENTIFIER_CACHE):
         persistence.purge_id_cache()
+        codec.reset()
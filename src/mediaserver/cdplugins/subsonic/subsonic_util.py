@@ -31,6 +31,7 @@ from element_type import ElementType
 from artist_from_album import ArtistFromAlbum
 from typing import Optional
 from album_metadata import AlbumMetadata
+from artist_metadata import ArtistMetadata
 from song_data_structures import SongArtist
 from song_data_structures import SongContributor
 from song_data_structures import SongArtistType
@@ -40,6 +41,8 @@ from metadata_model import AlbumMetadataModel
 import audio_codec
 
 import request_cache
+import image_cache_provider
+import imagecaching
 import connector_provider
 import cache_manager_provider
 
@@ -53,7 +56,6 @@ import secrets
 import constants
 import requests
 import mimetypes
-import glob
 import copy
 import os
 import time
@@ -1699,37 +1701,17 @@ def __build_cover_art_url(item_id: str, force_save: bool = False) -> str:
         save_start: float = time.time()
         if verbose:
             msgproc.log(f"__build_cover_art_url saving image for item_id [{item_id}] ...")
-        images_cached_dir: str = ensure_directory(
-            config.getWebServerDocumentRoot(),
-            config.get_webserver_path_images_cache())
-        ensure_directory_elapsed: float = time.time() - save_start
-        if verbose:
-            msgproc.log(f"__build_cover_art_url ensured directory [{images_cached_dir}] "
-                        f"exists in [{ensure_directory_elapsed:.3f}]")
+        image_cache: imagecaching.ImageCache = get_image_cache()
+        images_cached_dir: str = image_cache.directory
         exists: str = False
         matching_files: list[str] = []
         cached_file_name: str = item_id
         cached_file_path: str = os.path.join(images_cached_dir, item_id)
-        item_id_ext: str = os.path.splitext(cached_file_path)[1]
-        if item_id_ext:
-            # cached_file_path has extension, we convert that to lower case
-            item_id_ext = item_id_ext.lower()
-        item_id_with_ext: str = cached_file_path if item_id_ext else None
-        if not item_id_with_ext:
-            # item_id does not have an extension
-            matching_files = __match_images_only(glob.glob(f"{cached_file_path}.*"))
-            if matching_files and len(matching_files) > 0:
-                item_id_with_ext = os.path.basename(matching_files[0])
-                # remove other matching_files files ...
-                to_remove: str
-                for to_remove in matching_files[1:]:
-                    msgproc.log(f"__build_cover_art_url removing spurious file [{to_remove}] ...")
-                    os.remove(to_remove)
-                exists = True
-        else:
-            exists = os.path.exists(cached_file_path)
-            if exists:
-                matching_files = [cached_file_path]
+        item_id_with_ext: str = image_cache.get_file_name(item_id=item_id)
+        if item_id_with_ext:
+            exists = True
+            matching_files = [os.path.join(images_cached_dir, item_id_with_ext)]
+            image_cache.touch(file_name=item_id_with_ext)
         serve_local: bool = False
         if exists and not force_save:
             # file exists or force_save not set
@@ -1740,6 +1722,7 @@ def __build_cover_art_url(item_id: str, force_save: bool = False) -> str:
                 # remove matching_files
                 to_remove: str
                 for to_remove in matching_files:
+                    image_cache.remove(file_name=os.path.basename(to_remove))
                     try:
                         os.remove(to_remove)
                     except Exception as ex:
@@ -1778,6 +1761,7 @@ def __build_cover_art_url(item_id: str, force_save: bool = False) -> str:
                         img_data: bytes = response.content
                         with open(cached_file_path, 'wb') as handler:
                             handler.write(img_data)
+                        image_cache.add(file_name=item_id_with_ext, size=len(img_data))
                         serve_local = True
             except Exception as ex:
                 msgproc.log(f"__build_cover_art_url could not save file [{cached_file_path}] due to [{type(ex)}] [{ex}]")
@@ -1794,6 +1778,19 @@ def __build_cover_art_url(item_id: str, force_save: bool = False) -> str:
         return cover_art_url
 
 
+def get_image_cache() -> imagecaching.ImageCache:
+    image_cache: imagecaching.ImageCache = image_cache_provider.get()
+    if not image_cache:
+        # not loaded at init time, load now
+        images_cached_dir: str = ensure_directory(
+            config.getWebServerDocumentRoot(),
+            config.get_webserver_path_images_cache())
+        image_cache = image_cache_provider.get_or_create(
+            directory=images_cached_dir,
+            accept=lambda x: match_supported_image_type_by_name(x) is not None)
+    return image_cache
+
+
 def __build_image_path_as_list(item_id_with_ext: str) -> list[str]:
     path: list[str] = list()
     path.extend(config.get_webserver_path_images_cache())
@@ -1801,20 +1798,6 @@ def __build_image_path_as_list(item_id_with_ext: str) -> list[str]:
     return compose_docroot_url(os.path.join(*path))
 
 
-def __match_images_only(match_list: list[str]) -> list[str]:
-    verbose: bool = config.get_verbose_logging()
-    result: list[str] = []
-    for m in match_list if match_list else []:
-        if match_supported_image_type_by_name(m):
-            if verbose:
-                msgproc.log(f"__match_images_only matching image success for [{m}]")
-            result.append(m)
-        else:
-            if verbose:
-                msgproc.log(f"__match_images_only matching image failed for [{m}]")
-    return result
-
-
 def get_album_disc_numbers(album: Album) -> list[int]:
     disc_list: list[int] = []
     song: Song
@@ -1927,12 +1910,18 @@ def get_song_contributors(song: Song) -> list[SongContributor]:
     return res
 
 
-def set_artist_metadata_by_artist_id(artist_id: str, target: dict):
+def set_artist_metadata_by_artist_id(
+        artist_id: str,
+        target: dict,
+        artist_metadata: ArtistMetadata = None,
+        genre_list: list[str] = None):
+    # metadata and genres are loaded if not provided
     upnp_util.set_upmpd_meta(
         upmpdmeta.UpMpdMeta.ARTIST_ID,
         artist_id,
         target)
-    artist_metadata: persistence.ArtistMetadata = persistence.get_artist_metadata(artist_id=artist_id)
+    if artist_metadata is None:
+        artist_metadata = persistence.get_artist_metadata(artist_id=artist_id)
     if artist_metadata:
         upnp_util.set_upnp_meta(
             constants.UpnpMeta.ARTIST,
@@ -1953,7 +1942,9 @@ def set_artist_metadata_by_artist_id(artist_id: str, target: dict):
             name_key_to_display(artist_metadata.artist_media_type),
             target)
     # genres?
-    genre_list: list[str] = persistence.get_genre_list_by_artist_id(artist_id=artist_id)
+    genre_list = (list(genre_list)
+                  if genre_list is not None
+                  else persistence.get_genre_list_by_artist_id(artist_id=artist_id))
     genre_list.sort()
     genres_display_value: str = join_with_comma(genre_list)
     upnp_util.set_upnp_meta(
@@ -2223,20 +2214,10 @@ def __mixed_lossless_lossy(lossless_count: int, lossy_count: int) -> str:
             f"lossy ({lossy_count} {'songs' if lossy_count > 1 else 'song'})")
 
 
-def get_cached_image_subdir_list() -> list[str]:
-    return [
-        constants.PluginConstant.PLUGIN_NAME.value,
-        constants.PluginConstant.CACHED_IMAGES_DIRECTORY.value]
-
-
 def cached_images_exist(image_file_name: str) -> list[str]:
-    document_root_dir: str = config.getWebServerDocumentRoot()
-    if document_root_dir:
-        sub_dir_list: list[str] = get_cached_image_subdir_list()
-        image_dir: str = ensure_directory(base_dir=document_root_dir, sub_dir_list=sub_dir_list)
-        cached_file_name_no_ext: str = f"{str(image_file_name)}"
-        cached_files: list[str] = __match_images_only(glob.glob(f"{os.path.join(image_dir, cached_file_name_no_ext)}.*"))
-        return cached_files if cached_files else []
+    if config.getWebServerDocumentRoot():
+        cached_file: str = get_image_cache().get_file_path(item_id=str(image_file_name))
+        return [cached_file] if cached_file else []
     return []
 
 
@@ -0,0 +1,267 @@
+# Copyright (C) 2026 Giovanni Fulco
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+# the in-memory index must answer the album property browser exactly like the sql queries
+# the sql path is forced by passing a connection, the index path by passing none
+
+import random
+import sqlite3
+import unittest
+
+from album_facet_index import AlbumFacetIndex
+from album_metadata import AlbumMetadata
+from album_property_key import AlbumPropertyKeyValue
+from album_property_key import AlbumPropertyKeyOccurrence
+from album_property_key import AlbumPropertyValueOccurrence
+from metadata_model import AlbumMetadataModel
+import persistence
+
+ALBUM_PREFIX: str = "facet-test-"
+KEY_VALUE_LIST: dict[str, list[str]] = {
+    "genre": ["rock", "jazz", "classical", "pop", "ambient", "blues"],
+    "year": [str(y) for y in range(1990, 2000)],
+    "label": ["ecm", "blue note", "warp", "4ad"],
+    "mood": ["calm", "dark", "bright"],
+    "format": ["cd"]}
+
+
+def create_album_properties(rng: random.Random) -> dict[str, list[str]]:
+    properties: dict[str, list[str]] = {}
+    key: str
+    for key, value_list in KEY_VALUE_LIST.items():
+        # keys can be missing, mood can be multi-valued
+        if rng.random() < 0.25:
+            continue
+        properties[key] = rng.sample(value_list, k=rng.randint(1, 2)) if key == "mood" else [rng.choice(value_list)]
+    return properties
+
+
+def save_album(album_id: str, properties: dict[str, list[str]]):
+    album_metadata: AlbumMetadata = AlbumMetadata()
+    album_metadata.set_value(AlbumMetadataModel.ALBUM_ID, album_id)
+    persistence.save_album_metadata(album_metadata=album_metadata)
+    persistence.save_album_properties(album_id=album_id, properties=properties, delete_all=True)
+
+
+class TestAlbumFacetIndexEquivalence(unittest.TestCase):
+
+    def setUp(self):
+        self.rng: random.Random = random.Random(1234)
+        self.album_id_list: list[str] = [f"{ALBUM_PREFIX}{i:04d}" for i in range(150)]
+        album_id: str
+        for album_id in self.album_id_list:
+            save_album(album_id, create_album_properties(self.rng))
+        # one album without properties is not part of the universe
+        save_album(f"{ALBUM_PREFIX}empty", {})
+        # built from the database on first use
+        persistence.load_album_facet_index()
+
+    def tearDown(self):
+        album_id: str
+        for album_id in self.album_id_list + [f"{ALBUM_PREFIX}empty"]:
+            persistence.delete_album_metadata(album_id=album_id)
+
+    def test_random_drill_down_matches_sql(self):
+        walk: int
+        for walk in range(40):
+            condition_list: list[AlbumPropertyKeyValue] = []
+            while True:
+                self.assert_equivalent(condition_list)
+                key_list: list[AlbumPropertyKeyOccurrence] = self.__sql(
+                    persistence.get_album_property_key_occurence_list,
+                    condition_list=condition_list)
+                selectable: list[AlbumPropertyKeyOccurrence] = [
+                    k for k in key_list if k.property_key not in [c.key for c in condition_list]]
+                if not selectable:
+                    break
+                key: AlbumPropertyKeyOccurrence = self.rng.choice(selectable)
+                if key.is_missing_for_some and self.rng.random() < 0.3:
+                    # negative condition: albums without the key
+                    condition_list.append(AlbumPropertyKeyValue(key=key.property_key, value=None))
+                    continue
+                value_list: list[AlbumPropertyValueOccurrence] = self.__sql(
+                    persistence.get_album_property_value_occurence_list,
+                    condition_list=condition_list,
+                    property_key=key.property_key)
+                condition_list.append(AlbumPropertyKeyValue(
+                    key=key.property_key,
+                    value=self.rng.choice(value_list).property_value))
+
+    def test_conditions_matching_nothing(self):
+        self.assert_equivalent([AlbumPropertyKeyValue(key="genre", value="no-such-genre")])
+        self.assert_equivalent([AlbumPropertyKeyValue(key="no-such-key", value="x")])
+        self.assert_equivalent([AlbumPropertyKeyValue(key="format", value=None),
+                                AlbumPropertyKeyValue(key="format", value="cd")])
+
+    def test_updates_keep_index_in_sync(self):
+        # replace some keys only
+        persistence.save_album_properties(
+            album_id=self.album_id_list[0],
+            properties={"genre": ["jazz"], "mood": ["calm", "dark"]})
+        # replace everything
+        persistence.save_album_properties(
+            album_id=self.album_id_list[1],
+            properties={"year": ["1990"]},
+            delete_all=True)
+        # remove all properties, then the album itself
+        persistence.save_album_properties(album_id=self.album_id_list[2], properties={}, delete_all=True)
+        persistence.delete_album_metadata(album_id=self.album_id_list[3])
+        # new values and keys
+        persistence.save_album_properties(
+            album_id=self.album_id_list[4],
+            properties={"genre": ["drone"], "country": ["it"]})
+        # properties for an album which had none
+        persistence.save_album_properties(album_id=f"{ALBUM_PREFIX}empty", properties={"genre": ["rock"]})
+        self.assertTrue(persistence.load_album_facet_index())
+        self.assert_drill_down_samples()
+
+    def test_rollback_keeps_index_on_committed_data(self):
+        connection: sqlite3.Connection = persistence.get_working_connection()
+        try:
+            persistence.save_album_properties(
+                album_id=self.album_id_list[0],
+                properties={"genre": ["rollback-genre"]},
+                connection=connection,
+                do_commit=False)
+            # not visible before commit
+            self.assert_equivalent([AlbumPropertyKeyValue(key="genre", value="rollback-genre")])
+            persistence.rollback(connection)
+        finally:
+            connection.close()
+        self.assertEqual(
+            persistence.get_album_property_matching_count(
+                condition_list=[AlbumPropertyKeyValue(key="genre", value="rollback-genre")]),
+            0)
+        self.assert_drill_down_samples()
+
+    def assert_drill_down_samples(self):
+        self.assert_equivalent([])
+        key: str
+        for key, value_list in KEY_VALUE_LIST.items():
+            self.assert_equivalent([AlbumPropertyKeyValue(key=key, value=None)])
+            self.assert_equivalent([AlbumPropertyKeyValue(key=key, value=value_list[0])])
+        self.assert_equivalent([AlbumPropertyKeyValue(key="genre", value="drone"),
+                                AlbumPropertyKeyValue(key="country", value="it")])
+
+    def assert_equivalent(self, condition_list: list[AlbumPropertyKeyValue]):
+        message: str = f"conditions {[(c.key, c.value) for c in condition_list]}"
+        matching: list[str] = self.__sql(persistence.get_album_property_matching, condition_list=condition_list)
+        self.assertEqual(
+            sorted(persistence.get_album_property_matching(condition_list=condition_list)),
+            sorted(matching),
+            message)
+        self.assertEqual(
+            persistence.get_album_property_matching_count(condition_list=condition_list),
+            self.__sql(persistence.get_album_property_matching_count, condition_list=condition_list),
+            message)
+        random_album_id: str = persistence.get_one_random_album_property_matching(condition_list=condition_list)
+        if matching:
+            self.assertIn(random_album_id, matching, message)
+        else:
+            self.assertIsNone(random_album_id, message)
+        # representatives are picked differently, they only have to match
+        index_key_list: list[AlbumPropertyKeyOccurrence] = persistence.get_album_property_key_occurence_list(
+            condition_list=condition_list)
+        self.assertEqual(
+            [(k.property_key, k.property_value_count, bool(k.is_missing_for_some)) for k in index_key_list],
+            [(k.property_key, k.property_value_count, bool(k.is_missing_for_some)) for k in self.__sql(
+                persistence.get_album_property_key_occurence_list,
+                condition_list=condition_list)],
+            message)
+        k: AlbumPropertyKeyOccurrence
+        for k in index_key_list:
+            self.assertIn(k.representative_album_id, matching, message)
+        key: str
+        for key in list(KEY_VALUE_LIST.keys()) + ["country"]:
+            index_value_list: list[AlbumPropertyValueOccurrence] = persistence.get_album_property_value_occurence_list(
+                condition_list=condition_list,
+                property_key=key)
+            self.assertEqual(
+                [(v.property_value, v.album_count, bool(v.is_missing_for_some)) for v in index_value_list],
+                [(v.property_value, v.album_count, bool(v.is_missing_for_some)) for v in self.__sql(
+                    persistence.get_album_property_value_occurence_list,
+                    condition_list=condition_list,
+                    property_key=key)],
+                f"{message} key [{key}]")
+            v: AlbumPropertyValueOccurrence
+            for v in index_value_list:
+                self.assertIn(
+                    v.representative_album_id,
+                    self.__sql(
+                        persistence.get_album_property_matching,
+                        condition_list=condition_list + [AlbumPropertyKeyValue(key=key, value=v.property_value)]),
+                    f"{message} key [{key}] value [{v.property_value}]")
+
+    def __sql(self, query, **kwargs):
+        connection: sqlite3.Connection = persistence.get_working_connection()
+        try:
+            return query(connection=connection, **kwargs)
+        finally:
+            connection.close()
+
+
+class TestAlbumFacetIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.row_list: list[tuple[str, str, str]] = [
+            ("a1", "genre", "rock"),
+            ("a1", "year", "1990"),
+            ("a2", "genre", "jazz"),
+            ("a3", "genre", "rock")]
+        self.load_count: int = 0
+        self.index: AlbumFacetIndex = AlbumFacetIndex()
+
+    def loader(self) -> list[tuple[str, str, str]]:
+        self.load_count += 1
+        return list(self.row_list)
+
+    def test_loaded_once(self):
+        self.assertFalse(self.index.loaded)
+        self.index.ensure_loaded(self.loader)
+        self.index.ensure_loaded(self.loader)
+        self.assertTrue(self.index.loaded)
+        self.assertEqual(self.load_count, 1)
+        self.assertEqual(self.index.album_count, 3)
+
+    def test_changes_are_ignored_until_loaded(self):
+        self.index.set_album_properties(album_id="a4", properties={"genre": ["rock"]})
+        self.row_list.append(("a4", "genre", "pop"))
+        self.index.ensure_loaded(self.loader)
+        self.assertEqual(self.index.get_matching(condition_list=[AlbumPropertyKeyValue(key="genre", value="pop")]),
+                         ["a4"])
+
+    def test_invalidate_reloads(self):
+        self.index.ensure_loaded(self.loader)
+        self.row_list.append(("a4", "genre", "rock"))
+        self.assertEqual(self.index.get_matching_count([AlbumPropertyKeyValue(key="genre", value="rock")]), 2)
+        self.index.invalidate()
+        self.assertFalse(self.index.loaded)
+        self.assertEqual(self.index.album_count, 0)
+        self.index.ensure_loaded(self.loader)
+        self.assertEqual(self.load_count, 2)
+        self.assertEqual(self.index.get_matching_count([AlbumPropertyKeyValue(key="genre", value="rock")]), 3)
+
+    def test_removed_album_position_is_reused(self):
+        self.index.ensure_loaded(self.loader)
+        self.index.remove_album(album_id="a2")
+        self.assertEqual(self.index.album_count, 2)
+        self.assertEqual(self.index.get_matching_count([]), 2)
+        self.index.set_album_properties(album_id="a5", properties={"genre": ["jazz"]})
+        self.assertEqual(self.index.get_matching([AlbumPropertyKeyValue(key="genre", value="jazz")]), ["a5"])
+        self.assertEqual(sorted(self.index.get_matching([])), ["a1", "a3", "a5"])
+        # negative condition
+        self.assertEqual(sorted(self.index.get_matching([AlbumPropertyKeyValue(key="year", value=None)])),
+                         ["a3", "a5"])
@@ -0,0 +1,100 @@
+# Copyright (C) 2026 Giovanni Fulco
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import unittest
+
+from subsonic_connector.album import Album
+from subsonic_connector.response import Response
+from subsonic_connector.song import Song
+
+from caching_connector import CachedMethod
+from caching_connector import CachingConnector
+from responsecaching import ResponseCache
+
+
+class FakeConnector:
+    """Same signatures as the subsonic connector, counts the calls"""
+
+    def __init__(self):
+        self.calls: dict[str, int] = {}
+        self.scrobbled: list[str] = []
+
+    def getAlbum(self, albumId: str) -> Response[Album]:
+        self.__count("getAlbum")
+        data: dict = {"status": "ok", "version": "1.16.1", "album": {"id": albumId}}
+        return Response(data, Album(data))
+
+    def getSong(self, song_id: str) -> Response[Song]:
+        self.__count("getSong")
+        data: dict = {"status": "ok", "version": "1.16.1", "song": {"id": song_id, "albumId": f"album-of-{song_id}"}}
+        return Response(data, Song(data))
+
+    def scrobble(self, song_id: str, submission: bool = True, listenTime: int = None) -> dict:
+        self.scrobbled.append(song_id)
+        return {"status": "ok"}
+
+    def __count(self, name: str):
+        self.calls[name] = self.calls.get(name, 0) + 1
+
+
+class TestCachingConnector(unittest.TestCase):
+
+    def setUp(self):
+        self.connector: FakeConnector = FakeConnector()
+        self.caching_connector: CachingConnector = CachingConnector(
+            connector=self.connector,
+            cache=ResponseCache(name="test", max_size=100, logger=lambda message: None),
+            cached_methods={
+                "getAlbum": CachedMethod(ttl_sec=100, stale_sec=0),
+                "getSong": CachedMethod(ttl_sec=100, stale_sec=0)})
+
+    def test_positional_and_keyword_arguments_share_the_entry(self):
+        self.caching_connector.getAlbum("a1")
+        self.caching_connector.getAlbum(albumId="a1")
+        self.caching_connector.getAlbum("a2")
+        self.assertEqual(self.connector.calls["getAlbum"], 2)
+
+    def test_invalidate_by_arguments(self):
+        self.caching_connector.getAlbum("a1")
+        self.caching_connector.getAlbum("a2")
+        self.caching_connector.invalidate("getAlbum", albumId="a1")
+        self.caching_connector.getAlbum("a1")
+        self.caching_connector.getAlbum("a2")
+        self.assertEqual(self.connector.calls["getAlbum"], 3)
+        self.caching_connector.invalidate()
+        self.caching_connector.getAlbum("a2")
+        self.assertEqual(self.connector.calls["getAlbum"], 4)
+
+    def test_scrobble_invalidates_song_and_its_album(self):
+        self.caching_connector.getSong("s1")
+        self.caching_connector.getAlbum("album-of-s1")
+        self.caching_connector.getAlbum("other")
+        self.caching_connector.scrobble(song_id="s1", submission=True, listenTime=1)
+        self.assertEqual(self.connector.scrobbled, ["s1"])
+        self.caching_connector.getSong("s1")
+        self.caching_connector.getAlbum("album-of-s1")
+        self.caching_connector.getAlbum("other")
+        self.assertEqual(self.connector.calls["getSong"], 2)
+        self.assertEqual(self.connector.calls["getAlbum"], 3)
+
+    def test_scrobble_of_unknown_song_invalidates_all_albums(self):
+        self.caching_connector.getAlbum("a1")
+        self.caching_connector.scrobble(song_id="s1")
+        self.caching_connector.getAlbum("a1")
+        self.assertEqual(self.connector.calls["getAlbum"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
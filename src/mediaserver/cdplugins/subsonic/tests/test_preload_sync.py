@@ -0,0 +1,90 @@
+# Copyright (C) 2026 Giovanni Fulco
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import datetime
+import unittest
+from unittest import mock
+
+from subsonic_connector.album import Album
+from subsonic_connector.album_list import AlbumList
+from subsonic_connector.response import Response
+
+import preload_sync
+
+
+class FakeConnector:
+    """getAlbum fails for the album ids in failing, raises for the ones in raising"""
+
+    def __init__(self, failing: set[str] = None, raising: set[str] = None):
+        self.failing: set[str] = failing or set()
+        self.raising: set[str] = raising or set()
+
+    def getAlbum(self, albumId: str) -> Response[Album]:
+        if albumId in self.raising:
+            raise Exception(f"connection lost for [{albumId}]")
+        if albumId in self.failing:
+            data: dict = {"status": "failed", "version": "1.16.1", "error": {"code": 70, "message": "not found"}}
+            return Response(data, None)
+        data: dict = {"status": "ok", "version": "1.16.1", "album": {
+            "id": albumId,
+            "song": [{"id": f"{albumId}-song-{i}", "albumId": albumId} for i in range(2)]}}
+        return Response(data, Album(data))
+
+    def getNewestAlbumList(self, size: int = 10, offset: int = 0, musicFolderId: str = None) -> Response[AlbumList]:
+        data: dict = {"status": "failed", "version": "1.16.1", "error": {"code": 0, "message": "server error"}}
+        return Response(data, None)
+
+
+def build_album_list(album_id_list: list[str]) -> list[Album]:
+    return [Album({"id": album_id}) for album_id in album_id_list]
+
+
+class TestPreloadSync(unittest.TestCase):
+
+    def __patch_connector(self, connector: FakeConnector):
+        patcher = mock.patch("connector_provider.get_uncached", return_value=connector)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_failed_albums_are_reported(self):
+        self.__patch_connector(FakeConnector(failing={"a2"}, raising={"a3"}))
+        fetched: preload_sync.FetchedSongs = preload_sync.fetch_songs_by_album_list(
+            album_list=build_album_list(["a1", "a2", "a3", "a4"]))
+        self.assertEqual(sorted(fetched.failed_album_id_list), ["a2", "a3"])
+        self.assertEqual(sorted(song.getId() for song in fetched.song_list),
+                         ["a1-song-0", "a1-song-1", "a4-song-0", "a4-song-1"])
+
+    def test_retried_albums_not_found_anymore_are_dropped(self):
+        self.__patch_connector(FakeConnector(failing={"a2"}))
+        album_list: list[Album] = preload_sync.fetch_albums_by_id_list(["a1", "a2"])
+        self.assertEqual([album.getId() for album in album_list], ["a1"])
+
+    def test_failed_album_list_is_not_taken_as_empty(self):
+        self.__patch_connector(FakeConnector())
+        with self.assertRaises(Exception):
+            preload_sync.fetch_albums_created_after(high_water_mark=datetime.datetime(2026, 1, 1))
+
+    def test_retry_album_id_list_round_trip(self):
+        preload_sync.save_retry_album_id_list(["a1", "a2"])
+        self.assertEqual(preload_sync.load_retry_album_id_list(), ["a1", "a2"])
+        # a full sync loads everything again
+        preload_sync.save_full_sync(sync_start=1000.0, server_last_modified=10)
+        self.assertEqual(preload_sync.load_retry_album_id_list(), [])
+        self.assertEqual(preload_sync.load_state().server_last_modified, 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+# Copyright (C) 2026 Giovanni Fulco
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+# Played album stream info for a page of tracks: one query per distinct album,
+# as before, against the single IN (...) query, on a temporary db with synthetic plays.
+# Run from the cdplugins directory:
+#   python3 tidal/benchmarks/played_album_query_benchmark.py [album_count] [page_album_count]
+
+import random
+import sqlite3
+import sys
+import time
+
+import benchmark_env
+
+from played_track_request import PlayedTrackRequest  # noqa: E402
+import persistence  # noqa: E402
+
+TRACKS_PER_ALBUM: int = 10
+REPEAT: int = 20
+
+
+def create_plays(album_count: int):
+    connection: sqlite3.Connection = persistence.get_connection()
+    for album in range(album_count):
+        for track in range(TRACKS_PER_ALBUM):
+            request: PlayedTrackRequest = PlayedTrackRequest()
+            request.track_id = str(album * 100 + track)
+            request.album_id = str(album)
+            request.album_track_count = TRACKS_PER_ALBUM
+            request.track_name = f"track {track}"
+            request.track_duration = 240
+            request.track_num = track + 1
+            request.volume_num = 1
+            request.album_num_volumes = 1
+            request.album_name = f"album {album}"
+            request.audio_quality = "LOSSLESS"
+            request.album_artist_name = f"artist {album % 100}"
+            request.image_url = f"https://images/{album}"
+            request.explicit = 0
+            request.artist_name = f"artist {album % 100}"
+            request.album_duration = 2400
+            request.bit_depth = 16
+            request.sample_rate = 44100
+            persistence.track_playback(played_track_request=request, connection=connection)
+    connection.commit()
+    connection.close()
+
+
+def per_album_ms(album_id_list: list[str]) -> float:
+    start: float = time.perf_counter()
+    for _ in range(REPEAT):
+        for album_id in album_id_list:
+            persistence.get_played_album_entries(album_id=album_id)
+    return 1e3 * (time.perf_counter() - start) / REPEAT
+
+
+def bulk_ms(album_id_list: list[str]) -> float:
+    start: float = time.perf_counter()
+    for _ in range(REPEAT):
+        persistence.get_played_album_entries_by_album_id_list(album_id_list=album_id_list)
+    return 1e3 * (time.perf_counter() - start) / REPEAT
+
+
+def run(album_count: int, page_album_count: int) -> dict[str, float]:
+    create_plays(album_count)
+    # some albums of a page were never played
+    album_id_list: list[str] = [str(a) for a in random.Random(42).sample(range(2 * album_count), page_album_count)]
+    bulk: dict[str, list] = persistence.get_played_album_entries_by_album_id_list(album_id_list=album_id_list)
+    for album_id in album_id_list:
+        if len(bulk[album_id]) != len(persistence.get_played_album_entries(album_id=album_id)):
+            raise Exception(f"Results differ for album [{album_id}]")
+    return {
+        f"{page_album_count} queries (ms)": per_album_ms(album_id_list),
+        "1 query (ms)": bulk_ms(album_id_list)}
+
+
+if __name__ == "__main__":
+    albums: int = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    page_albums: int = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    print(f"played album entries, [{albums}] played albums, page with [{page_albums}] distinct albums, "
+          f"cache dir [{benchmark_env.tmp_dir}]")
+    for name, value in run(albums, page_albums).items():
+        print(f"  {name} [{value:.2f}]")
@@ -0,0 +1,68 @@
+# Copyright (C) 2026 Giovanni Fulco
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+# Track uri cache: cost per put and per get with the default bound (trackuricachemaxentries),
+# so that puts also evict, and cost of saving the file.
+# Run from the cdplugins directory:
+#   python3 tidal/benchmarks/track_uri_cache_benchmark.py [operation_count] [max_entries]
+
+import os
+import random
+import sys
+import time
+
+import benchmark_env
+
+from track_uri_cache import TrackUriCache  # noqa: E402
+from track_uri_cache import TrackUriEntry  # noqa: E402
+
+QUALITY_LIST: list[str] = ["LOSSLESS", "HI_RES_LOSSLESS"]
+
+
+def run(operation_count: int, max_entries: int) -> dict[str, float]:
+    rng: random.Random = random.Random(42)
+    cache: TrackUriCache = TrackUriCache(
+        ttl_sec=3600,
+        max_entries=max_entries,
+        file_name=os.path.join(benchmark_env.tmp_dir, "track-uri-cache.json"))
+    # track ids repeat, so there are replacements as well
+    key_list: list[tuple[str, str]] = [
+        (str(rng.randrange(operation_count // 2)), rng.choice(QUALITY_LIST)) for _ in range(operation_count)]
+    result: dict[str, float] = {}
+    start: float = time.perf_counter()
+    for track_id, quality in key_list:
+        cache.put(track_id, quality, TrackUriEntry(media_url=f"https://media/{track_id}/{quality}", duration_sec=240))
+    result["put (us)"] = 1e6 * (time.perf_counter() - start) / operation_count
+    rng.shuffle(key_list)
+    start = time.perf_counter()
+    for track_id, quality in key_list:
+        cache.get(track_id, quality)
+    result["get (us)"] = 1e6 * (time.perf_counter() - start) / operation_count
+    result["put + get (us per operation)"] = (result["put (us)"] + result["get (us)"]) / 2
+    start = time.perf_counter()
+    cache.save()
+    result["save (ms)"] = 1e3 * (time.perf_counter() - start)
+    result["entries"] = len(cache)
+    result["evictions"] = cache.statistics.evictions
+    return result
+
+
+if __name__ == "__main__":
+    operations: int = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    bound: int = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    print(f"track uri cache, [{operations}] puts and gets, max entries [{bound}]")
+    for name, value in run(operations, bound).items():
+        print(f"  {name} [{value:.2f}]" if isinstance(value, float) else f"  {name} [{value}]")
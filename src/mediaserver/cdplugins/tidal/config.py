@@ -14,6 +14,8 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 import upmplgutils
+from configsnapshot import ConfigSnapshotHolder
+from configsnapshot import ConfigSnapshotLogger
 import constants
 from tidalapi import Quality as TidalQuality
 
@@ -30,7 +32,35 @@ def get_option_value(nm, dflt: any = None):
     return upmplgutils.getOptionValue(get_plugin_config_variable_name(nm), dflt)
 
 
+__snapshot_holder: ConfigSnapshotHolder = ConfigSnapshotHolder(
+    param_list=lambda: constants.ConfigParam,
+    str_loader=lambda p: __load_config_param_as_str(p),
+    int_loader=lambda p: __load_config_param_as_int(p),
+    bool_loader=lambda p: __load_config_param_as_bool(p))
+
+
 def get_config_param_as_str(configuration_parameter: constants.ConfigParam) -> str:
+    return __snapshot_holder.get_str(configuration_parameter)
+
+
+def get_config_param_as_int(configuration_parameter: constants.ConfigParam) -> int:
+    return __snapshot_holder.get_int(configuration_parameter)
+
+
+def get_config_param_as_bool(configuration_parameter: constants.ConfigParam) -> bool:
+    return __snapshot_holder.get_bool(configuration_parameter)
+
+
+def reload_config() -> None:
+    """Reads the configuration again, config param accessors will return the new values"""
+    __snapshot_holder.reload()
+
+
+def install_reload_config_on_sighup(logger: ConfigSnapshotLogger) -> bool:
+    return __snapshot_holder.install_reload_on_sighup(logger=logger)
+
+
+def __load_config_param_as_str(configuration_parameter: constants.ConfigParam) -> str:
     dv: str | None = configuration_parameter.default_value
     if dv is not None and not isinstance(dv, str):
         raise Exception(f"Invalid default value for [{configuration_parameter.key}]")
@@ -44,7 +74,7 @@ def get_config_param_as_str(configuration_parameter: constants.ConfigParam) -> s
     return str(v)
 
 
-def get_config_param_as_int(configuration_parameter: constants.ConfigParam) -> str:
+def __load_config_param_as_int(configuration_parameter: constants.ConfigParam) -> str:
     dv: int | None = configuration_parameter.default_value
     if dv is not None and not isinstance(dv, int):
         raise Exception(f"Invalid default value for [{configuration_parameter.key}]")
@@ -58,7 +88,7 @@ def get_config_param_as_int(configuration_parameter: constants.ConfigParam) -> s
     return int(v)
 
 
-def get_config_param_as_bool(configuration_parameter: constants.ConfigParam) -> bool:
+def __load_config_param_as_bool(configuration_parameter: constants.ConfigParam) -> bool:
     default_value_as_int: int = 0
     dv: any = configuration_parameter.default_value
     if isinstance(dv, int):
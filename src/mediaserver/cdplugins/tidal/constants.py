@@ -21,7 +21,7 @@ import lafv_matcher
 
 class PluginConstant(Enum):
 
-    PLUGIN_RELEASE = "0.8.13.1"
+    PLUGIN_RELEASE = "0.8.14"
     PLUGIN_NAME = "tidal"
     CACHED_IMAGES_DIRECTORY = "images"
     STATIC_IMAGES_DIRECTORY = "static-images"
@@ -136,11 +136,39 @@ class ConfigParam(Enum):
     ENABLE_DUMP_STREAM_DATA = _ConfigParamData("enabledumpstreamdata", False)
     ENABLE_CACHED_IMAGE_AGE_LIMIT = _ConfigParamData("enablecachedimageagelimit", False)
     CACHED_IMAGE_MAX_AGE_DAYS = _ConfigParamData("cachedimagemaxagedays", 60)
+    CACHED_IMAGE_MAX_SIZE_MB = _ConfigParamData("cachedimagemaxsizemb", 0)
+    CACHED_IMAGE_EVICTION_INTERVAL_SEC = _ConfigParamData("cachedimageevictionintervalsec", 300)
+    CACHED_IMAGE_MAX_EVICTIONS_PER_RUN = _ConfigParamData("cachedimagemaxevictionsperrun", 500)
+    IMAGE_DOWNLOAD_WORKERS = _ConfigParamData("imagedownloadworkers", 2)
+    ENABLE_HTTP_RESPONSE_CACHE = _ConfigParamData("enablehttpresponsecache", True)
+    HTTP_RESPONSE_CACHE_TTL_SEC = _ConfigParamData("httpresponsecachettlsec", 86400)
+    HTTP_RESPONSE_CACHE_MAX_SIZE_MB = _ConfigParamData("httpresponsecachemaxsizemb", 64)
 
     TRACK_URI_ENTRY_EXPIRATION_SEC = _ConfigParamData("trackurientryexpirationsec", 240)
+    TRACK_URI_CACHE_MAX_ENTRIES = _ConfigParamData("trackuricachemaxentries", 1000)
+    PERSIST_TRACK_URI_CACHE = _ConfigParamData("persisttrackuricache", False)
+    PREFETCH_NEXT_TRACK_COUNT = _ConfigParamData("prefetchnexttrackcount", 1)
+    PREFETCH_LEAD_SEC = _ConfigParamData("prefetchleadsec", 60)
+    PLAYBACK_STATS_FLUSH_INTERVAL_SEC = _ConfigParamData("playbackstatsflushintervalsec", 2)
+    PLAYBACK_STATS_MAX_BATCH_SIZE = _ConfigParamData("playbackstatsmaxbatchsize", 50)
+    FAVORITES_MIRROR_REFRESH_SEC = _ConfigParamData("favoritesmirrorrefreshsec", 300)
+    MANIFEST_STORE_MAX_ENTRIES = _ConfigParamData("manifeststoremaxentries", 256)
+    MANIFEST_SWEEP_INTERVAL_SEC = _ConfigParamData("manifestsweepintervalsec", 60)
+    PAGE_CACHE_TTL_SEC = _ConfigParamData("pagecachettlsec", 900)
+    PAGE_CACHE_BROWSE_TTL_SEC = _ConfigParamData("pagecachebrowsettlsec", 21600)
+    PAGE_CACHE_PAGELINK_TTL_SEC = _ConfigParamData("pagecachepagelinkttlsec", 1800)
+    PAGE_CACHE_MAX_ENTRIES = _ConfigParamData("pagecachemaxentries", 128)
+    PAGE_CACHE_REFRESH_INTERVAL_SEC = _ConfigParamData("pagecacherefreshintervalsec", 60)
+    METADATA_STORE_ALBUM_TTL_SEC = _ConfigParamData("metadatastorealbumttlsec", 604800)
+    METADATA_STORE_TRACK_TTL_SEC = _ConfigParamData("metadatastoretrackttlsec", 604800)
+    METADATA_STORE_ARTIST_TTL_SEC = _ConfigParamData("metadatastoreartistttlsec", 86400)
+    METADATA_STORE_MAX_MEMORY_ENTRIES = _ConfigParamData("metadatastoremaxmemoryentries", 2000)
+    METADATA_STORE_MAX_DB_ENTRIES = _ConfigParamData("metadatastoremaxdbentries", 50000)
+    METADATA_STORE_REPORT_EVERY = _ConfigParamData("metadatastorereportevery", 1000)
 
     TRACK_ID_REGEX = _ConfigParamData("trackidregex", "^[0-9]+$")
     VERBOSE_LOGGING = _ConfigParamData("verboselogging", False)
+    ENABLE_CONFIG_RELOAD_ON_SIGHUP = _ConfigParamData("enableconfigreloadonsighup", False)
     SEARCH_LIMIT = _ConfigParamData("searchlimit", 15)
 
     ALLOW_NAMED_STATIC_IMAGES = _ConfigParamData("allownamedstaticimages", True)
@@ -228,6 +256,7 @@ tile_image_expiration_time_sec: int = 86400
 
 oauth2_credentials_file_name: str = "oauth2.credentials.json"
 pkce_credentials_file_name: str = "pkce.credentials.json"
+track_uri_cache_file_name: str = "track-uri-cache.json"
 # remove if not really used
 default_max_album_tracks_per_page: int = 30
 
@@ -20,7 +20,7 @@ class ContextKey(Enum):
     CANNOT_GET_STREAM_INFO = 0, "cannot-get-stream-info", False
     SUCCESS_COUNT = 1, "success-count", 0
     PROCESS_COUNT = 2, "process-count", 0
-    PLAYED_ALBUM_TRACKS_DICT = 3, "played-albums-tracks-dict", dict()
+    PLAYED_ALBUM_TRACKS_DICT = 3, "played-albums-tracks-dict", None
     KNOWN_TRACKS_COUNT = 4, "known-tracks-count", 0
     GUESSED_TRACKS_COUNT = 5, "guessed-tracks-count", 0
     IS_ALBUM = 6, "is-album", False
@@ -39,6 +39,8 @@ class ContextKey(Enum):
     GUESSED_TRACK_DICT = 18, "guessed-track-dict", None
     CONTAINER_TYPE = 21, "container-type", None
     CONTAINER_ID = 20, "container-id", None
+    PLAYED_TRACK_DICT = 22, "played-track-dict", None
+    PLAYED_ALBUM_QUERY_COUNT = 23, "played-album-query-count", 0
 
     def __init__(self,
             num: int,
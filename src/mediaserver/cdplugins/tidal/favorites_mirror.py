@@ -0,0 +1,135 @@
+# Copyright (C) 2026 Giovanni Fulco
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# in-memory mirror of the user favorites, loaded from the plugin db and refreshed in background
+# every sort order is an index array computed when the items change, so a page is just a slice
+
+import threading
+import time
+from enum import Enum
+from typing import Callable
+from typing import Generic
+from typing import TypeVar
+
+T = TypeVar("T")
+
+
+class _MirrorState(Generic[T]):
+
+    def __init__(
+            self,
+            item_list: list[T],
+            position_by_id: dict[str, int],
+            index_by_order: dict["FavoriteSortOrder", list[int]]):
+        self.item_list: list[T] = item_list
+        self.position_by_id: dict[str, int] = position_by_id
+        self.index_by_order: dict[FavoriteSortOrder, list[int]] = index_by_order
+
+
+class FavoriteSortOrder(Enum):
+
+    ARTIST = "artist"
+    TITLE = "title"
+    RELEASE_DATE = "release-date"
+    DATE_ADDED = "date-added"
+    NAME = "name"
+
+
+class FavoritesMirror(Generic[T]):
+
+    def __init__(
+            self,
+            name: str,
+            id_extractor: Callable[[T], str],
+            sort_key_extractors: dict[FavoriteSortOrder, Callable[[T], any]]):
+        self.__name: str = name
+        self.__id_extractor: Callable[[T], str] = id_extractor
+        self.__sort_key_extractors: dict[FavoriteSortOrder, Callable[[T], any]] = sort_key_extractors
+        self.__lock: threading.Lock = threading.Lock()
+        # replaced as a whole, readers do not need the lock
+        self.__state: _MirrorState[T] = _MirrorState([], {}, {})
+        self.__loaded: bool = False
+        self.__update_time: float = 0.0
+
+    @property
+    def name(self) -> str:
+        return self.__name
+
+    @property
+    def size(self) -> int:
+        return len(self.__state.item_list)
+
+    @property
+    def loaded(self) -> bool:
+        return self.__loaded
+
+    @property
+    def update_time(self) -> float:
+        return self.__update_time
+
+    def contains(self, item_id: str) -> bool:
+        return str(item_id) in self.__state.position_by_id
+
+    def replace(self, item_list: list[T]):
+        """Sets the whole favorites list"""
+        with self.__lock:
+            self.__rebuild(list(item_list))
+            self.__loaded = True
+
+    def add(self, item_list: list[T]):
+        """Adds new favorites, known ones are updated"""
+        if not item_list:
+            return
+        with self.__lock:
+            current_list: list[T] = list(self.__state.item_list)
+            current: T
+            for current in item_list:
+                position: int = self.__state.position_by_id.get(str(self.__id_extractor(current)))
+                if position is None:
+                    current_list.append(current)
+                else:
+                    current_list[position] = current
+            self.__rebuild(current_list)
+
+    def remove(self, item_id: str) -> bool:
+        with self.__lock:
+            if str(item_id) not in self.__state.position_by_id:
+                return False
+            self.__rebuild([x for x in self.__state.item_list if str(self.__id_extractor(x)) != str(item_id)])
+            return True
+
+    def page(self, sort_order: FavoriteSortOrder, descending: bool, offset: int, limit: int) -> list[T]:
+        state: _MirrorState[T] = self.__state
+        item_list: list[T] = state.item_list
+        index: list[int] = state.index_by_order.get(sort_order, [])
+        count: int = len(index)
+        if offset >= count or limit <= 0:
+            return []
+        end: int = min(count, offset + limit)
+        if descending:
+            return [item_list[index[count - 1 - i]] for i in range(offset, end)]
+        return [item_list[index[i]] for i in range(offset, end)]
+
+    def __rebuild(self, item_list: list[T]):
+        index_by_order: dict[FavoriteSortOrder, list[int]] = {}
+        sort_order: FavoriteSortOrder
+        for sort_order, extractor in self.__sort_key_extractors.items():
+            key_list: list[any] = [extractor(x) for x in item_list]
+            index_by_order[sort_order] = sorted(range(len(item_list)), key=key_list.__getitem__)
+        self.__state = _MirrorState(
+            item_list=item_list,
+            position_by_id={str(self.__id_extractor(x)): i for i, x in enumerate(item_list)},
+            index_by_order=index_by_order)
+        self.__update_time = time.time()
@@ -0,0 +1,87 @@
+# Copyright (C) 2026 Giovanni Fulco
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# disk-backed cache of tidal catalog responses, mounted on the requests session of every tidal session
+# only immutable-ish catalog resources are cached, user data (favorites, playlists, ...) is never cached
+
+import os
+import threading
+
+import requests
+import upmplgutils
+import httpcaching
+from httpcaching import HttpCacheRule
+from httpcaching import HttpResponseCache
+from msgproc_provider import msgproc
+import config
+import constants
+
+__http_cache: HttpResponseCache = None
+__disabled: bool = False
+__lock: threading.Lock = threading.Lock()
+
+__db_file_name: str = "http-response-cache.db"
+
+# album, album tracks/items/credits/review, artist, artist albums/top tracks/similar/bio, track, genres
+__catalog_path_regex: str = (r"^https://api\.tidal\.com/v1/("
+                             r"albums/\d+(/(tracks|items|credits|review))?|"
+                             r"artists/\d+(/(albums|toptracks|similar|bio))?|"
+                             r"tracks/\d+|"
+                             r"genres)(\?|$)")
+
+# these do not change the response
+__ignored_params: list[str] = ["sessionId"]
+
+
+def __create() -> HttpResponseCache:
+    http_cache: HttpResponseCache = HttpResponseCache(
+        name=constants.PluginConstant.PLUGIN_NAME.value,
+        db_file=os.path.join(
+            upmplgutils.getcachedir(constants.PluginConstant.PLUGIN_NAME.value),
+            __db_file_name),
+        rules=[HttpCacheRule(
+            pattern=__catalog_path_regex,
+            ttl_sec=config.get_config_param_as_int(constants.ConfigParam.HTTP_RESPONSE_CACHE_TTL_SEC))],
+        logger=msgproc.log,
+        max_size_bytes=config.get_config_param_as_int(constants.ConfigParam.HTTP_RESPONSE_CACHE_MAX_SIZE_MB) * 1024 * 1024,
+        ignored_params=__ignored_params)
+    http_cache.open()
+    return http_cache
+
+
+def get() -> HttpResponseCache | None:
+    global __http_cache
+    global __disabled
+    if __http_cache or __disabled:
+        return __http_cache
+    with __lock:
+        if __http_cache or __disabled:
+            return __http_cache
+        if not config.get_config_param_as_bool(constants.ConfigParam.ENABLE_HTTP_RESPONSE_CACHE):
+            __disabled = True
+            return None
+        try:
+            __http_cache = __create()
+        except Exception as ex:
+            msgproc.log(f"Cannot open http response cache due to [{type(ex)}] [{ex}]")
+            __disabled = True
+        return __http_cache
+
+
+def install(request_session: requests.Session):
+    """Mounts the http response cache on request_session, if enabled"""
+    http_cache: HttpResponseCache = get()
+    if http_cache and request_session is not None:
+        httpcaching.install(request_session, http_cache)
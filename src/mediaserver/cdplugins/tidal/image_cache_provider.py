@@ -0,0 +1,71 @@
+# Copyright (C) 2026 Giovanni Fulco
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from imagecaching import ImageCache
+from imagecaching import ImageDownloader
+from msgproc_provider import msgproc
+import config
+import constants
+import mimetypes
+import threading
+
+__image_cache: ImageCache = None
+__image_downloader: ImageDownloader = None
+__lock: threading.Lock = threading.Lock()
+
+
+def __is_image(file_name: str) -> bool:
+    mime_type: str = mimetypes.guess_type(file_name)[0]
+    return mime_type is not None and mime_type.startswith("image/")
+
+
+def __create(directory: str) -> ImageCache:
+    max_age_sec: int = (config.get_config_param_as_int(constants.ConfigParam.CACHED_IMAGE_MAX_AGE_DAYS) * (24 * 60 * 60)
+                        if config.get_config_param_as_bool(constants.ConfigParam.ENABLE_CACHED_IMAGE_AGE_LIMIT)
+                        else 0)
+    max_size_bytes: int = config.get_config_param_as_int(constants.ConfigParam.CACHED_IMAGE_MAX_SIZE_MB) * 1024 * 1024
+    image_cache: ImageCache = ImageCache(
+        name=constants.PluginConstant.PLUGIN_NAME.value,
+        directory=directory,
+        accept=__is_image,
+        logger=msgproc.log,
+        max_size_bytes=max_size_bytes,
+        max_age_sec=max_age_sec)
+    image_cache.load()
+    return image_cache
+
+
+def get_or_create(directory: str) -> ImageCache:
+    global __image_cache
+    global __image_downloader
+    if __image_cache:
+        return __image_cache
+    with __lock:
+        if not __image_cache:
+            image_cache: ImageCache = __create(directory=directory)
+            __image_downloader = ImageDownloader(
+                image_cache=image_cache,
+                logger=msgproc.log,
+                worker_count=config.get_config_param_as_int(constants.ConfigParam.IMAGE_DOWNLOAD_WORKERS))
+            __image_cache = image_cache
+        return __image_cache
+
+
+def get() -> ImageCache | None:
+    return __image_cache
+
+
+def get_downloader() -> ImageDownloader | None:
+    return __image_downloader
@@ -0,0 +1,157 @@
+# Copyright (C) 2026 Giovanni Fulco
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# dash/hls manifests written to the web document root, tracked in memory
+# a manifest is rewritten only when its content changes, files are removed by a background
+# sweeper when they get too old or when the store is full, no directory scan per request
+
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+from msgproc_provider import msgproc
+
+
+class ManifestEntry:
+
+    def __init__(self, digest: str, last_used: float):
+        self.digest: str = digest
+        self.last_used: float = last_used
+
+
+class ManifestStoreStatistics:
+
+    def __init__(self):
+        self.written: int = 0
+        self.reused: int = 0
+        self.swept: int = 0
+        self.evicted: int = 0
+
+    def __str__(self) -> str:
+        return (f"written [{self.written}] reused [{self.reused}] "
+                f"swept [{self.swept}] evicted [{self.evicted}]")
+
+
+class ManifestStore:
+
+    def __init__(self, max_entries: int, max_age_sec: int):
+        self.__max_entries: int = max_entries
+        self.__max_age_sec: int = max_age_sec
+        self.__lock: threading.Lock = threading.Lock()
+        # by file path, least recently used first
+        self.__entries: OrderedDict[str, ManifestEntry] = OrderedDict()
+        self.__statistics: ManifestStoreStatistics = ManifestStoreStatistics()
+        self.__sweeper: threading.Thread = None
+
+    @property
+    def statistics(self) -> ManifestStoreStatistics:
+        return self.__statistics
+
+    @property
+    def size(self) -> int:
+        return len(self.__entries)
+
+    def put(self, file_path: str, data: str) -> bool:
+        """Writes the manifest unless the same content is already there, returns True if written"""
+        digest: str = hashlib.sha1(data.encode("utf-8")).hexdigest()
+        now: float = time.time()
+        with self.__lock:
+            current: ManifestEntry = self.__entries.get(file_path)
+            if current and current.digest == digest:
+                current.last_used = now
+                self.__entries.move_to_end(file_path)
+                self.__statistics.reused += 1
+                return False
+        # replaced atomically, a renderer might be reading the previous version
+        # the temp file is unique, the prefetcher and trackuri can write the same manifest
+        fd, tmp_file_path = tempfile.mkstemp(
+            dir=os.path.dirname(file_path),
+            prefix=f"{os.path.basename(file_path)}.",
+            suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write(data)
+            # mkstemp creates the file readable by the owner only
+            os.chmod(tmp_file_path, 0o644)
+            os.replace(tmp_file_path, file_path)
+        except Exception:
+            self.__remove_files([tmp_file_path])
+            raise
+        evicted_list: list[str] = list()
+        with self.__lock:
+            self.__entries[file_path] = ManifestEntry(digest=digest, last_used=now)
+            self.__entries.move_to_end(file_path)
+            self.__statistics.written += 1
+            while len(self.__entries) > self.__max_entries > 0:
+                evicted_path, _ = self.__entries.popitem(last=False)
+                evicted_list.append(evicted_path)
+                self.__statistics.evicted += 1
+        self.__remove_files(evicted_list)
+        return True
+
+    def adopt_directory(self, directory: str):
+        """Tracks the files left by a previous run, so they are swept as well"""
+        if not os.path.isdir(directory):
+            return
+        adopted: int = 0
+        with self.__lock:
+            for entry in os.scandir(directory):
+                if not entry.is_file() or entry.path in self.__entries:
+                    continue
+                self.__entries[entry.path] = ManifestEntry(digest=None, last_used=entry.stat().st_mtime)
+                adopted += 1
+        msgproc.log(f"ManifestStore adopted [{adopted}] file(s) from [{directory}]")
+        self.sweep()
+
+    def sweep(self) -> int:
+        threshold: float = time.time() - self.__max_age_sec
+        expired_list: list[str] = list()
+        with self.__lock:
+            for file_path, entry in list(self.__entries.items()):
+                if entry.last_used < threshold:
+                    del self.__entries[file_path]
+                    expired_list.append(file_path)
+            self.__statistics.swept += len(expired_list)
+        self.__remove_files(expired_list)
+        return len(expired_list)
+
+    def start_sweeper(self, interval_sec: int):
+        if self.__sweeper is not None or interval_sec <= 0:
+            return
+        self.__sweeper = threading.Thread(target=self.__sweep_loop, args=(interval_sec,), daemon=True)
+        self.__sweeper.start()
+
+    def __sweep_loop(self, interval_sec: int):
+        while True:
+            time.sleep(interval_sec)
+            try:
+                swept: int = self.sweep()
+                if swept > 0:
+                    msgproc.log(f"ManifestStore swept [{swept}] file(s), "
+                                f"size [{self.size}] {self.__statistics}")
+            except Exception as ex:
+                msgproc.log(f"ManifestStore sweep failed [{type(ex)}] [{ex}]")
+
+    def __remove_files(self, file_path_list: list[str]):
+        for file_path in file_path_list:
+            try:
+                os.remove(file_path)
+            except FileNotFoundError:
+                pass
+            except Exception as ex:
+                msgproc.log(f"ManifestStore cannot remove [{file_path}] [{type(ex)}] [{ex}]")
@@ -0,0 +1,274 @@
+# Copyright (C) 2026 Giovanni Fulco
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# local store of tidal album, track and artist descriptors (the json returned by the api)
+# descriptors are kept in memory (bounded lru) and in the plugin db, each kind with its own ttl
+# and a version stamp, objects are rebuilt from the descriptor with the current session,
+# the api is called only when the descriptor is missing, expired or of an older version
+
+import functools
+import json
+import threading
+import time
+from enum import Enum
+from typing import Callable
+
+import requests
+from tidalapi.exceptions import ObjectNotFound
+from tidalapi.session import Session as TidalSession
+from tidalapi.album import Album as TidalAlbum
+from tidalapi.artist import Artist as TidalArtist
+from tidalapi.media import Track as TidalTrack
+
+from responsecaching import ResponseCache
+from responsecaching import ResponseCacheStatistics
+from msgproc_provider import msgproc
+import config
+import constants
+import persistence
+
+# bump when the stored descriptors are not good anymore
+METADATA_DESCRIPTOR_VERSION: int = 1
+
+
+class MetadataKind(Enum):
+
+    ALBUM = "album", "albums/{}"
+    ALBUM_TRACKS = "album_tracks", "albums/{}/tracks"
+    TRACK = "track", "tracks/{}"
+    ARTIST = "artist", "artists/{}"
+
+    def __init__(self, kind_name: str, api_path: str):
+        self.__kind_name: str = kind_name
+        self.__api_path: str = api_path
+
+    @property
+    def kind_name(self) -> str:
+        return self.__kind_name
+
+    def get_api_path(self, item_id: str) -> str:
+        return self.__api_path.format(item_id)
+
+
+class _Descriptor:
+
+    def __init__(self, data: dict[str, any], fetched_at: float):
+        self.data: dict[str, any] = data
+        self.fetched_at: float = fetched_at
+
+
+class MetadataStoreStatistics:
+
+    def __init__(self):
+        self.db_hits: int = 0
+        self.api_loads: int = 0
+        self.api_failures: int = 0
+        self.expired: int = 0
+        self.outdated: int = 0
+
+    def __str__(self) -> str:
+        return (f"db hits [{self.db_hits}] api loads [{self.api_loads}] "
+                f"api failures [{self.api_failures}] expired [{self.expired}] "
+                f"outdated [{self.outdated}]")
+
+
+class MetadataStore:
+
+    # prune the db every this many api loads
+    __prune_every: int = 500
+
+    def __init__(
+            self,
+            ttl_by_kind: dict[MetadataKind, int],
+            max_memory_entries: int,
+            max_db_entries: int,
+            report_every: int = 0):
+        self.__ttl_by_kind: dict[MetadataKind, int] = ttl_by_kind
+        self.__max_db_entries: int = max_db_entries
+        self.__lock: threading.Lock = threading.Lock()
+        self.__statistics: MetadataStoreStatistics = MetadataStoreStatistics()
+        self.__memory: ResponseCache = ResponseCache(
+            name="tidal-metadata",
+            max_size=max_memory_entries,
+            logger=msgproc.log,
+            report_every=report_every)
+
+    @property
+    def statistics(self) -> MetadataStoreStatistics:
+        return self.__statistics
+
+    def get_memory_statistics(self) -> list[ResponseCacheStatistics]:
+        return self.__memory.get_statistics()
+
+    def get_album(self, tidal_session: TidalSession, album_id: str) -> TidalAlbum:
+        return self.__get(MetadataKind.ALBUM, tidal_session, album_id, tidal_session.parse_album)
+
+    def get_album_tracks(
+            self,
+            tidal_session: TidalSession,
+            album_id: str,
+            album: TidalAlbum = None) -> list[TidalTrack]:
+        # tracks refer to their album like album.tracks() does, so the album artist is kept
+        parent: TidalAlbum = album if album else self.get_album(tidal_session, album_id)
+        return self.__get(
+            MetadataKind.ALBUM_TRACKS,
+            tidal_session,
+            album_id,
+            functools.partial(tidal_session.parse_track, album=parent))
+
+    def get_track(self, tidal_session: TidalSession, track_id: str) -> TidalTrack:
+        return self.__get(MetadataKind.TRACK, tidal_session, track_id, tidal_session.parse_track)
+
+    def get_artist(self, tidal_session: TidalSession, artist_id: str) -> TidalArtist:
+        return self.__get(MetadataKind.ARTIST, tidal_session, artist_id, tidal_session.parse_artist)
+
+    def invalidate(self, kind: MetadataKind = None):
+        self.__memory.invalidate(group=kind.kind_name if kind else None)
+
+    def prune(self) -> int:
+        # descriptors older than the longest ttl are of no use anymore
+        max_ttl_sec: int = max(self.__ttl_by_kind.values()) if self.__ttl_by_kind else 0
+        pruned: int = persistence.prune_metadata_descriptors(
+            max_entries=self.__max_db_entries,
+            older_than=time.time() - max_ttl_sec if max_ttl_sec > 0 else None)
+        if pruned > 0:
+            msgproc.log(f"MetadataStore pruned [{pruned}] descriptor(s)")
+        return pruned
+
+    def prune_in_background(self):
+        threading.Thread(target=self.__prune_and_report, daemon=True).start()
+
+    def report(self):
+        msgproc.log(f"MetadataStore {self.__statistics}")
+        for memory_statistics in self.__memory.get_statistics():
+            msgproc.log(f"MetadataStore memory {memory_statistics}")
+
+    def __get(
+            self,
+            kind: MetadataKind,
+            tidal_session: TidalSession,
+            item_id: str,
+            parse: Callable[[dict[str, any]], any]) -> any:
+        ttl_sec: int = self.__ttl_by_kind.get(kind, 0)
+        if ttl_sec <= 0:
+            return self.__to_object(tidal_session, self.__fetch(kind, tidal_session, item_id).data, parse)
+        country_code: str = str(tidal_session.country_code)
+        key: tuple[str, str] = (str(item_id), country_code)
+
+        def loader() -> _Descriptor:
+            return self.__load(kind, tidal_session, str(item_id), country_code, ttl_sec)
+        descriptor: _Descriptor = self.__memory.get(
+            group=kind.kind_name,
+            key=key,
+            loader=loader,
+            ttl_sec=ttl_sec,
+            # a descriptor from the db is kept in memory only for the rest of its lifetime
+            ttl_of=lambda d: ttl_sec - (time.time() - d.fetched_at))
+        return self.__to_object(tidal_session, descriptor.data, parse)
+
+    def __to_object(
+            self,
+            tidal_session: TidalSession,
+            data: dict[str, any],
+            parse: Callable[[dict[str, any]], any]) -> any:
+        # same mapping applied by tidalapi, also for paged lists
+        return tidal_session.request.map_json(data, parse=parse)
+
+    def __load(
+            self,
+            kind: MetadataKind,
+            tidal_session: TidalSession,
+            item_id: str,
+            country_code: str,
+            ttl_sec: int) -> _Descriptor:
+        stored: persistence.MetadataDescriptor = None
+        try:
+            stored = persistence.load_metadata_descriptor(kind.kind_name, item_id, country_code)
+        except Exception as ex:
+            msgproc.log(f"MetadataStore cannot read [{kind.kind_name}] [{item_id}] [{type(ex)}] [{ex}]")
+        if stored:
+            if stored.descriptor_version != METADATA_DESCRIPTOR_VERSION:
+                self.__count("outdated")
+            elif time.time() - stored.fetched_at >= ttl_sec:
+                self.__count("expired")
+            else:
+                self.__count("db_hits")
+                return _Descriptor(data=json.loads(stored.descriptor), fetched_at=stored.fetched_at)
+        descriptor: _Descriptor = self.__fetch(kind, tidal_session, item_id)
+        try:
+            persistence.store_metadata_descriptor(
+                kind=kind.kind_name,
+                item_id=item_id,
+                country_code=country_code,
+                metadata_descriptor=persistence.MetadataDescriptor(
+                    descriptor_version=METADATA_DESCRIPTOR_VERSION,
+                    descriptor=json.dumps(descriptor.data),
+                    fetched_at=descriptor.fetched_at))
+        except Exception as ex:
+            msgproc.log(f"MetadataStore cannot store [{kind.kind_name}] [{item_id}] [{type(ex)}] [{ex}]")
+        return descriptor
+
+    def __fetch(self, kind: MetadataKind, tidal_session: TidalSession, item_id: str) -> _Descriptor:
+        try:
+            # same request tidalapi does when building the object
+            data: dict[str, any] = tidal_session.request.request(
+                "GET",
+                kind.get_api_path(item_id),
+                {"limit": None, "offset": 0} if kind == MetadataKind.ALBUM_TRACKS else None).json()
+        except requests.HTTPError as ex:
+            self.__count("api_failures")
+            # callers tell a missing object from other failures, as with tidalapi
+            if ex.response is not None and ex.response.status_code == 404:
+                raise ObjectNotFound(f"{kind.kind_name} [{item_id}] not found") from ex
+            raise
+        except Exception:
+            self.__count("api_failures")
+            raise
+        if not data:
+            self.__count("api_failures")
+            raise ObjectNotFound(f"{kind.kind_name} [{item_id}] not found")
+        api_loads: int = self.__count("api_loads")
+        if api_loads % MetadataStore.__prune_every == 0:
+            self.prune_in_background()
+        return _Descriptor(data=data, fetched_at=time.time())
+
+    def __prune_and_report(self):
+        try:
+            self.prune()
+        except Exception as ex:
+            msgproc.log(f"MetadataStore prune failed [{type(ex)}] [{ex}]")
+        self.report()
+
+    def __count(self, counter_name: str) -> int:
+        with self.__lock:
+            value: int = getattr(self.__statistics, counter_name) + 1
+            setattr(self.__statistics, counter_name, value)
+            return value
+
+
+def __create() -> MetadataStore:
+    album_ttl_sec: int = config.get_config_param_as_int(constants.ConfigParam.METADATA_STORE_ALBUM_TTL_SEC)
+    return MetadataStore(
+        ttl_by_kind={
+            MetadataKind.ALBUM: album_ttl_sec,
+            MetadataKind.ALBUM_TRACKS: album_ttl_sec,
+            MetadataKind.TRACK: config.get_config_param_as_int(constants.ConfigParam.METADATA_STORE_TRACK_TTL_SEC),
+            MetadataKind.ARTIST: config.get_config_param_as_int(constants.ConfigParam.METADATA_STORE_ARTIST_TTL_SEC)},
+        max_memory_entries=config.get_config_param_as_int(constants.ConfigParam.METADATA_STORE_MAX_MEMORY_ENTRIES),
+        max_db_entries=config.get_config_param_as_int(constants.ConfigParam.METADATA_STORE_MAX_DB_ENTRIES),
+        report_every=config.get_config_param_as_int(constants.ConfigParam.METADATA_STORE_REPORT_EVERY))
+
+
+metadata_store: MetadataStore = __create()
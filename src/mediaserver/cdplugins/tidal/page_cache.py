@@ -0,0 +1,211 @@
+# Copyright (C) 2026 Giovanni Fulco
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# in-process cache of tidal editorial pages (home, explore, genres, moods, page links)
+# pages are materialized once and kept by path and session quality, each with its own ttl,
+# recently used pages are refreshed in background before they expire, so browsing and
+# pagination slice the cached items instead of asking tidal again
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable
+
+from msgproc_provider import msgproc
+
+
+class CachedPage:
+
+    def __init__(self, title: str, items: list[any]):
+        self.__title: str = title
+        self.__items: list[any] = items
+
+    @property
+    def title(self) -> str:
+        return self.__title
+
+    @property
+    def items(self) -> list[any]:
+        return self.__items
+
+    def slice(self, offset: int, limit: int) -> list[any]:
+        return self.__items[offset:offset + limit]
+
+    def __iter__(self):
+        return iter(self.__items)
+
+    def __len__(self) -> int:
+        return len(self.__items)
+
+
+def materialize(page: any) -> CachedPage:
+    """Reads all the items of a page once, so the page can be iterated again without requests"""
+    if page is None:
+        return None
+    return CachedPage(title=getattr(page, "title", None), items=list(page))
+
+
+class PageCacheEntry:
+
+    def __init__(
+            self,
+            page: CachedPage,
+            loader: Callable[[], any],
+            ttl_sec: int):
+        self.page: CachedPage = page
+        self.loader: Callable[[], any] = loader
+        self.ttl_sec: int = ttl_sec
+        self.fetch_time: float = time.time()
+        self.last_access: float = self.fetch_time
+
+    def age(self, now: float) -> float:
+        return now - self.fetch_time
+
+    def is_expired(self, now: float) -> bool:
+        return self.age(now) >= self.ttl_sec
+
+
+class PageCacheStatistics:
+
+    def __init__(self):
+        self.hits: int = 0
+        self.misses: int = 0
+        self.refreshed: int = 0
+        self.stale: int = 0
+        self.evicted: int = 0
+
+    def __str__(self) -> str:
+        return (f"hits [{self.hits}] misses [{self.misses}] refreshed [{self.refreshed}] "
+                f"stale [{self.stale}] evicted [{self.evicted}]")
+
+
+class PageCache:
+
+    # pages used since their last fetch are reloaded when this much of the ttl is gone
+    __refresh_ahead_ratio: float = 0.8
+
+    def __init__(self, max_entries: int):
+        self.__max_entries: int = max_entries
+        self.__lock: threading.Lock = threading.Lock()
+        # by (path, variant), least recently used first
+        self.__entries: OrderedDict[tuple[str, str], PageCacheEntry] = OrderedDict()
+        self.__statistics: PageCacheStatistics = PageCacheStatistics()
+        self.__refresher: threading.Thread = None
+
+    @property
+    def statistics(self) -> PageCacheStatistics:
+        return self.__statistics
+
+    @property
+    def size(self) -> int:
+        return len(self.__entries)
+
+    def get(
+            self,
+            path: str,
+            variant: str,
+            ttl_sec: int,
+            loader: Callable[[], any]) -> CachedPage:
+        """Returns the page at path, calling loader only when missing or expired"""
+        if ttl_sec <= 0:
+            return materialize(loader())
+        key: tuple[str, str] = (path, variant)
+        now: float = time.time()
+        with self.__lock:
+            entry: PageCacheEntry = self.__entries.get(key)
+            if entry and not entry.is_expired(now):
+                entry.last_access = now
+                self.__entries.move_to_end(key)
+                self.__statistics.hits += 1
+                return entry.page
+            self.__statistics.misses += 1
+        try:
+            page: CachedPage = materialize(loader())
+        except Exception as ex:
+            if not entry:
+                raise
+            # an expired page is better than no page at all
+            msgproc.log(f"PageCache cannot reload [{path}], serving stale page [{type(ex)}] [{ex}]")
+            with self.__lock:
+                self.__statistics.stale += 1
+            return entry.page
+        if page is not None:
+            self.__store(key, PageCacheEntry(page=page, loader=loader, ttl_sec=ttl_sec))
+        return page
+
+    def invalidate(self, path: str = None):
+        with self.__lock:
+            if path is None:
+                self.__entries.clear()
+                return
+            for key in [k for k in self.__entries.keys() if k[0] == path]:
+                del self.__entries[key]
+
+    def refresh(self) -> int:
+        """Reloads the pages which are about to expire and were used since they were fetched,
+        drops the ones nobody asked for during their ttl"""
+        now: float = time.time()
+        to_refresh: list[tuple[tuple[str, str], PageCacheEntry]] = list()
+        with self.__lock:
+            for key, entry in list(self.__entries.items()):
+                if entry.age(now) < entry.ttl_sec * PageCache.__refresh_ahead_ratio:
+                    continue
+                if entry.last_access > entry.fetch_time:
+                    to_refresh.append((key, entry))
+                elif entry.is_expired(now):
+                    del self.__entries[key]
+        refreshed: int = 0
+        for key, entry in to_refresh:
+            try:
+                page: CachedPage = materialize(entry.loader())
+            except Exception as ex:
+                msgproc.log(f"PageCache cannot refresh [{key[0]}] [{type(ex)}] [{ex}]")
+                continue
+            if page is None:
+                continue
+            refreshed_entry: PageCacheEntry = PageCacheEntry(
+                page=page,
+                loader=entry.loader,
+                ttl_sec=entry.ttl_sec)
+            self.__store(key, refreshed_entry)
+            refreshed += 1
+        with self.__lock:
+            self.__statistics.refreshed += refreshed
+        return refreshed
+
+    def start_refresher(self, interval_sec: int):
+        if self.__refresher is not None or interval_sec <= 0:
+            return
+        self.__refresher = threading.Thread(target=self.__refresh_loop, args=(interval_sec,), daemon=True)
+        self.__refresher.start()
+
+    def __refresh_loop(self, interval_sec: int):
+        while True:
+            time.sleep(interval_sec)
+            try:
+                refreshed: int = self.refresh()
+                if refreshed > 0:
+                    msgproc.log(f"PageCache refreshed [{refreshed}] page(s), "
+                                f"size [{self.size}] {self.__statistics}")
+            except Exception as ex:
+                msgproc.log(f"PageCache refresh failed [{type(ex)}] [{ex}]")
+
+    def __store(self, key: tuple[str, str], entry: PageCacheEntry):
+        with self.__lock:
+            self.__entries[key] = entry
+            self.__entries.move_to_end(key)
+            while len(self.__entries) > self.__max_entries > 0:
+                self.__entries.popitem(last=False)
+                self.__statistics.evicted += 1
@@ -42,6 +42,9 @@ __table_name_listen_track_queue_v1: str = "listen_track_queue_v1"
 
 __table_name_album_metadata_cache_v1: str = "album_metadata_cache_v1"
 __table_name_tile_image_v1: str = "tile_image_v1"
+__table_name_favorite_album_v1: str = "favorite_album_v1"
+__table_name_favorite_artist_v1: str = "favorite_artist_v1"
+__table_name_metadata_descriptor_v1: str = "metadata_descriptor_v1"
 
 __field_name_album_id: str = "album_id"
 __field_name_artist_id: str = "artist_id"
@@ -141,6 +144,14 @@ class AlbumMetadata:
     artist_image_url_list: list[str] = []
 
 
+class FavoriteArtistMetadata:
+
+    artist_id: str = None
+    artist_name: str = None
+    image_url: str = None
+    user_date_added: datetime = None
+
+
 class PlayedTracksSorting(Enum):
 
     LAST_PLAYED_FIRST = 0, "lp-first", "last_played", "DESC"
@@ -195,14 +206,25 @@ def __adapt_flexible_timestamp(ts_bytes):
         return datetime.datetime.strptime(ts_str, "%Y-%m-%d %H:%M:%S%z")
 
 
+sqlite3.register_converter("TIMESTAMP", __adapt_flexible_timestamp)
+
+
 def get_connection() -> sqlite3.Connection:
-    sqlite3.register_converter("TIMESTAMP", __adapt_flexible_timestamp)
     connection = sqlite3.connect(
         __get_db_full_path(),
         detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES)
     return connection
 
 
+def get_writer_connection() -> sqlite3.Connection:
+    # long-lived connection for background writers
+    # WAL lets readers go on while we write, NORMAL avoids a fsync per commit
+    connection: sqlite3.Connection = get_connection()
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    return connection
+
+
 def __prepare_table_db_version():
     cursor_obj = get_connection().cursor()
     # Creating table
@@ -680,14 +702,66 @@ def migration_18():
     migration_template("19", do_migration_18)
 
 
+def do_migration_20():
+    # mirror of the user favorites, album data is in album_metadata_cache_v1
+    connection: sqlite3.Connection = get_connection()
+    cursor_obj = connection.cursor()
+    cursor_obj.execute(f"""
+        CREATE TABLE IF NOT EXISTS {__table_name_favorite_album_v1}(
+        {__field_name_album_id} VARCHAR(255) PRIMARY KEY,
+        {Column.USER_DATE_ADDED.column_name} TIMESTAMP)
+    """)
+    cursor_obj.execute(f"""
+        CREATE TABLE IF NOT EXISTS {__table_name_favorite_artist_v1}(
+        {__field_name_artist_id} VARCHAR(255) PRIMARY KEY,
+        {__field_name_name} VARCHAR(255),
+        {__field_name_image_url} VARCHAR(255),
+        {Column.USER_DATE_ADDED.column_name} TIMESTAMP)
+    """)
+    cursor_obj.close()
+
+
+def do_migration_21():
+    # tidal api descriptors of albums, tracks and artists, see metadata_store
+    connection: sqlite3.Connection = get_connection()
+    cursor_obj = connection.cursor()
+    cursor_obj.execute(f"""
+        CREATE TABLE IF NOT EXISTS {__table_name_metadata_descriptor_v1}(
+        kind VARCHAR(32),
+        item_id VARCHAR(255),
+        country_code VARCHAR(8),
+        descriptor_version INTEGER,
+        descriptor TEXT,
+        fetched_at REAL,
+        PRIMARY KEY (kind, item_id, country_code))
+    """)
+    cursor_obj.execute(f"""
+        CREATE INDEX IF NOT EXISTS metadata_descriptor_v1_idx_fetched_at
+        ON {__table_name_metadata_descriptor_v1}(fetched_at)
+    """)
+    cursor_obj.close()
+    connection.close()
+
+
 def migration_19():
     migration_template("20", do_migration_19)
 
 
+def migration_20():
+    migration_template("21", do_migration_20)
+
+
+def migration_21():
+    migration_template("22", do_migration_21)
+
+
 def insert_playback(
         played_track_request: PlayedTrackRequest,
-        last_played: datetime.datetime):
-    play_count: int = 1 if last_played else 0
+        last_played: datetime.datetime,
+        play_count_increment: int = 1,
+        connection: sqlite3.Connection = None):
+    # when a connection is provided, the caller is in charge of the commit
+    play_count: int = play_count_increment if last_played else 0
     # msgproc.log(f"insert_playback [{played_track_request.track_id}] "
     #             f"with play_count [{play_count}] "
     #             f"last_played [{'NOT NULL' if last_played else 'NULL'}]")
@@ -711,7 +785,9 @@ def insert_playback(
         played_track_request.sample_rate,
         play_count,
         last_played)
-    connection: sqlite3.Connection = get_connection()
+    do_commit: bool = connection is None
+    if do_commit:
+        connection: sqlite3.Connection = get_connection()
     cursor = connection.cursor()
     cursor.execute(
         "INSERT INTO played_track_v1(track_id, \
@@ -736,12 +812,19 @@ def insert_playback(
                     VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
         t)
     cursor.close()
-    connection.commit()
+    if do_commit:
+        connection.commit()
 
 
 def update_playback(
         played_track_request: PlayedTrackRequest,
-        last_played: datetime.datetime):
+        last_played: datetime.datetime,
+        play_count_increment: int = 1,
+        connection: sqlite3.Connection = None):
+    # when a connection is provided, the caller is in charge of the commit
+    do_commit: bool = connection is None
+    if do_commit:
+        connection: sqlite3.Connection = get_connection()
     if config.get_config_param_as_bool(constants.ConfigParam.VERBOSE_LOGGING):
         msgproc.log(f"update_playback [{played_track_request.track_id}] "
                     f"with last_played [{'NOT NULL' if last_played else 'NULL'}]")
@@ -763,10 +846,9 @@ def update_playback(
             played_track_request.album_duration,
             played_track_request.bit_depth,
             played_track_request.sample_rate,
-            played_track_request.track_id,
+            play_count_increment,
             last_played,
             played_track_request.track_id)
-        connection: sqlite3.Connection = get_connection()
         cursor = connection.cursor()
         cursor.execute("UPDATE played_track_v1 set album_id = ?, \
                     album_track_count = ?, \
@@ -784,7 +866,7 @@ def update_playback(
                     album_duration = ?, \
                     bit_depth = ?, \
                     sample_rate = ?, \
-                    play_count = (SELECT play_count + 1 AS play_count FROM played_track_v1 WHERE track_id = ?), \
+                    play_count = play_count + ?, \
                     last_played = ? \
                     WHERE track_id = ?", t)
     else:
@@ -807,7 +889,6 @@ def update_playback(
             played_track_request.bit_depth,
             played_track_request.sample_rate,
             played_track_request.track_id)
-        connection: sqlite3.Connection = get_connection()
         cursor = connection.cursor()
         cursor.execute("UPDATE played_track_v1 set album_id = ?, \
                     album_track_count = ?, \
@@ -827,7 +908,8 @@ def update_playback(
                     sample_rate = ? \
                     WHERE track_id = ?", t)
     cursor.close()
-    connection.commit()
+    if do_commit:
+        connection.commit()
 
 
 def _get_played_tracks(sorting: PlayedTracksSorting, max_tracks: int) -> list[PlayedTrack]:
@@ -958,59 +1040,92 @@ def get_played_track_entry(track_id: str) -> PlayedTrack:
     return result
 
 
+__played_album_entry_column_list: str = """
+    play_count,
+    last_played,
+    track_id,
+    album_track_count,
+    track_name,
+    track_duration,
+    track_num,
+    volume_num,
+    album_num_volumes,
+    album_name,
+    audio_quality,
+    album_artist_name,
+    image_url,
+    artist_name,
+    explicit,
+    album_duration,
+    bit_depth,
+    sample_rate,
+    album_id"""
+
+# sqlite allows a limited number of host parameters per statement
+__max_in_list_size: int = 500
+
+
+def __played_album_entry_from_row(row) -> PlayedTrack:
+    played_track: PlayedTrack = PlayedTrack()
+    played_track.play_count = row[0]
+    played_track.last_played = row[1]
+    played_track.track_id = str(row[2])
+    played_track.album_track_count = row[3]
+    played_track.track_name = row[4]
+    played_track.track_duration = row[5]
+    played_track.track_num = row[6]
+    played_track.volume_num = row[7]
+    played_track.album_num_volumes = row[8]
+    played_track.album_name = row[9]
+    played_track.audio_quality = row[10]
+    played_track.album_artist_name = row[11]
+    played_track.image_url = row[12]
+    played_track.artist_name = row[13]
+    played_track.explicit = row[14]
+    played_track.album_duration = row[15]
+    played_track.bit_depth = row[16]
+    played_track.sample_rate = row[17]
+    played_track.album_id = str(row[18])
+    return played_track
+
+
 def get_played_album_entries(album_id: str, connection: sqlite3.Connection = None) -> list[PlayedTrack]:
     t: tuple[str] = tuple([album_id])
     cn: sqlite3.Connection = get_connection() if connection is None else connection
     cursor = cn.cursor()
-    cursor.execute("SELECT \
-                   play_count, \
-                   last_played, \
-                   track_id, \
-                   album_track_count, \
-                   track_name, \
-                   track_duration, \
-                   track_num, \
-                   volume_num, \
-                   album_num_volumes, \
-                   album_name, \
-                   audio_quality, \
-                   album_artist_name, \
-                   image_url, \
-                   artist_name, \
-                   explicit, \
-                   album_duration, \
-                   bit_depth, \
-                   sample_rate \
+    cursor.execute(f"SELECT {__played_album_entry_column_list} \
                 FROM played_track_v1 \
                 WHERE album_id = ? \
                 ORDER BY volume_num, track_num", t)
     rows = cursor.fetchall()
     cursor.close()
-    if not rows:
-        return list()
-    result: list[PlayedTrack] = list()
-    for row in rows:
-        played_track: PlayedTrack = PlayedTrack()
-        played_track.album_id = album_id
-        played_track.play_count = row[0]
-        played_track.last_played = row[1]
-        played_track.track_id = str(row[2])
-        played_track.album_track_count = row[3]
-        played_track.track_name = row[4]
-        played_track.track_duration = row[5]
-        played_track.track_num = row[6]
-        played_track.volume_num = row[7]
-        played_track.album_num_volumes = row[8]
-        played_track.album_name = row[9]
-        played_track.audio_quality = row[10]
-        played_track.album_artist_name = row[11]
-        played_track.image_url = row[12]
-        played_track.explicit = row[13]
-        played_track.artist_name = row[14]
-        played_track.album_duration = row[15]
-        played_track.bit_depth = row[16]
-        played_track.sample_rate = row[17]
-        result.append(played_track)
+    if connection is None:
+        cn.close()
+    return [__played_album_entry_from_row(row) for row in rows] if rows else list()
+
+
+def get_played_album_entries_by_album_id_list(
+        album_id_list: list[str],
+        connection: sqlite3.Connection = None) -> dict[str, list[PlayedTrack]]:
+    # one query per chunk of album ids instead of one per album
+    # every requested album is in the result, with an empty list when never played
+    result: dict[str, list[PlayedTrack]] = {str(album_id): list() for album_id in album_id_list}
+    album_id_tuple: tuple[str] = tuple(result.keys())
+    if len(album_id_tuple) == 0:
+        return result
+    cn: sqlite3.Connection = get_connection() if connection is None else connection
+    cursor = cn.cursor()
+    for chunk_start in range(0, len(album_id_tuple), __max_in_list_size):
+        chunk: tuple[str] = album_id_tuple[chunk_start:chunk_start + __max_in_list_size]
+        placeholders: str = ", ".join("?" * len(chunk))
+        cursor.execute(f"SELECT {__played_album_entry_column_list} \
+                    FROM played_track_v1 \
+                    WHERE album_id IN ({placeholders}) \
+                    ORDER BY album_id, volume_num, track_num", chunk)
+        for row in cursor.fetchall():
+            played_track: PlayedTrack = __played_album_entry_from_row(row)
+            result[played_track.album_id].append(played_track)
+    cursor.close()
     if connection is None:
         cn.close()
     return result
@@ -1132,19 +1247,27 @@ def track_ghost_playback(played_track_request: PlayedTrackRequest):
             last_played=None)
 
 
-def track_playback(played_track_request: PlayedTrackRequest):
-    now: datetime.datetime = datetime.datetime.now()
+def track_playback(
+        played_track_request: PlayedTrackRequest,
+        last_played: datetime.datetime = None,
+        play_count_increment: int = 1,
+        connection: sqlite3.Connection = None):
+    now: datetime.datetime = last_played if last_played else datetime.datetime.now()
     # we try inserting first
     track_action: str = "insert"
     try:
         insert_playback(
             played_track_request=played_track_request,
-            last_played=now)
+            last_played=now,
+            play_count_increment=play_count_increment,
+            connection=connection)
     except sqlite3.IntegrityError:
         track_action: str = "update"
         update_playback(
             played_track_request=played_track_request,
-            last_played=now)
+            last_played=now,
+            play_count_increment=play_count_increment,
+            connection=connection)
     if config.get_config_param_as_bool(constants.ConfigParam.VERBOSE_LOGGING):
         msgproc.log(f"Track playback for {played_track_request.track_id} completed [{track_action}].")
 
@@ -1363,25 +1486,7 @@ def get_album_metadata(album_id: str, connection: sqlite3.Connection = None) ->
     cursor.execute(
         f"""
             SELECT
-                {__field_name_album_id},
-                {__field_name_name},
-                {__field_name_artist_id},
-                {__field_name_artist_name},
-                {__field_name_explicit},
-                {__field_name_release_date},
-                {__field_name_available_release_date},
-                {__field_name_image_url},
-                {__field_name_audio_modes},
-                {__field_name_audio_quality},
-                {__field_name_media_metadata_tags},
-                {Column.ALBUM_DURATION.column_name},
-                {Column.NUM_VOLUMES.column_name},
-                {Column.NUM_TRACKS.column_name},
-                {Column.USER_DATE_ADDED.column_name},
-                {Column.ARTIST_ID_LIST.column_name},
-                {Column.ARTIST_NAME_LIST.column_name},
-                {Column.ARTIST_IMAGE_URL_LIST.column_name},
-                {__field_name_created_timestamp}
+                {__get_album_metadata_column_list()}
             FROM
                 {__table_name_album_metadata_cache_v1}
             WHERE {__field_name_album_id} = ?""",
@@ -1392,7 +1497,35 @@ def get_album_metadata(album_id: str, connection: sqlite3.Connection = None) ->
         return None
     if len(rows) > 1:
         raise Exception(f"Multiple {__table_name_album_metadata_cache_v1} records for [{album_id}]")
-    row = rows[0]
+    return __album_metadata_from_row(rows[0])
+
+
+def __get_album_metadata_column_list(table_alias: str = None) -> str:
+    column_list: list[str] = [
+        __field_name_album_id,
+        __field_name_name,
+        __field_name_artist_id,
+        __field_name_artist_name,
+        __field_name_explicit,
+        __field_name_release_date,
+        __field_name_available_release_date,
+        __field_name_image_url,
+        __field_name_audio_modes,
+        __field_name_audio_quality,
+        __field_name_media_metadata_tags,
+        Column.ALBUM_DURATION.column_name,
+        Column.NUM_VOLUMES.column_name,
+        Column.NUM_TRACKS.column_name,
+        Column.USER_DATE_ADDED.column_name,
+        Column.ARTIST_ID_LIST.column_name,
+        Column.ARTIST_NAME_LIST.column_name,
+        Column.ARTIST_IMAGE_URL_LIST.column_name,
+        __field_name_created_timestamp]
+    prefix: str = f"{table_alias}." if table_alias else ""
+    return ", ".join([f"{prefix}{x}" for x in column_list])
+
+
+def __album_metadata_from_row(row) -> AlbumMetadata:
     result: AlbumMetadata = AlbumMetadata()
     result.album_id = row[0]
     result.album_name = row[1]
@@ -1511,6 +1644,206 @@ def store_album_metadata(album_metadata: AlbumMetadata, connection: sqlite3.Conn
         cn.close()
 
 
+def load_favorite_album_metadata_list() -> list[AlbumMetadata]:
+    connection: sqlite3.Connection = get_connection()
+    cursor = connection.cursor()
+    cursor.execute(
+        f"""
+            SELECT
+                {__get_album_metadata_column_list(table_alias="m")},
+                f.{Column.USER_DATE_ADDED.column_name}
+            FROM
+                {__table_name_favorite_album_v1} f
+                JOIN {__table_name_album_metadata_cache_v1} m
+                    ON m.{__field_name_album_id} = f.{__field_name_album_id}""")
+    rows = cursor.fetchall()
+    cursor.close()
+    connection.close()
+    result: list[AlbumMetadata] = list()
+    for row in rows:
+        album_metadata: AlbumMetadata = __album_metadata_from_row(row)
+        # the favorite date wins over the cached one
+        album_metadata.user_date_added = row[19]
+        result.append(album_metadata)
+    return result
+
+
+def store_favorite_albums(album_metadata_list: list[AlbumMetadata], replace: bool):
+    # replace means this is the whole favorites list
+    connection: sqlite3.Connection = get_connection()
+    cursor = connection.cursor()
+    if replace:
+        cursor.execute(f"DELETE FROM {__table_name_favorite_album_v1}")
+    current: AlbumMetadata
+    for current in album_metadata_list:
+        store_album_metadata(album_metadata=current, connection=connection)
+        cursor.execute(
+            f"""INSERT OR REPLACE INTO {__table_name_favorite_album_v1}(
+                    {__field_name_album_id},
+                    {Column.USER_DATE_ADDED.column_name})
+                VALUES (?, ?)""",
+            (current.album_id, current.user_date_added))
+    cursor.close()
+    connection.commit()
+    connection.close()
+
+
+def delete_favorite_album(album_id: str):
+    connection: sqlite3.Connection = get_connection()
+    cursor = connection.cursor()
+    cursor.execute(
+        f"DELETE FROM {__table_name_favorite_album_v1} WHERE {__field_name_album_id} = ?",
+        (album_id, ))
+    cursor.close()
+    connection.commit()
+    connection.close()
+
+
+def load_favorite_artist_metadata_list() -> list[FavoriteArtistMetadata]:
+    connection: sqlite3.Connection = get_connection()
+    cursor = connection.cursor()
+    cursor.execute(
+        f"""
+            SELECT
+                {__field_name_artist_id},
+                {__field_name_name},
+                {__field_name_image_url},
+                {Column.USER_DATE_ADDED.column_name}
+            FROM
+                {__table_name_favorite_artist_v1}""")
+    rows = cursor.fetchall()
+    cursor.close()
+    connection.close()
+    result: list[FavoriteArtistMetadata] = list()
+    for row in rows:
+        artist_metadata: FavoriteArtistMetadata = FavoriteArtistMetadata()
+        artist_metadata.artist_id = row[0]
+        artist_metadata.artist_name = row[1]
+        artist_metadata.image_url = row[2]
+        artist_metadata.user_date_added = row[3]
+        result.append(artist_metadata)
+    return result
+
+
+def store_favorite_artists(artist_metadata_list: list[FavoriteArtistMetadata], replace: bool):
+    # replace means this is the whole favorites list
+    connection: sqlite3.Connection = get_connection()
+    cursor = connection.cursor()
+    if replace:
+        cursor.execute(f"DELETE FROM {__table_name_favorite_artist_v1}")
+    cursor.executemany(
+        f"""INSERT OR REPLACE INTO {__table_name_favorite_artist_v1}(
+                {__field_name_artist_id},
+                {__field_name_name},
+                {__field_name_image_url},
+                {Column.USER_DATE_ADDED.column_name})
+            VALUES (?, ?, ?, ?)""",
+        [(x.artist_id, x.artist_name, x.image_url, x.user_date_added) for x in artist_metadata_list])
+    cursor.close()
+    connection.commit()
+    connection.close()
+
+
+def delete_favorite_artist(artist_id: str):
+    connection: sqlite3.Connection = get_connection()
+    cursor = connection.cursor()
+    cursor.execute(
+        f"DELETE FROM {__table_name_favorite_artist_v1} WHERE {__field_name_artist_id} = ?",
+        (artist_id, ))
+    cursor.close()
+    connection.commit()
+    connection.close()
+
+
+class MetadataDescriptor:
+
+    def __init__(
+            self,
+            descriptor_version: int,
+            descriptor: str,
+            fetched_at: float):
+        self.descriptor_version: int = descriptor_version
+        self.descriptor: str = descriptor
+        self.fetched_at: float = fetched_at
+
+
+def load_metadata_descriptor(kind: str, item_id: str, country_code: str) -> MetadataDescriptor | None:
+    connection: sqlite3.Connection = get_connection()
+    cursor = connection.cursor()
+    cursor.execute(
+        f"""
+            SELECT
+                descriptor_version,
+                descriptor,
+                fetched_at
+            FROM
+                {__table_name_metadata_descriptor_v1}
+            WHERE
+                kind = ? AND item_id = ? AND country_code = ?""",
+        (kind, item_id, country_code))
+    row = cursor.fetchone()
+    cursor.close()
+    connection.close()
+    if not row:
+        return None
+    return MetadataDescriptor(
+        descriptor_version=row[0],
+        descriptor=row[1],
+        fetched_at=row[2])
+
+
+def store_metadata_descriptor(
+        kind: str,
+        item_id: str,
+        country_code: str,
+        metadata_descriptor: MetadataDescriptor):
+    connection: sqlite3.Connection = get_connection()
+    cursor = connection.cursor()
+    cursor.execute(
+        f"""INSERT OR REPLACE INTO {__table_name_metadata_descriptor_v1}(
+                kind,
+                item_id,
+                country_code,
+                descriptor_version,
+                descriptor,
+                fetched_at)
+            VALUES (?, ?, ?, ?, ?, ?)""",
+        (kind,
+         item_id,
+         country_code,
+         metadata_descriptor.descriptor_version,
+         metadata_descriptor.descriptor,
+         metadata_descriptor.fetched_at))
+    cursor.close()
+    connection.commit()
+    connection.close()
+
+
+def prune_metadata_descriptors(max_entries: int, older_than: float = None) -> int:
+    # drops descriptors fetched before older_than, then the oldest ones above max_entries
+    connection: sqlite3.Connection = get_connection()
+    cursor = connection.cursor()
+    deleted: int = 0
+    if older_than is not None:
+        cursor.execute(
+            f"DELETE FROM {__table_name_metadata_descriptor_v1} WHERE fetched_at < ?",
+            (older_than, ))
+        deleted += cursor.rowcount
+    if max_entries > 0:
+        cursor.execute(
+            f"""DELETE FROM {__table_name_metadata_descriptor_v1}
+                WHERE rowid IN (
+                    SELECT rowid FROM {__table_name_metadata_descriptor_v1}
+                    ORDER BY fetched_at DESC
+                    LIMIT -1 OFFSET ?)""",
+            (max_entries, ))
+        deleted += cursor.rowcount
+    cursor.close()
+    connection.commit()
+    connection.close()
+    return deleted
+
+
 __prepare_table_db_version()
 
 current_db_version: str = get_db_version()
@@ -1616,7 +1949,15 @@ migrations: list[Migration] = [
     Migration(
         migration_name="add artist image url list to album_metadata_v1",
         apply_on="19",
-        migration_function=migration_19)]
+        migration_function=migration_19),
+    Migration(
+        migration_name="add favorite_album_v1 and favorite_artist_v1",
+        apply_on="20",
+        migration_function=migration_20),
+    Migration(
+        migration_name="add metadata_descriptor_v1",
+        apply_on="21",
+        migration_function=migration_21)]
 
 current_migration: Migration
 for current_migration in migrations:
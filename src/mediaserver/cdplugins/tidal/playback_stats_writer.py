@@ -0,0 +1,167 @@
+# Copyright (C) 2026 Giovanni Fulco
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# playback statistics are written by a background thread, so trackuri does not wait for them
+# requests are built in the worker too, as they might need more calls to tidal (e.g. the album)
+# plays of the same track are coalesced and written in one transaction on a long-lived
+# WAL connection, so playback start never waits for the disk
+
+import datetime
+import queue
+import sqlite3
+import threading
+import time
+from typing import Callable
+
+from msgproc_provider import msgproc
+from played_track_request import PlayedTrackRequest
+import config
+import constants
+import persistence
+
+
+class _PendingPlayback:
+
+    def __init__(self, played_track_request: PlayedTrackRequest, last_played: datetime.datetime):
+        self.played_track_request: PlayedTrackRequest = played_track_request
+        self.last_played: datetime.datetime = last_played
+        self.play_count: int = 1
+
+
+class PlaybackStatsWriter:
+
+    def __init__(self, flush_interval_sec: float, max_batch_size: int):
+        self.__flush_interval_sec: float = max(0.0, flush_interval_sec)
+        self.__max_batch_size: int = max(1, max_batch_size)
+        self.__queue: queue.Queue = queue.Queue()
+        self.__lock: threading.Lock = threading.Lock()
+        self.__worker: threading.Thread = None
+        self.__pending: dict[str, _PendingPlayback] = {}
+        self.__connection: sqlite3.Connection = None
+        self.__written: int = 0
+        self.__coalesced: int = 0
+        self.__commits: int = 0
+        self.__skipped: int = 0
+        self.__failed: int = 0
+
+    def submit(self, request_builder: Callable[[], PlayedTrackRequest]):
+        """request_builder runs in the worker, None means nothing to write"""
+        with self.__lock:
+            if self.__worker is None:
+                self.__worker = threading.Thread(target=self.__run, daemon=True)
+                self.__worker.start()
+        self.__queue.put((request_builder, datetime.datetime.now()))
+
+    def flush(self, timeout_sec: float = 10.0) -> bool:
+        """Writes everything which is queued, returns False on timeout"""
+        with self.__lock:
+            if self.__worker is None:
+                return True
+        done: threading.Event = threading.Event()
+        self.__queue.put(done)
+        return done.wait(timeout_sec)
+
+    def __str__(self) -> str:
+        return (f"written [{self.__written}] coalesced [{self.__coalesced}] "
+                f"commits [{self.__commits}] skipped [{self.__skipped}] "
+                f"failed [{self.__failed}] pending [{len(self.__pending)}] "
+                f"queued [{self.__queue.qsize()}]")
+
+    def __run(self):
+        first_pending_time: float = 0.0
+        while True:
+            timeout_sec: float = None
+            if self.__pending:
+                timeout_sec = max(0.0, first_pending_time + self.__flush_interval_sec - time.time())
+            try:
+                item = self.__queue.get(timeout=timeout_sec)
+            except queue.Empty:
+                self.__write_pending()
+                continue
+            if isinstance(item, threading.Event):
+                self.__write_pending()
+                item.set()
+                continue
+            request_builder, last_played = item
+            try:
+                played_track_request: PlayedTrackRequest = request_builder()
+            except Exception as ex:
+                self.__failed += 1
+                msgproc.log(f"PlaybackStatsWriter cannot build request [{type(ex)}] [{ex}]")
+                continue
+            if played_track_request is None:
+                self.__skipped += 1
+                continue
+            if not self.__pending:
+                first_pending_time = time.time()
+            self.__add_pending(played_track_request, last_played)
+            if len(self.__pending) >= self.__max_batch_size:
+                self.__write_pending()
+
+    def __add_pending(self, played_track_request: PlayedTrackRequest, last_played: datetime.datetime):
+        current: _PendingPlayback = self.__pending.get(played_track_request.track_id)
+        if current is None:
+            self.__pending[played_track_request.track_id] = _PendingPlayback(
+                played_track_request=played_track_request,
+                last_played=last_played)
+            return
+        # same track played again before the write, keep the latest metadata
+        current.played_track_request = played_track_request
+        current.last_played = last_played
+        current.play_count += 1
+        self.__coalesced += 1
+
+    def __write_pending(self):
+        if not self.__pending:
+            return
+        pending_list: list[_PendingPlayback] = list(self.__pending.values())
+        self.__pending.clear()
+        start: float = time.time()
+        try:
+            if self.__connection is None:
+                self.__connection = persistence.get_writer_connection()
+            for pending in pending_list:
+                persistence.track_playback(
+                    played_track_request=pending.played_track_request,
+                    last_played=pending.last_played,
+                    play_count_increment=pending.play_count,
+                    connection=self.__connection)
+            self.__connection.commit()
+            self.__commits += 1
+            self.__written += len(pending_list)
+        except Exception as ex:
+            self.__failed += len(pending_list)
+            msgproc.log(f"PlaybackStatsWriter failed writing [{len(pending_list)}] "
+                        f"track(s) [{type(ex)}] [{ex}]")
+            self.__discard_connection()
+            return
+        if config.get_config_param_as_bool(constants.ConfigParam.VERBOSE_LOGGING):
+            msgproc.log(f"PlaybackStatsWriter wrote [{len(pending_list)}] track(s) "
+                        f"elapsed [{(time.time() - start):.3f}] {self}")
+
+    def __discard_connection(self):
+        if self.__connection is None:
+            return
+        try:
+            self.__connection.rollback()
+            self.__connection.close()
+        except Exception as ex:
+            msgproc.log(f"PlaybackStatsWriter cannot close connection [{type(ex)}] [{ex}]")
+        self.__connection = None
+
+
+playback_stats_writer: PlaybackStatsWriter = PlaybackStatsWriter(
+    flush_interval_sec=config.get_config_param_as_int(constants.ConfigParam.PLAYBACK_STATS_FLUSH_INTERVAL_SEC),
+    max_batch_size=config.get_config_param_as_int(constants.ConfigParam.PLAYBACK_STATS_MAX_BATCH_SIZE))
@@ -0,0 +1,41 @@
+# Copyright (C) 2026 Giovanni Fulco
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# elapsed time of the stages of a request, e.g. trackuri
+# each mark closes the stage started by the previous mark (or by the creation)
+
+import time
+
+
+class StageTimer:
+
+    def __init__(self, name: str):
+        self.__name: str = name
+        self.__start: float = time.time()
+        self.__last: float = self.__start
+        self.__stages: list[tuple[str, float]] = []
+
+    def mark(self, stage: str):
+        now: float = time.time()
+        self.__stages.append((stage, now - self.__last))
+        self.__last = now
+
+    @property
+    def elapsed(self) -> float:
+        return time.time() - self.__start
+
+    def __str__(self) -> str:
+        stages: str = " ".join(f"{stage} [{elapsed:.3f}]" for stage, elapsed in self.__stages)
+        return f"{self.__name} {stages} total [{self.elapsed:.3f}] sec"
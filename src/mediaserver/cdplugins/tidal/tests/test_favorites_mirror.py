@@ -0,0 +1,145 @@
+# Copyright (C) 2026 Giovanni Fulco
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import datetime
+import unittest
+
+from favorites_mirror import FavoriteSortOrder
+from favorites_mirror import FavoritesMirror
+from persistence import FavoriteArtistMetadata
+import persistence
+
+
+class FavoriteAlbum:
+
+    def __init__(self, album_id: int, title: str, artist: str, date_added: float):
+        self.album_id: int = album_id
+        self.title: str = title
+        self.artist: str = artist
+        self.date_added: float = date_added
+
+
+class TestFavoritesMirror(unittest.TestCase):
+
+    def setUp(self):
+        self.mirror: FavoritesMirror[FavoriteAlbum] = FavoritesMirror(
+            name="albums",
+            id_extractor=lambda x: x.album_id,
+            sort_key_extractors={
+                FavoriteSortOrder.TITLE: lambda x: x.title.lower(),
+                FavoriteSortOrder.ARTIST: lambda x: x.artist.lower(),
+                FavoriteSortOrder.DATE_ADDED: lambda x: x.date_added})
+        self.mirror.replace([
+            FavoriteAlbum(1, "Kind of Blue", "Miles Davis", 30),
+            FavoriteAlbum(2, "a love supreme", "John Coltrane", 10),
+            FavoriteAlbum(3, "Mezzanine", "Massive Attack", 20),
+            FavoriteAlbum(4, "Blue Train", "John Coltrane", 40)])
+
+    def __page_ids(self, sort_order: FavoriteSortOrder, descending: bool = False,
+                   offset: int = 0, limit: int = 100) -> list[int]:
+        return [x.album_id for x in self.mirror.page(sort_order, descending, offset, limit)]
+
+    def test_empty_until_loaded(self):
+        mirror: FavoritesMirror[FavoriteAlbum] = FavoritesMirror("empty", lambda x: x.album_id, {})
+        self.assertFalse(mirror.loaded)
+        self.assertEqual(mirror.size, 0)
+        self.assertEqual(mirror.page(FavoriteSortOrder.TITLE, False, 0, 10), [])
+        self.assertTrue(self.mirror.loaded)
+
+    def test_pages_follow_sort_orders(self):
+        self.assertEqual(self.__page_ids(FavoriteSortOrder.TITLE), [2, 4, 1, 3])
+        self.assertEqual(self.__page_ids(FavoriteSortOrder.DATE_ADDED, descending=True), [4, 1, 3, 2])
+        # equal keys keep the list order
+        self.assertEqual(self.__page_ids(FavoriteSortOrder.ARTIST), [2, 4, 3, 1])
+
+    def test_page_slices(self):
+        self.assertEqual(self.__page_ids(FavoriteSortOrder.TITLE, offset=1, limit=2), [4, 1])
+        self.assertEqual(self.__page_ids(FavoriteSortOrder.TITLE, descending=True, offset=3, limit=2), [2])
+        self.assertEqual(self.__page_ids(FavoriteSortOrder.TITLE, offset=4, limit=2), [])
+        self.assertEqual(self.__page_ids(FavoriteSortOrder.TITLE, limit=0), [])
+        # no extractor for this order
+        self.assertEqual(self.__page_ids(FavoriteSortOrder.RELEASE_DATE), [])
+
+    def test_add_new_and_update_known(self):
+        update_time: float = self.mirror.update_time
+        self.mirror.add([
+            FavoriteAlbum(5, "Dummy", "Portishead", 50),
+            FavoriteAlbum(3, "Zzz renamed", "Massive Attack", 20)])
+        self.assertEqual(self.mirror.size, 5)
+        self.assertTrue(self.mirror.contains("5"))
+        self.assertEqual(self.__page_ids(FavoriteSortOrder.TITLE), [2, 4, 5, 1, 3])
+        self.assertEqual(self.__page_ids(FavoriteSortOrder.DATE_ADDED, descending=True, limit=1), [5])
+        self.assertGreaterEqual(self.mirror.update_time, update_time)
+
+    def test_remove(self):
+        self.assertTrue(self.mirror.remove(4))
+        self.assertFalse(self.mirror.remove("4"))
+        self.assertFalse(self.mirror.contains(4))
+        self.assertEqual(self.__page_ids(FavoriteSortOrder.TITLE), [2, 1, 3])
+        self.assertEqual(self.__page_ids(FavoriteSortOrder.DATE_ADDED), [2, 3, 1])
+
+    def test_replace_drops_removed_favorites(self):
+        self.mirror.replace([FavoriteAlbum(2, "a love supreme", "John Coltrane", 10)])
+        self.assertEqual(self.mirror.size, 1)
+        self.assertFalse(self.mirror.contains(1))
+        self.assertEqual(self.__page_ids(FavoriteSortOrder.ARTIST), [2])
+
+    def test_pages_taken_before_a_change_are_unaffected(self):
+        page = self.mirror.page(FavoriteSortOrder.TITLE, False, 0, 10)
+        self.mirror.remove(2)
+        self.assertEqual([x.album_id for x in page], [2, 4, 1, 3])
+
+
+def create_favorite_artist(artist_id: str, artist_name: str, day: int) -> FavoriteArtistMetadata:
+    artist_metadata: FavoriteArtistMetadata = FavoriteArtistMetadata()
+    artist_metadata.artist_id = artist_id
+    artist_metadata.artist_name = artist_name
+    artist_metadata.image_url = f"https://images/{artist_id}"
+    artist_metadata.user_date_added = datetime.datetime(2026, 1, day)
+    return artist_metadata
+
+
+class TestFavoriteArtistsReload(unittest.TestCase):
+    """The mirror is loaded from what persistence stored, as at startup"""
+
+    def setUp(self):
+        self.addCleanup(persistence.store_favorite_artists, [], True)
+        self.mirror: FavoritesMirror[FavoriteArtistMetadata] = FavoritesMirror(
+            name="artists",
+            id_extractor=lambda x: x.artist_id,
+            sort_key_extractors={
+                FavoriteSortOrder.NAME: lambda x: x.artist_name.lower(),
+                FavoriteSortOrder.DATE_ADDED: lambda x: x.user_date_added})
+
+    def __reload(self) -> list[str]:
+        self.mirror.replace(persistence.load_favorite_artist_metadata_list())
+        return [x.artist_id for x in self.mirror.page(FavoriteSortOrder.DATE_ADDED, True, 0, 100)]
+
+    def test_store_replace_add_delete(self):
+        persistence.store_favorite_artists([
+            create_favorite_artist("1", "Nick Drake", 3),
+            create_favorite_artist("2", "Bjork", 1)], replace=True)
+        self.assertEqual(self.__reload(), ["1", "2"])
+        self.assertEqual([x.artist_name for x in self.mirror.page(FavoriteSortOrder.NAME, False, 0, 10)],
+                         ["Bjork", "Nick Drake"])
+        # incremental refresh, only newer favorites
+        persistence.store_favorite_artists([create_favorite_artist("3", "Low", 5)], replace=False)
+        self.assertEqual(self.__reload(), ["3", "1", "2"])
+        persistence.delete_favorite_artist("1")
+        self.assertEqual(self.__reload(), ["3", "2"])
+        # a full reload catches removals
+        persistence.store_favorite_artists([create_favorite_artist("2", "Bjork", 1)], replace=True)
+        self.assertEqual(self.__reload(), ["2"])
@@ -0,0 +1,149 @@
+# Copyright (C) 2026 Giovanni Fulco
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from manifest_store import ManifestStore
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now: float = time.time()
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestManifestStore(unittest.TestCase):
+
+    def setUp(self):
+        self.clock: FakeClock = FakeClock()
+        patcher = mock.patch("time.time", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.directory: str = tempfile.mkdtemp(prefix="manifest-store-tests-")
+        self.addCleanup(shutil.rmtree, self.directory, True)
+        self.store: ManifestStore = ManifestStore(max_entries=3, max_age_sec=100)
+
+    def __path(self, name: str) -> str:
+        return os.path.join(self.directory, f"{name}.mpd")
+
+    def __read(self, name: str) -> str:
+        with open(self.__path(name)) as f:
+            return f.read()
+
+    def test_unchanged_manifest_is_not_rewritten(self):
+        self.assertTrue(self.store.put(self.__path("1"), "<MPD>a</MPD>"))
+        os.utime(self.__path("1"), (0, 0))
+        self.assertFalse(self.store.put(self.__path("1"), "<MPD>a</MPD>"))
+        self.assertEqual(os.stat(self.__path("1")).st_mtime, 0)
+        self.assertTrue(self.store.put(self.__path("1"), "<MPD>b</MPD>"))
+        self.assertEqual(self.__read("1"), "<MPD>b</MPD>")
+        self.assertEqual(self.store.statistics.written, 2)
+        self.assertEqual(self.store.statistics.reused, 1)
+        self.assertEqual(self.store.size, 1)
+        self.assertFalse(os.path.exists(f"{self.__path('1')}.tmp"))
+
+    def test_least_recently_used_files_are_evicted(self):
+        for name in ["1", "2", "3"]:
+            self.store.put(self.__path(name), name)
+        # reuse makes "1" the most recent
+        self.store.put(self.__path("1"), "1")
+        self.store.put(self.__path("4"), "4")
+        self.assertEqual(self.store.size, 3)
+        self.assertFalse(os.path.exists(self.__path("2")))
+        self.assertTrue(os.path.exists(self.__path("1")))
+        self.assertEqual(self.store.statistics.evicted, 1)
+
+    def test_sweep_removes_files_older_than_max_age(self):
+        self.store.put(self.__path("1"), "1")
+        self.clock.now += 60
+        self.store.put(self.__path("2"), "2")
+        self.clock.now += 60
+        self.assertEqual(self.store.sweep(), 1)
+        self.assertFalse(os.path.exists(self.__path("1")))
+        self.assertTrue(os.path.exists(self.__path("2")))
+        self.assertEqual(self.store.size, 1)
+        self.assertEqual(self.store.statistics.swept, 1)
+
+    def test_reuse_keeps_a_file_from_being_swept(self):
+        self.store.put(self.__path("1"), "1")
+        self.clock.now += 60
+        self.store.put(self.__path("1"), "1")
+        self.clock.now += 60
+        self.assertEqual(self.store.sweep(), 0)
+        self.assertTrue(os.path.exists(self.__path("1")))
+
+    def test_swept_file_is_written_again(self):
+        self.store.put(self.__path("1"), "1")
+        self.clock.now += 200
+        self.store.sweep()
+        self.assertTrue(self.store.put(self.__path("1"), "1"))
+        self.assertEqual(self.__read("1"), "1")
+
+    def test_files_of_a_previous_run_are_adopted_and_swept(self):
+        for name, age in [("old", 500), ("recent", 10)]:
+            with open(self.__path(name), "w") as f:
+                f.write(name)
+            os.utime(self.__path(name), (self.clock.now - age, self.clock.now - age))
+        self.store.adopt_directory(self.directory)
+        self.assertFalse(os.path.exists(self.__path("old")))
+        self.assertTrue(os.path.exists(self.__path("recent")))
+        self.assertEqual(self.store.size, 1)
+        # adopted files have no digest, so the first put rewrites them
+        self.assertTrue(self.store.put(self.__path("recent"), "recent"))
+        self.clock.now += 101
+        self.assertEqual(self.store.sweep(), 1)
+        self.assertEqual(os.listdir(self.directory), [])
+
+    def test_concurrent_writers_of_the_same_manifest(self):
+        data_list: list[str] = [f"<MPD>{i}</MPD>" for i in range(8)]
+        failures: list[Exception] = list()
+
+        def write(data: str):
+            try:
+                for _ in range(50):
+                    self.store.put(self.__path("1"), data)
+            except Exception as ex:
+                failures.append(ex)
+
+        writers: list[threading.Thread] = [threading.Thread(target=write, args=(d,)) for d in data_list]
+        for w in writers:
+            w.start()
+        for w in writers:
+            w.join()
+        self.assertEqual(failures, [])
+        self.assertIn(self.__read("1"), data_list)
+        # no temp file is left behind
+        self.assertEqual(os.listdir(self.directory), ["1.mpd"])
+
+    def test_failed_write_removes_temp_file(self):
+        with mock.patch("os.replace", side_effect=OSError("replace failed")):
+            with self.assertRaises(OSError):
+                self.store.put(self.__path("1"), "<MPD>a</MPD>")
+        self.assertEqual(os.listdir(self.directory), [])
+        self.assertEqual(self.store.size, 0)
+
+    def test_adopt_missing_directory(self):
+        self.store.adopt_directory(os.path.join(self.directory, "missing"))
+        self.assertEqual(self.store.size, 0)
@@ -0,0 +1,194 @@
+# Copyright (C) 2026 Giovanni Fulco
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import time
+import unittest
+from unittest import mock
+
+import requests
+from tidalapi.exceptions import ObjectNotFound
+
+import persistence
+from metadata_store import METADATA_DESCRIPTOR_VERSION
+from metadata_store import MetadataKind
+from metadata_store import MetadataStore
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now: float = time.time()
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeResponse:
+
+    def __init__(self, data: dict[str, any]):
+        self.__data: dict[str, any] = data
+
+    def json(self) -> dict[str, any]:
+        return self.__data
+
+
+class FakeRequest:
+    """Serves the descriptors in data_by_path, 404 for the others"""
+
+    def __init__(self, data_by_path: dict[str, dict[str, any]]):
+        self.data_by_path: dict[str, dict[str, any]] = data_by_path
+        self.calls: int = 0
+
+    def request(self, method: str, path: str, params: dict[str, any] = None) -> FakeResponse:
+        self.calls += 1
+        if path not in self.data_by_path:
+            response: requests.Response = requests.Response()
+            response.status_code = 404
+            raise requests.HTTPError(f"404 for [{path}]", response=response)
+        return FakeResponse(self.data_by_path[path])
+
+    def map_json(self, data: dict[str, any], parse) -> any:
+        # paged lists are mapped item by item, as tidalapi does
+        if "items" in data:
+            return [parse(item) for item in data["items"]]
+        return parse(data)
+
+
+class FakeSession:
+
+    def __init__(self, data_by_path: dict[str, dict[str, any]]):
+        self.country_code: str = "US"
+        self.request: FakeRequest = FakeRequest(data_by_path)
+
+    def parse_album(self, data: dict[str, any]) -> dict[str, any]:
+        return data
+
+    def parse_track(self, data: dict[str, any], album: dict[str, any] = None) -> dict[str, any]:
+        # like tidalapi, the album given by the caller replaces the partial one of the track
+        return {**data, "album": album} if album else data
+
+    def parse_artist(self, data: dict[str, any]) -> dict[str, any]:
+        return data
+
+
+class TestMetadataStore(unittest.TestCase):
+
+    def setUp(self):
+        self.clock: FakeClock = FakeClock()
+        patcher = mock.patch("time.time", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        # every test starts with an empty db
+        persistence.prune_metadata_descriptors(max_entries=0, older_than=float("inf"))
+        self.store: MetadataStore = MetadataStore(
+            ttl_by_kind={kind: 100 for kind in MetadataKind},
+            max_memory_entries=100,
+            max_db_entries=1000)
+
+    def __store_descriptor(self, album_id: str, age_sec: float, version: int = METADATA_DESCRIPTOR_VERSION):
+        persistence.store_metadata_descriptor(
+            kind=MetadataKind.ALBUM.kind_name,
+            item_id=album_id,
+            country_code="US",
+            metadata_descriptor=persistence.MetadataDescriptor(
+                descriptor_version=version,
+                descriptor='{"id": 1, "title": "stored"}',
+                fetched_at=self.clock.now - age_sec))
+
+    def test_api_load_is_kept_in_memory_and_db(self):
+        session: FakeSession = FakeSession({"albums/1": {"id": 1, "title": "api"}})
+        self.assertEqual(self.store.get_album(session, "1")["title"], "api")
+        self.assertEqual(self.store.get_album(session, "1")["title"], "api")
+        self.assertEqual(session.request.calls, 1)
+        # a new store finds it in the db
+        other: MetadataStore = MetadataStore(
+            ttl_by_kind={MetadataKind.ALBUM: 100},
+            max_memory_entries=100,
+            max_db_entries=1000)
+        self.assertEqual(other.get_album(session, "1")["title"], "api")
+        self.assertEqual(session.request.calls, 1)
+        self.assertEqual(other.statistics.db_hits, 1)
+
+    def test_memory_entry_expires_with_ttl(self):
+        session: FakeSession = FakeSession({"albums/1": {"id": 1, "title": "api"}})
+        self.store.get_album(session, "1")
+        self.clock.now += 101
+        self.store.get_album(session, "1")
+        self.assertEqual(session.request.calls, 2)
+        self.assertEqual(self.store.statistics.expired, 1)
+
+    def test_db_descriptor_lives_only_for_its_remaining_ttl(self):
+        self.__store_descriptor("1", age_sec=90)
+        session: FakeSession = FakeSession({"albums/1": {"id": 1, "title": "api"}})
+        self.assertEqual(self.store.get_album(session, "1")["title"], "stored")
+        self.clock.now += 5
+        self.assertEqual(self.store.get_album(session, "1")["title"], "stored")
+        # past the descriptor ttl, not past a full ttl from the db read
+        self.clock.now += 6
+        self.assertEqual(self.store.get_album(session, "1")["title"], "api")
+        self.assertEqual(session.request.calls, 1)
+
+    def test_outdated_descriptor_is_reloaded(self):
+        self.__store_descriptor("1", age_sec=0, version=METADATA_DESCRIPTOR_VERSION - 1)
+        session: FakeSession = FakeSession({"albums/1": {"id": 1, "title": "api"}})
+        self.assertEqual(self.store.get_album(session, "1")["title"], "api")
+        self.assertEqual(self.store.statistics.outdated, 1)
+
+    def test_invalidate(self):
+        session: FakeSession = FakeSession({"albums/1": {"id": 1, "title": "api"}})
+        self.store.get_album(session, "1")
+        self.store.invalidate(MetadataKind.ALBUM)
+        self.store.get_album(session, "1")
+        # read again from the db, not from the api
+        self.assertEqual(session.request.calls, 1)
+        self.assertEqual(self.store.statistics.db_hits, 1)
+
+    def test_missing_object(self):
+        session: FakeSession = FakeSession({"albums/2": {}})
+        with self.assertRaises(ObjectNotFound):
+            self.store.get_album(session, "1")
+        with self.assertRaises(ObjectNotFound):
+            self.store.get_album(session, "2")
+        self.assertEqual(self.store.statistics.api_failures, 2)
+        self.assertIsNone(persistence.load_metadata_descriptor(MetadataKind.ALBUM.kind_name, "1", "US"))
+        self.assertIsNone(persistence.load_metadata_descriptor(MetadataKind.ALBUM.kind_name, "2", "US"))
+
+    def test_zero_ttl_always_calls_the_api(self):
+        store: MetadataStore = MetadataStore(
+            ttl_by_kind={MetadataKind.TRACK: 0},
+            max_memory_entries=100,
+            max_db_entries=1000)
+        session: FakeSession = FakeSession({"tracks/1": {"id": 1}})
+        store.get_track(session, "1")
+        store.get_track(session, "1")
+        self.assertEqual(session.request.calls, 2)
+
+    def test_album_tracks_keep_the_album_artist(self):
+        session: FakeSession = FakeSession({
+            "albums/1": {"id": 1, "title": "compilation", "artist": {"name": "Various Artists"}},
+            "albums/1/tracks": {"items": [
+                {"id": 10, "artist": {"name": "Track Artist"}, "album": {"id": 1, "title": "compilation"}}]}})
+        track_list: list[dict[str, any]] = self.store.get_album_tracks(session, "1")
+        self.assertEqual(len(track_list), 1)
+        self.assertEqual(track_list[0]["artist"]["name"], "Track Artist")
+        self.assertEqual(track_list[0]["album"]["artist"]["name"], "Various Artists")
+        # the album given by the caller is used as it is
+        album: dict[str, any] = self.store.get_album(session, "1")
+        self.assertIs(self.store.get_album_tracks(session, "1", album)[0]["album"], album)
+        self.assertEqual(session.request.calls, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
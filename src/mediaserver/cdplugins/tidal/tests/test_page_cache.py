@@ -0,0 +1,182 @@
+# Copyright (C) 2026 Giovanni Fulco
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import time
+import unittest
+from unittest import mock
+
+from page_cache import CachedPage
+from page_cache import PageCache
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now: float = time.time()
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakePage:
+    """Iterable like a tidalapi page"""
+
+    def __init__(self, title: str, items: list[str]):
+        self.title: str = title
+        self.__items: list[str] = items
+
+    def __iter__(self):
+        return iter(self.__items)
+
+
+class PageLoader:
+    """Counts the calls, each load returns a new version of the page"""
+
+    def __init__(self, title: str = "Home"):
+        self.title: str = title
+        self.calls: int = 0
+        self.fail: bool = False
+
+    def __call__(self) -> FakePage:
+        self.calls += 1
+        if self.fail:
+            raise Exception("tidal is not available")
+        return FakePage(self.title, [f"{self.title}-v{self.calls}-{i}" for i in range(5)])
+
+
+class TestPageCache(unittest.TestCase):
+
+    def setUp(self):
+        self.clock: FakeClock = FakeClock()
+        patcher = mock.patch("time.time", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.cache: PageCache = PageCache(max_entries=3)
+        self.loader: PageLoader = PageLoader()
+
+    def __get(self, path: str = "pages/home", variant: str = "LOSSLESS", ttl_sec: int = 100,
+              loader: PageLoader = None) -> CachedPage:
+        return self.cache.get(path=path, variant=variant, ttl_sec=ttl_sec, loader=loader if loader else self.loader)
+
+    def test_page_is_materialized_once_within_ttl(self):
+        page: CachedPage = self.__get()
+        self.assertEqual(page.title, "Home")
+        self.assertEqual(page.slice(3, 10), ["Home-v1-3", "Home-v1-4"])
+        self.clock.now += 99
+        self.assertIs(self.__get(), page)
+        self.assertEqual(list(self.__get()), page.items)
+        self.assertEqual(self.loader.calls, 1)
+        self.assertEqual(self.cache.statistics.hits, 2)
+
+    def test_expired_page_is_loaded_again(self):
+        self.__get()
+        self.clock.now += 100
+        self.assertEqual(self.__get().items[0], "Home-v2-0")
+        self.assertEqual(self.loader.calls, 2)
+        self.assertEqual(self.cache.statistics.misses, 2)
+
+    def test_zero_ttl_is_not_cached(self):
+        self.__get(ttl_sec=0)
+        self.__get(ttl_sec=0)
+        self.assertEqual(self.loader.calls, 2)
+        self.assertEqual(self.cache.size, 0)
+
+    def test_variants_are_cached_separately(self):
+        self.__get(variant="LOSSLESS")
+        self.__get(variant="HI_RES_LOSSLESS")
+        self.assertEqual(self.loader.calls, 2)
+        self.assertEqual(self.cache.size, 2)
+
+    def test_stale_page_is_served_when_reload_fails(self):
+        page: CachedPage = self.__get()
+        self.clock.now += 200
+        self.loader.fail = True
+        self.assertIs(self.__get(), page)
+        self.assertEqual(self.cache.statistics.stale, 1)
+        # the next request tries again
+        self.loader.fail = False
+        self.assertEqual(self.__get().items[0], "Home-v3-0")
+
+    def test_failure_without_cached_page_is_raised(self):
+        self.loader.fail = True
+        with self.assertRaises(Exception):
+            self.__get()
+
+    def test_missing_page_is_not_cached(self):
+        calls: list[int] = []
+        self.assertIsNone(self.cache.get("pages/none", "LOSSLESS", 100, lambda: calls.append(1)))
+        self.assertIsNone(self.cache.get("pages/none", "LOSSLESS", 100, lambda: calls.append(1)))
+        self.assertEqual(len(calls), 2)
+
+    def test_invalidate(self):
+        self.__get(variant="LOSSLESS")
+        self.__get(variant="HI_RES_LOSSLESS")
+        self.__get(path="pages/explore", loader=PageLoader("Explore"))
+        self.cache.invalidate("pages/home")
+        self.assertEqual(self.cache.size, 1)
+        self.__get()
+        self.assertEqual(self.loader.calls, 3)
+        self.cache.invalidate()
+        self.assertEqual(self.cache.size, 0)
+
+    def test_least_recently_used_pages_are_evicted(self):
+        for name in ["a", "b", "c"]:
+            self.__get(path=f"pages/{name}", loader=PageLoader(name))
+        # "a" becomes the most recent
+        self.__get(path="pages/a")
+        self.__get(path="pages/d", loader=PageLoader("d"))
+        self.assertEqual(self.cache.statistics.evicted, 1)
+        loader_b: PageLoader = PageLoader("b")
+        self.__get(path="pages/b", loader=loader_b)
+        self.assertEqual(loader_b.calls, 1)
+
+    def test_refresh_reloads_used_pages_ahead_of_expiry(self):
+        self.__get()
+        self.clock.now += 50
+        self.__get()
+        # not yet near expiry
+        self.assertEqual(self.cache.refresh(), 0)
+        self.clock.now += 30
+        self.assertEqual(self.cache.refresh(), 1)
+        self.assertEqual(self.loader.calls, 2)
+        # the refreshed page is served with a new ttl
+        self.clock.now += 90
+        self.assertEqual(self.__get().items[0], "Home-v2-0")
+        self.assertEqual(self.loader.calls, 2)
+        self.assertEqual(self.cache.statistics.refreshed, 1)
+
+    def test_refresh_drops_expired_pages_nobody_used(self):
+        self.__get()
+        unused: PageLoader = PageLoader("Unused")
+        self.__get(path="pages/unused", loader=unused)
+        self.clock.now += 85
+        self.__get()
+        # unused is near expiry, but kept until it expires
+        self.assertEqual(self.cache.refresh(), 1)
+        self.assertEqual(self.cache.size, 2)
+        self.clock.now += 20
+        self.cache.refresh()
+        self.assertEqual(self.cache.size, 1)
+        self.assertEqual(unused.calls, 1)
+
+    def test_refresh_failure_keeps_the_current_page(self):
+        page: CachedPage = self.__get()
+        self.clock.now += 10
+        self.__get()
+        self.clock.now += 80
+        self.loader.fail = True
+        self.assertEqual(self.cache.refresh(), 0)
+        self.assertIs(self.__get(), page)
@@ -0,0 +1,148 @@
+# Copyright (C) 2026 Giovanni Fulco
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from track_uri_cache import TrackUriCache
+from track_uri_cache import TrackUriEntry
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now: float = time.time()
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestTrackUriCache(unittest.TestCase):
+
+    def setUp(self):
+        self.clock: FakeClock = FakeClock()
+        patcher = mock.patch("time.time", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.tmp_dir: str = tempfile.mkdtemp(prefix="track-uri-cache-tests-")
+        self.addCleanup(shutil.rmtree, self.tmp_dir, True)
+        self.discarded: list[TrackUriEntry] = []
+
+    def __build_cache(self, max_entries: int = 0, file_name: str = None, persist_filter=None) -> TrackUriCache:
+        return TrackUriCache(
+            ttl_sec=100,
+            max_entries=max_entries,
+            file_name=file_name,
+            on_discard=self.discarded.append,
+            persist_filter=persist_filter)
+
+    def test_hit_and_miss(self):
+        cache: TrackUriCache = self.__build_cache()
+        cache.put("1", "LOSSLESS", TrackUriEntry(media_url="url-1", duration_sec=200))
+        self.assertEqual(cache.get("1", "LOSSLESS").media_url, "url-1")
+        self.assertEqual(cache.get("1", "LOSSLESS").duration_sec, 200)
+        # quality is part of the key
+        self.assertIsNone(cache.get("1", "HI_RES_LOSSLESS"))
+        self.assertEqual(cache.statistics.hits, 2)
+        self.assertEqual(cache.statistics.misses, 1)
+
+    def test_entries_expire_after_ttl(self):
+        cache: TrackUriCache = self.__build_cache()
+        cache.put("1", "LOSSLESS", TrackUriEntry(media_url="url-1"))
+        self.clock.now += 50
+        cache.put("2", "LOSSLESS", TrackUriEntry(media_url="url-2"))
+        self.clock.now += 50
+        self.assertFalse(cache.contains("1", "LOSSLESS"))
+        self.assertTrue(cache.contains("2", "LOSSLESS"))
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.statistics.expirations, 1)
+        self.assertEqual([e.media_url for e in self.discarded], ["url-1"])
+
+    def test_replaced_entry_gets_a_new_expiry(self):
+        cache: TrackUriCache = self.__build_cache()
+        cache.put("1", "LOSSLESS", TrackUriEntry(media_url="old"))
+        self.clock.now += 60
+        cache.put("1", "LOSSLESS", TrackUriEntry(media_url="new"))
+        self.clock.now += 60
+        # the heap item of the replaced entry is skipped
+        self.assertEqual(cache.get("1", "LOSSLESS").media_url, "new")
+        self.assertEqual(cache.statistics.expirations, 0)
+        self.assertEqual(self.discarded, [])
+        self.clock.now += 40
+        self.assertIsNone(cache.get("1", "LOSSLESS"))
+        self.assertEqual(cache.statistics.expirations, 1)
+
+    def test_many_replacements_keep_the_cache_consistent(self):
+        cache: TrackUriCache = self.__build_cache()
+        for i in range(1000):
+            self.clock.now += 0.01
+            cache.put(str(i % 10), "LOSSLESS", TrackUriEntry(media_url=f"url-{i}"))
+        self.assertEqual(len(cache), 10)
+        self.assertEqual(cache.get("9", "LOSSLESS").media_url, "url-999")
+        self.clock.now += 100
+        self.assertIsNone(cache.get("9", "LOSSLESS"))
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.statistics.expirations, 10)
+
+    def test_entries_closest_to_expiry_are_evicted(self):
+        cache: TrackUriCache = self.__build_cache(max_entries=2)
+        for i in range(3):
+            self.clock.now += 1
+            cache.put(str(i), "LOSSLESS", TrackUriEntry(media_url=f"url-{i}"))
+        self.assertEqual(len(cache), 2)
+        self.assertFalse(cache.contains("0", "LOSSLESS"))
+        self.assertEqual(cache.statistics.evictions, 1)
+        self.assertEqual([e.media_url for e in self.discarded], ["url-0"])
+
+    def test_saved_entries_are_loaded_within_ttl(self):
+        file_name: str = os.path.join(self.tmp_dir, "track-uri-cache.json")
+        cache: TrackUriCache = self.__build_cache(
+            file_name=file_name,
+            persist_filter=lambda entry: not entry.media_url.startswith("local"))
+        cache.put("1", "LOSSLESS", TrackUriEntry(media_url="url-1", duration_sec=180))
+        self.clock.now += 60
+        cache.put("2", "LOSSLESS", TrackUriEntry(media_url="url-2"))
+        cache.put("3", "LOSSLESS", TrackUriEntry(media_url="local-3"))
+        cache.save()
+        with open(file_name) as f:
+            self.assertEqual(sorted(item["track_id"] for item in json.load(f)), ["1", "2"])
+        # the first one is expired when loaded
+        self.clock.now += 50
+        loaded: TrackUriCache = self.__build_cache(file_name=file_name)
+        self.assertEqual(loaded.load(), 1)
+        self.assertIsNone(loaded.get("1", "LOSSLESS"))
+        self.assertEqual(loaded.get("2", "LOSSLESS").media_url, "url-2")
+        # the expiry is still based on the original creation time
+        self.clock.now += 50
+        self.assertIsNone(loaded.get("2", "LOSSLESS"))
+
+    def test_load_keeps_duration(self):
+        file_name: str = os.path.join(self.tmp_dir, "track-uri-cache.json")
+        cache: TrackUriCache = self.__build_cache(file_name=file_name)
+        cache.put("1", "LOSSLESS", TrackUriEntry(media_url="url-1", duration_sec=180))
+        cache.save()
+        loaded: TrackUriCache = self.__build_cache(file_name=file_name)
+        loaded.load()
+        self.assertEqual(loaded.get("1", "LOSSLESS").duration_sec, 180)
+
+    def test_load_without_file(self):
+        self.assertEqual(self.__build_cache(file_name=os.path.join(self.tmp_dir, "missing.json")).load(), 0)
+        self.assertEqual(self.__build_cache().load(), 0)
@@ -20,7 +20,6 @@ import os
 import datetime
 import time
 import secrets
-import glob
 import shutil
 import threading
 import sqlite3
@@ -32,7 +31,6 @@ from pathlib import Path
 
 import upmplgutils
 import html
-import pathlib
 import re
 
 import codec
@@ -42,6 +40,8 @@ import constants
 import config
 import persistence
 import tidal_util
+import image_cache_provider
+import http_cache_provider
 
 from tidal_util import FavoriteAlbumsMode
 
@@ -72,6 +72,9 @@ from tidalapi.page import PageItem as TidalPageItem
 from tidalapi.page import ItemList as TidalItemList
 from tidalapi.page import PageLink as TidalPageLink
 from tidalapi.page import FeaturedItems as TidalFeaturedItems
+from tidalapi.types import AlbumOrder as TidalAlbumOrder
+from tidalapi.types import ArtistOrder as TidalArtistOrder
+from tidalapi.types import OrderDirection as TidalOrderDirection
 
 from track_adapter import TrackAdapter
 from tidal_track_adapter import TidalTrackAdapter
@@ -89,14 +92,23 @@ from played_album import PlayedAlbum
 from played_track_request import PlayedTrackRequest
 from tile_image import TileImage
 
-from album_sort_criteria import AlbumSortCriteria
-from artist_sort_criteria import ArtistSortCriteria
-
-from functools import cmp_to_key
+from favorites_mirror import FavoritesMirror
+from favorites_mirror import FavoriteSortOrder
+from persistence import FavoriteArtistMetadata
 
 from streaming_info import StreamingInfo
+from stage_timer import StageTimer
+from playback_stats_writer import playback_stats_writer
+from track_prefetcher import TrackPrefetcher
+from track_uri_cache import TrackUriCache
+from track_uri_cache import TrackUriEntry
+from manifest_store import ManifestStore
+from metadata_store import metadata_store
+from page_cache import PageCache
+from page_cache import CachedPage
 from tidal_page_definition import TidalPageDefinition
 from container_type import ContainerType
+from imagecaching import ImageCache
 from msgproc_provider import msgproc
 from msgproc_provider import dispatcher
 
@@ -197,6 +209,8 @@ def build_session(audio_quality: str = config.get_config_param_as_str(constants.
     #             f"oauth2_file_available [{oauth2_file_available}] "
     #             f"-> use_pkce [{use_pkce}]")
     session: TidalSession = TidalSession()
+    # catalog responses are served from the http response cache when available
+    http_cache_provider.install(getattr(session, "request_session", None))
     if config.get_override_country_code():
         session.country_code = config.get_override_country_code()
         # msgproc.log(f"build_session creating a new session using country code [{session.country_code}] ...")
@@ -239,16 +253,31 @@ def build_intermediate_url(track_id: str, container_type: ContainerType = None,
             msgproc.log(f"intermediate_url for [{container_type.value}:{container_id}:{track_id}] -> [{url}]")
         else:
             msgproc.log(f"intermediate_url for [{track_id}] -> [{url}]")
+    if container_type and container_id and container_type != ContainerType.TRACK:
+        # learn the track order of the container for prefetching
+        track_prefetcher.add_container_track(
+            container_type=container_type.value,
+            container_id=container_id,
+            track_id=track_id)
     return url
 
 
-def remove_older_files(files_path: str, delta_sec: int):
-    now = time.time()
-    for f in os.listdir(files_path):
-        # msgproc.log(f"Found [{files_path}] [{f}]")
-        if os.stat(os.path.join(files_path, f)).st_mtime < (now - delta_sec):
-            # msgproc.log(f"Deleting file: [{os.path.join(files_path, f)}]")
-            os.remove(os.path.join(files_path, f))
+__manifest_dir_by_serve_mode: dict[str, str] = {
+    "hls": "m3u8-files",
+    "mpd": "mpd-files"}
+
+manifest_store: ManifestStore = ManifestStore(
+    max_entries=config.get_config_param_as_int(constants.ConfigParam.MANIFEST_STORE_MAX_ENTRIES),
+    max_age_sec=config.max_file_age_seconds)
+
+page_cache: PageCache = PageCache(
+    max_entries=config.get_config_param_as_int(constants.ConfigParam.PAGE_CACHE_MAX_ENTRIES))
+
+# genres and moods change far less often than the editorial pages
+__browse_page_path_set: set[str] = {
+    TidalPageDefinition.GENRES.page_path,
+    TidalPageDefinition.LOCAL_GENRES.page_path,
+    TidalPageDefinition.MOODS.page_path}
 
 
 def try_get_stream(track: TidalTrack):
@@ -258,11 +287,13 @@ def try_get_stream(track: TidalTrack):
         msgproc.log(f"Cannot get stream for track [{track.id}] due to [{type(ex)}] [{ex}]")
 
 
-def build_streaming_url(tidal_session: TidalSession, track: TidalTrack) -> StreamingInfo:
+def build_streaming_url(tidal_session: TidalSession, track: TidalTrack, timer: StageTimer = None) -> StreamingInfo:
     track_id: str = track.id
     streaming_url: str = None
     document_root_dir: str = config.getWebServerDocumentRoot()
     stream = try_get_stream(track)
+    if timer:
+        timer.mark("stream")
     if not stream:
         msgproc.log(f"build_streaming_url failed for track [{track.id}]")
         return None
@@ -290,25 +321,25 @@ def build_streaming_url(tidal_session: TidalSession, track: TidalTrack) -> Strea
     if stream.is_mpd:
         data: any = None
         file_ext: str
-        file_dir: str
         if "hls" == config.serve_mode:
             file_ext = "m3u8"
-            file_dir = "m3u8-files"
             data = manifest.get_hls()
         elif "mpd" == config.serve_mode:
             file_ext = "mpd"
-            file_dir = "mpd-files"
             data = stream.get_manifest_data()
         else:
             raise Exception(f"Invalid serve_mode: [{config.serve_mode}]")
+        file_dir: str = __manifest_dir_by_serve_mode[config.serve_mode]
         sub_dir_list: list[str] = [constants.PluginConstant.PLUGIN_NAME.value, file_dir]
         write_dir: str = tidal_util.ensure_directory(document_root_dir, sub_dir_list)
-        file_name: str = "dash_{}.{}".format(track.id, file_ext)
-        with open(os.path.join(write_dir, file_name), "w") as my_file:
-            my_file.write(data)
-            if config.get_config_param_as_bool(constants.ConfigParam.ENABLE_DUMP_STREAM_DATA):
-                msgproc.log(f"data=[{data}]")
-        remove_older_files(files_path=write_dir, delta_sec=config.max_file_age_seconds)
+        # one file per track and quality, rewritten only when the manifest changes
+        file_name: str = "dash_{}_{}.{}".format(track.id, quality, file_ext)
+        written: bool = manifest_store.put(file_path=os.path.join(write_dir, file_name), data=data)
+        if config.get_config_param_as_bool(constants.ConfigParam.ENABLE_DUMP_STREAM_DATA):
+            msgproc.log(f"data=[{data}]")
+        if config.get_config_param_as_bool(constants.ConfigParam.VERBOSE_LOGGING):
+            msgproc.log(f"build_streaming_url manifest [{file_name}] written [{written}] "
+                        f"store size [{manifest_store.size}] {manifest_store.statistics}")
         path: list[str] = list()
         path.extend([constants.PluginConstant.PLUGIN_NAME.value, file_dir])
         path.append(file_name)
@@ -327,6 +358,8 @@ def build_streaming_url(tidal_session: TidalSession, track: TidalTrack) -> Strea
                             f"got a [{type(streaming_url) if streaming_url else 'None'}]")
     else:
         raise Exception(f"Unrecognized stream type for track_id [{track_id}]")
+    if timer:
+        timer.mark("manifest")
     result: StreamingInfo = StreamingInfo()
     result.url = streaming_url
     result.mimetype = mimetype
@@ -359,55 +392,39 @@ def calc_bitrate(tidal_quality: TidalQuality, bit_depth: int, sample_rate: int)
         return 1411
 
 
-class TrackUriEntry:
+track_prefetcher: TrackPrefetcher = TrackPrefetcher(
+    next_count=config.get_config_param_as_int(constants.ConfigParam.PREFETCH_NEXT_TRACK_COUNT),
+    lead_sec=config.get_config_param_as_int(constants.ConfigParam.PREFETCH_LEAD_SEC),
+    max_containers=64)
 
-    def __init__(self, media_url: str):
-        self.__media_url: str = media_url
-        self.__creation_time: float = time.time()
 
-    @property
-    def media_url(self) -> str:
-        return self.__media_url
-
-    @property
-    def creation_time(self) -> time:
-        return self.__creation_time
+def __on_track_uri_discarded(entry: TrackUriEntry):
+    if entry.prefetched and not entry.used:
+        track_prefetcher.prefetch_wasted()
 
 
-track_uri_cache: dict[tuple[str, str], TrackUriEntry] = {}
-
-
-def track_uri_entry_too_old(entry: TrackUriEntry, max_duration_sec: int) -> bool:
-    now: float = time.time()
-    diff: float = now - entry.creation_time
-    if diff > max_duration_sec:
-        return True
-    return False
-
-
-def track_uri_purge_old():
-    max_duration_sec: int = config.get_config_param_as_int(constants.ConfigParam.TRACK_URI_ENTRY_EXPIRATION_SEC)
-    to_purge_list: list[str] = list()
-    k: str
-    v: TrackUriEntry
-    for k, v in track_uri_cache.items():
-        # too old? add to purge list
-        if track_uri_entry_too_old(v, max_duration_sec):
-            to_purge_list.append(k)
-    to_purge: any
-    for to_purge in to_purge_list:
-        del track_uri_cache[to_purge]
+track_uri_cache: TrackUriCache = TrackUriCache(
+    ttl_sec=config.get_config_param_as_int(constants.ConfigParam.TRACK_URI_ENTRY_EXPIRATION_SEC),
+    max_entries=config.get_config_param_as_int(constants.ConfigParam.TRACK_URI_CACHE_MAX_ENTRIES),
+    file_name=(os.path.join(
+        upmplgutils.getcachedir(constants.PluginConstant.PLUGIN_NAME.value),
+        constants.track_uri_cache_file_name)
+        if config.get_config_param_as_bool(constants.ConfigParam.PERSIST_TRACK_URI_CACHE)
+        else None),
+    on_discard=__on_track_uri_discarded,
+    # manifests in the document root do not survive a restart
+    persist_filter=lambda entry: not tidal_util.is_docroot_url(entry.media_url))
 
 
 def get_cached_track_uri_entry(track_id: str, tidal_quality: str) -> TrackUriEntry:
-    track_uri_purge_old()
-    return track_uri_cache[(track_id, tidal_quality)] if (track_id, tidal_quality) in track_uri_cache else None
+    return track_uri_cache.get(track_id, tidal_quality)
 
 
 @dispatcher.record('trackuri')
 def trackuri(a):
     upmpd_pathprefix = os.environ["UPMPD_PATHPREFIX"]
     track_id: str = upmplgutils.trackid_from_urlpath(upmpd_pathprefix, a)
+    timer: StageTimer = StageTimer(f"trackuri track_id [{track_id}]")
     # trackuri validation
     if not track_id or not re.match(config.get_config_param_as_str(constants.ConfigParam.TRACK_ID_REGEX), track_id):
         msgproc.log(f"trackuri: invalid track_id [{track_id}]")
@@ -442,16 +459,38 @@ def trackuri(a):
                 msgproc.log("Empty user agent, no match.")
         msgproc.log(f"User Agent [{user_agent}] is whitelisted: [{whitelisted}] "
                     f"select_audio_quality: [{select_audio_quality}]")
+    timer.mark("whitelist")
     # we get a regular session if there is a match, otherwise we build a session with lower quality
     cached_entry: TrackUriEntry = get_cached_track_uri_entry(track_id, select_audio_quality)
     if cached_entry:
         msgproc.log(f"Returning cached media_url for track_id [{track_id}] "
-                    f"quality [{select_audio_quality}]")
+                    f"quality [{select_audio_quality}] prefetched [{cached_entry.prefetched}]")
+        source: str = "cached"
+        if cached_entry.prefetched and not cached_entry.used:
+            source = "prefetched"
+            track_prefetcher.prefetch_hit()
+            playback_stats_writer.submit(cached_entry.played_track_request_builder)
+        cached_entry.used = True
+        if track_prefetcher.enabled:
+            # the session is only built if the prefetch actually runs
+            track_prefetcher.schedule(
+                track_id=track_id,
+                duration_sec=cached_entry.duration_sec,
+                resolver=__build_prefetch_resolver(
+                    tidal_session_supplier=lambda: (
+                        get_session() if whitelisted else build_session(audio_quality=select_audio_quality)),
+                    tidal_quality=select_audio_quality))
+        timer.mark("cache")
+        __log_trackuri_timer(timer, source)
         return {"media_url": cached_entry.media_url}
+    # a different track is being played, the prefetch scheduled for the previous one is stale
+    track_prefetcher.cancel(track_id)
     tidal_session: TidalSession = get_session() if whitelisted else build_session(audio_quality=select_audio_quality)
+    timer.mark("session")
     tidal_track: TidalTrack
     ex: Exception
     tidal_track, ex = tidal_util.try_get_track(tidal_session=tidal_session, track_id=track_id)
+    timer.mark("track")
     if not tidal_track:
         # cannot load track?
         msgproc.log(f"Cannot load track with id [{track_id}] due to [{type(ex)}] [{ex}]")
@@ -459,7 +498,8 @@ def trackuri(a):
         return {}
     streaming_info: StreamingInfo = build_streaming_url(
         tidal_session=tidal_session,
-        track=tidal_track)
+        track=tidal_track,
+        timer=timer)
     if not streaming_info:
         # nothing to do, report error and return nothing
         msgproc.log(f"Cannot execute trackuri for track_id [{track_id}]")
@@ -467,45 +507,110 @@ def trackuri(a):
     res: dict[str, any] = {}
     # we have the streaming info, we are good to go
     res['media_url'] = streaming_info.url
-    best_streaming_info: StreamingInfo = streaming_info
-    if not whitelisted:
-        # get streaming info from a standard session
-        best_streaming_info = build_streaming_url(
-            tidal_session=get_session(),
-            track=tidal_track)
-    if best_streaming_info.url:
-        track: TidalTrack = tidal_session.track(track_id)
-        if track:
-            played_track_request: PlayedTrackRequest = PlayedTrackRequest()
-            played_track_request.track_id = track_id
-            played_track_request.track_name = track.name
-            played_track_request.track_duration = track.duration
-            played_track_request.track_num = track.track_num
-            played_track_request.volume_num = track.volume_num
-            played_track_request.audio_quality = best_streaming_info.audio_quality
-            played_track_request.explicit = track.explicit
-            played_track_request.album_id = track.album.id
-            played_track_request.artist_name = track.artist.name
-            played_track_request.bit_depth = best_streaming_info.bit_depth
-            played_track_request.sample_rate = best_streaming_info.sample_rate
-            album: TidalAlbum = tidal_session.album(played_track_request.album_id)
-            if album:
-                played_track_request.album_track_count = album.num_tracks
-                played_track_request.album_num_volumes = album.num_volumes
-                played_track_request.album_duration = album.duration
-                played_track_request.album_name = album.name
-                played_track_request.album_artist_name = album.artist.name
-                played_track_request.image_url = tidal_util.get_image_url(album)
-                persistence.track_playback(played_track_request)
+    if streaming_info.url:
+        # the album is loaded by the writer, off the critical path
+        playback_stats_writer.submit(lambda: __build_played_track_request(
+            tidal_session=tidal_session,
+            track=tidal_track,
+            streaming_info=streaming_info))
     if config.get_config_param_as_bool(constants.ConfigParam.VERBOSE_LOGGING):
         msgproc.log(f"trackuri is returning [{res}]")
     # update track uri cache
-    track_uri_cache[(
-        track_id,
-        select_audio_quality)] = TrackUriEntry(media_url=streaming_info.url)
+    track_uri_cache.put(
+        track_id=track_id,
+        tidal_quality=select_audio_quality,
+        entry=TrackUriEntry(media_url=streaming_info.url, duration_sec=tidal_track.duration))
+    if track_prefetcher.enabled:
+        track_prefetcher.schedule(
+            track_id=track_id,
+            duration_sec=tidal_track.duration,
+            resolver=__build_prefetch_resolver(
+                tidal_session_supplier=lambda: tidal_session,
+                tidal_quality=select_audio_quality))
+    timer.mark("reply")
+    __log_trackuri_timer(timer, "resolved")
     return res
 
 
+def __log_trackuri_timer(timer: StageTimer, source: str):
+    track_prefetcher.record_latency(source, timer.elapsed)
+    if config.get_config_param_as_bool(constants.ConfigParam.VERBOSE_LOGGING):
+        msgproc.log(f"{timer} source [{source}]")
+        msgproc.log(f"TrackPrefetcher {track_prefetcher.statistics}")
+        msgproc.log(f"TrackUriCache size [{len(track_uri_cache)}] {track_uri_cache.statistics}")
+
+
+def __build_prefetch_resolver(
+        tidal_session_supplier: Callable[[], TidalSession],
+        tidal_quality: str) -> Callable[[str], bool]:
+    tidal_session_holder: list[TidalSession] = []
+
+    def resolve(track_id: str) -> bool:
+        if not tidal_session_holder:
+            tidal_session_holder.append(tidal_session_supplier())
+        return __prefetch_track(
+            tidal_session=tidal_session_holder[0],
+            track_id=track_id,
+            tidal_quality=tidal_quality)
+    return resolve
+
+
+def __prefetch_track(tidal_session: TidalSession, track_id: str, tidal_quality: str) -> bool:
+    if track_uri_cache.contains(track_id, tidal_quality):
+        return False
+    tidal_track: TidalTrack
+    ex: Exception
+    tidal_track, ex = tidal_util.try_get_track(tidal_session=tidal_session, track_id=track_id)
+    if not tidal_track:
+        raise ex if ex else Exception(f"Cannot load track [{track_id}]")
+    streaming_info: StreamingInfo = build_streaming_url(
+        tidal_session=tidal_session,
+        track=tidal_track)
+    if not streaming_info or not streaming_info.url:
+        raise Exception(f"No streaming url for track [{track_id}]")
+    track_uri_cache.put(
+        track_id=track_id,
+        tidal_quality=tidal_quality,
+        entry=TrackUriEntry(
+            media_url=streaming_info.url,
+            prefetched=True,
+            duration_sec=tidal_track.duration,
+            played_track_request_builder=lambda: __build_played_track_request(
+                tidal_session=tidal_session,
+                track=tidal_track,
+                streaming_info=streaming_info)))
+    return True
+
+
+def __build_played_track_request(
+        tidal_session: TidalSession,
+        track: TidalTrack,
+        streaming_info: StreamingInfo) -> PlayedTrackRequest | None:
+    played_track_request: PlayedTrackRequest = PlayedTrackRequest()
+    played_track_request.track_id = str(track.id)
+    played_track_request.track_name = track.name
+    played_track_request.track_duration = track.duration
+    played_track_request.track_num = track.track_num
+    played_track_request.volume_num = track.volume_num
+    played_track_request.audio_quality = streaming_info.audio_quality
+    played_track_request.explicit = track.explicit
+    played_track_request.album_id = track.album.id
+    played_track_request.artist_name = track.artist.name
+    played_track_request.bit_depth = streaming_info.bit_depth
+    played_track_request.sample_rate = streaming_info.sample_rate
+    # the album in the track is partial
+    album: TidalAlbum = tidal_util.try_get_album(tidal_session=tidal_session, album_id=played_track_request.album_id)
+    if not album:
+        return None
+    played_track_request.album_track_count = album.num_tracks
+    played_track_request.album_num_volumes = album.num_volumes
+    played_track_request.album_duration = album.duration
+    played_track_request.album_name = album.name
+    played_track_request.album_artist_name = album.artist.name
+    played_track_request.image_url = tidal_util.get_image_url(album)
+    return played_track_request
+
+
 def tidal_track_to_played_track_request(
         track_adapter: TrackAdapter,
         tidal_session: TidalSession) -> PlayedTrackRequest:
@@ -521,7 +626,7 @@ def tidal_track_to_played_track_request(
     played_track_request.artist_name = track_adapter.get_artist_name()
     played_track_request.bit_depth = track_adapter.get_bit_depth()
     played_track_request.sample_rate = track_adapter.get_sample_rate()
-    album: TidalAlbum = tidal_session.album(played_track_request.album_id)
+    album: TidalAlbum = tidal_util.try_get_album(tidal_session=tidal_session, album_id=played_track_request.album_id)
     if album:
         played_track_request.album_track_count = album.num_tracks
         played_track_request.album_num_volumes = album.num_volumes
@@ -1101,7 +1206,7 @@ def set_stream_information_for_mix_or_playlist_entry(
         context=context,
         album_id=track_adapter.get_album_id())
     played = get_played_track(
-        played_album_tracks=played_album_tracks,
+        context=context,
         track_id=track_adapter.get_id())
     got_from_played: bool = False
     if __played_track_has_stream_info(played):
@@ -1218,7 +1323,7 @@ def set_stream_information_for_album_entry(
         context=context,
         album_id=track_adapter.get_album_id())
     played = get_played_track(
-        played_album_tracks=played_album_tracks,
+        context=context,
         track_id=track_adapter.get_id())
     got_from_played: bool = False
     if __played_track_has_stream_info(played):
@@ -1346,25 +1451,56 @@ def correct_audio_quality(
         return audio_quality if audio_quality else TidalQuality.high_lossless
 
 
-def get_or_load_played_album_tracks(context: Context, album_id: str) -> list[PlayedTrack]:
-    played_album_tracks_dict: dict[str, list[PlayedTrack]] = context.get(ContextKey.PLAYED_ALBUM_TRACKS_DICT)
-    played_tracks_list: list[PlayedTrack] = (
-        played_album_tracks_dict[album_id]
-        if album_id in played_album_tracks_dict
-        else None)
-    if not played_tracks_list:
-        played_tracks_list = persistence.get_played_album_entries(album_id=str(album_id))
+def __get_or_create_context_dict(context: Context, key: ContextKey) -> dict[str, any]:
+    current: dict[str, any] = context.get(key)
+    if current is None:
+        current = dict()
+        context.add(key=key, value=current)
+    return current
+
+
+def preload_played_album_tracks(context: Context, album_id_list: list[str]):
+    # played tracks of all the albums we are about to show, with a single query
+    # instead of one query per album, then indexed by track id
+    played_album_tracks_dict: dict[str, list[PlayedTrack]] = __get_or_create_context_dict(
+        context=context,
+        key=ContextKey.PLAYED_ALBUM_TRACKS_DICT)
+    played_track_dict: dict[str, PlayedTrack] = __get_or_create_context_dict(
+        context=context,
+        key=ContextKey.PLAYED_TRACK_DICT)
+    missing_album_id_list: list[str] = list(dict.fromkeys(
+        str(album_id)
+        for album_id in album_id_list
+        if str(album_id) not in played_album_tracks_dict))
+    if len(missing_album_id_list) == 0:
+        return
+    loaded: dict[str, list[PlayedTrack]] = persistence.get_played_album_entries_by_album_id_list(
+        album_id_list=missing_album_id_list)
+    context.increment(key=ContextKey.PLAYED_ALBUM_QUERY_COUNT)
+    for album_id, played_tracks_list in loaded.items():
         played_album_tracks_dict[album_id] = played_tracks_list
-        context.update(key=ContextKey.PLAYED_ALBUM_TRACKS_DICT, value=played_album_tracks_dict)
-    return played_tracks_list
+        played_track: PlayedTrack
+        for played_track in played_tracks_list:
+            played_track_dict[played_track.track_id] = played_track
 
 
-def get_played_track(played_album_tracks: list[PlayedTrack], track_id: str) -> PlayedTrack:
-    played_track: PlayedTrack
-    for played_track in played_album_tracks:
-        if str(played_track.track_id) == str(track_id):
-            return played_track
-    return None
+def preload_played_album_tracks_for_tracks(context: Context, tracks: list[TidalTrack]):
+    preload_played_album_tracks(
+        context=context,
+        album_id_list=[
+            track.album.id
+            for track in (tracks or list())
+            if isinstance(track, TidalTrack) and track.album])
+
+
+def get_or_load_played_album_tracks(context: Context, album_id: str) -> list[PlayedTrack]:
+    preload_played_album_tracks(context=context, album_id_list=[album_id])
+    return context.get(ContextKey.PLAYED_ALBUM_TRACKS_DICT)[str(album_id)]
+
+
+def get_played_track(context: Context, track_id: str) -> PlayedTrack:
+    played_track_dict: dict[str, PlayedTrack] = context.get(ContextKey.PLAYED_TRACK_DICT)
+    return played_track_dict.get(str(track_id)) if played_track_dict else None
 
 
 def artist_to_entry_raw(
@@ -1701,184 +1837,156 @@ def get_category(
     return first
 
 
-def compare_favorite_album_by_criteria_list(
-        criteria_list: list[AlbumSortCriteria],
-        left: TidalAlbum,
-        right: TidalAlbum) -> int:
-    cmp: int = 0
-    current: AlbumSortCriteria
-    for current in criteria_list:
-        cmp = current.compare(left, right)
-        if cmp != 0:
-            break
-    return cmp
-
-
-def compare_favorite_artist_by_criteria_list(
-        criteria_list: list[ArtistSortCriteria],
-        left: TidalArtist,
-        right: TidalArtist) -> int:
-    cmp: int = 0
-    current: ArtistSortCriteria
-    for current in criteria_list:
-        cmp = current.compare(left, right)
-        if cmp != 0:
-            break
-    return cmp
-
-
-def build_album_sort_criteria_by_artist(descending: bool = False) -> list[AlbumSortCriteria]:
-    criteria_list: list[AlbumSortCriteria] = list()
-    multiplier: int = -1 if descending else 1
-    def artist_extractor(a: TidalAlbum) -> str:
-        return (
-            a.artist.name.upper()
-            if a.artist and a.artist.name
-            else "")
-    def artist_comparator(left: str, right: str) -> int:
-        return multiplier * (-1 if left < right else 0 if left == right else 1)
-    criteria_list.append(AlbumSortCriteria(artist_extractor, artist_comparator))
-    def rd_extractor(a: TidalAlbum) -> float:
-        return (
-            a.available_release_date.timestamp()
-            if a.available_release_date
-            else 0.0)
-    def rd_comparator(left: float, right: float) -> int:
-        return (multiplier * (-1 if left < right else 0 if left == right else 1))
-    criteria_list.append(AlbumSortCriteria(rd_extractor, rd_comparator))
-    def t_extractor(a: TidalAlbum) -> str:
-        return a.name.upper() if a.name else ""
-    def t_comparator(left: str, right: str) -> int:
-        return (multiplier * (-1 if left < right else 0 if left == right else 1))
-    criteria_list.append(AlbumSortCriteria(t_extractor, t_comparator))
-    return criteria_list
-
-
-def build_album_sort_criteria_by_release_date(descending: bool = False) -> list[AlbumSortCriteria]:
-    criteria_list: list[AlbumSortCriteria] = list()
-    multiplier: int = -1 if descending else 1
-    def extractor(a: TidalAlbum) -> float:
-        return a.available_release_date.timestamp() if a.available_release_date else 0.0
-    def comparator(left: float, right: float) -> int:
-        return multiplier * (-1 if left < right else 0 if left == right else 1)
-    criteria_list.append(AlbumSortCriteria(extractor, comparator))
-    return criteria_list
-
-
-def build_album_sort_criteria_by_user_date_added(descending: bool = False) -> list[AlbumSortCriteria]:
-    criteria_list: list[AlbumSortCriteria] = list()
-    multiplier: int = -1 if descending else 1
-    def extractor(a: TidalAlbum) -> float:
-        return a.user_date_added.timestamp() if a.user_date_added else 0.0
-    def comparator(left: float, right: float) -> int:
-        return multiplier * (-1 if left < right else 0 if left == right else 1)
-    criteria_list.append(AlbumSortCriteria(extractor, comparator))
-    return criteria_list
-
-
-def build_artist_sort_criteria_by_user_date_added(descending: bool = False) -> list[ArtistSortCriteria]:
-    criteria_list: list[ArtistSortCriteria] = list()
-    multiplier: int = -1 if descending else 1
-    def extractor(a: TidalArtist) -> float:
-        return a.user_date_added.timestamp() if a.user_date_added else 0.0
-    def comparator(left: float, right: float) -> int:
-        return multiplier * (-1 if left < right else 0 if left == right else 1)
-    criteria_list.append(ArtistSortCriteria(extractor, comparator))
-    return criteria_list
-
-
-def build_album_sort_criteria_by_name(descending: bool = False) -> list[AlbumSortCriteria]:
-    criteria_list: list[AlbumSortCriteria] = list()
-    multiplier: int = -1 if descending else 1
-    def t_extractor(a: TidalAlbum) -> str:
-        return a.name.upper() if a.name else ""
-    def t_comparator(left: str, right: str) -> int:
-        return multiplier * (-1 if left < right else 0 if left == right else 1)
-    criteria_list.append(AlbumSortCriteria(t_extractor, t_comparator))
-    return criteria_list
-
-
-def build_artist_sort_criteria_by_name(descending: bool = False) -> list[ArtistSortCriteria]:
-    criteria_list: list[ArtistSortCriteria] = list()
-    multiplier: int = -1 if descending else 1
-    def t_extractor(a: TidalArtist) -> str:
-        return a.name.upper() if a.name else ""
-    def t_comparator(left: str, right: str) -> int:
-        return multiplier * (-1 if left < right else 0 if left == right else 1)
-    criteria_list.append(ArtistSortCriteria(t_extractor, t_comparator))
-    return criteria_list
-
-
-def get_favorite_albums_by_artist(
-        tidal_session: TidalSession,
-        descending: bool,
-        limit: int,
-        offset: int = 0) -> list[TidalAlbum]:
-    items: list[TidalAlbum] = tidal_util.try_get_all_favorites(tidal_session)
-    sc_list: list[AlbumSortCriteria] = build_album_sort_criteria_by_artist(descending=descending)
-    items.sort(key=cmp_to_key(lambda x, y: compare_favorite_album_by_criteria_list(sc_list, x, y)))
-    return items[offset:offset + limit] if items else []
+def __timestamp_or_zero(value: datetime.datetime) -> float:
+    return value.timestamp() if value else 0.0
 
 
-def get_favorite_albums_by_title(
-        tidal_session: TidalSession,
-        descending: bool,
-        limit: int,
-        offset: int = 0) -> list[TidalAlbum]:
-    items: list[TidalAlbum] = tidal_util.try_get_all_favorites(tidal_session)
-    sc_list: list[AlbumSortCriteria] = build_album_sort_criteria_by_name(descending=descending)
-    items.sort(key=cmp_to_key(lambda x, y: compare_favorite_album_by_criteria_list(sc_list, x, y)))
-    return items[offset:offset + limit] if items else []
+favorite_albums_mirror: FavoritesMirror[AlbumMetadata] = FavoritesMirror(
+    name="albums",
+    id_extractor=lambda a: a.album_id,
+    sort_key_extractors={
+        FavoriteSortOrder.ARTIST: lambda a: (
+            a.artist_name.upper() if a.artist_name else "",
+            __timestamp_or_zero(a.available_release_date),
+            a.album_name.upper() if a.album_name else ""),
+        FavoriteSortOrder.TITLE: lambda a: a.album_name.upper() if a.album_name else "",
+        FavoriteSortOrder.RELEASE_DATE: lambda a: __timestamp_or_zero(a.available_release_date),
+        FavoriteSortOrder.DATE_ADDED: lambda a: __timestamp_or_zero(a.user_date_added)})
 
+favorite_artists_mirror: FavoritesMirror[FavoriteArtistMetadata] = FavoritesMirror(
+    name="artists",
+    id_extractor=lambda a: a.artist_id,
+    sort_key_extractors={
+        FavoriteSortOrder.NAME: lambda a: a.artist_name.upper() if a.artist_name else "",
+        FavoriteSortOrder.DATE_ADDED: lambda a: __timestamp_or_zero(a.user_date_added)})
 
-def get_favorite_albums_by_release_date(
-        tidal_session: TidalSession,
-        descending: bool,
-        limit: int,
-        offset: int = 0) -> list[TidalAlbum]:
-    items: list[TidalAlbum] = tidal_util.try_get_all_favorites(tidal_session)
-    sc_list: list[AlbumSortCriteria] = build_album_sort_criteria_by_release_date(descending=descending)
-    items.sort(key=cmp_to_key(lambda x, y: compare_favorite_album_by_criteria_list(sc_list, x, y)))
-    return items[offset:offset + limit] if items else []
+__favorites_refresh_lock: threading.Lock = threading.Lock()
+__favorites_refresh_event: threading.Event = threading.Event()
 
 
-def get_favorite_albums_by_user_date_added(
-        tidal_session: TidalSession,
-        descending: bool,
-        limit: int,
-        offset: int = 0) -> list[TidalAlbum]:
-    items: list[TidalAlbum] = tidal_util.try_get_all_favorites(tidal_session)
-    sc_list: list[AlbumSortCriteria] = build_album_sort_criteria_by_user_date_added(descending=descending)
-    items.sort(key=cmp_to_key(lambda x, y: compare_favorite_album_by_criteria_list(sc_list, x, y)))
-    return items[offset:offset + limit] if items else []
+def __tidal_artist_to_favorite_artist_metadata(artist: TidalArtist) -> FavoriteArtistMetadata:
+    result: FavoriteArtistMetadata = FavoriteArtistMetadata()
+    result.artist_id = artist.id
+    result.artist_name = artist.name
+    result.image_url = tidal_util.get_image_url(artist)
+    result.user_date_added = artist.user_date_added
+    return result
+
+
+def __get_new_favorites(
+        loader: Callable[[int, int], list[any]],
+        mirror: FavoritesMirror,
+        full: bool) -> list[any]:
+    # loader returns the newest first, so we can stop at the first item we already know
+    result: list[any] = list()
+    offset: int = 0
+    limit: int = 100
+    while True:
+        some: list[any] = loader(limit, offset)
+        current: any
+        for current in some if some else []:
+            if not full and mirror.contains(current.id):
+                return result
+            result.append(current)
+        if not some or len(some) < limit:
+            return result
+        offset += limit
+
+
+def refresh_favorites_mirror(tidal_session: TidalSession, full: bool):
+    with __favorites_refresh_lock:
+        start: float = time.time()
+        album_list: list[TidalAlbum] = __get_new_favorites(
+            loader=lambda limit, offset: tidal_session.user.favorites.albums(
+                limit=limit,
+                offset=offset,
+                order=TidalAlbumOrder.DateAdded,
+                order_direction=TidalOrderDirection.Descending),
+            mirror=favorite_albums_mirror,
+            full=full)
+        album_metadata_list: list[AlbumMetadata] = [tidal_album_to_album_metadata(x) for x in album_list]
+        if full or album_metadata_list:
+            persistence.store_favorite_albums(album_metadata_list=album_metadata_list, replace=full)
+        artist_list: list[TidalArtist] = __get_new_favorites(
+            loader=lambda limit, offset: tidal_session.user.favorites.artists(
+                limit=limit,
+                offset=offset,
+                order=TidalArtistOrder.DateAdded,
+                order_direction=TidalOrderDirection.Descending),
+            mirror=favorite_artists_mirror,
+            full=full)
+        artist_metadata_list: list[FavoriteArtistMetadata] = [
+            __tidal_artist_to_favorite_artist_metadata(x) for x in artist_list]
+        if full or artist_metadata_list:
+            persistence.store_favorite_artists(artist_metadata_list=artist_metadata_list, replace=full)
+        if full:
+            favorite_albums_mirror.replace(album_metadata_list)
+            favorite_artists_mirror.replace(artist_metadata_list)
+        else:
+            favorite_albums_mirror.add(album_metadata_list)
+            favorite_artists_mirror.add(artist_metadata_list)
+        if (full or album_metadata_list or artist_metadata_list or
+                config.get_config_param_as_bool(constants.ConfigParam.VERBOSE_LOGGING)):
+            msgproc.log(f"refresh_favorites_mirror full [{full}] "
+                        f"new albums [{len(album_metadata_list)}] artists [{len(artist_metadata_list)}] "
+                        f"total albums [{favorite_albums_mirror.size}] artists [{favorite_artists_mirror.size}] "
+                        f"elapsed [{(time.time() - start):.3f}]")
+
+
+def request_favorites_mirror_refresh():
+    __favorites_refresh_event.set()
+
+
+def __load_favorites_mirror():
+    album_metadata_list: list[AlbumMetadata] = persistence.load_favorite_album_metadata_list()
+    if album_metadata_list:
+        favorite_albums_mirror.replace(album_metadata_list)
+    artist_metadata_list: list[FavoriteArtistMetadata] = persistence.load_favorite_artist_metadata_list()
+    if artist_metadata_list:
+        favorite_artists_mirror.replace(artist_metadata_list)
+    msgproc.log(f"Favorites mirror loaded albums [{favorite_albums_mirror.size}] "
+                f"artists [{favorite_artists_mirror.size}]")
+
+
+def __ensure_favorites_mirror(tidal_session: TidalSession):
+    # nothing stored yet, we need a full load before we can serve a page
+    if favorite_albums_mirror.loaded and favorite_artists_mirror.loaded:
+        return
+    refresh_favorites_mirror(tidal_session=tidal_session, full=True)
 
 
-def get_favorite_artists_by_name(
+def get_favorite_albums(
         tidal_session: TidalSession,
+        sort_order: FavoriteSortOrder,
         descending: bool,
         limit: int,
-        offset: int = 0) -> list[TidalArtist]:
-    items: list[TidalArtist] = tidal_session.user.favorites.artists()
-    sc_list: list[ArtistSortCriteria] = build_artist_sort_criteria_by_name(descending=descending)
-    items.sort(key=cmp_to_key(lambda x, y: compare_favorite_artist_by_criteria_list(sc_list, x, y)))
-    return items[offset:offset + limit] if items else []
+        offset: int = 0) -> list[AlbumMetadata]:
+    __ensure_favorites_mirror(tidal_session)
+    return favorite_albums_mirror.page(
+        sort_order=sort_order,
+        descending=descending,
+        offset=offset,
+        limit=limit)
 
 
-def get_favorite_artists_by_user_date_added(
+def get_favorite_artists(
         tidal_session: TidalSession,
+        sort_order: FavoriteSortOrder,
         descending: bool,
         limit: int,
-        offset: int = 0) -> list[TidalArtist]:
-    items: list[TidalArtist] = tidal_session.user.favorites.artists()
-    sc_list: list[ArtistSortCriteria] = build_artist_sort_criteria_by_user_date_added(descending=descending)
-    items.sort(key=cmp_to_key(lambda x, y: compare_favorite_artist_by_criteria_list(sc_list, x, y)))
-    return items[offset:offset + limit] if items else []
+        offset: int = 0) -> list[FavoriteArtistMetadata]:
+    __ensure_favorites_mirror(tidal_session)
+    return favorite_artists_mirror.page(
+        sort_order=sort_order,
+        descending=descending,
+        offset=offset,
+        limit=limit)
 
 
 def __handler_element_favorite_albums_common(
         descending: bool,
         element_type: ElementType,
-        list_retriever: Callable[[TidalSession, bool, int, int], list[TidalAlbum]],
+        sort_order: FavoriteSortOrder,
         objid,
         item_identifier: ItemIdentifier,
         entries: list) -> list:
@@ -1887,11 +1995,11 @@ def __handler_element_favorite_albums_common(
     counter: int = offset
     max_items: int = config.albums_per_page
     # one over the max so I have the art for next
-    items: list[TidalAlbum] = list_retriever(tidal_session, descending, max_items + 1, offset)
+    items: list[AlbumMetadata] = get_favorite_albums(tidal_session, sort_order, descending, max_items + 1, offset)
     # back to the target size
-    next_album: TidalAlbum = items[max_items] if len(items) == max_items + 1 else None
+    next_album: AlbumMetadata = items[max_items] if len(items) == max_items + 1 else None
     items = items[0:max_items] if len(items) == max_items + 1 else items
-    current: TidalAlbum
+    current: AlbumMetadata
     for current in items:
         counter += 1
         options: dict[str, any] = dict()
@@ -1900,14 +2008,17 @@ def __handler_element_favorite_albums_common(
                 options=options,
                 option_key=OptionKey.PREPEND_ENTRY_NUMBER_IN_ENTRY_NAME,
                 option_value=counter)
-        if config.skip_non_stereo and not tidal_util.is_tidal_album_stereo(current):
+        album_adapter: AlbumAdapter = album_metadata_to_adapter(current)
+        if config.skip_non_stereo and not tidal_util.is_stereo(album_adapter.media_metadata_tags):
             if config.get_config_param_as_bool(constants.ConfigParam.VERBOSE_LOGGING):
-                msgproc.log(tidal_util.not_stereo_skipmessage(current))
+                msgproc.log(f"Skipping album with id [{album_adapter.id}] [{album_adapter.name}] "
+                            f"by [{album_adapter.artist_name}] "
+                            f"because: [{album_adapter.media_metadata_tags}]")
             continue
-        entries.append(album_to_album_container(
+        entries.append(album_adapter_to_album_container(
             objid=objid,
             tidal_session=tidal_session,
-            album=current,
+            album_adapter=album_adapter,
             options=options))
     if next_album:
         next_button: dict[str, any] = create_next_button(
@@ -1917,7 +2028,7 @@ def __handler_element_favorite_albums_common(
             next_offset=offset + max_items)
         upnp_util.set_album_art_from_uri(
             album_art_uri=tidal_util.get_album_art_url_by_album_id(
-                album_id=next_album.id,
+                album_id=next_album.album_id,
                 tidal_session=tidal_session),
             target=next_button)
         entries.append(next_button)
@@ -1928,7 +2039,7 @@ def handler_element_favorite_albums_by_artist_asc(objid, item_identifier: ItemId
     return __handler_element_favorite_albums_common(
         descending=False,
         element_type=ElementType.FAVORITE_ALBUMS_BY_ARTIST_ASC,
-        list_retriever=get_favorite_albums_by_artist,
+        sort_order=FavoriteSortOrder.ARTIST,
         objid=objid,
         item_identifier=item_identifier,
         entries=entries)
@@ -1938,7 +2049,7 @@ def handler_element_favorite_albums_by_artist_desc(objid, item_identifier: ItemI
     return __handler_element_favorite_albums_common(
         descending=True,
         element_type=ElementType.FAVORITE_ALBUMS_BY_ARTIST_DESC,
-        list_retriever=get_favorite_albums_by_artist,
+        sort_order=FavoriteSortOrder.ARTIST,
         objid=objid,
         item_identifier=item_identifier,
         entries=entries)
@@ -1948,7 +2059,7 @@ def handler_element_favorite_albums_by_title_asc(objid, item_identifier: ItemIde
     return __handler_element_favorite_albums_common(
         descending=False,
         element_type=ElementType.FAVORITE_ALBUMS_BY_TITLE_ASC,
-        list_retriever=get_favorite_albums_by_title,
+        sort_order=FavoriteSortOrder.TITLE,
         objid=objid,
         item_identifier=item_identifier,
         entries=entries)
@@ -1958,7 +2069,7 @@ def handler_element_favorite_albums_by_title_desc(objid, item_identifier: ItemId
     return __handler_element_favorite_albums_common(
         descending=True,
         element_type=ElementType.FAVORITE_ALBUMS_BY_TITLE_DESC,
-        list_retriever=get_favorite_albums_by_title,
+        sort_order=FavoriteSortOrder.TITLE,
         objid=objid,
         item_identifier=item_identifier,
         entries=entries)
@@ -1971,7 +2082,7 @@ def handler_element_favorite_albums_by_release_date_asc(
     return __handler_element_favorite_albums_common(
         descending=False,
         element_type=ElementType.FAVORITE_ALBUMS_BY_RELEASE_DATE_ASC,
-        list_retriever=get_favorite_albums_by_release_date,
+        sort_order=FavoriteSortOrder.RELEASE_DATE,
         objid=objid,
         item_identifier=item_identifier,
         entries=entries)
@@ -1984,7 +2095,7 @@ def handler_element_favorite_albums_by_release_date_desc(
     return __handler_element_favorite_albums_common(
         descending=True,
         element_type=ElementType.FAVORITE_ALBUMS_BY_RELEASE_DATE_DESC,
-        list_retriever=get_favorite_albums_by_release_date,
+        sort_order=FavoriteSortOrder.RELEASE_DATE,
         objid=objid,
         item_identifier=item_identifier,
         entries=entries)
@@ -1997,7 +2108,7 @@ def handler_element_favorite_albums_by_user_added_asc(
     return __handler_element_favorite_albums_common(
         descending=False,
         element_type=ElementType.FAVORITE_ALBUMS_BY_USER_DATE_ADDED_ASC,
-        list_retriever=get_favorite_albums_by_user_date_added,
+        sort_order=FavoriteSortOrder.DATE_ADDED,
         objid=objid,
         item_identifier=item_identifier,
         entries=entries)
@@ -2010,7 +2121,7 @@ def handler_element_favorite_albums_by_user_added_desc(
     return __handler_element_favorite_albums_common(
         descending=True,
         element_type=ElementType.FAVORITE_ALBUMS_BY_USER_DATE_ADDED_DESC,
-        list_retriever=get_favorite_albums_by_user_date_added,
+        sort_order=FavoriteSortOrder.DATE_ADDED,
         objid=objid,
         item_identifier=item_identifier,
         entries=entries)
@@ -2021,41 +2132,40 @@ def handler_tag_favorite_albums(objid, item_identifier: ItemIdentifier, entries:
         FavoriteAlbumsMode.create(
             element_type=ElementType.FAVORITE_ALBUMS_BY_ARTIST_ASC,
             display_name="By Artist (Asc)",
-            sort_criteria_builder=build_album_sort_criteria_by_artist),
+            sort_order=FavoriteSortOrder.ARTIST),
         FavoriteAlbumsMode.create(
             element_type=ElementType.FAVORITE_ALBUMS_BY_ARTIST_DESC,
             display_name="By Artist (Desc)",
-            sort_criteria_builder=build_album_sort_criteria_by_artist,
+            sort_order=FavoriteSortOrder.ARTIST,
             descending=True),
         FavoriteAlbumsMode.create(
             element_type=ElementType.FAVORITE_ALBUMS_BY_TITLE_ASC,
             display_name="By Title (Asc)",
-            sort_criteria_builder=build_album_sort_criteria_by_name),
+            sort_order=FavoriteSortOrder.TITLE),
         FavoriteAlbumsMode.create(
             element_type=ElementType.FAVORITE_ALBUMS_BY_TITLE_DESC,
             display_name="By Title (Desc)",
-            sort_criteria_builder=build_album_sort_criteria_by_name,
+            sort_order=FavoriteSortOrder.TITLE,
             descending=True),
         FavoriteAlbumsMode.create(
             element_type=ElementType.FAVORITE_ALBUMS_BY_RELEASE_DATE_ASC,
             display_name="By Release Date (Asc)",
-            sort_criteria_builder=build_album_sort_criteria_by_release_date),
+            sort_order=FavoriteSortOrder.RELEASE_DATE),
         FavoriteAlbumsMode.create(
             element_type=ElementType.FAVORITE_ALBUMS_BY_RELEASE_DATE_DESC,
             display_name="By Release Date (Desc)",
-            sort_criteria_builder=build_album_sort_criteria_by_release_date,
+            sort_order=FavoriteSortOrder.RELEASE_DATE,
             descending=True),
         FavoriteAlbumsMode.create(
             element_type=ElementType.FAVORITE_ALBUMS_BY_USER_DATE_ADDED_ASC,
             display_name="By Date Added (Asc)",
-            sort_criteria_builder=build_album_sort_criteria_by_user_date_added),
+            sort_order=FavoriteSortOrder.DATE_ADDED),
         FavoriteAlbumsMode.create(
             element_type=ElementType.FAVORITE_ALBUMS_BY_USER_DATE_ADDED_DESC,
             display_name="By Date Added (Desc)",
-            sort_criteria_builder=build_album_sort_criteria_by_user_date_added,
+            sort_order=FavoriteSortOrder.DATE_ADDED,
             descending=True)]
     tidal_session: TidalSession = get_session()
-    tidal_favorite_list: list[TidalAlbum] = tidal_util.try_get_all_favorites(tidal_session)
     current_tuple: FavoriteAlbumsMode
     for current_tuple in tuple_array:
         identifier: ItemIdentifier = ItemIdentifier(
@@ -2066,13 +2176,13 @@ def handler_tag_favorite_albums(objid, item_identifier: ItemIdentifier, entries:
             id=identifier_util.create_id_from_identifier(identifier))
         entry = upmplgutils.direntry(id, objid, current_tuple.display_name)
         entries.append(entry)
-        descending: bool = current_tuple.descending
-        sc_list_builder: Callable[[bool], list[AlbumSortCriteria]] = current_tuple.sort_criteria_builder
-        sc_list: list[AlbumSortCriteria] = sc_list_builder(descending)
-        favorite_list: list[TidalAlbum] = tidal_favorite_list.copy()
-        favorite_list.sort(key=cmp_to_key(lambda x, y: compare_favorite_album_by_criteria_list(sc_list, x, y)))
-        first: TidalAlbum = favorite_list[0] if favorite_list and len(favorite_list) > 0 else None
-        upnp_util.set_album_art_from_uri(tidal_util.get_image_url(first) if first else None, entry)
+        first_list: list[AlbumMetadata] = get_favorite_albums(
+            tidal_session=tidal_session,
+            sort_order=current_tuple.sort_order,
+            descending=current_tuple.descending,
+            limit=1)
+        first: AlbumMetadata = first_list[0] if len(first_list) > 0 else None
+        upnp_util.set_album_art_from_uri(first.image_url if first else None, entry)
     return entries
 
 
@@ -2080,7 +2190,7 @@ def handler_favorite_artists_by_name_asc(objid, item_identifier: ItemIdentifier,
     return handler_favorite_artists_common(
         descending=False,
         element_type=ElementType.FAVORITE_ARTISTS_BY_NAME_ASC,
-        list_retriever=get_favorite_artists_by_name,
+        sort_order=FavoriteSortOrder.NAME,
         objid=objid,
         item_identifier=item_identifier,
         entries=entries)
@@ -2090,7 +2200,7 @@ def handler_favorite_artists_by_name_desc(objid, item_identifier: ItemIdentifier
     return handler_favorite_artists_common(
         descending=True,
         element_type=ElementType.FAVORITE_ARTISTS_BY_NAME_DESC,
-        list_retriever=get_favorite_artists_by_name,
+        sort_order=FavoriteSortOrder.NAME,
         objid=objid,
         item_identifier=item_identifier,
         entries=entries)
@@ -2100,7 +2210,7 @@ def handler_favorite_artists_by_user_date_added_asc(objid, item_identifier: Item
     return handler_favorite_artists_common(
         descending=False,
         element_type=ElementType.FAVORITE_ARTISTS_BY_USER_DATE_ADDED_ASC,
-        list_retriever=get_favorite_artists_by_user_date_added,
+        sort_order=FavoriteSortOrder.DATE_ADDED,
         objid=objid,
         item_identifier=item_identifier,
         entries=entries)
@@ -2110,7 +2220,7 @@ def handler_favorite_artists_by_user_date_added_desc(objid, item_identifier: Ite
     return handler_favorite_artists_common(
         descending=True,
         element_type=ElementType.FAVORITE_ARTISTS_BY_USER_DATE_ADDED_DESC,
-        list_retriever=get_favorite_artists_by_user_date_added,
+        sort_order=FavoriteSortOrder.DATE_ADDED,
         objid=objid,
         item_identifier=item_identifier,
         entries=entries)
@@ -2119,20 +2229,26 @@ def handler_favorite_artists_by_user_date_added_desc(objid, item_identifier: Ite
 def handler_favorite_artists_common(
         descending: bool,
         element_type: ElementType,
-        list_retriever: Callable[[TidalSession, bool, int, int], list[TidalArtist]],
+        sort_order: FavoriteSortOrder,
         objid,
         item_identifier: ItemIdentifier,
         entries: list) -> list:
     offset: int = item_identifier.get(ItemIdentifierKey.OFFSET, 0)
     tidal_session: TidalSession = get_session()
     max_items: int = config.artists_per_page
-    items: list[TidalArtist] = list_retriever(tidal_session, descending, max_items + 1, offset)
-    next_artist: TidalArtist = items[config.artists_per_page] if len(items) == config.artists_per_page + 1 else None
+    items: list[FavoriteArtistMetadata] = get_favorite_artists(tidal_session, sort_order, descending, max_items + 1, offset)
+    next_artist: FavoriteArtistMetadata = (items[config.artists_per_page]
+                                           if len(items) == config.artists_per_page + 1
+                                           else None)
     # shrink
     items = items[0:min(len(items), config.artists_per_page)] if len(items) > 0 else list()
-    current: TidalArtist
+    current: FavoriteArtistMetadata
     for current in items:
-        entries.append(artist_to_entry(objid=objid, artist=current))
+        entries.append(artist_to_entry_raw(
+            objid=objid,
+            artist_id=current.artist_id,
+            artist_name=current.artist_name,
+            artist_image_url=current.image_url))
     if next_artist:
         next_button: dict[str, any] = create_next_button(
             objid=objid,
@@ -2140,7 +2256,7 @@ def handler_favorite_artists_common(
             element_id=element_type.getName(),
             next_offset=offset + max_items)
         upnp_util.set_album_art_from_uri(
-            album_art_uri=tidal_util.get_image_url(obj=next_artist),
+            album_art_uri=next_artist.image_url,
             target=next_button)
         entries.append(next_button)
     return entries
@@ -2151,19 +2267,19 @@ def handler_tag_favorite_artists(objid, item_identifier: ItemIdentifier, entries
         (
             ElementType.FAVORITE_ARTISTS_BY_NAME_ASC,
             "By Name (Asc)",
-            build_artist_sort_criteria_by_name, False),
+            FavoriteSortOrder.NAME, False),
         (
             ElementType.FAVORITE_ARTISTS_BY_NAME_DESC,
             "By Name (Desc)",
-            build_artist_sort_criteria_by_name, True),
+            FavoriteSortOrder.NAME, True),
         (
             ElementType.FAVORITE_ARTISTS_BY_USER_DATE_ADDED_ASC,
             "By Date Added (Asc)",
-            build_artist_sort_criteria_by_user_date_added, False),
+            FavoriteSortOrder.DATE_ADDED, False),
         (
             ElementType.FAVORITE_ARTISTS_BY_USER_DATE_ADDED_DESC,
             "By Date Added (Desc)",
-            build_artist_sort_criteria_by_user_date_added, True)]
+            FavoriteSortOrder.DATE_ADDED, True)]
     tidal_session: TidalSession = get_session()
     for current_tuple in tuple_array:
         identifier: ItemIdentifier = ItemIdentifier(
@@ -2174,13 +2290,13 @@ def handler_tag_favorite_artists(objid, item_identifier: ItemIdentifier, entries
             id=identifier_util.create_id_from_identifier(identifier))
         entry = upmplgutils.direntry(id, objid, current_tuple[1])
         entries.append(entry)
-        descending: bool = current_tuple[3]
-        sc_list_builder: Callable[[bool], list[ArtistSortCriteria]] = current_tuple[2]
-        sc_list: list[ArtistSortCriteria] = sc_list_builder(descending)
-        favorite_list: list[TidalArtist] = tidal_session.user.favorites.artists()
-        favorite_list.sort(key=cmp_to_key(lambda x, y: compare_favorite_artist_by_criteria_list(sc_list, x, y)))
-        first: TidalArtist = favorite_list[0] if favorite_list and len(favorite_list) > 0 else None
-        upnp_util.set_album_art_from_uri(tidal_util.get_image_url(first) if first else None, entry)
+        first_list: list[FavoriteArtistMetadata] = get_favorite_artists(
+            tidal_session=tidal_session,
+            sort_order=current_tuple[2],
+            descending=current_tuple[3],
+            limit=1)
+        first: FavoriteArtistMetadata = first_list[0] if len(first_list) > 0 else None
+        upnp_util.set_album_art_from_uri(first.image_url if first else None, entry)
     return entries
 
 
@@ -2375,7 +2491,7 @@ def handler_tag_bookmarks(
 
 def handler_tag_page(
         objid,
-        page_extractor: Callable[[TidalSession], TidalPage],
+        page_extractor: Callable[[TidalSession], CachedPage],
         entries: list,
         offset: int,
         next_button_element_id: str) -> list:
@@ -2580,6 +2696,7 @@ def handler_element_mix(objid, item_identifier: ItemIdentifier, entries: list) -
     context.add(key=ContextKey.IS_MIX, value=True)
     context.add(key=ContextKey.CONTAINER_TYPE, value=ContainerType.MIX)
     context.add(key=ContextKey.CONTAINER_ID, value=mix_id)
+    preload_played_album_tracks_for_tracks(context=context, tracks=tracks)
     for track in tracks:
         if not isinstance(track, TidalTrack):
             continue
@@ -2599,25 +2716,47 @@ def handler_element_mix(objid, item_identifier: ItemIdentifier, entries: list) -
     known_tracks_count: int = context.get(ContextKey.KNOWN_TRACKS_COUNT)
     guessed_tracks_count: int = context.get(ContextKey.GUESSED_TRACKS_COUNT)
     get_stream_count: int = context.get(ContextKey.GET_STREAM_COUNT)
+    played_album_query_count: int = context.get(ContextKey.PLAYED_ALBUM_QUERY_COUNT)
     msgproc.log(f"handler_element_mix finished with success_count [{success_count}] "
                 f"Known [{known_tracks_count}] Guessed [{guessed_tracks_count}] "
-                f"Get Stream Count [{get_stream_count}]")
+                f"Get Stream Count [{get_stream_count}] "
+                f"Played Album Queries [{played_album_query_count}]")
     return entries
 
 
 def follow_page_link(page_link: TidalPageLink) -> any:
-    next = page_link
+    tidal_session: TidalSession = getattr(page_link, "session", None)
+    api_path: str = page_link.api_path
+    title: str = page_link.title
+    return page_cache.get(
+        path=api_path,
+        variant=__get_page_cache_variant(tidal_session),
+        ttl_sec=config.get_config_param_as_int(constants.ConfigParam.PAGE_CACHE_PAGELINK_TTL_SEC),
+        loader=lambda: __follow_page_link(api_path=api_path, title=title))
+
+
+def __follow_page_link(api_path: str, title: str) -> TidalPage:
+    # the session is obtained when the loader runs, the refresher calls it long after
+    # the request which found the link, whose session might be expired by then
+    next = None
+    try:
+        next = get_session().page.get(api_path)
+    except Exception as next_exc:
+        msgproc.log(f"Cannot execute next for [{title}] due to [{type(next_exc)}] [{next_exc}]")
     while next:
         # msgproc.log(f"follow_page_link type of next is [{type(next).__name__}]")
         if isinstance(next, TidalPageLink):
             try:
                 next = next.get()
             except Exception as next_exc:
-                msgproc.log(f"Cannot execute next for [{page_link.title}] due to [{type(next_exc)}] [{next_exc}]")
+                msgproc.log(f"Cannot execute next for [{title}] due to [{type(next_exc)}] [{next_exc}]")
                 next = None
             # msgproc.log(f"  next found: [{'yes' if next else 'no'}] type: [{type(next).__name__ if next else None}]")
         else:
             break
+    if next is not None and not isinstance(next, TidalPage):
+        msgproc.log(f"follow_page_link[{api_path}]: found a [{type(next).__name__}], not handled")
+        return None
     return next
 
 
@@ -2633,7 +2772,7 @@ def get_items_in_page_link(page_link: TidalPageLink, limit: int = None) -> list[
     if not linked:
         msgproc.log("get_items_in_page_link linked_object is empty, returning empty list")
         return items
-    if isinstance(linked, TidalPage):
+    if isinstance(linked, CachedPage):
         # msgproc.log(f"get_items_in_page_link: found a Page")
         for current in linked:
             if limit and len(items) >= limit:
@@ -2667,7 +2806,10 @@ def handler_element_pagelink(objid, item_identifier: ItemIdentifier, entries: li
                 f"api_path [{api_path}]")
     tidal_session: TidalSession = get_session()
     try:
-        page: TidalPage = tidal_session.page.get(api_path)
+        page: CachedPage = get_page_by_path(
+            tidal_session=tidal_session,
+            page_path=api_path,
+            ttl_sec=config.get_config_param_as_int(constants.ConfigParam.PAGE_CACHE_PAGELINK_TTL_SEC))
         if not page:
             msgproc.log("handler_element_pagelink page not found")
             return entries
@@ -2698,7 +2840,7 @@ def handler_element_page(objid, item_identifier: ItemIdentifier, entries: list)
     if verbose:
         msgproc.log(f"handler_element_page [{thing_value}] at offset [{offset}]")
     tidal_session: TidalSession = get_session()
-    page: TidalPage = tidal_session.page.get(thing_value)
+    page: CachedPage = get_page_by_path(tidal_session=tidal_session, page_path=thing_value)
     if verbose:
         msgproc.log(f"handler_element_page [{thing_value}] at offset [{offset}] page [{thing_value}]")
     return page_to_entries(
@@ -2718,8 +2860,8 @@ def page_to_entries(
         objid,
         tidal_session: TidalSession,
         entries: list,
-        page_extractor: Callable[[TidalSession], TidalPage] = None,
-        page: TidalPage = None,
+        page_extractor: Callable[[TidalSession], CachedPage] = None,
+        page: CachedPage = None,
         paginate: bool = False,
         offset: int = 0,
         limit: int = 100,
@@ -2737,18 +2879,9 @@ def page_to_entries(
     # extracting items from page
     if config.get_config_param_as_bool(constants.ConfigParam.VERBOSE_LOGGING):
         msgproc.log(f"page_to_entries for page [{page.title if page else ''}] from offset [{offset}]")
-    current_offset: int = 0
-    sliced: list[any] = list()
     limit_size: int = max_items + 1 if paginate else max_items
-    for current_page_item in page if page else []:
-        current_offset += 1
-        if (current_offset - 1) < offset:
-            continue
-        if (len(sliced) < limit_size):
-            # add to sliced
-            sliced.append(current_page_item)
-        else:
-            break
+    # pages are materialized, pagination is just a slice
+    sliced: list[any] = page.slice(offset, limit_size) if page else list()
     next_needed: bool = paginate and (len(sliced) == max_items + 1)
     if config.get_config_param_as_bool(constants.ConfigParam.VERBOSE_LOGGING):
         msgproc.log(f"next_needed=[{next_needed}] len(sliced)={len(sliced)} "
@@ -3732,6 +3865,7 @@ def handler_all_tracks_in_playlist_or_mix(
     msgproc.log(f"handler_all_tracks_in_playlist_or_mix - {type(mix_or_playlist).__name__} loaded")
     tracks: list[TidalTrack] = tidal_util.get_all_mix_or_playlist_tracks(mix_or_playlist=mix_or_playlist)
     context: Context = Context()
+    preload_played_album_tracks_for_tracks(context=context, tracks=tracks)
     options: dict[str, any] = {}
     track: TidalTrack
     track_counter: int = 0
@@ -3828,7 +3962,7 @@ def handler_element_mix_playlist_toptrack_navigable_item(
         entries: list) -> list:
     track_id: str = item_identifier.get(ItemIdentifierKey.THING_VALUE)
     tidal_session: TidalSession = get_session()
-    track: TidalTrack = tidal_session.track(track_id)
+    track: TidalTrack = metadata_store.get_track(tidal_session, track_id)
     track_options: dict[str, any] = dict()
     set_option(
         options=track_options,
@@ -4065,9 +4199,9 @@ def handler_element_album(
     page: int = item_identifier.get(ItemIdentifierKey.ALBUM_PAGE, None)
     offset: int = page * constants.default_max_album_tracks_per_page if page else 0
     tidal_session: TidalSession = get_session()
-    album: TidalAlbum = tidal_session.album(album_id)
+    album: TidalAlbum = metadata_store.get_album(tidal_session, album_id)
     is_multidisc_album: bool = tidal_util.is_multidisc_album(album)
-    tracks: list[TidalTrack] = album.tracks()
+    tracks: list[TidalTrack] = metadata_store.get_album_tracks(tidal_session, album_id, album)
     track_count: int = len(tracks)
     paged: bool = False
     if track_count > constants.default_max_album_tracks_per_page:
@@ -4108,10 +4242,12 @@ def handler_element_album(
     guessed_tracks_count: int = context.get(ContextKey.GUESSED_TRACKS_COUNT)
     assumed_from_first_count: int = context.get(ContextKey.ASSUMED_FROM_FIRST_ALBUM_TRACK_COUNT)
     get_stream_count: int = context.get(ContextKey.GET_STREAM_COUNT)
+    played_album_query_count: int = context.get(ContextKey.PLAYED_ALBUM_QUERY_COUNT)
     msgproc.log(f"handler_element_album for id [{album_id}] finished with "
                 f"success_count [{success_count}] out of [{track_count}] "
                 f"Known [{known_tracks_count}] Guessed [{guessed_tracks_count}] "
-                f"Assumed by first [{assumed_from_first_count}] Get Stream Count [{get_stream_count}]")
+                f"Assumed by first [{assumed_from_first_count}] Get Stream Count [{get_stream_count}] "
+                f"Played Album Queries [{played_album_query_count}]")
     return entries
 
 
@@ -4577,6 +4713,7 @@ def handler_element_artist_add_to_fav(objid, item_identifier: ItemIdentifier, en
     tidal_session: TidalSession = get_session()
     if artist_id not in get_favorite_artist_id_list(tidal_session=tidal_session):
         tidal_session.user.favorites.add_artist(artist_id=artist_id)
+        request_favorites_mirror_refresh()
     identifier: ItemIdentifier = ItemIdentifier(
         ElementType.ARTIST.getName(),
         artist_id)
@@ -4588,6 +4725,7 @@ def handler_element_album_add_to_fav(objid, item_identifier: ItemIdentifier, ent
     tidal_session: TidalSession = get_session()
     if album_id not in get_favorite_album_id_list(tidal_session=tidal_session):
         tidal_session.user.favorites.add_album(album_id=album_id)
+        request_favorites_mirror_refresh()
     identifier: ItemIdentifier = ItemIdentifier(
         ElementType.ALBUM_CONTAINER.getName(),
         album_id)
@@ -4599,6 +4737,8 @@ def handler_element_artist_del_from_fav(objid, item_identifier: ItemIdentifier,
     tidal_session: TidalSession = get_session()
     if artist_id in get_favorite_artist_id_list(tidal_session=tidal_session):
         tidal_session.user.favorites.remove_artist(artist_id=artist_id)
+        favorite_artists_mirror.remove(artist_id)
+        persistence.delete_favorite_artist(artist_id)
     identifier: ItemIdentifier = ItemIdentifier(
         ElementType.ARTIST.getName(),
         artist_id)
@@ -4610,6 +4750,8 @@ def handler_element_album_del_from_fav(objid, item_identifier: ItemIdentifier, e
     tidal_session: TidalSession = get_session()
     if album_id in get_favorite_album_id_list(tidal_session=tidal_session):
         tidal_session.user.favorites.remove_album(album_id=album_id)
+        favorite_albums_mirror.remove(album_id)
+        persistence.delete_favorite_album(album_id)
     identifier: ItemIdentifier = ItemIdentifier(
         ElementType.ALBUM_CONTAINER.getName(),
         album_id)
@@ -5048,7 +5190,7 @@ def track_data_to_entry(
 def handler_element_track_simple(objid, item_identifier: ItemIdentifier, entries: list) -> list:
     track_id: str = item_identifier.get(ItemIdentifierKey.THING_VALUE)
     tidal_session: TidalSession = get_session()
-    track: TidalTrack = tidal_session.track(track_id)
+    track: TidalTrack = metadata_store.get_track(tidal_session, track_id)
     identifier: ItemIdentifier = ItemIdentifier(ElementType.TRACK.getName(), track_id)
     id: str = identifier_util.create_objid(objid, identifier_util.create_id_from_identifier(identifier))
     track_entry: dict = track_data_to_entry(
@@ -5656,7 +5798,7 @@ def __load_tidal_track_adapter_by_track_id(
     # msgproc.log(f"Loading track details from Tidal for track_id: [{track_id}]")
     adapter: TidalTrackAdapter = TidalTrackAdapter(
         tidal_session=tidal_session,
-        track=tidal_session.track(track_id),
+        track=metadata_store.get_track(tidal_session, track_id),
         album_retriever=album_retriever)
     # maybe update on db?
     if config.get_config_param_as_bool(constants.ConfigParam.ENABLE_READ_STREAM_METADATA):
@@ -5789,7 +5931,7 @@ def __image_retriever_by_page_definition(
         tidal_page_definition: TidalPageDefinition) -> str:
     if not config.get_config_param_as_bool(constants.ConfigParam.ALLOW_SEARCH_IMAGE_FOR_PAGE):
         return None
-    page: TidalPage = get_tidal_page(tidal_session, tidal_page_definition)
+    page: CachedPage = get_tidal_page(tidal_session, tidal_page_definition)
     return image_retriever_page(page=page)
 
 
@@ -5797,7 +5939,7 @@ def image_retriever_hires_page(
         tidal_session: TidalSession,
         tag_type: TagType,
         obj_cache: dict[str, any]) -> str:
-    page: TidalPage = get_tidal_page(tidal_session, TidalPageDefinition.HI_RES)
+    page: CachedPage = get_tidal_page(tidal_session, TidalPageDefinition.HI_RES)
     return image_retriever_page(page=page)
 
 
@@ -5805,7 +5947,7 @@ def image_retriever_genres_page(
         tidal_session: TidalSession,
         tag_type: TagType,
         obj_cache: dict[str, any]) -> str:
-    page: TidalPage = get_tidal_page(tidal_session, TidalPageDefinition.GENRES)
+    page: CachedPage = get_tidal_page(tidal_session, TidalPageDefinition.GENRES)
     return image_retriever_page(page=page)
 
 
@@ -5813,7 +5955,7 @@ def image_retriever_local_genres_page(
         tidal_session: TidalSession,
         tag_type: TagType,
         obj_cache: dict[str, any]) -> str:
-    page: TidalPage = get_tidal_page(tidal_session, TidalPageDefinition.LOCAL_GENRES)
+    page: CachedPage = get_tidal_page(tidal_session, TidalPageDefinition.LOCAL_GENRES)
     return image_retriever_page(page=page)
 
 
@@ -5821,12 +5963,12 @@ def image_retriever_moods_page(
         tidal_session: TidalSession,
         tag_type: TagType,
         obj_cache: dict[str, any]) -> str:
-    page: TidalPage = get_tidal_page(tidal_session, TidalPageDefinition.MOODS)
+    page: CachedPage = get_tidal_page(tidal_session, TidalPageDefinition.MOODS)
     return image_retriever_page(page=page)
 
 
 def image_retriever_page(
-        page: TidalPage,
+        page: CachedPage,
         limit: int = config.get_config_param_as_int(constants.ConfigParam.PAGE_ITEMS_FOR_TILE_IMAGE)) -> str:
     if not page:
         msgproc.log("image_retriever_page page is not set, returning None")
@@ -6022,7 +6164,7 @@ def image_retriever_listen_queue(
         if select_album_id else None)
 
 
-def get_tidal_page(tidal_session: TidalSession, tidal_page_def: TidalPageDefinition) -> TidalPage:
+def get_tidal_page(tidal_session: TidalSession, tidal_page_def: TidalPageDefinition) -> CachedPage:
     try:
         return __get_page(tidal_session, tidal_page_def.page_path)
     except Exception as ex:
@@ -6030,8 +6172,28 @@ def get_tidal_page(tidal_session: TidalSession, tidal_page_def: TidalPageDefinit
         return None
 
 
-def __get_page(tidal_session: TidalSession, page_path: str) -> TidalPage:
-    return tidal_session.page.get(page_path)
+def __get_page(tidal_session: TidalSession, page_path: str) -> CachedPage:
+    return get_page_by_path(tidal_session=tidal_session, page_path=page_path)
+
+
+def get_page_by_path(tidal_session: TidalSession, page_path: str, ttl_sec: int = None) -> CachedPage:
+    if ttl_sec is None:
+        ttl_sec = config.get_config_param_as_int(
+            constants.ConfigParam.PAGE_CACHE_BROWSE_TTL_SEC
+            if page_path in __browse_page_path_set
+            else constants.ConfigParam.PAGE_CACHE_TTL_SEC)
+    return page_cache.get(
+        path=page_path,
+        variant=__get_page_cache_variant(tidal_session),
+        ttl_sec=ttl_sec,
+        # not tidal_session: the refresher calls the loader after this request is gone
+        loader=lambda: get_session().page.get(page_path))
+
+
+def __get_page_cache_variant(tidal_session: TidalSession) -> str:
+    # the same page might be different depending on the session quality
+    audio_quality: any = getattr(tidal_session, "audio_quality", None) if tidal_session else None
+    return str(audio_quality) if audio_quality else ""
 
 
 __tag_image_retriever: dict[str, Callable[[TidalSession, TagType, dict[str, any]], str]] = {
@@ -6409,6 +6571,8 @@ def execute_search(
             resultset_length = len(item_list) if item_list else 0
             options: dict[str, any] = dict()
             context: Context = Context()
+            if not search_result_track_as_container:
+                preload_played_album_tracks_for_tracks(context=context, tracks=item_list)
             set_option(options=options, option_key=OptionKey.SKIP_TRACK_NUMBER, option_value=True)
             item: TidalTrack
             for item in item_list:
@@ -6460,6 +6624,8 @@ def execute_search(
                 offset=offset)
             resultset_length += len(item_list) if item_list else 0
             context: Context = Context()
+            if st.get_model() == TidalTrack and not search_result_track_as_container:
+                preload_played_album_tracks_for_tracks(context=context, tracks=item_list)
             for item in item_list:
                 if st.get_model() == TidalArtist:
                     entries.append(artist_to_entry(
@@ -6542,45 +6708,6 @@ def search(a):
 _g_init = False
 
 
-def get_image_cache_path_for_pruning(www_image_path: list[str]) -> bool:
-    # check cache dir
-    cache_dir: str = upmplgutils.getUpnpWebDocRoot(constants.PluginConstant.PLUGIN_NAME.value)
-    if not cache_dir:
-        msgproc.log("Cache directory is not set, cannot allow pruning.")
-        return None
-    candidate: pathlib.Path = pathlib.Path(cache_dir)
-    # does the path actually exist?
-    if not candidate.exists() or not candidate.is_dir():
-        msgproc.log(f"Invalid cache path [{candidate}], cannot allow pruning.")
-        return None
-    # is the provided argument a valid non-empty list?
-    if not www_image_path or not isinstance(www_image_path, list) or len(www_image_path) == 0:
-        msgproc.log("www_image_path is not a valid list, cannot allow pruning.")
-        return None
-    return tidal_util.ensure_directory(
-        upmplgutils.getUpnpWebDocRoot(constants.PluginConstant.PLUGIN_NAME.value),
-        www_image_path)
-
-
-def prune_cache(cached_images_dir: str):
-    now: float = time.time()
-    # list directories
-    file_count: int = 0
-    deleted_count: int = 0
-    max_age_seconds: int = config.get_config_param_as_int(constants.ConfigParam.CACHED_IMAGE_MAX_AGE_DAYS) * (24 * 60 * 60)
-    for filename in glob.glob(f"{cached_images_dir}/**/*", recursive=True):
-        filename_path = os.path.normpath(filename)
-        file_count += 1
-        time_diff_sec: float = now - os.path.getmtime(filename_path)
-        # msgproc.log(f"Found file: timediff [{time_diff_sec:.2f}] [{filename}]")
-        if time_diff_sec >= float(max_age_seconds):
-            # msgproc.log(f"Deleting file [{filename}] which is older than "
-            #             f"[{config.get_config_param_as_int(constants.ConfigParam.CACHED_IMAGE_MAX_AGE_DAYS)}] days")
-            os.remove(filename_path)
-            deleted_count += 1
-    msgproc.log(f"Deleted [{deleted_count}] cached images out of [{file_count}]")
-
-
 def load_static_images(path_static_images: list[str], static_images_dir: str):
     msgproc.log(f"copy_static_images to [{path_static_images}]")
     # plugin_static_images_dir: str = tidal_util.get_plugin_static_images_abs_path()
@@ -6695,19 +6822,11 @@ def preloading():
     msgproc.log("preloading started ...")
     tidal_session: TidalSession = get_session()
     msgproc.log("preloading got a session")
-    cn: sqlite3.Connection = persistence.get_connection()
-    msgproc.log("preloading got a connection")
-    # TODO load favorite artists
-    # TODO load favorite albums
-    album_list: list[TidalAlbum] = tidal_session.user.favorites.albums_paginated()
-    msgproc.log(f"preloading loading [{len(album_list)}] albums ...")
-    curr_album: TidalAlbum
-    for curr_album in album_list:
-        album_start: float = time.time()
-        msgproc.log(f"preloading processing album [{curr_album.id}] ...")
-        curr_album_md: AlbumMetadata = tidal_album_to_album_metadata(curr_album)
-        persistence.store_album_metadata(album_metadata=curr_album_md, connection=cn)
-        msgproc.log(f"preloading processed album [{curr_album.id}] in [{(time.time() - album_start):.3f}]")
+    # favorite albums and artists, also catches removals made outside of the plugin
+    try:
+        refresh_favorites_mirror(tidal_session=tidal_session, full=True)
+    except Exception as ex:
+        msgproc.log(f"preloading cannot refresh favorites due to [{type(ex)}] [{ex}]")
     # TODO load favorite songs
     # get images for page selection
     page_selection_tags: list[TagType] = get_page_selection()
@@ -6751,6 +6870,9 @@ def _inittidal():
         return True
     # Do whatever is needed here
     msgproc.log(f"Tidal Plugin Release {constants.PluginConstant.PLUGIN_RELEASE.value}")
+    if config.get_config_param_as_bool(constants.ConfigParam.ENABLE_CONFIG_RELOAD_ON_SIGHUP):
+        installed: bool = config.install_reload_config_on_sighup(logger=msgproc.log)
+        msgproc.log(f"Config reload on SIGHUP installed [{installed}]")
     msgproc.log(f"enable_read_stream_metadata=["
                 f"{config.get_config_param_as_bool(constants.ConfigParam.ENABLE_READ_STREAM_METADATA)}]")
     msgproc.log(f"enable_assume_bitdepth=[{config.enable_assume_bitdepth}]")
@@ -6781,19 +6903,57 @@ def _inittidal():
         upmplgutils.getUpnpWebDocRoot(constants.PluginConstant.PLUGIN_NAME.value),
         path_cached_images)
     msgproc.log(f"Cached images dir is [{cached_images_dir}]")
-    # pruning of cached images
-    if config.get_config_param_as_bool(constants.ConfigParam.ENABLE_CACHED_IMAGE_AGE_LIMIT):
-        prune_path: str = get_image_cache_path_for_pruning(tidal_util.get_webserver_cached_images_path())
-        if prune_path:
-            msgproc.log(f"Pruning image cache at path [{prune_path}] ...")
-            prune_cache(cached_images_dir=prune_path)
-            msgproc.log(f"Pruned image cache at path [{prune_path}].")
-    else:
-        msgproc.log("Image pruning disabled.")
+    # index cached images, then evict by age/size in background
+    try:
+        image_cache: ImageCache = image_cache_provider.get_or_create(directory=cached_images_dir)
+        image_cache.start_eviction(
+            interval_sec=config.get_config_param_as_int(constants.ConfigParam.CACHED_IMAGE_EVICTION_INTERVAL_SEC),
+            max_count_per_run=config.get_config_param_as_int(constants.ConfigParam.CACHED_IMAGE_MAX_EVICTIONS_PER_RUN))
+    except Exception as ex:
+        msgproc.log(f"Cannot index image cache due to [{type(ex)}] [{ex}]")
+    msgproc.log(f"Http response cache enabled [{http_cache_provider.get() is not None}]")
+    track_uri_cache.load()
+    __load_favorites_mirror()
+    # manifests left by a previous run are removed when they get too old
+    document_root_dir: str = config.getWebServerDocumentRoot()
+    manifest_dir: str
+    for manifest_dir in __manifest_dir_by_serve_mode.values() if document_root_dir else []:
+        manifest_store.adopt_directory(os.path.join(
+            document_root_dir,
+            constants.PluginConstant.PLUGIN_NAME.value,
+            manifest_dir))
+    manifest_store.start_sweeper(
+        interval_sec=config.get_config_param_as_int(constants.ConfigParam.MANIFEST_SWEEP_INTERVAL_SEC))
+    page_cache.start_refresher(
+        interval_sec=config.get_config_param_as_int(constants.ConfigParam.PAGE_CACHE_REFRESH_INTERVAL_SEC))
+    # drop the descriptors left by previous runs which are too old or too many
+    metadata_store.prune_in_background()
+    # pending writes are flushed when upmpdcli closes our input
+    msgproc.em.exitfunc = __on_plugin_exit
     _g_init = True
     return True
 
 
+def __on_plugin_exit(exit_value: int):
+    flushed: bool = playback_stats_writer.flush()
+    msgproc.log(f"Exiting with [{exit_value}], playback stats flushed [{flushed}] {playback_stats_writer}")
+    track_uri_cache.save()
+    metadata_store.report()
+
+
+def favorites_mirror_worker():
+    refresh_sec: int = config.get_config_param_as_int(constants.ConfigParam.FAVORITES_MIRROR_REFRESH_SEC)
+    msgproc.log(f"favorites_mirror_worker interval [{refresh_sec}]")
+    while True:
+        # woken up early when favorites are added from the plugin
+        __favorites_refresh_event.wait(refresh_sec)
+        __favorites_refresh_event.clear()
+        try:
+            refresh_favorites_mirror(tidal_session=get_session(), full=False)
+        except Exception as ex:
+            msgproc.log(f"favorites_mirror_worker failed due to [{type(ex)}] [{ex}]")
+
+
 def preloading_worker():
     preload_interval: int = config.get_config_param_as_int(constants.ConfigParam.PRELOAD_INTERVAL)
     msgproc.log(f"preloading_worker interval [{preload_interval}]")
@@ -6807,4 +6967,5 @@ _inittidal()
 thread = threading.Thread(target=preloading_worker, args=tuple([]))
 # Start it
 thread.start()
+threading.Thread(target=favorites_mirror_worker, daemon=True).start()
 msgproc.mainloop()
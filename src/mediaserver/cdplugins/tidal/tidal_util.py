@@ -16,12 +16,8 @@
 import upmplgutils
 import constants
 import config
-import requests
 import os
 import secrets
-import mimetypes
-import glob
-import pathlib
 import sqlite3
 
 import upmpdmeta
@@ -52,9 +48,13 @@ from item_identifier_key import ItemIdentifierKey
 
 import identifier_util
 import persistence
+import image_cache_provider
+from imagecaching import ImageCache
+from imagecaching import ImageDownloader
 from played_track import PlayedTrack
 
-from album_sort_criteria import AlbumSortCriteria
+from favorites_mirror import FavoriteSortOrder
+from metadata_store import metadata_store
 from album_adapter import AlbumAdapter
 from datetime import datetime
 
@@ -82,7 +82,7 @@ class FavoriteAlbumsMode:
 
     __element_type: ElementType
     __display_name: str
-    __sort_criteria_builder: Callable[[bool], list[AlbumSortCriteria]]
+    __sort_order: FavoriteSortOrder
     __descending: bool
 
     @classmethod
@@ -90,12 +90,12 @@ class FavoriteAlbumsMode:
             cls,
             element_type: ElementType,
             display_name: str,
-            sort_criteria_builder: Callable[[bool], list[AlbumSortCriteria]],
+            sort_order: FavoriteSortOrder,
             descending: bool = False):
         obj: FavoriteAlbumsMode = FavoriteAlbumsMode()
         obj.__element_type = element_type
         obj.__display_name = display_name
-        obj.__sort_criteria_builder = sort_criteria_builder
+        obj.__sort_order = sort_order
         obj.__descending = descending
         return obj
 
@@ -108,8 +108,8 @@ class FavoriteAlbumsMode:
         return self.__display_name
 
     @property
-    def sort_criteria_builder(self) -> Callable[[bool], list[AlbumSortCriteria]]:
-        return self.__sort_criteria_builder
+    def sort_order(self) -> FavoriteSortOrder:
+        return self.__sort_order
 
     @property
     def descending(self) -> bool:
@@ -136,19 +136,26 @@ def get_cached_image_subdir_list(image_type: str) -> list[str]:
         image_type]
 
 
-def cached_images_exist(album_id: str) -> list[str]:
-    document_root_dir: str = config.getWebServerDocumentRoot()
-    if document_root_dir:
-        sub_dir_list: list[str] = get_cached_image_subdir_list(image_type=TidalAlbum.__name__)
-        image_dir: str = ensure_directory(base_dir=document_root_dir, sub_dir_list=sub_dir_list)
-        cached_file_name_no_ext: str = f"{str(album_id)}"
-        cached_files: list[str] = glob.glob(f"{os.path.join(image_dir, cached_file_name_no_ext)}.*")
-        return cached_files if cached_files else []
-    return []
+def __get_cached_image_file_name(item_id: str, image_type: str) -> str:
+    # looked up in the in-memory index of the image cache, no file system access
+    image_cache: ImageCache = image_cache_provider.get()
+    return image_cache.get_file_name(item_id=str(item_id), sub_dir=image_type) if image_cache else None
+
+
+def __touch_cached_image(file_name: str, image_type: str):
+    image_cache: ImageCache = image_cache_provider.get()
+    if image_cache:
+        image_cache.touch(file_name=file_name, sub_dir=image_type)
+
+
+def __download_image(image_url: str, item_id: str, image_type: str):
+    image_downloader: ImageDownloader = image_cache_provider.get_downloader()
+    if image_downloader and image_url:
+        image_downloader.submit(url=image_url, item_id=str(item_id), sub_dir=image_type)
 
 
 def if_cached_exists(album_id: str, image_url: str) -> str:
-    return image_url if album_id and len(cached_images_exist(album_id=album_id)) > 0 else None
+    return image_url if album_id and __get_cached_image_file_name(album_id, TidalAlbum.__name__) else None
 
 
 def get_album_art_url_by_album_id(
@@ -163,21 +170,14 @@ def get_album_art_url_by_album_id(
                     f"by [{album.artist.name if album and album.artist else None}] "
                     f"album [{'set' if album else 'not set'}]")
     # use cached?
-    cached_files: list[str] = cached_images_exist(album_id=album_id) if use_cached else []
-    use_cached = len(cached_files) > 0 if use_cached else False
-    if use_cached:
-        # try cached!
-        # pick newest file
-        cached_file: str = __select_newest_file(cached_files)
-        cached_file_name_ext: str = os.path.splitext(cached_file)[1]
-        # touch the file.
-        # msgproc.log(f"About to touch file [{cached_file}] ...")
-        pathlib.Path(cached_file).touch()
+    cached_file_name: str = __get_cached_image_file_name(album_id, TidalAlbum.__name__) if use_cached else None
+    if cached_file_name:
+        __touch_cached_image(cached_file_name, TidalAlbum.__name__)
         # use cached file
         path: list[str] = list()
         sub_dir_list: list[str] = get_cached_image_subdir_list(image_type=TidalAlbum.__name__)
         path.extend(sub_dir_list)
-        path.append(f"{str(album_id)}{cached_file_name_ext}")
+        path.append(cached_file_name)
         cached_image_url: str = compose_docroot_url(os.path.join(*path))
         if config.get_dump_image_caching():
             msgproc.log(f"get_album_art_url_by_album_id [{album_id}] -> [{cached_image_url}]")
@@ -222,85 +222,19 @@ def get_image_url(obj: any, refresh: bool = False) -> str:
         return __get_image_url(obj)
     if type(obj) not in [TidalAlbum, TidalArtist, TidalPlaylist, TidalMix]:
         return __get_image_url(obj)
-    sub_dir_list: list[str] = [
-        constants.PluginConstant.PLUGIN_NAME.value,
-        constants.PluginConstant.CACHED_IMAGES_DIRECTORY.value,
-        type(obj).__name__]
-    image_dir: str = ensure_directory(document_root_dir, sub_dir_list)
-    cached_file_names: list[str] = __get_cached_file_names(image_dir, str(obj.id))
-    # msgproc.log(f"get_image_url for [{str(obj.id)}] -> [{cached_file_names}]")
-    # pick newest file
-    cached_file_name: str = (__select_newest_file(cached_file_names)
-                             if cached_file_names and len(cached_file_names) > 0
-                             else None)
-    # touch the file.
+    image_type: str = type(obj).__name__
+    cached_file_name: str = __get_cached_image_file_name(obj.id, image_type)
     if cached_file_name:
-        # msgproc.log(f"About to touch file [{cached_file_name}] ...")
-        pathlib.Path(cached_file_name).touch()
-    # cached_file_name_ext will include the ".", so it will likely be ".jpg"
-    cached_file_name_ext: str = os.path.splitext(cached_file_name)[1] if cached_file_name else None
-    # msgproc.log(f"For itemid [{str(obj.id)}] found file [{cached_file_name}]")
+        __touch_cached_image(cached_file_name, image_type)
     if refresh or not cached_file_name:
+        # downloaded in background, until then the image is served by tidal
         image_url: str = __get_image_url(obj=obj)
-        # msgproc.log(f"get_image_url saving to [{image_dir}] [{dest_file}]")
-        response = requests.get(image_url)
-        content_type = response.headers.get('content-type')
-        file_types: list[str] = mimetypes.guess_all_extensions(content_type)
-        if file_types and len(file_types) > 0:
-            # file_types include the "."
-            cached_file: str = os.path.join(image_dir, f"{str(obj.id)}{file_types[0].lower()}")
-            if config.get_config_param_as_bool(constants.ConfigParam.VERBOSE_LOGGING):
-                msgproc.log(f"get_image_url got mimetype for [{image_url}] -> "
-                            f"[{file_types}] -> "
-                            f"saving to [{cached_file}]")
-            img_data: bytes = requests.get(image_url).content
-            with open(cached_file, 'wb') as handler:
-                handler.write(img_data)
-            cached_image_url: str = get_web_document_root_file_url(
-                dir_list=sub_dir_list,
-                file_name=f"{str(obj.id)}{file_types[0].lower()}")
-            return cached_image_url
-        else:
-            msgproc.log(f"Cannot understand file type for item id [{str(obj.id)}], cannot cache.")
-            return None
-    elif cached_file_name:
-        return get_web_document_root_file_url(
-                dir_list=sub_dir_list,
-                file_name=f"{str(obj.id)}{cached_file_name_ext}")
-
-
-def __get_cached_file_names(cache_dir: str, item_id: str) -> list[str]:
-    cached_file_path: str = os.path.join(cache_dir, item_id)
-    item_id_ext: str = os.path.splitext(cached_file_path)[1]
-    if item_id_ext:
-        # cached_file_path has extension, we convert that to lower case
-        item_id_ext = item_id_ext.lower()
-        exists = os.path.exists(cached_file_path)
-        if exists:
-            return [cached_file_path]
-    else:
-        # no extension in item_id, look what's stored, if any
-        matching_files: list[str] = glob.glob(f"{cached_file_path}.*")
-        if matching_files and len(matching_files) > 0:
-            return matching_files
-    return []
-
-
-def __select_newest_file(file_list: list[str]) -> str:
-    if not file_list or len(file_list) == 0:
-        return None
-    if len(file_list) == 1:
-        return file_list[0]
-    by_modification_time: list[tuple[str, float]] = []
-    curr_file: str
-    for curr_file in file_list:
-        curr_path = os.path.normcase(curr_file)
-        mtime: float = os.path.getmtime(curr_path)
-        by_modification_time.append((curr_file, mtime))
-    # sort by mtime descending
-    by_modification_time.sort(key=lambda x: x[1], reverse=True)
-    # get first.
-    return by_modification_time[0][0]
+        __download_image(image_url=image_url, item_id=obj.id, image_type=image_type)
+        if not cached_file_name:
+            return image_url
+    return get_web_document_root_file_url(
+        dir_list=get_cached_image_subdir_list(image_type=image_type),
+        file_name=cached_file_name)
 
 
 def __get_image_url(obj: any) -> str:
@@ -345,7 +279,7 @@ def is_multidisc_album(album: TidalAlbum) -> bool:
 def try_get_track(tidal_session: TidalSession, track_id: str) -> tuple[TidalTrack, Exception]:
     track: TidalTrack = None
     try:
-        track = tidal_session.track(track_id)
+        track = metadata_store.get_track(tidal_session, track_id)
     except Exception as ex:
         msgproc.log(f"try_get_track failed for track_id [{track_id}] [{type(ex)}] [{ex}]")
         return None, ex
@@ -357,7 +291,7 @@ def try_get_album(tidal_session: TidalSession, album_id: str) -> TidalAlbum:
     try:
         if config.get_config_param_as_bool(constants.ConfigParam.VERBOSE_LOGGING):
             msgproc.log(f"try_get_album loading album_id [{album_id}] ...")
-        album = tidal_session.album(album_id)
+        album = metadata_store.get_album(tidal_session, album_id)
         return album
     except ObjectNotFound as onfEx:
         msgproc.log(f"try_get_album could not find album_id [{album_id}] [{type(onfEx)}] [{onfEx}]")
@@ -369,7 +303,7 @@ def try_get_album(tidal_session: TidalSession, album_id: str) -> TidalAlbum:
 def try_get_artist(tidal_session: TidalSession, artist_id: str) -> TidalArtist:
     artist: TidalArtist = None
     try:
-        artist = tidal_session.artist(artist_id)
+        artist = metadata_store.get_artist(tidal_session, artist_id)
     except Exception as ex:
         msgproc.log(f"try_get_artist failed for artist_id [{artist_id}] [{type(ex)}] [{ex}]")
     return artist
@@ -582,27 +516,6 @@ def __get_best_quality(media_metadata_tags: list[str]) -> str:
     return None
 
 
-def try_get_all_favorites(tidal_session: TidalSession) -> list[TidalAlbum]:
-    favorite_list: list[TidalAlbum] = list()
-    offset: int = 0
-    limit: int = 100
-    while True:
-        some: list[TidalAlbum] = None
-        try:
-            some: list[TidalAlbum] = tidal_session.user.favorites.albums(limit=limit, offset=offset)
-        except Exception as ex:
-            msg: str = f"Cannot get favorite albums from offset [{offset}] [{type(ex)}] [{ex}]"
-            raise Exception(msg)
-        some_len: int = len(some) if some else 0
-        if some_len > 0:
-            favorite_list.extend(some)
-        if some_len < limit:
-            break
-        # another slice maybe
-        offset += limit
-    return favorite_list
-
-
 def get_quality_badge(
         album: TidalAlbum,
         cached_tidal_quality: CachedTidalQuality) -> str:
@@ -817,6 +730,11 @@ def compose_docroot_url(right: str) -> str:
     return f"{doc_root_base_url}/{right}" if doc_root_base_url else None
 
 
+def is_docroot_url(url: str) -> bool:
+    doc_root_base_url: str = get_docroot_base_url()
+    return doc_root_base_url is not None and url is not None and url.startswith(f"{doc_root_base_url}/")
+
+
 def get_oauth2_credentials_file_name() -> str:
     return os.path.join(upmplgutils.getcachedir(constants.PluginConstant.PLUGIN_NAME.value), constants.oauth2_credentials_file_name)
 
@@ -0,0 +1,164 @@
+# Copyright (C) 2026 Giovanni Fulco
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# predictive resolution of the next tracks of an album, playlist or mix
+# the order of the tracks is learned from the intermediate urls built while browsing the container
+# when track N is resolved, tracks N+1.. are resolved a little before N ends, so that the
+# renderer finds them in the track uri cache at the transition
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable
+
+from msgproc_provider import msgproc
+
+
+class PrefetchStatistics:
+
+    def __init__(self):
+        self.prefetched: int = 0
+        self.already_cached: int = 0
+        self.failed: int = 0
+        self.hits: int = 0
+        self.wasted: int = 0
+        self.cancelled: int = 0
+        # trackuri latency by source (prefetched, cached, resolved)
+        self.__latency: dict[str, tuple[int, float]] = {}
+
+    def record_latency(self, source: str, elapsed: float):
+        count, total = self.__latency.get(source, (0, 0.0))
+        self.__latency[source] = (count + 1, total + elapsed)
+
+    def __str__(self) -> str:
+        latency: str = " ".join(
+            f"{source} [{count}] avg [{(total / count):.3f}]"
+            for source, (count, total) in self.__latency.items())
+        return (f"prefetched [{self.prefetched}] hits [{self.hits}] wasted [{self.wasted}] "
+                f"already cached [{self.already_cached}] failed [{self.failed}] cancelled [{self.cancelled}] "
+                f"latency {latency}")
+
+
+class TrackPrefetcher:
+
+    def __init__(self, next_count: int, lead_sec: int, max_containers: int):
+        self.__next_count: int = next_count
+        self.__lead_sec: int = lead_sec
+        self.__max_containers: int = max_containers
+        self.__lock: threading.Lock = threading.Lock()
+        # container -> track ids in browse order, most recently browsed last
+        self.__tracks_by_container: OrderedDict[tuple[str, str], list[str]] = OrderedDict()
+        # track id -> container it was last seen in
+        self.__container_by_track: dict[str, tuple[str, str]] = {}
+        self.__statistics: PrefetchStatistics = PrefetchStatistics()
+        # the pending prefetch and the track it was scheduled for
+        self.__pending_timer: threading.Timer = None
+        self.__pending_track_id: str = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.__next_count > 0
+
+    @property
+    def statistics(self) -> PrefetchStatistics:
+        return self.__statistics
+
+    def add_container_track(self, container_type: str, container_id: str, track_id: str):
+        if not self.enabled:
+            return
+        container: tuple[str, str] = (container_type, container_id)
+        track_id = str(track_id)
+        with self.__lock:
+            track_list: list[str] = self.__tracks_by_container.get(container)
+            if track_list is None:
+                track_list = []
+                self.__tracks_by_container[container] = track_list
+                while len(self.__tracks_by_container) > self.__max_containers:
+                    _, evicted = self.__tracks_by_container.popitem(last=False)
+                    for evicted_track_id in evicted:
+                        if self.__container_by_track.get(evicted_track_id) not in self.__tracks_by_container:
+                            self.__container_by_track.pop(evicted_track_id, None)
+            self.__tracks_by_container.move_to_end(container)
+            if track_id not in track_list:
+                track_list.append(track_id)
+            self.__container_by_track[track_id] = container
+
+    def get_next_track_id_list(self, track_id: str) -> list[str]:
+        with self.__lock:
+            container: tuple[str, str] = self.__container_by_track.get(str(track_id))
+            track_list: list[str] = self.__tracks_by_container.get(container) if container else None
+            if not track_list:
+                return []
+            pos: int = track_list.index(str(track_id))
+            return track_list[pos + 1:pos + 1 + self.__next_count]
+
+    def schedule(self, track_id: str, duration_sec: int, resolver: Callable[[str], bool]):
+        """Runs resolver on the next tracks lead seconds before track_id ends.
+        resolver returns False when the track was already cached"""
+        next_track_id_list: list[str] = self.get_next_track_id_list(track_id)
+        if not next_track_id_list:
+            self.cancel(track_id)
+            return
+        delay_sec: float = max(0, (duration_sec if duration_sec else 0) - self.__lead_sec)
+        timer: threading.Timer = threading.Timer(
+            interval=delay_sec,
+            function=self.__prefetch,
+            args=(next_track_id_list, resolver))
+        timer.daemon = True
+        with self.__lock:
+            # only one track plays at a time, a previous prefetch is stale
+            self.__cancel_pending()
+            self.__pending_timer = timer
+            self.__pending_track_id = str(track_id)
+        timer.start()
+
+    def cancel(self, track_id: str):
+        """Cancels the pending prefetch, unless it was scheduled for track_id"""
+        with self.__lock:
+            if self.__pending_track_id != str(track_id):
+                self.__cancel_pending()
+
+    def __cancel_pending(self):
+        if self.__pending_timer:
+            if self.__pending_timer.is_alive():
+                self.__statistics.cancelled += 1
+            # no effect if the timer has already fired
+            self.__pending_timer.cancel()
+        self.__pending_timer = None
+        self.__pending_track_id = None
+
+    def prefetch_hit(self):
+        self.__statistics.hits += 1
+
+    def prefetch_wasted(self):
+        self.__statistics.wasted += 1
+
+    def record_latency(self, source: str, elapsed: float):
+        with self.__lock:
+            self.__statistics.record_latency(source, elapsed)
+
+    def __prefetch(self, track_id_list: list[str], resolver: Callable[[str], bool]):
+        for track_id in track_id_list:
+            start: float = time.time()
+            try:
+                if resolver(track_id):
+                    self.__statistics.prefetched += 1
+                    msgproc.log(f"TrackPrefetcher prefetched track_id [{track_id}] "
+                                f"in [{(time.time() - start):.3f}] sec")
+                else:
+                    self.__statistics.already_cached += 1
+            except Exception as ex:
+                self.__statistics.failed += 1
+                msgproc.log(f"TrackPrefetcher cannot prefetch track_id [{track_id}] due to [{type(ex)}] [{ex}]")
@@ -0,0 +1,235 @@
+# Copyright (C) 2026 Giovanni Fulco
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# media urls returned by trackuri, by track id and quality, valid for ttl seconds
+# expiry times are kept in a heap, so purging only looks at the entries which are due
+# the size is bounded, entries closest to expiry are evicted first
+# optionally, entries are saved to a file by a background thread and loaded again at startup
+
+import heapq
+import json
+import os
+import threading
+import time
+from typing import Callable
+
+from msgproc_provider import msgproc
+from played_track_request import PlayedTrackRequest
+
+# interval between saves of the cache file, when there are changes
+_SAVE_INTERVAL_SEC: int = 30
+
+
+class TrackUriEntry:
+
+    def __init__(
+            self,
+            media_url: str,
+            prefetched: bool = False,
+            played_track_request_builder: Callable[[], PlayedTrackRequest] = None,
+            creation_time: float = None,
+            duration_sec: int = None):
+        self.__media_url: str = media_url
+        # needed for scheduling the prefetch of the next tracks on a hit
+        self.__duration_sec: int = duration_sec
+        self.__creation_time: float = creation_time if creation_time else time.time()
+        self.__prefetched: bool = prefetched
+        # for prefetched entries, statistics are written on first use
+        self.__played_track_request_builder: Callable[[], PlayedTrackRequest] = played_track_request_builder
+        self.used: bool = False
+
+    @property
+    def media_url(self) -> str:
+        return self.__media_url
+
+    @property
+    def creation_time(self) -> float:
+        return self.__creation_time
+
+    @property
+    def duration_sec(self) -> int:
+        return self.__duration_sec
+
+    @property
+    def prefetched(self) -> bool:
+        return self.__prefetched
+
+    @property
+    def played_track_request_builder(self) -> Callable[[], PlayedTrackRequest]:
+        return self.__played_track_request_builder
+
+
+class TrackUriCacheStatistics:
+
+    def __init__(self):
+        self.hits: int = 0
+        self.misses: int = 0
+        self.expirations: int = 0
+        self.evictions: int = 0
+        self.loaded: int = 0
+
+    def __str__(self) -> str:
+        lookups: int = self.hits + self.misses
+        hit_ratio: float = float(self.hits) / lookups if lookups > 0 else 0.0
+        return (f"hits [{self.hits}] misses [{self.misses}] hit ratio [{hit_ratio:.3f}] "
+                f"expirations [{self.expirations}] evictions [{self.evictions}] loaded [{self.loaded}]")
+
+
+class TrackUriCache:
+
+    def __init__(
+            self,
+            ttl_sec: int,
+            max_entries: int,
+            file_name: str = None,
+            on_discard: Callable[[TrackUriEntry], None] = None,
+            persist_filter: Callable[[TrackUriEntry], bool] = None):
+        self.__ttl_sec: int = ttl_sec
+        self.__max_entries: int = max_entries
+        # None disables persistence
+        self.__file_name: str = file_name
+        # called for entries removed by expiry or eviction
+        self.__on_discard: Callable[[TrackUriEntry], None] = on_discard
+        # entries which would not be valid after a restart are not saved
+        self.__persist_filter: Callable[[TrackUriEntry], bool] = persist_filter
+        self.__lock: threading.Lock = threading.Lock()
+        self.__entries: dict[tuple[str, str], TrackUriEntry] = {}
+        # (expires_at, sequence, key), entries replaced in the meantime are skipped when popped
+        self.__heap: list[tuple[float, int, tuple[str, str]]] = []
+        self.__sequence: int = 0
+        # sequence of the heap item of each live entry
+        self.__sequence_by_key: dict[tuple[str, str], int] = {}
+        self.__statistics: TrackUriCacheStatistics = TrackUriCacheStatistics()
+        self.__dirty: bool = False
+        self.__saver: threading.Thread = None
+
+    @property
+    def statistics(self) -> TrackUriCacheStatistics:
+        return self.__statistics
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def get(self, track_id: str, tidal_quality: str) -> TrackUriEntry | None:
+        with self.__lock:
+            self.__purge(time.time())
+            entry: TrackUriEntry = self.__entries.get((track_id, tidal_quality))
+            if entry:
+                self.__statistics.hits += 1
+            else:
+                self.__statistics.misses += 1
+            return entry
+
+    def contains(self, track_id: str, tidal_quality: str) -> bool:
+        """Like get, without counting"""
+        with self.__lock:
+            self.__purge(time.time())
+            return (track_id, tidal_quality) in self.__entries
+
+    def put(self, track_id: str, tidal_quality: str, entry: TrackUriEntry):
+        with self.__lock:
+            self.__put((track_id, tidal_quality), entry)
+            self.__purge(time.time())
+            self.__dirty = True
+            if self.__file_name and self.__saver is None:
+                self.__saver = threading.Thread(target=self.__save_periodically, daemon=True)
+                self.__saver.start()
+
+    def load(self) -> int:
+        """Loads the unexpired entries from the file, if persistence is enabled"""
+        if not self.__file_name or not os.path.exists(self.__file_name):
+            return 0
+        try:
+            with open(self.__file_name, "r") as f:
+                item_list: list[dict[str, any]] = json.load(f)
+        except Exception as ex:
+            msgproc.log(f"TrackUriCache cannot load [{self.__file_name}] due to [{type(ex)}] [{ex}]")
+            return 0
+        now: float = time.time()
+        with self.__lock:
+            for item in item_list:
+                if item["creation_time"] + self.__ttl_sec <= now:
+                    continue
+                self.__put(
+                    (item["track_id"], item["quality"]),
+                    TrackUriEntry(
+                        media_url=item["media_url"],
+                        creation_time=item["creation_time"],
+                        duration_sec=item.get("duration_sec")))
+                self.__statistics.loaded += 1
+            self.__purge(now)
+        msgproc.log(f"TrackUriCache loaded [{self.__statistics.loaded}] of [{len(item_list)}] entries "
+                    f"from [{self.__file_name}]")
+        return self.__statistics.loaded
+
+    def save(self):
+        if not self.__file_name:
+            return
+        with self.__lock:
+            self.__dirty = False
+            item_list: list[dict[str, any]] = [
+                {"track_id": k[0], "quality": k[1], "media_url": v.media_url, "creation_time": v.creation_time,
+                 "duration_sec": v.duration_sec}
+                for k, v in self.__entries.items()
+                if not self.__persist_filter or self.__persist_filter(v)]
+        # replaced atomically
+        tmp_file_name: str = f"{self.__file_name}.tmp"
+        with open(tmp_file_name, "w") as f:
+            json.dump(item_list, f)
+        os.replace(tmp_file_name, self.__file_name)
+
+    def __put(self, key: tuple[str, str], entry: TrackUriEntry):
+        # lock must be held by the caller
+        self.__entries[key] = entry
+        self.__sequence += 1
+        heapq.heappush(self.__heap, (entry.creation_time + self.__ttl_sec, self.__sequence, key))
+        self.__sequence_by_key[key] = self.__sequence
+        # too many replaced entries in the heap
+        if len(self.__heap) > 2 * len(self.__entries) + 16:
+            self.__heap = [x for x in self.__heap if self.__sequence_by_key.get(x[2]) == x[1]]
+            heapq.heapify(self.__heap)
+        while len(self.__entries) > self.__max_entries > 0:
+            self.__pop(expired=False)
+
+    def __purge(self, now: float):
+        # lock must be held by the caller, amortized O(log n) per removed entry
+        while self.__heap and self.__heap[0][0] <= now:
+            self.__pop(expired=True)
+
+    def __pop(self, expired: bool):
+        # lock must be held by the caller
+        _, sequence, key = heapq.heappop(self.__heap)
+        if self.__sequence_by_key.get(key) != sequence:
+            # replaced or already removed
+            return
+        entry: TrackUriEntry = self.__entries.pop(key)
+        del self.__sequence_by_key[key]
+        self.__dirty = True
+        if expired:
+            self.__statistics.expirations += 1
+        else:
+            self.__statistics.evictions += 1
+        if self.__on_discard:
+            self.__on_discard(entry)
+
+    def __save_periodically(self):
+        while True:
+            time.sleep(_SAVE_INTERVAL_SEC)
+            if not self.__dirty:
+                continue
+            try:
+                self.save()
+            except Exception as ex:
+                msgproc.log(f"TrackUriCache cannot save [{self.__file_name}] due to [{type(ex)}] [{ex}]")